@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Migration 016: Add CommitManifest table for materialized per-commit file listings.
+
+Tree, paths-info, repo info and resolve endpoints are served from a manifest
+(path, size, oid, lfs flag, mtime, physical address) computed once per commit
+instead of relisting LakeFS and joining File row by row.
+
+Changes:
+- Add CommitManifest table (one row per repository + commit)
+
+Existing commits need no backfill here: their manifests are built lazily on
+first access.
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+# Add db_migrations to path (for _migration_utils)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from kohakuhub.config import cfg
+from kohakuhub.db import db
+from _migration_utils import check_table_exists, should_skip_due_to_future_migrations
+
+MIGRATION_NUMBER = 16
+
+
+def is_applied(db, cfg):
+    """Check if THIS migration has been applied.
+
+    Returns True if CommitManifest table exists.
+    """
+    return check_table_exists(db, "commitmanifest")
+
+
+def migrate_postgres():
+    """Create CommitManifest table in PostgreSQL."""
+    cursor = db.cursor()
+
+    print("Creating CommitManifest table...")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS commitmanifest (
+            id SERIAL PRIMARY KEY,
+            repository_id INTEGER NOT NULL REFERENCES repository(id) ON DELETE CASCADE,
+            commit_id VARCHAR(255) NOT NULL,
+            file_count INTEGER NOT NULL DEFAULT 0,
+            total_size BIGINT NOT NULL DEFAULT 0,
+            entries BYTEA NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    print("  ✓ Created CommitManifest table")
+
+    # Create indexes
+    print("Creating indexes...")
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS commitmanifest_repository_id
+        ON commitmanifest(repository_id)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS commitmanifest_commit_id
+        ON commitmanifest(commit_id)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS commitmanifest_repository_id_commit_id
+        ON commitmanifest(repository_id, commit_id)
+        """
+    )
+    print("  ✓ Created indexes")
+
+
+def migrate_sqlite():
+    """Create CommitManifest table in SQLite."""
+    cursor = db.cursor()
+
+    print("Creating CommitManifest table...")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS commitmanifest (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            repository_id INTEGER NOT NULL,
+            commit_id VARCHAR(255) NOT NULL,
+            file_count INTEGER NOT NULL DEFAULT 0,
+            total_size INTEGER NOT NULL DEFAULT 0,
+            entries BLOB NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (repository_id) REFERENCES repository (id) ON DELETE CASCADE
+        )
+        """
+    )
+    print("  ✓ Created CommitManifest table")
+
+    # Create indexes
+    print("Creating indexes...")
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS commitmanifest_repository_id
+        ON commitmanifest(repository_id)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS commitmanifest_commit_id
+        ON commitmanifest(commit_id)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS commitmanifest_repository_id_commit_id
+        ON commitmanifest(repository_id, commit_id)
+        """
+    )
+    print("  ✓ Created indexes")
+
+
+def run():
+    """Run migration 016.
+
+    Returns:
+        True if successful or already applied, False otherwise
+    """
+    db.connect(reuse_if_open=True)
+
+    try:
+        # Check if should skip due to future migrations
+        if should_skip_due_to_future_migrations(MIGRATION_NUMBER, db, cfg):
+            print(
+                f"Migration {MIGRATION_NUMBER}: Skipped (superseded by future migration)"
+            )
+            return True
+
+        # Check if already applied
+        if is_applied(db, cfg):
+            print(
+                f"Migration {MIGRATION_NUMBER}: Already applied (CommitManifest table exists)"
+            )
+            return True
+
+        print("=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: Add CommitManifest table")
+        print("=" * 70)
+
+        # Run migration in transaction
+        with db.atomic():
+            if cfg.app.db_backend == "postgres":
+                migrate_postgres()
+            else:
+                migrate_sqlite()
+
+        print("\n" + "=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: ✓ Completed Successfully")
+        print("=" * 70)
+        print("\nSummary:")
+        print("  • Added CommitManifest table for per-commit file listings")
+        print("  • Manifests for existing commits are built lazily on first access")
+        return True
+
+    except Exception as e:
+        print(f"\n✗ Migration {MIGRATION_NUMBER} failed: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Migration 017: Add denormalized main branch head to Repository.
+
+Repository list endpoints used to call LakeFS get_branch + get_commit for
+every row. The head commit ID and its creation date are now stored on the
+Repository row and kept in sync by commit/merge/revert/reset.
+
+Changes:
+- Add Repository.head_commit_id (NULL = not synced yet)
+- Add Repository.last_modified (creation date of head commit)
+- Add index on (repo_type, last_modified) for sort=lastModified
+- Backfill both columns from LakeFS (best effort; rows that can't be
+  reached now are filled lazily by the list endpoints)
+"""
+
+import asyncio
+import sys
+import os
+from datetime import datetime, timezone
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+# Add db_migrations to path (for _migration_utils)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from kohakuhub.db import db
+from kohakuhub.config import cfg
+from _migration_utils import should_skip_due_to_future_migrations, check_column_exists
+
+MIGRATION_NUMBER = 17
+
+
+def is_applied(db, cfg):
+    """Check if THIS migration has been applied.
+
+    Returns True if Repository.head_commit_id column exists.
+    """
+    return check_column_exists(db, cfg, "repository", "head_commit_id")
+
+
+def check_migration_needed():
+    """Check if this migration needs to run by checking if columns exist."""
+    return not check_column_exists(db, cfg, "repository", "head_commit_id")
+
+
+def migrate_sqlite():
+    """Migrate SQLite database.
+
+    Note: This function runs inside a transaction (db.atomic()).
+    Do NOT call db.commit() or db.rollback() inside this function.
+    """
+    cursor = db.cursor()
+
+    for column, sql in [
+        (
+            "head_commit_id",
+            "ALTER TABLE repository ADD COLUMN head_commit_id VARCHAR(255) DEFAULT NULL",
+        ),
+        (
+            "last_modified",
+            "ALTER TABLE repository ADD COLUMN last_modified DATETIME DEFAULT NULL",
+        ),
+    ]:
+        try:
+            cursor.execute(sql)
+            print(f"  ✓ Added Repository.{column}")
+        except Exception as e:
+            if "duplicate column" in str(e).lower():
+                print(f"  - Repository.{column} already exists")
+            else:
+                raise
+
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS repository_repo_type_last_modified
+        ON repository(repo_type, last_modified)
+        """
+    )
+    print("  ✓ Created index on (repo_type, last_modified)")
+
+
+def migrate_postgres():
+    """Migrate PostgreSQL database.
+
+    Note: This function runs inside a transaction (db.atomic()).
+    Do NOT call db.commit() or db.rollback() inside this function.
+    """
+    cursor = db.cursor()
+
+    for column, sql in [
+        (
+            "head_commit_id",
+            "ALTER TABLE repository ADD COLUMN head_commit_id VARCHAR(255) DEFAULT NULL",
+        ),
+        (
+            "last_modified",
+            "ALTER TABLE repository ADD COLUMN last_modified TIMESTAMP DEFAULT NULL",
+        ),
+    ]:
+        try:
+            cursor.execute(sql)
+            print(f"  ✓ Added Repository.{column}")
+        except Exception as e:
+            if "already exists" in str(e).lower():
+                print(f"  - Repository.{column} already exists")
+            else:
+                raise
+
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS repository_repo_type_last_modified
+        ON repository(repo_type, last_modified)
+        """
+    )
+    print("  ✓ Created index on (repo_type, last_modified)")
+
+
+async def fetch_heads(repos: list[tuple]) -> list[tuple]:
+    """Fetch main branch head for each (id, repo_type, full_id) from LakeFS.
+
+    Returns:
+        List of (head_commit_id, last_modified, id) for reachable repositories
+    """
+    from kohakuhub.utils.lakefs import get_lakefs_client, lakefs_repo_name
+
+    client = get_lakefs_client()
+    semaphore = asyncio.Semaphore(max(cfg.lakefs.list_concurrency, 1))
+
+    async def fetch(repo_id: int, repo_type: str, full_id: str):
+        lakefs_repo = lakefs_repo_name(repo_type, full_id)
+        async with semaphore:
+            try:
+                branch = await client.get_branch(repository=lakefs_repo, branch="main")
+                commit = await client.get_commit(
+                    repository=lakefs_repo, commit_id=branch["commit_id"]
+                )
+            except Exception as e:
+                print(f"  - Could not read head of {repo_type}/{full_id}: {e}")
+                return None
+        last_modified = datetime.fromtimestamp(commit["creation_date"], tz=timezone.utc)
+        return commit["id"], last_modified, repo_id
+
+    results = await asyncio.gather(*[fetch(*repo) for repo in repos])
+    return [result for result in results if result is not None]
+
+
+def backfill_heads():
+    """Backfill head columns from LakeFS (outside the schema transaction)."""
+    cursor = db.cursor()
+    cursor.execute(
+        "SELECT id, repo_type, full_id FROM repository WHERE head_commit_id IS NULL"
+    )
+    repos = cursor.fetchall()
+    if not repos:
+        return
+
+    print(f"Backfilling head commit for {len(repos)} repositories from LakeFS...")
+    try:
+        heads = asyncio.run(fetch_heads(repos))
+    except Exception as e:
+        print(f"  - Backfill skipped, LakeFS unavailable: {e}")
+        print("    Heads will be filled lazily by the list endpoints")
+        return
+
+    param = "%s" if cfg.app.db_backend == "postgres" else "?"
+    with db.atomic():
+        cursor = db.cursor()
+        cursor.executemany(
+            f"UPDATE repository SET head_commit_id = {param}, "
+            f"last_modified = {param} WHERE id = {param}",
+            heads,
+        )
+    print(f"  ✓ Backfilled {len(heads)}/{len(repos)} repositories")
+
+
+def run():
+    """Run this migration.
+
+    IMPORTANT: Do NOT call db.close() in finally block!
+    The db connection is managed by run_migrations.py and should stay open
+    across all migrations to avoid stdout/stderr closure issues on Windows.
+    """
+    db.connect(reuse_if_open=True)
+
+    try:
+        # Pre-flight checks (outside transaction for performance)
+        if should_skip_due_to_future_migrations(MIGRATION_NUMBER, db, cfg):
+            print("Migration 017: Skipped (superseded by future migration)")
+            return True
+
+        if not check_migration_needed():
+            print("Migration 017: Already applied (columns exist)")
+            return True
+
+        print("Migration 017: Adding Repository head commit fields...")
+
+        # Run migration in a transaction - will auto-rollback on exception
+        with db.atomic():
+            if cfg.app.db_backend == "postgres":
+                migrate_postgres()
+            else:
+                migrate_sqlite()
+
+        # Data backfill is best effort and must not fail the migration
+        try:
+            backfill_heads()
+        except Exception as e:
+            print(f"  - Backfill failed (heads will be filled lazily): {e}")
+
+        print("Migration 017: ✓ Completed")
+        return True
+
+    except Exception as e:
+        # Transaction automatically rolled back if we reach here
+        print(f"Migration 017: ✗ Failed - {e}")
+        print("  All changes have been rolled back")
+        import traceback
+
+        traceback.print_exc()
+        return False
+    # NOTE: No finally block - db connection stays open
+
+
+if __name__ == "__main__":
+    success = run()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Migration 018: Add composite indexes for keyset-paginated repository lists.
+
+/api/models, /api/datasets and /api/spaces page through repositories ordered
+by (created_at, id), (downloads, id) or (likes_count, id) within a repo type.
+Each order gets a matching index so a page is read straight off the index.
+
+Changes:
+- Add index on Repository(repo_type, created_at, id)
+- Add index on Repository(repo_type, downloads, id)
+- Add index on Repository(repo_type, likes_count, id)
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+# Add db_migrations to path (for _migration_utils)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from kohakuhub.db import db
+from kohakuhub.config import cfg
+from _migration_utils import should_skip_due_to_future_migrations
+
+MIGRATION_NUMBER = 18
+
+INDEXES = [
+    ("repository_repo_type_created_at_id", "repo_type, created_at, id"),
+    ("repository_repo_type_downloads_id", "repo_type, downloads, id"),
+    ("repository_repo_type_likes_count_id", "repo_type, likes_count, id"),
+]
+
+
+def check_index_exists(db, cfg, index_name: str) -> bool:
+    """Check if an index exists in the database."""
+    try:
+        cursor = db.cursor()
+        if cfg.app.db_backend == "postgres":
+            cursor.execute(
+                "SELECT 1 FROM pg_indexes WHERE indexname = %s", (index_name,)
+            )
+        else:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                (index_name,),
+            )
+        return cursor.fetchone() is not None
+    except Exception:
+        return False
+
+
+def is_applied(db, cfg):
+    """Check if THIS migration has been applied.
+
+    Returns True if all list indexes exist.
+    """
+    return all(check_index_exists(db, cfg, name) for name, _ in INDEXES)
+
+
+def migrate():
+    """Create the indexes (same SQL for SQLite and PostgreSQL).
+
+    Note: This function runs inside a transaction (db.atomic()).
+    Do NOT call db.commit() or db.rollback() inside this function.
+    """
+    cursor = db.cursor()
+
+    for name, columns in INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON repository({columns})")
+        print(f"  ✓ Created index {name}")
+
+
+def run():
+    """Run this migration.
+
+    IMPORTANT: Do NOT call db.close() in finally block!
+    The db connection is managed by run_migrations.py and should stay open
+    across all migrations to avoid stdout/stderr closure issues on Windows.
+    """
+    db.connect(reuse_if_open=True)
+
+    try:
+        # Pre-flight checks (outside transaction for performance)
+        if should_skip_due_to_future_migrations(MIGRATION_NUMBER, db, cfg):
+            print("Migration 018: Skipped (superseded by future migration)")
+            return True
+
+        if is_applied(db, cfg):
+            print("Migration 018: Already applied (indexes exist)")
+            return True
+
+        print("Migration 018: Adding repository list indexes...")
+
+        # Run migration in a transaction - will auto-rollback on exception
+        with db.atomic():
+            migrate()
+
+        print("Migration 018: ✓ Completed")
+        return True
+
+    except Exception as e:
+        # Transaction automatically rolled back if we reach here
+        print(f"Migration 018: ✗ Failed - {e}")
+        print("  All changes have been rolled back")
+        import traceback
+
+        traceback.print_exc()
+        return False
+    # NOTE: No finally block - db connection stays open
+
+
+if __name__ == "__main__":
+    success = run()
+    sys.exit(0 if success else 1)
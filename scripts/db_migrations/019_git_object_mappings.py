@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Migration 019: Add persistent git object mapping tables for the git bridge.
+
+Git ref advertisement used to list every object of the head commit and
+download every regular file just to compute blob SHA-1s. Blob SHA-1s are now
+stored per LakeFS physical address, and the synthesized commit/tree SHA-1s
+per LakeFS commit.
+
+Changes:
+- Add GitBlobMapping table (physical address -> git blob SHA-1)
+- Add GitCommitMapping table (repository + LakeFS commit -> git commit/tree SHA-1)
+
+Both tables are filled lazily by the git bridge, no backfill is needed.
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+# Add db_migrations to path (for _migration_utils)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from kohakuhub.config import cfg
+from kohakuhub.db import db
+from _migration_utils import check_table_exists, should_skip_due_to_future_migrations
+
+MIGRATION_NUMBER = 19
+
+
+def is_applied(db, cfg):
+    """Check if THIS migration has been applied.
+
+    Returns True if both mapping tables exist.
+    """
+    return check_table_exists(db, "gitblobmapping") and check_table_exists(
+        db, "gitcommitmapping"
+    )
+
+
+def create_indexes(cursor):
+    """Create mapping table indexes (same SQL for both backends)."""
+    print("Creating indexes...")
+    cursor.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS gitblobmapping_physical_address
+        ON gitblobmapping(physical_address)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS gitcommitmapping_repository_id
+        ON gitcommitmapping(repository_id)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS gitcommitmapping_commit_id
+        ON gitcommitmapping(commit_id)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS gitcommitmapping_commit_sha1
+        ON gitcommitmapping(commit_sha1)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS gitcommitmapping_repository_id_commit_id
+        ON gitcommitmapping(repository_id, commit_id)
+        """
+    )
+    print("  ✓ Created indexes")
+
+
+def migrate_postgres():
+    """Create mapping tables in PostgreSQL."""
+    cursor = db.cursor()
+
+    print("Creating GitBlobMapping table...")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS gitblobmapping (
+            id SERIAL PRIMARY KEY,
+            physical_address VARCHAR(1024) NOT NULL,
+            checksum VARCHAR(255),
+            blob_sha1 VARCHAR(40) NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    print("  ✓ Created GitBlobMapping table")
+
+    print("Creating GitCommitMapping table...")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS gitcommitmapping (
+            id SERIAL PRIMARY KEY,
+            repository_id INTEGER NOT NULL REFERENCES repository(id) ON DELETE CASCADE,
+            commit_id VARCHAR(255) NOT NULL,
+            commit_sha1 VARCHAR(40) NOT NULL,
+            tree_sha1 VARCHAR(40) NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    print("  ✓ Created GitCommitMapping table")
+
+    create_indexes(cursor)
+
+
+def migrate_sqlite():
+    """Create mapping tables in SQLite."""
+    cursor = db.cursor()
+
+    print("Creating GitBlobMapping table...")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS gitblobmapping (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            physical_address VARCHAR(1024) NOT NULL,
+            checksum VARCHAR(255),
+            blob_sha1 VARCHAR(40) NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    print("  ✓ Created GitBlobMapping table")
+
+    print("Creating GitCommitMapping table...")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS gitcommitmapping (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            repository_id INTEGER NOT NULL,
+            commit_id VARCHAR(255) NOT NULL,
+            commit_sha1 VARCHAR(40) NOT NULL,
+            tree_sha1 VARCHAR(40) NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (repository_id) REFERENCES repository (id) ON DELETE CASCADE
+        )
+        """
+    )
+    print("  ✓ Created GitCommitMapping table")
+
+    create_indexes(cursor)
+
+
+def run():
+    """Run migration 019.
+
+    Returns:
+        True if successful or already applied, False otherwise
+    """
+    db.connect(reuse_if_open=True)
+
+    try:
+        # Check if should skip due to future migrations
+        if should_skip_due_to_future_migrations(MIGRATION_NUMBER, db, cfg):
+            print(
+                f"Migration {MIGRATION_NUMBER}: Skipped (superseded by future migration)"
+            )
+            return True
+
+        # Check if already applied
+        if is_applied(db, cfg):
+            print(
+                f"Migration {MIGRATION_NUMBER}: Already applied (mapping tables exist)"
+            )
+            return True
+
+        print("=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: Add git object mapping tables")
+        print("=" * 70)
+
+        # Run migration in transaction
+        with db.atomic():
+            if cfg.app.db_backend == "postgres":
+                migrate_postgres()
+            else:
+                migrate_sqlite()
+
+        print("\n" + "=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: ✓ Completed Successfully")
+        print("=" * 70)
+        print("\nSummary:")
+        print("  • Added GitBlobMapping table (physical address -> blob SHA-1)")
+        print("  • Added GitCommitMapping table (LakeFS commit -> git commit SHA-1)")
+        print("  • Mappings are filled lazily by the git bridge")
+        return True
+
+    except Exception as e:
+        print(f"\n✗ Migration {MIGRATION_NUMBER} failed: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Migration 020: Store parents and commit objects of synthesized git commits.
+
+The git bridge used to synthesize one parentless commit per LakeFS commit.
+Commits are now mapped with their real LakeFS parents and the raw commit
+object is stored, so the SHA-1 advertised to clients never changes.
+
+Changes:
+- Add GitCommitMapping.parent_commit_ids (JSON list of LakeFS commit IDs)
+- Add GitCommitMapping.commit_object (git commit object with header)
+- Drop existing (parentless) mappings; they are remapped on first access
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+# Add db_migrations to path (for _migration_utils)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from kohakuhub.config import cfg
+from kohakuhub.db import db
+from _migration_utils import check_column_exists, should_skip_due_to_future_migrations
+
+MIGRATION_NUMBER = 20
+
+
+def is_applied(db, cfg):
+    """Check if THIS migration has been applied.
+
+    Returns True if GitCommitMapping.commit_object column exists.
+    """
+    return check_column_exists(db, cfg, "gitcommitmapping", "commit_object")
+
+
+def migrate_sqlite():
+    """Migrate SQLite database.
+
+    Note: This function runs inside a transaction (db.atomic()).
+    Do NOT call db.commit() or db.rollback() inside this function.
+    """
+    cursor = db.cursor()
+
+    for column, sql in [
+        (
+            "parent_commit_ids",
+            "ALTER TABLE gitcommitmapping ADD COLUMN parent_commit_ids TEXT NOT NULL DEFAULT '[]'",
+        ),
+        (
+            "commit_object",
+            "ALTER TABLE gitcommitmapping ADD COLUMN commit_object BLOB DEFAULT NULL",
+        ),
+    ]:
+        try:
+            cursor.execute(sql)
+            print(f"  ✓ Added GitCommitMapping.{column}")
+        except Exception as e:
+            if "duplicate column" in str(e).lower():
+                print(f"  - GitCommitMapping.{column} already exists")
+            else:
+                raise
+
+    cursor.execute("DELETE FROM gitcommitmapping")
+    print("  ✓ Cleared parentless commit mappings")
+
+
+def migrate_postgres():
+    """Migrate PostgreSQL database.
+
+    Note: This function runs inside a transaction (db.atomic()).
+    Do NOT call db.commit() or db.rollback() inside this function.
+    """
+    cursor = db.cursor()
+
+    for column, sql in [
+        (
+            "parent_commit_ids",
+            "ALTER TABLE gitcommitmapping ADD COLUMN parent_commit_ids TEXT NOT NULL DEFAULT '[]'",
+        ),
+        (
+            "commit_object",
+            "ALTER TABLE gitcommitmapping ADD COLUMN commit_object BYTEA DEFAULT NULL",
+        ),
+    ]:
+        try:
+            cursor.execute(sql)
+            print(f"  ✓ Added GitCommitMapping.{column}")
+        except Exception as e:
+            if "already exists" in str(e).lower():
+                print(f"  - GitCommitMapping.{column} already exists")
+            else:
+                raise
+
+    cursor.execute("DELETE FROM gitcommitmapping")
+    print("  ✓ Cleared parentless commit mappings")
+
+
+def run():
+    """Run migration 020.
+
+    Returns:
+        True if successful or already applied, False otherwise
+    """
+    db.connect(reuse_if_open=True)
+
+    try:
+        # Check if should skip due to future migrations
+        if should_skip_due_to_future_migrations(MIGRATION_NUMBER, db, cfg):
+            print(
+                f"Migration {MIGRATION_NUMBER}: Skipped (superseded by future migration)"
+            )
+            return True
+
+        # Check if already applied
+        if is_applied(db, cfg):
+            print(
+                f"Migration {MIGRATION_NUMBER}: Already applied (commit_object column exists)"
+            )
+            return True
+
+        print("=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: Git commit history")
+        print("=" * 70)
+
+        # Run migration in transaction
+        with db.atomic():
+            if cfg.app.db_backend == "postgres":
+                migrate_postgres()
+            else:
+                migrate_sqlite()
+
+        print("\n" + "=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: ✓ Completed Successfully")
+        print("=" * 70)
+        print("\nSummary:")
+        print("  • Git commits now carry their LakeFS parents")
+        print("  • Existing mappings are rebuilt on first git access")
+        return True
+
+    except Exception as e:
+        print(f"\n✗ Migration {MIGRATION_NUMBER} failed: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    run()
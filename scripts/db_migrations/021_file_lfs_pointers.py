@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Migration 021: Store git LFS pointer blobs on File rows.
+
+The git bridge regenerated and rehashed the LFS pointer of every large file
+each time it built a tree. The pointer blob SHA-1 and pointer content are
+now written with the File row when an LFS file is committed.
+
+Changes:
+- Add File.lfs_pointer_sha1 (git blob SHA-1 of the LFS pointer)
+- Add File.lfs_pointer (LFS pointer content)
+- Backfill both for existing LFS files (rows left NULL fall back to
+  building the pointer on the fly)
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+# Add db_migrations to path (for _migration_utils)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from kohakuhub.config import cfg
+from kohakuhub.db import db
+from _migration_utils import check_column_exists, should_skip_due_to_future_migrations
+
+MIGRATION_NUMBER = 21
+BACKFILL_BATCH_SIZE = 1000
+
+
+def is_applied(db, cfg):
+    """Check if THIS migration has been applied.
+
+    Returns True if File.lfs_pointer_sha1 column exists.
+    """
+    return check_column_exists(db, cfg, "file", "lfs_pointer_sha1")
+
+
+def migrate_sqlite():
+    """Migrate SQLite database.
+
+    Note: This function runs inside a transaction (db.atomic()).
+    Do NOT call db.commit() or db.rollback() inside this function.
+    """
+    cursor = db.cursor()
+
+    for column, sql in [
+        (
+            "lfs_pointer_sha1",
+            "ALTER TABLE file ADD COLUMN lfs_pointer_sha1 VARCHAR(40) DEFAULT NULL",
+        ),
+        (
+            "lfs_pointer",
+            "ALTER TABLE file ADD COLUMN lfs_pointer BLOB DEFAULT NULL",
+        ),
+    ]:
+        try:
+            cursor.execute(sql)
+            print(f"  ✓ Added File.{column}")
+        except Exception as e:
+            if "duplicate column" in str(e).lower():
+                print(f"  - File.{column} already exists")
+            else:
+                raise
+
+
+def migrate_postgres():
+    """Migrate PostgreSQL database.
+
+    Note: This function runs inside a transaction (db.atomic()).
+    Do NOT call db.commit() or db.rollback() inside this function.
+    """
+    cursor = db.cursor()
+
+    for column, sql in [
+        (
+            "lfs_pointer_sha1",
+            "ALTER TABLE file ADD COLUMN lfs_pointer_sha1 VARCHAR(40) DEFAULT NULL",
+        ),
+        (
+            "lfs_pointer",
+            "ALTER TABLE file ADD COLUMN lfs_pointer BYTEA DEFAULT NULL",
+        ),
+    ]:
+        try:
+            cursor.execute(sql)
+            print(f"  ✓ Added File.{column}")
+        except Exception as e:
+            if "already exists" in str(e).lower():
+                print(f"  - File.{column} already exists")
+            else:
+                raise
+
+
+def backfill_pointers():
+    """Backfill pointer blobs of existing LFS files (outside the schema transaction)."""
+    from kohakuhub.api.git.utils.lakefs_bridge import create_lfs_pointer_blob
+
+    param = "%s" if cfg.app.db_backend == "postgres" else "?"
+    total = 0
+    while True:
+        cursor = db.cursor()
+        cursor.execute(
+            "SELECT id, sha256, size FROM file "
+            "WHERE lfs AND lfs_pointer_sha1 IS NULL "
+            f"LIMIT {BACKFILL_BATCH_SIZE}"
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+
+        updates = []
+        for file_id, sha256, size in rows:
+            pointer_sha1, pointer = create_lfs_pointer_blob(sha256, size)
+            updates.append((pointer_sha1, pointer, file_id))
+
+        with db.atomic():
+            cursor = db.cursor()
+            cursor.executemany(
+                f"UPDATE file SET lfs_pointer_sha1 = {param}, "
+                f"lfs_pointer = {param} WHERE id = {param}",
+                updates,
+            )
+        total += len(updates)
+
+    print(f"  ✓ Backfilled LFS pointers of {total} files")
+
+
+def run():
+    """Run migration 021.
+
+    Returns:
+        True if successful or already applied, False otherwise
+    """
+    db.connect(reuse_if_open=True)
+
+    try:
+        # Check if should skip due to future migrations
+        if should_skip_due_to_future_migrations(MIGRATION_NUMBER, db, cfg):
+            print(
+                f"Migration {MIGRATION_NUMBER}: Skipped (superseded by future migration)"
+            )
+            return True
+
+        # Check if already applied
+        if is_applied(db, cfg):
+            print(
+                f"Migration {MIGRATION_NUMBER}: Already applied (lfs_pointer_sha1 column exists)"
+            )
+            return True
+
+        print("=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: File LFS pointer blobs")
+        print("=" * 70)
+
+        # Run migration in transaction
+        with db.atomic():
+            if cfg.app.db_backend == "postgres":
+                migrate_postgres()
+            else:
+                migrate_sqlite()
+
+        # Data backfill is best effort and must not fail the migration
+        try:
+            backfill_pointers()
+        except Exception as e:
+            print(f"  - Backfill failed (pointers are built on the fly): {e}")
+
+        print("\n" + "=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: ✓ Completed Successfully")
+        print("=" * 70)
+        print("\nSummary:")
+        print("  • LFS pointer blobs are stored with File rows at commit time")
+        return True
+
+    except Exception as e:
+        print(f"\n✗ Migration {MIGRATION_NUMBER} failed: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    run()
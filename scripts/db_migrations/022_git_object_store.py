@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Migration 022: Add the git object store index.
+
+The git bridge recomputed every tree and refetched every blob from LakeFS on
+each clone. Git objects are now mirrored into an S3 object store per
+repository (loose objects and packs under git-objects/), indexed in the
+database.
+
+Changes:
+- Add GitObject table (repository + SHA-1 -> type, size, pack location)
+
+The store is filled lazily by the git bridge, no backfill is needed.
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+# Add db_migrations to path (for _migration_utils)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from kohakuhub.config import cfg
+from kohakuhub.db import db
+from _migration_utils import check_table_exists, should_skip_due_to_future_migrations
+
+MIGRATION_NUMBER = 22
+
+
+def is_applied(db, cfg):
+    """Check if THIS migration has been applied.
+
+    Returns True if the GitObject table exists.
+    """
+    return check_table_exists(db, "gitobject")
+
+
+def create_indexes(cursor):
+    """Create GitObject indexes (same SQL for both backends)."""
+    print("Creating indexes...")
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS gitobject_repository_id
+        ON gitobject(repository_id)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS gitobject_repository_id_sha1
+        ON gitobject(repository_id, sha1)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS gitobject_repository_id_pack
+        ON gitobject(repository_id, pack)
+        """
+    )
+    print("  ✓ Created indexes")
+
+
+def migrate_postgres():
+    """Create GitObject table in PostgreSQL."""
+    cursor = db.cursor()
+
+    print("Creating GitObject table...")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS gitobject (
+            id SERIAL PRIMARY KEY,
+            repository_id INTEGER NOT NULL REFERENCES repository(id) ON DELETE CASCADE,
+            sha1 VARCHAR(40) NOT NULL,
+            obj_type INTEGER NOT NULL,
+            size BIGINT NOT NULL,
+            pack VARCHAR(40),
+            "offset" BIGINT,
+            length BIGINT,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    print("  ✓ Created GitObject table")
+
+    create_indexes(cursor)
+
+
+def migrate_sqlite():
+    """Create GitObject table in SQLite."""
+    cursor = db.cursor()
+
+    print("Creating GitObject table...")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS gitobject (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            repository_id INTEGER NOT NULL,
+            sha1 VARCHAR(40) NOT NULL,
+            obj_type INTEGER NOT NULL,
+            size BIGINT NOT NULL,
+            pack VARCHAR(40),
+            "offset" BIGINT,
+            length BIGINT,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (repository_id) REFERENCES repository (id) ON DELETE CASCADE
+        )
+        """
+    )
+    print("  ✓ Created GitObject table")
+
+    create_indexes(cursor)
+
+
+def run():
+    """Run migration 022.
+
+    Returns:
+        True if successful or already applied, False otherwise
+    """
+    db.connect(reuse_if_open=True)
+
+    try:
+        # Check if should skip due to future migrations
+        if should_skip_due_to_future_migrations(MIGRATION_NUMBER, db, cfg):
+            print(
+                f"Migration {MIGRATION_NUMBER}: Skipped (superseded by future migration)"
+            )
+            return True
+
+        # Check if already applied
+        if is_applied(db, cfg):
+            print(f"Migration {MIGRATION_NUMBER}: Already applied (gitobject exists)")
+            return True
+
+        print("=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: Add git object store index")
+        print("=" * 70)
+
+        # Run migration in transaction
+        with db.atomic():
+            if cfg.app.db_backend == "postgres":
+                migrate_postgres()
+            else:
+                migrate_sqlite()
+
+        print("\n" + "=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: ✓ Completed Successfully")
+        print("=" * 70)
+        print("\nSummary:")
+        print("  • Added GitObject table (SHA-1 -> loose object or pack entry)")
+        print("  • The object store is filled lazily by the git bridge")
+        return True
+
+    except Exception as e:
+        print(f"\n✗ Migration {MIGRATION_NUMBER} failed: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Migration 023: Add LFS object content verification state.
+
+Uploaded LFS objects were trusted for deduplication as soon as they existed
+in S3, without checking that their content hashes to the claimed OID. The
+server now hashes every confirmed upload and records the result.
+
+Changes:
+- Add LFSObjectVerification table (OID -> size, status, actual hash)
+
+Objects uploaded before this migration have no verification row; they are
+uploaded (and verified) again the next time a client pushes them.
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+# Add db_migrations to path (for _migration_utils)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from kohakuhub.config import cfg
+from kohakuhub.db import db
+from _migration_utils import check_table_exists, should_skip_due_to_future_migrations
+
+MIGRATION_NUMBER = 23
+
+
+def is_applied(db, cfg):
+    """Check if THIS migration has been applied.
+
+    Returns True if the LFSObjectVerification table exists.
+    """
+    return check_table_exists(db, "lfsobjectverification")
+
+
+def create_indexes(cursor):
+    """Create LFSObjectVerification indexes (same SQL for both backends)."""
+    print("Creating indexes...")
+    cursor.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS lfsobjectverification_sha256
+        ON lfsobjectverification(sha256)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS lfsobjectverification_status
+        ON lfsobjectverification(status)
+        """
+    )
+    print("  ✓ Created indexes")
+
+
+def migrate_postgres():
+    """Create LFSObjectVerification table in PostgreSQL."""
+    cursor = db.cursor()
+
+    print("Creating LFSObjectVerification table...")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lfsobjectverification (
+            id SERIAL PRIMARY KEY,
+            sha256 VARCHAR(64) NOT NULL,
+            size BIGINT NOT NULL,
+            status VARCHAR(255) NOT NULL DEFAULT 'pending',
+            actual_sha256 VARCHAR(64),
+            checked_at TIMESTAMP,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    print("  ✓ Created LFSObjectVerification table")
+
+    create_indexes(cursor)
+
+
+def migrate_sqlite():
+    """Create LFSObjectVerification table in SQLite."""
+    cursor = db.cursor()
+
+    print("Creating LFSObjectVerification table...")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lfsobjectverification (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sha256 VARCHAR(64) NOT NULL,
+            size BIGINT NOT NULL,
+            status VARCHAR(255) NOT NULL DEFAULT 'pending',
+            actual_sha256 VARCHAR(64),
+            checked_at TIMESTAMP,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    print("  ✓ Created LFSObjectVerification table")
+
+    create_indexes(cursor)
+
+
+def run():
+    """Run migration 023.
+
+    Returns:
+        True if successful or already applied, False otherwise
+    """
+    db.connect(reuse_if_open=True)
+
+    try:
+        # Check if should skip due to future migrations
+        if should_skip_due_to_future_migrations(MIGRATION_NUMBER, db, cfg):
+            print(
+                f"Migration {MIGRATION_NUMBER}: Skipped (superseded by future migration)"
+            )
+            return True
+
+        # Check if already applied
+        if is_applied(db, cfg):
+            print(f"Migration {MIGRATION_NUMBER}: Already applied (lfsobjectverification exists)")
+            return True
+
+        print("=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: Add LFS object verification state")
+        print("=" * 70)
+
+        # Run migration in transaction
+        with db.atomic():
+            if cfg.app.db_backend == "postgres":
+                migrate_postgres()
+            else:
+                migrate_sqlite()
+
+        print("\n" + "=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: ✓ Completed Successfully")
+        print("=" * 70)
+        print("\nSummary:")
+        print("  • Added LFSObjectVerification table (OID -> verification status)")
+        print("  • Older LFS objects are re-uploaded and verified on their next push")
+        return True
+
+    except Exception as e:
+        print(f"\n✗ Migration {MIGRATION_NUMBER} failed: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    run()
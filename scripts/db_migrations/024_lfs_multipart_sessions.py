@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Migration 024: Add resumable multipart LFS upload sessions.
+
+Every LFS batch request started a new S3 multipart upload, so a retried
+upload restarted from zero and the parts of the abandoned upload stayed in
+the bucket. Open multipart uploads are now recorded and resumed.
+
+Changes:
+- Add LFSMultipartUpload table ((OID, size) -> upload ID, parts, expiry)
+
+Multipart uploads started before this migration are not tracked; configure
+an S3 lifecycle rule (AbortIncompleteMultipartUpload) to clean those up.
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+# Add db_migrations to path (for _migration_utils)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from kohakuhub.config import cfg
+from kohakuhub.db import db
+from _migration_utils import check_table_exists, should_skip_due_to_future_migrations
+
+MIGRATION_NUMBER = 24
+
+
+def is_applied(db, cfg):
+    """Check if THIS migration has been applied.
+
+    Returns True if the LFSMultipartUpload table exists.
+    """
+    return check_table_exists(db, "lfsmultipartupload")
+
+
+def create_indexes(cursor):
+    """Create LFSMultipartUpload indexes (same SQL for both backends)."""
+    print("Creating indexes...")
+    cursor.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS lfsmultipartupload_upload_id
+        ON lfsmultipartupload(upload_id)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE INDEX IF NOT EXISTS lfsmultipartupload_expires_at
+        ON lfsmultipartupload(expires_at)
+        """
+    )
+    cursor.execute(
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS lfsmultipartupload_sha256_size
+        ON lfsmultipartupload(sha256, size)
+        """
+    )
+    print("  ✓ Created indexes")
+
+
+def migrate_postgres():
+    """Create LFSMultipartUpload table in PostgreSQL."""
+    cursor = db.cursor()
+
+    print("Creating LFSMultipartUpload table...")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lfsmultipartupload (
+            id SERIAL PRIMARY KEY,
+            sha256 VARCHAR(64) NOT NULL,
+            size BIGINT NOT NULL,
+            upload_id VARCHAR(1024) NOT NULL,
+            chunk_size BIGINT NOT NULL,
+            part_count INTEGER NOT NULL,
+            parts TEXT NOT NULL DEFAULT '[]',
+            expires_at TIMESTAMP NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    print("  ✓ Created LFSMultipartUpload table")
+
+    create_indexes(cursor)
+
+
+def migrate_sqlite():
+    """Create LFSMultipartUpload table in SQLite."""
+    cursor = db.cursor()
+
+    print("Creating LFSMultipartUpload table...")
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS lfsmultipartupload (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sha256 VARCHAR(64) NOT NULL,
+            size BIGINT NOT NULL,
+            upload_id VARCHAR(1024) NOT NULL,
+            chunk_size BIGINT NOT NULL,
+            part_count INTEGER NOT NULL,
+            parts TEXT NOT NULL DEFAULT '[]',
+            expires_at TIMESTAMP NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    print("  ✓ Created LFSMultipartUpload table")
+
+    create_indexes(cursor)
+
+
+def run():
+    """Run migration 024.
+
+    Returns:
+        True if successful or already applied, False otherwise
+    """
+    db.connect(reuse_if_open=True)
+
+    try:
+        # Check if should skip due to future migrations
+        if should_skip_due_to_future_migrations(MIGRATION_NUMBER, db, cfg):
+            print(
+                f"Migration {MIGRATION_NUMBER}: Skipped (superseded by future migration)"
+            )
+            return True
+
+        # Check if already applied
+        if is_applied(db, cfg):
+            print(f"Migration {MIGRATION_NUMBER}: Already applied (lfsmultipartupload exists)")
+            return True
+
+        print("=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: Add resumable multipart LFS uploads")
+        print("=" * 70)
+
+        # Run migration in transaction
+        with db.atomic():
+            if cfg.app.db_backend == "postgres":
+                migrate_postgres()
+            else:
+                migrate_sqlite()
+
+        print("\n" + "=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: ✓ Completed Successfully")
+        print("=" * 70)
+        print("\nSummary:")
+        print("  • Added LFSMultipartUpload table (open multipart LFS uploads)")
+        print("  • Retried uploads resume, abandoned ones are aborted after the TTL")
+        return True
+
+    except Exception as e:
+        print(f"\n✗ Migration {MIGRATION_NUMBER} failed: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Migration 025: Stage multipart LFS uploads under their own keys.
+
+Multipart LFS uploads wrote straight to the shared lfs/<oid> key, so a
+mismatching upload could replace content other repositories link to. They
+now write to a staging key of their own, published as lfs/<oid> only after
+the server verified the content.
+
+Changes:
+- Add LFSMultipartUpload.s3_key (staging key the upload writes to)
+- Open uploads started before this migration keep their lfs/<oid> key and
+  are expired, so the sweeper aborts them instead of resuming them
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+# Add db_migrations to path (for _migration_utils)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from kohakuhub.config import cfg
+from kohakuhub.db import db
+from _migration_utils import check_column_exists, should_skip_due_to_future_migrations
+
+MIGRATION_NUMBER = 25
+
+
+def is_applied(db, cfg):
+    """Check if THIS migration has been applied.
+
+    Returns True if LFSMultipartUpload.s3_key column exists.
+    """
+    return check_column_exists(db, cfg, "lfsmultipartupload", "s3_key")
+
+
+def expire_direct_uploads(cursor):
+    """Point existing uploads at the key they write to and expire them."""
+    cursor.execute("""
+        UPDATE lfsmultipartupload
+        SET s3_key = 'lfs/' || substr(sha256, 1, 2) || '/' || substr(sha256, 3, 2)
+                || '/' || sha256,
+            expires_at = CURRENT_TIMESTAMP
+        WHERE s3_key IS NULL
+        """)
+    print(f"  ✓ Expired {cursor.rowcount} open upload(s) writing to lfs/")
+
+
+def migrate_sqlite():
+    """Migrate SQLite database.
+
+    Note: This function runs inside a transaction (db.atomic()).
+    Do NOT call db.commit() or db.rollback() inside this function.
+    """
+    cursor = db.cursor()
+
+    try:
+        cursor.execute(
+            "ALTER TABLE lfsmultipartupload ADD COLUMN s3_key VARCHAR(1024) DEFAULT NULL"
+        )
+        print("  ✓ Added LFSMultipartUpload.s3_key")
+    except Exception as e:
+        if "duplicate column" in str(e).lower():
+            print("  - LFSMultipartUpload.s3_key already exists")
+        else:
+            raise
+
+    expire_direct_uploads(cursor)
+
+
+def migrate_postgres():
+    """Migrate PostgreSQL database.
+
+    Note: This function runs inside a transaction (db.atomic()).
+    Do NOT call db.commit() or db.rollback() inside this function.
+    """
+    cursor = db.cursor()
+
+    try:
+        cursor.execute(
+            "ALTER TABLE lfsmultipartupload ADD COLUMN s3_key VARCHAR(1024) DEFAULT NULL"
+        )
+        print("  ✓ Added LFSMultipartUpload.s3_key")
+    except Exception as e:
+        if "already exists" in str(e).lower():
+            print("  - LFSMultipartUpload.s3_key already exists")
+        else:
+            raise
+
+    expire_direct_uploads(cursor)
+
+
+def run():
+    """Run migration 025.
+
+    Returns:
+        True if successful or already applied, False otherwise
+    """
+    db.connect(reuse_if_open=True)
+
+    try:
+        # Check if should skip due to future migrations
+        if should_skip_due_to_future_migrations(MIGRATION_NUMBER, db, cfg):
+            print(
+                f"Migration {MIGRATION_NUMBER}: Skipped (superseded by future migration)"
+            )
+            return True
+
+        # Check if already applied
+        if is_applied(db, cfg):
+            print(
+                f"Migration {MIGRATION_NUMBER}: Already applied (s3_key column exists)"
+            )
+            return True
+
+        print("=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: Stage multipart LFS uploads")
+        print("=" * 70)
+
+        # Run migration in transaction
+        with db.atomic():
+            if cfg.app.db_backend == "postgres":
+                migrate_postgres()
+            else:
+                migrate_sqlite()
+
+        print("\n" + "=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: ✓ Completed Successfully")
+        print("=" * 70)
+        print("\nSummary:")
+        print("  • Multipart LFS uploads write to staging keys until verified")
+        print("  • Open uploads writing to lfs/ are aborted by the next sweep")
+        return True
+
+    except Exception as e:
+        print(f"\n✗ Migration {MIGRATION_NUMBER} failed: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    run()
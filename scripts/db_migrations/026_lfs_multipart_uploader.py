@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Migration 026: Scope multipart LFS upload sessions to their uploader.
+
+Sessions were keyed by (sha256, size) only, so every user uploading the same
+object resumed (and could add parts to) one shared S3 upload. They are now
+keyed by (sha256, size, user).
+
+Changes:
+- Add LFSMultipartUpload.user_id (FK to user, SET NULL on delete)
+- Replace the unique index on (sha256, size) with (sha256, size, user_id)
+- Open uploads started before this migration have no owner and are expired,
+  so the sweeper aborts them instead of resuming them
+"""
+
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "src"))
+# Add db_migrations to path (for _migration_utils)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from kohakuhub.config import cfg
+from kohakuhub.db import db
+from _migration_utils import check_column_exists, should_skip_due_to_future_migrations
+
+MIGRATION_NUMBER = 26
+
+
+def is_applied(db, cfg):
+    """Check if THIS migration has been applied.
+
+    Returns True if LFSMultipartUpload.user_id column exists.
+    """
+    return check_column_exists(db, cfg, "lfsmultipartupload", "user_id")
+
+
+def replace_unique_index(cursor):
+    """Key sessions by uploader and expire the ones without one."""
+    cursor.execute("DROP INDEX IF EXISTS lfsmultipartupload_sha256_size")
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS lfsmultipartupload_sha256_size_user_id
+        ON lfsmultipartupload(sha256, size, user_id)
+        """)
+    print("  ✓ Replaced unique index (sha256, size) with (sha256, size, user_id)")
+
+    cursor.execute("""
+        UPDATE lfsmultipartupload
+        SET expires_at = CURRENT_TIMESTAMP
+        WHERE user_id IS NULL
+        """)
+    print(f"  ✓ Expired {cursor.rowcount} open upload(s) without an uploader")
+
+
+def migrate_sqlite():
+    """Migrate SQLite database.
+
+    Note: This function runs inside a transaction (db.atomic()).
+    Do NOT call db.commit() or db.rollback() inside this function.
+    """
+    cursor = db.cursor()
+
+    try:
+        cursor.execute(
+            "ALTER TABLE lfsmultipartupload ADD COLUMN user_id INTEGER "
+            "REFERENCES user(id) ON DELETE SET NULL"
+        )
+        print("  ✓ Added LFSMultipartUpload.user_id")
+    except Exception as e:
+        if "duplicate column" in str(e).lower():
+            print("  - LFSMultipartUpload.user_id already exists")
+        else:
+            raise
+
+    replace_unique_index(cursor)
+
+
+def migrate_postgres():
+    """Migrate PostgreSQL database.
+
+    Note: This function runs inside a transaction (db.atomic()).
+    Do NOT call db.commit() or db.rollback() inside this function.
+    """
+    cursor = db.cursor()
+
+    try:
+        cursor.execute(
+            "ALTER TABLE lfsmultipartupload ADD COLUMN user_id INTEGER "
+            'REFERENCES "user"(id) ON DELETE SET NULL'
+        )
+        print("  ✓ Added LFSMultipartUpload.user_id")
+    except Exception as e:
+        if "already exists" in str(e).lower():
+            print("  - LFSMultipartUpload.user_id already exists")
+        else:
+            raise
+
+    replace_unique_index(cursor)
+
+
+def run():
+    """Run migration 026.
+
+    Returns:
+        True if successful or already applied, False otherwise
+    """
+    db.connect(reuse_if_open=True)
+
+    try:
+        # Check if should skip due to future migrations
+        if should_skip_due_to_future_migrations(MIGRATION_NUMBER, db, cfg):
+            print(
+                f"Migration {MIGRATION_NUMBER}: Skipped (superseded by future migration)"
+            )
+            return True
+
+        # Check if already applied
+        if is_applied(db, cfg):
+            print(
+                f"Migration {MIGRATION_NUMBER}: Already applied (user_id column exists)"
+            )
+            return True
+
+        print("=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: Scope multipart LFS uploads to uploader")
+        print("=" * 70)
+
+        # Run migration in transaction
+        with db.atomic():
+            if cfg.app.db_backend == "postgres":
+                migrate_postgres()
+            else:
+                migrate_sqlite()
+
+        print("\n" + "=" * 70)
+        print(f"Migration {MIGRATION_NUMBER}: ✓ Completed Successfully")
+        print("=" * 70)
+        print("\nSummary:")
+        print("  • Multipart LFS upload sessions belong to the user who started them")
+        print("  • Open uploads without an uploader are aborted by the next sweep")
+        return True
+
+    except Exception as e:
+        print(f"\n✗ Migration {MIGRATION_NUMBER} failed: {e}")
+        import traceback
+
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    run()
@@ -225,12 +225,17 @@ async function uploadPartWithRetry(
 /**
  * Upload parts in parallel with concurrency control
  * @param {Array} parts - Array of part objects from sliceFileIntoParts
- * @param {Object} partUrls - Map of part number to presigned URL
+ * @param {Function} getPartUrl - Async function returning the presigned URL of a part number
  * @param {number} concurrency - Maximum concurrent uploads
  * @param {Function} onProgress - Overall progress callback
  * @returns {Promise<Array<{PartNumber: number, ETag: string}>>}
  */
-async function uploadPartsInParallel(parts, partUrls, concurrency, onProgress) {
+async function uploadPartsInParallel(
+  parts,
+  getPartUrl,
+  concurrency,
+  onProgress,
+) {
   const totalParts = parts.length;
   const totalSize = parts.reduce((sum, part) => sum + part.size, 0);
   const partProgress = {}; // Track progress per part
@@ -250,7 +255,7 @@ async function uploadPartsInParallel(parts, partUrls, concurrency, onProgress) {
 
   // Create upload tasks
   const uploadTasks = parts.map((part) => async () => {
-    const partUrl = partUrls[part.partNumber];
+    const partUrl = await getPartUrl(part.partNumber);
     if (!partUrl) {
       throw new Error(`No URL found for part ${part.partNumber}`);
     }
@@ -296,6 +301,54 @@ async function uploadPartsInParallel(parts, partUrls, concurrency, onProgress) {
   return completedParts;
 }
 
+/**
+ * Confirm an upload; the server hashes the staged object and publishes it
+ * (requires write permission, so credentials are sent)
+ * @param {string} verifyHref - Verify action href from the batch response
+ * @param {string} sha256 - SHA256 of the uploaded file
+ * @param {number} size - File size
+ */
+async function verifyLFSUpload(verifyHref, sha256, size) {
+  try {
+    await api.post(
+      verifyHref,
+      { oid: sha256, size: size },
+      { timeout: 0 }, // Large objects take a while to hash
+    );
+    console.log("LFS verification successful");
+  } catch (error) {
+    console.error("LFS verification failed:", error);
+    throw new Error(`LFS verification failed: ${error.message}`);
+  }
+}
+
+/**
+ * Create a part URL getter fetching presigned URLs in windows on demand
+ * (lazy_part_urls), so URLs are fresh when late parts are sent
+ * @param {string} partsHref - Part URL endpoint from the batch response
+ * @returns {Function} - Async function (partNumber) => presigned URL
+ */
+function createLazyPartUrlGetter(partsHref) {
+  const windowSize = 100;
+  const windows = {}; // Window index -> Promise of {partNumber: url}
+
+  return async (partNumber) => {
+    const index = Math.floor((partNumber - 1) / windowSize);
+    if (!windows[index]) {
+      windows[index] = api
+        .get(partsHref, {
+          params: { from: index * windowSize + 1, count: windowSize },
+        })
+        .then((response) => response.data.parts)
+        .catch((error) => {
+          delete windows[index]; // Retry on next request
+          throw error;
+        });
+    }
+    return (await windows[index])[partNumber];
+  };
+}
+
 /**
  * Upload large file using multipart upload
  * @param {string} repoId - Repository ID (namespace/name)
@@ -338,11 +391,29 @@ async function uploadLFSFileMultipart(
 
   console.log(`Found ${Object.keys(partUrls).length} part URLs`);
 
-  // Slice file into parts
-  const parts = sliceFileIntoParts(file, chunkSize);
-  console.log(`File sliced into ${parts.length} parts`);
+  // Lazy part URLs are fetched in windows while uploading
+  const getPartUrl = header.parts_href
+    ? createLazyPartUrlGetter(header.parts_href)
+    : async (partNumber) => partUrls[partNumber];
+
+  // Parts already uploaded before a resume (the backend has no URLs for them)
+  const uploadedParts = new Set(
+    (header.uploaded_parts || "")
+      .split(",")
+      .filter((part) => part)
+      .map((part) => parseInt(part)),
+  );
+
+  // Slice file into parts, skipping the ones already uploaded
+  const parts = sliceFileIntoParts(file, chunkSize).filter(
+    (part) => !uploadedParts.has(part.partNumber),
+  );
+  console.log(
+    `File sliced into ${parts.length + uploadedParts.size} parts` +
+      (uploadedParts.size ? `, resuming after ${uploadedParts.size}` : ""),
+  );
 
-  if (parts.length !== Object.keys(partUrls).length) {
+  if (!header.parts_href && parts.length !== Object.keys(partUrls).length) {
     console.warn(
       `Part count mismatch: file has ${parts.length} parts, but backend provided ${Object.keys(partUrls).length} URLs`,
     );
@@ -351,7 +422,7 @@ async function uploadLFSFileMultipart(
   // Upload parts in parallel (16 concurrent for faster uploads)
   const completedParts = await uploadPartsInParallel(
     parts,
-    partUrls,
+    getPartUrl,
     16, // Concurrency limit (increased from 4)
     onProgress,
   );
@@ -374,18 +445,9 @@ async function uploadLFSFileMultipart(
     throw new Error(`Multipart completion failed: ${error.message}`);
   }
 
-  // Verify upload (optional but recommended)
+  // Completion verified the content, this only confirms it
   if (lfsObject.actions.verify) {
-    try {
-      await s3Client.post(lfsObject.actions.verify.href, {
-        oid: sha256,
-        size: file.size,
-      });
-      console.log("LFS verification successful");
-    } catch (error) {
-      // Verification failure is non-fatal - file is already uploaded
-      console.warn("LFS verification failed (non-fatal):", error);
-    }
+    await verifyLFSUpload(lfsObject.actions.verify.href, sha256, file.size);
   }
 
   return {
@@ -419,6 +481,8 @@ export async function uploadLFSFile(repoId, file, sha256, onProgress) {
       ],
       hash_algo: "sha256",
       is_browser: true, // Tell backend to include Content-Type in presigned URL signature
+      resume_multipart: true, // Only get URLs for parts not uploaded yet
+      lazy_part_urls: true, // Fetch part URLs in windows while uploading
     },
     {
       timeout: 60000, // 60 seconds for LFS batch API
@@ -480,19 +544,9 @@ export async function uploadLFSFile(repoId, file, sha256, onProgress) {
       throw error;
     }
 
-    // Verify upload (optional but recommended)
+    // The upload is staged until the server verified its content
     if (lfsObject.actions.verify) {
-      try {
-        // Use s3Client (no credentials) for verify to avoid CORS issues
-        await s3Client.post(lfsObject.actions.verify.href, {
-          oid: sha256,
-          size: size,
-        });
-        console.log("LFS verification successful");
-      } catch (error) {
-        // Verification failure is non-fatal - file is already uploaded
-        console.warn("LFS verification failed (non-fatal):", error);
-      }
+      await verifyLFSUpload(lfsObject.actions.verify.href, sha256, size);
     }
   } else {
     // File already exists in LFS storage (deduplication)
@@ -8,6 +8,7 @@ from kohakuhub.db import Repository, User, db
 from kohakuhub.db_operations import create_user, delete_repository, delete_user
 from kohakuhub.logger import get_logger
 from kohakuhub.api.admin.utils import verify_admin_token
+from kohakuhub.api.git.utils.repo_cache import invalidate_repo_resolution
 
 logger = get_logger("ADMIN")
 router = APIRouter()
@@ -253,6 +254,7 @@ async def delete_user_admin(
         # Delete repositories sequentially (sync DB operations)
         for repo in owned_repos:
             delete_repository(repo)
+            invalidate_repo_resolution(repo.namespace, repo.name)
             logger.warning(f"Admin deleted repository: {repo.full_id}")
             deleted_repos.append(f"{repo.repo_type}:{repo.full_id}")
 
@@ -20,6 +20,9 @@ from kohakuhub.api.repo.utils.gc import (
     sync_file_table_with_commit,
     track_commit_lfs_objects,
 )
+from kohakuhub.api.git.utils.lakefs_bridge import schedule_pack_warm
+from kohakuhub.api.repo.utils.head import sync_repository_head
+from kohakuhub.api.repo.utils.manifest import schedule_manifest_build
 from kohakuhub.api.repo.utils.hf import (
     HFErrorCode,
     hf_error_response,
@@ -425,6 +428,10 @@ async def revert_branch(
         except Exception as e:
             logger.warning(f"Failed to record commit in database: {e}")
 
+        schedule_manifest_build(repo_row, lakefs_repo, new_commit_id)
+        await sync_repository_head(repo_row, lakefs_repo, branch)
+        schedule_pack_warm(repo_row, branch, new_commit_id)
+
     except Exception as e:
         # Don't fail the revert if tracking fails
         logger.warning(f"Failed to track LFS objects after revert: {e}")
@@ -555,6 +562,10 @@ async def merge_branches(
                 )
             except Exception as e:
                 logger.warning(f"Failed to record commit in database: {e}")
+
+            schedule_manifest_build(repo_row, lakefs_repo, merge_commit_id)
+            await sync_repository_head(repo_row, lakefs_repo, destination_branch)
+            schedule_pack_warm(repo_row, destination_branch, merge_commit_id)
         else:
             logger.warning("Merge result did not contain commit reference")
     except Exception as e:
@@ -810,6 +821,11 @@ async def reset_branch(
             logger.exception(f"Failed to record reset commit in database: {e}", e)
             logger.warning(f"Failed to record commit in database: {e}")
 
+        # Materialize after File table sync so oids are up to date
+        schedule_manifest_build(repo_row, lakefs_repo, commit_result["id"])
+        await sync_repository_head(repo_row, lakefs_repo, branch, commit_result)
+        schedule_pack_warm(repo_row, branch, commit_result["id"])
+
     except HTTPException:
         raise
     except Exception as e:
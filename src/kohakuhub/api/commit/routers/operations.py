@@ -27,7 +27,16 @@ from kohakuhub.auth.permissions import check_repo_write_permission
 from kohakuhub.utils.lakefs import get_lakefs_client, lakefs_repo_name
 from kohakuhub.utils.s3 import get_object_metadata, object_exists
 from kohakuhub.api.quota.util import update_namespace_storage, update_repository_storage
+from kohakuhub.api.git.utils.lakefs_bridge import (
+    create_lfs_pointer_blob,
+    schedule_pack_warm,
+)
 from kohakuhub.api.repo.utils.gc import run_gc_for_file, track_lfs_object
+from kohakuhub.api.repo.utils.head import sync_repository_head
+from kohakuhub.api.repo.utils.manifest import (
+    lfs_oid_from_address,
+    schedule_manifest_build,
+)
 
 logger = get_logger("FILE")
 router = APIRouter()
@@ -163,6 +172,8 @@ async def process_regular_file(
             File.sha256: git_blob_sha1,
             File.size: len(data),
             File.lfs: False,  # Explicitly set to False
+            File.lfs_pointer_sha1: None,
+            File.lfs_pointer: None,
             File.is_deleted: False,  # File is active (un-delete if previously deleted)
             File.updated_at: datetime.now(timezone.utc),
         },
@@ -380,13 +391,16 @@ async def process_lfs_file(
             detail={"error": f"Failed to link LFS file {path} in LakeFS: {str(e)}"},
         )
 
-    # Update database
+    # Update database (with the git LFS pointer blob, so git trees need no rebuild)
+    pointer_sha1, pointer = create_lfs_pointer_blob(oid, size)
     File.insert(
         repository=repo,
         path_in_repo=path,
         size=size,
         sha256=oid,
         lfs=True,
+        lfs_pointer_sha1=pointer_sha1,
+        lfs_pointer=pointer,
         is_deleted=False,
         owner=repo.owner,
     ).on_conflict(
@@ -395,6 +409,8 @@ async def process_lfs_file(
             File.sha256: oid,
             File.size: size,
             File.lfs: True,
+            File.lfs_pointer_sha1: pointer_sha1,
+            File.lfs_pointer: pointer,
             File.is_deleted: False,  # File is active (un-delete if previously deleted)
             File.updated_at: datetime.now(timezone.utc),
         },
@@ -615,6 +631,8 @@ async def process_copy_file(
                 size=src_file.size,
                 sha256=src_file.sha256,
                 lfs=src_file.lfs,
+                lfs_pointer_sha1=src_file.lfs_pointer_sha1,
+                lfs_pointer=src_file.lfs_pointer,
                 is_deleted=False,
                 owner=repo.owner,
             ).on_conflict(
@@ -623,6 +641,8 @@ async def process_copy_file(
                     File.sha256: src_file.sha256,
                     File.size: src_file.size,
                     File.lfs: src_file.lfs,
+                    File.lfs_pointer_sha1: src_file.lfs_pointer_sha1,
+                    File.lfs_pointer: src_file.lfs_pointer,
                     File.is_deleted: False,  # File is active
                     File.updated_at: datetime.now(timezone.utc),
                 },
@@ -631,20 +651,34 @@ async def process_copy_file(
             # If not in database, create entry based on LakeFS info
             # Use repo-specific LFS settings
             is_lfs = should_use_lfs(repo, dest_path, src_obj["size_bytes"])
+            # The LakeFS checksum is not the SHA256, only an address under
+            # lfs/ identifies the content; without it the bridge builds the
+            # pointer later
+            lfs_oid = lfs_oid_from_address(src_obj.get("physical_address", ""))
+            sha256 = lfs_oid or src_obj["checksum"]
+            pointer_sha1, pointer = (
+                create_lfs_pointer_blob(lfs_oid, src_obj["size_bytes"])
+                if is_lfs and lfs_oid
+                else (None, None)
+            )
             File.insert(
                 repository=repo,
                 path_in_repo=dest_path,
                 size=src_obj["size_bytes"],
-                sha256=src_obj["checksum"],
+                sha256=sha256,
                 lfs=is_lfs,
+                lfs_pointer_sha1=pointer_sha1,
+                lfs_pointer=pointer,
                 is_deleted=False,
                 owner=repo.owner,
             ).on_conflict(
                 conflict_target=(File.repository, File.path_in_repo),
                 update={
-                    File.sha256: src_obj["checksum"],
+                    File.sha256: sha256,
                     File.size: src_obj["size_bytes"],
                     File.lfs: is_lfs,
+                    File.lfs_pointer_sha1: pointer_sha1,
+                    File.lfs_pointer: pointer,
                     File.is_deleted: False,  # File is active
                     File.updated_at: datetime.now(timezone.utc),
                 },
@@ -663,6 +697,83 @@ async def process_copy_file(
     return True
 
 
+def track_commit_lfs_objects(
+    repo_type: str,
+    namespace: str,
+    name: str,
+    commit_id: str,
+    pending_lfs_tracking: list[dict],
+) -> None:
+    """Record LFS objects referenced by a commit and run GC on replaced files.
+
+    Args:
+        repo_type: Repository type
+        namespace: Repository namespace
+        name: Repository name
+        commit_id: LakeFS commit ID
+        pending_lfs_tracking: Tracking info returned by process_lfs_file
+    """
+    if pending_lfs_tracking:
+        logger.info(
+            f"[COMMIT_LFS_TRACKING] Processing {len(pending_lfs_tracking)} LFS file(s) "
+            f"for commit {commit_id[:8]}"
+        )
+        for lfs_info in pending_lfs_tracking:
+            logger.debug(
+                f"  - {lfs_info['path']}: sha256={lfs_info['sha256'][:8]}, size={lfs_info['size']:,}"
+            )
+
+            track_lfs_object(
+                repo_type=repo_type,
+                namespace=namespace,
+                name=name,
+                path_in_repo=lfs_info["path"],
+                sha256=lfs_info["sha256"],
+                size=lfs_info["size"],
+                commit_id=commit_id,
+            )
+
+            if cfg.app.lfs_auto_gc and lfs_info.get("old_sha256"):
+                deleted_count = run_gc_for_file(
+                    repo_type=repo_type,
+                    namespace=namespace,
+                    name=name,
+                    path_in_repo=lfs_info["path"],
+                    current_commit_id=commit_id,
+                )
+                if deleted_count > 0:
+                    logger.info(
+                        f"GC: Cleaned up {deleted_count} old version(s) of {lfs_info['path']}"
+                    )
+    else:
+        logger.warning(
+            f"[COMMIT_LFS_TRACKING] No LFS files to track for commit {commit_id[:8]}"
+        )
+
+
+async def update_commit_storage(repo_row: Repository, namespace: str) -> None:
+    """Recalculate repository and namespace storage after a commit (best effort)."""
+    try:
+        # Recalculate repository storage (keeps repo.used_bytes accurate)
+        await update_repository_storage(repo_row)
+        logger.debug(
+            f"Updated repository storage for {repo_row.full_id}: {repo_row.used_bytes:,} bytes"
+        )
+
+        # Check if namespace is organization (User with is_org=True)
+        org = get_organization(namespace)
+        is_org = org is not None
+
+        # Recalculate namespace storage usage
+        await update_namespace_storage(namespace, is_org)
+        logger.debug(
+            f"Updated storage usage for {'org' if is_org else 'user'} {namespace}"
+        )
+    except Exception as e:
+        # Log error but don't fail the commit
+        logger.warning(f"Failed to update storage usage for {namespace}: {e}")
+
+
 @router.post("/{repo_type}s/{namespace}/{name}/commit/{revision}")
 async def commit(
     repo_type: RepoType,
@@ -888,68 +999,22 @@ async def commit(
         logger.warning(f"Failed to record commit in database: {e}")
         # Don't fail the commit if DB recording fails
 
+    # File rows are already updated, so the manifest can be materialized now
+    schedule_manifest_build(repo_row, lakefs_repo, commit_result["id"])
+    await sync_repository_head(repo_row, lakefs_repo, revision, commit_result)
+    schedule_pack_warm(repo_row, revision, commit_result["id"])
+
     # Generate commit URL
     commit_url = f"{cfg.app.base_url}/{repo_id}/commit/{commit_result['id']}"
     logger.success(f"Commit URL: {commit_url}")
 
     # Track LFS objects and run GC
-    if pending_lfs_tracking:
-        logger.info(
-            f"[COMMIT_LFS_TRACKING] Processing {len(pending_lfs_tracking)} LFS file(s) "
-            f"for commit {commit_result['id'][:8]}"
-        )
-        for lfs_info in pending_lfs_tracking:
-            logger.debug(
-                f"  - {lfs_info['path']}: sha256={lfs_info['sha256'][:8]}, size={lfs_info['size']:,}"
-            )
-
-            track_lfs_object(
-                repo_type=repo_type.value,
-                namespace=namespace,
-                name=name,
-                path_in_repo=lfs_info["path"],
-                sha256=lfs_info["sha256"],
-                size=lfs_info["size"],
-                commit_id=commit_result["id"],
-            )
-
-            if cfg.app.lfs_auto_gc and lfs_info.get("old_sha256"):
-                deleted_count = run_gc_for_file(
-                    repo_type=repo_type.value,
-                    namespace=namespace,
-                    name=name,
-                    path_in_repo=lfs_info["path"],
-                    current_commit_id=commit_result["id"],
-                )
-                if deleted_count > 0:
-                    logger.info(
-                        f"GC: Cleaned up {deleted_count} old version(s) of {lfs_info['path']}"
-                    )
-    else:
-        logger.warning(
-            f"[COMMIT_LFS_TRACKING] No LFS files to track for commit {commit_result['id'][:8]}"
-        )
+    track_commit_lfs_objects(
+        repo_type.value, namespace, name, commit_result["id"], pending_lfs_tracking
+    )
 
     # Update storage usage for namespace and repository after successful commit
-    try:
-        # Recalculate repository storage (keeps repo.used_bytes accurate)
-        await update_repository_storage(repo_row)
-        logger.debug(
-            f"Updated repository storage for {repo_id}: {repo_row.used_bytes:,} bytes"
-        )
-
-        # Check if namespace is organization (User with is_org=True)
-        org = get_organization(namespace)
-        is_org = org is not None
-
-        # Recalculate namespace storage usage
-        await update_namespace_storage(namespace, is_org)
-        logger.debug(
-            f"Updated storage usage for {'org' if is_org else 'user'} {namespace}"
-        )
-    except Exception as e:
-        # Log error but don't fail the commit
-        logger.warning(f"Failed to update storage usage for {namespace}: {e}")
+    await update_commit_storage(repo_row, namespace)
 
     return {
         "commitUrl": commit_url,
@@ -33,6 +33,7 @@ from kohakuhub.utils.s3 import generate_download_presigned_url, parse_s3_uri
 from kohakuhub.api.fallback import with_repo_fallback
 from kohakuhub.api.xet import XET_ENABLE
 from kohakuhub.api.quota.util import check_quota
+from kohakuhub.api.repo.utils.manifest import get_revision_manifest
 from kohakuhub.api.utils.downloads import (
     get_or_create_tracking_cookie,
     track_download_async,
@@ -382,21 +383,35 @@ async def _get_file_metadata(
     lakefs_repo = lakefs_repo_name(repo_type, repo_id)
     client = get_lakefs_client()
 
-    try:
-        # Get object metadata from LakeFS
-        obj_stat = await client.stat_object(
-            repository=lakefs_repo, ref=revision, path=path
-        )
-    except Exception as e:
-        raise HTTPException(404, detail={"error": f"File not found: {e}"})
+    # Serve from the commit manifest when available
+    manifest = None
+    if repo_row:
+        try:
+            manifest = await get_revision_manifest(repo_row, lakefs_repo, revision)
+        except Exception as e:
+            logger.debug(f"No manifest for {repo_id}@{revision}: {str(e)}")
+
+    if manifest is not None:
+        obj_stat = manifest.get(path)
+        if not obj_stat:
+            raise HTTPException(404, detail={"error": f"File not found: {path}"})
+        commit_hash = manifest.commit_id
+    else:
+        try:
+            # Get object metadata from LakeFS
+            obj_stat = await client.stat_object(
+                repository=lakefs_repo, ref=revision, path=path
+            )
+        except Exception as e:
+            raise HTTPException(404, detail={"error": f"File not found: {e}"})
 
-    # Get commit hash for the revision
-    try:
-        branch = await client.get_branch(repository=lakefs_repo, branch=revision)
-        commit_hash = branch["commit_id"]
-    except Exception:
-        # If not a branch, might be a commit hash already
-        commit_hash = revision
+        # Get commit hash for the revision
+        try:
+            branch = await client.get_branch(repository=lakefs_repo, branch=revision)
+            commit_hash = branch["commit_id"]
+        except Exception:
+            # If not a branch, might be a commit hash already
+            commit_hash = revision
 
     # Parse physical address to get S3 bucket and key
     physical_address = obj_stat["physical_address"]
@@ -417,13 +432,19 @@ async def _get_file_metadata(
     # Prepare headers required by HuggingFace client
     file_size = obj_stat["size_bytes"]
 
-    # Get correct checksum from database
+    # Get correct checksum (manifest oid or database)
     # sha256 column stores: git blob SHA1 for non-LFS, SHA256 for LFS
-    file_record = get_file(repo_row, path) if repo_row else None
+    if manifest is not None:
+        file_sha256 = obj_stat["oid"]
+        file_is_lfs = obj_stat["lfs"]
+    else:
+        file_record = get_file(repo_row, path) if repo_row else None
+        file_sha256 = file_record.sha256 if file_record else ""
+        file_is_lfs = file_record.lfs if file_record else False
 
     # HuggingFace expects plain SHA256 hex (64 characters, unquoted)
     # For non-LFS: use git blob SHA1, for LFS: use SHA256
-    etag_value = file_record.sha256 if file_record and file_record.sha256 else ""
+    etag_value = file_sha256 or ""
 
     # Extract filename and encode for Content-Disposition header
     # HTTP headers must be ASCII/latin-1, so we use RFC 5987 encoding for Unicode filenames
@@ -454,12 +475,12 @@ async def _get_file_metadata(
         "Content-Disposition": f"attachment; filename=\"{encoded_filename_ascii}\"; filename*=UTF-8''{encoded_filename_utf8}",
     }
 
-    if file_record and file_record.sha256 and file_record.lfs and XET_ENABLE:
+    if file_sha256 and file_is_lfs and XET_ENABLE:
         # Try to enable xet here
         logger.debug(
-            f"Enabling xet for {repo_type} {repo_id} {revision} {filename} with hash {file_record.sha256}"
+            f"Enabling xet for {repo_type} {repo_id} {revision} {filename} with hash {file_sha256}"
         )
-        response_headers["X-Xet-hash"] = file_record.sha256
+        response_headers["X-Xet-hash"] = file_sha256
         response_headers["X-Xet-Refresh-Route"] = (
             f"{cfg.app.base_url}/api/{repo_type}s/{repo_id}/xet-read-token/{revision}/{filename}"
         )
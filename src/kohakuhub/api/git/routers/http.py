@@ -3,13 +3,15 @@
 This module implements Git Smart HTTP protocol for clone, fetch, pull, and push operations.
 """
 
+import tempfile
 from datetime import datetime, timezone
+from functools import partial
 
 from fastapi import APIRouter, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 
-from kohakuhub.db import Repository, Token, User
+from kohakuhub.db import Token, User
 from kohakuhub.constants import ERROR_REPO_NOT_FOUND
-from kohakuhub.db_operations import get_repository
 from kohakuhub.logger import get_logger
 from kohakuhub.auth.dependencies import get_optional_user
 from kohakuhub.auth.permissions import (
@@ -18,6 +20,8 @@ from kohakuhub.auth.permissions import (
 )
 from kohakuhub.auth.utils import hash_token
 from kohakuhub.api.git.utils.lakefs_bridge import GitLakeFSBridge
+from kohakuhub.api.git.utils.receive import apply_push
+from kohakuhub.api.git.utils.repo_cache import resolve_repository
 from kohakuhub.api.git.utils.server import (
     GitReceivePackHandler,
     GitUploadPackHandler,
@@ -67,12 +71,25 @@ async def get_user_from_git_auth(authorization: str | None) -> User | None:
     return user
 
 
+def is_protocol_v2(git_protocol: str | None) -> bool:
+    """Check whether the client asked for protocol v2 (Git-Protocol header).
+
+    Args:
+        git_protocol: Git-Protocol header value, e.g. "version=2"
+
+    Returns:
+        True if version=2 is among the colon-separated parameters
+    """
+    return bool(git_protocol) and "version=2" in git_protocol.split(":")
+
+
 @router.get("/{namespace}/{name}.git/info/refs")
 async def git_info_refs(
     namespace: str,
     name: str,
     service: str,
     authorization: str | None = Header(None),
+    git_protocol: str | None = Header(None, alias="Git-Protocol"),
 ):
     """Git info/refs endpoint for service advertisement.
 
@@ -83,6 +100,7 @@ async def git_info_refs(
         name: Repository name
         service: Git service (git-upload-pack or git-receive-pack)
         authorization: Optional Basic Auth header
+        git_protocol: Optional Git-Protocol header (version=2 for protocol v2)
 
     Returns:
         Service advertisement in pkt-line format
@@ -90,17 +108,13 @@ async def git_info_refs(
     repo_id = f"{namespace}/{name}"
     logger.info(f"Git info/refs: {service} for {repo_id}")
 
-    # Get repository - try all repo types since we don't know from URL
-    repo = None
-    for repo_type in ["model", "dataset", "space"]:
-        repo = get_repository(repo_type, namespace, name)
-        if repo:
-            break
+    # Resolve repository - the URL carries no repo type
+    repo = resolve_repository(namespace, name)
     if not repo:
         raise HTTPException(404, detail=ERROR_REPO_NOT_FOUND)
 
     # Authenticate user
-    user = get_user_from_git_auth(authorization)
+    user = await get_user_from_git_auth(authorization)
 
     # Check permissions based on service
     if service == "git-upload-pack":
@@ -114,6 +128,15 @@ async def git_info_refs(
     else:
         raise HTTPException(400, detail=f"Unknown service: {service}")
 
+    # Protocol v2 advertises capabilities only, refs come later via ls-refs
+    if service == "git-upload-pack" and is_protocol_v2(git_protocol):
+        handler = GitUploadPackHandler(repo_id)
+        return Response(
+            content=handler.get_v2_service_info(),
+            media_type=f"application/x-{service}-advertisement",
+            headers={"Cache-Control": "no-cache"},
+        )
+
     # Get refs from LakeFS using the repository's actual type
     bridge = GitLakeFSBridge(repo.repo_type, namespace, name)
     refs = await bridge.get_refs(branch="main")
@@ -141,6 +164,7 @@ async def git_upload_pack(
     name: str,
     request: Request,
     authorization: str | None = Header(None),
+    git_protocol: str | None = Header(None, alias="Git-Protocol"),
 ):
     """Git upload-pack endpoint for clone/fetch/pull.
 
@@ -151,24 +175,21 @@ async def git_upload_pack(
         name: Repository name
         request: FastAPI request
         authorization: Optional Basic Auth header
+        git_protocol: Optional Git-Protocol header (version=2 for protocol v2)
 
     Returns:
-        Pack file with requested objects
+        Pack file with requested objects, streamed as it is built
     """
     repo_id = f"{namespace}/{name}"
     logger.info(f"Git upload-pack for {repo_id}")
 
-    # Get repository - try all repo types since we don't know from URL
-    repo = None
-    for repo_type in ["model", "dataset", "space"]:
-        repo = get_repository(repo_type, namespace, name)
-        if repo:
-            break
+    # Resolve repository - the URL carries no repo type
+    repo = resolve_repository(namespace, name)
     if not repo:
         raise HTTPException(404, detail=ERROR_REPO_NOT_FOUND)
 
     # Authenticate and check read permission
-    user = get_user_from_git_auth(authorization)
+    user = await get_user_from_git_auth(authorization)
     check_repo_read_permission(repo, user)
 
     # Read request body
@@ -179,10 +200,13 @@ async def git_upload_pack(
 
     # Handle upload-pack
     handler = GitUploadPackHandler(repo_id, bridge=bridge)
-    response_data = await handler.handle_upload_pack(request_body)
+    if is_protocol_v2(git_protocol):
+        response_stream = handler.handle_v2_request(request_body)
+    else:
+        response_stream = handler.handle_upload_pack(request_body)
 
-    return Response(
-        content=response_data,
+    return StreamingResponse(
+        response_stream,
         media_type="application/x-git-upload-pack-result",
         headers={"Cache-Control": "no-cache"},
     )
@@ -206,33 +230,37 @@ async def git_receive_pack(
         authorization: Basic Auth header (required)
 
     Returns:
-        Status report
+        Status report (per-ref ok/ng)
     """
     repo_id = f"{namespace}/{name}"
     logger.info(f"Git receive-pack for {repo_id}")
 
-    # Get repository - try all repo types since we don't know from URL
-    repo = None
-    for repo_type in ["model", "dataset", "space"]:
-        repo = get_repository(repo_type, namespace, name)
-        if repo:
-            break
+    # Resolve repository - the URL carries no repo type
+    repo = resolve_repository(namespace, name)
     if not repo:
         raise HTTPException(404, detail=ERROR_REPO_NOT_FOUND)
 
     # Authenticate and check write permission
-    user = get_user_from_git_auth(authorization)
+    user = await get_user_from_git_auth(authorization)
     if not user:
         raise HTTPException(401, detail="Authentication required for push")
 
     check_repo_write_permission(repo, user)
 
-    # Read request body
-    request_body = await request.body()
+    # Pushes need the full row (quota and LFS settings), not the cached one
+    repo = repo.load()
+    if not repo:
+        raise HTTPException(404, detail=ERROR_REPO_NOT_FOUND)
+
+    # Spool request body to disk, pushes can carry large pack files
+    with tempfile.TemporaryFile() as request_body:
+        async for chunk in request.stream():
+            request_body.write(chunk)
+        request_body.seek(0)
 
-    # Handle receive-pack
-    handler = GitReceivePackHandler(repo_id)
-    response_data = await handler.handle_receive_pack(request_body)
+        # Handle receive-pack, replaying pushed commits onto LakeFS
+        handler = GitReceivePackHandler(repo_id, ingest=partial(apply_push, repo, user))
+        response_data = await handler.handle_receive_pack(request_body)
 
     return Response(
         content=response_data,
@@ -261,17 +289,13 @@ async def git_head(
     """
     repo_id = f"{namespace}/{name}"
 
-    # Get repository - try all repo types since we don't know from URL
-    repo = None
-    for repo_type in ["model", "dataset", "space"]:
-        repo = get_repository(repo_type, namespace, name)
-        if repo:
-            break
+    # Resolve repository - the URL carries no repo type
+    repo = resolve_repository(namespace, name)
     if not repo:
         raise HTTPException(404, detail=ERROR_REPO_NOT_FOUND)
 
     # Authenticate and check read permission
-    user = get_user_from_git_auth(authorization)
+    user = await get_user_from_git_auth(authorization)
     check_repo_read_permission(repo, user)
 
     # Return HEAD reference
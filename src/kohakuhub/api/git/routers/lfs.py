@@ -8,13 +8,17 @@ import asyncio
 import base64
 from datetime import datetime, timedelta, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 from kohakuhub.config import cfg
-from kohakuhub.db import Repository, User
-from kohakuhub.db_operations import get_file_by_sha256, get_organization, get_repository
+from kohakuhub.db import LFSMultipartUpload, Repository, User
+from kohakuhub.db_operations import (
+    get_file_by_sha256,
+    get_lfs_multipart_upload_by_id,
+    get_organization,
+)
 from kohakuhub.logger import get_logger
 from kohakuhub.auth.dependencies import get_optional_user
 from kohakuhub.auth.permissions import (
@@ -26,16 +30,38 @@ from kohakuhub.utils.s3 import (
     generate_download_presigned_url,
     generate_multipart_upload_urls,
     generate_upload_presigned_url,
-    get_multipart_chunk_size,
     get_multipart_threshold,
     get_object_metadata,
     object_exists,
+    presign_upload_part_urls,
 )
 from kohakuhub.api.quota.util import check_quota
+from kohakuhub.api.git.utils.lfs_multipart import (
+    close_upload_session,
+    complete_parts,
+    open_upload_session,
+    schedule_session_sweep,
+    upload_completed_elsewhere,
+)
+from kohakuhub.api.git.utils.lfs_verify import (
+    discard_staged_upload,
+    is_lfs_object_verified,
+    is_lfs_oid,
+    is_staging_token,
+    lfs_object_key,
+    new_staging_token,
+    staging_key,
+    verify_staged_upload,
+)
+from kohakuhub.api.git.utils.repo_cache import resolve_repository
 
 logger = get_logger("LFS")
 router = APIRouter()
 
+PART_URL_WINDOW = 100  # Default part URLs per lfs_part_urls request
+MAX_PART_URL_WINDOW = 1000
+PART_URL_EXPIRES_IN = 6 * 3600  # Lazy part URLs are fetched shortly before use
+
 
 class LFSObject(BaseModel):
     """LFS object specification."""
@@ -54,6 +80,12 @@ class LFSBatchRequest(BaseModel):
     is_browser: bool = (
         False  # True if request from browser (needs Content-Type in signature)
     )
+    resume_multipart: bool = (
+        False  # True if client skips multipart parts listed in "uploaded_parts"
+    )
+    lazy_part_urls: bool = (
+        False  # True if client fetches multipart part URLs from "parts_href"
+    )
 
 
 class LFSError(BaseModel):
@@ -90,11 +122,17 @@ def get_lfs_key(oid: str) -> str:
     Returns:
         S3 key with balanced directory structure
     """
-    return f"lfs/{oid[:2]}/{oid[2:4]}/{oid}"
+    return lfs_object_key(oid)
 
 
 async def process_upload_object(
-    oid: str, size: int, repo_id: str, is_browser: bool = False
+    oid: str,
+    size: int,
+    repo_id: str,
+    user: User,
+    is_browser: bool = False,
+    resume_multipart: bool = False,
+    lazy_part_urls: bool = False,
 ) -> LFSObjectResponse:
     """Process single LFS object for upload operation.
 
@@ -102,10 +140,24 @@ async def process_upload_object(
         oid: Object ID (SHA256)
         size: File size in bytes
         repo_id: Repository ID
+        user: Uploading user (owner of the multipart session)
+        is_browser: Include Content-Type in the upload signature
+        resume_multipart: Client skips parts listed in "uploaded_parts", so
+            only the missing parts of a resumed upload are presigned
+        lazy_part_urls: Client fetches part URLs in windows from "parts_href"
+            (lfs_part_urls) instead of getting all of them in the header
+
+    Uploads never write to the shared lfs/<oid> key: they go to a staging
+    key of their own, published by the verify (or multipart completion)
+    request once the content matches the OID.
 
     Returns:
         LFS object response with upload actions or error
     """
+    if not is_lfs_oid(oid):
+        return LFSObjectResponse(
+            oid=oid, size=size, error=LFSError(code=422, message="Invalid OID")
+        )
     lfs_key = get_lfs_key(oid)
 
     # Check if object exists in S3 (global dedup)
@@ -117,16 +169,11 @@ async def process_upload_object(
         )
         s3_exists = False
 
-    # Check File table (per-repository check)
-    existing_file = get_file_by_sha256(oid)
-
-    if s3_exists or (existing_file and existing_file.size == size):
-        # Object exists (either in S3 globally or in File table)
+    # Only content the server hashed itself is trusted for dedup, anything
+    # else (unverified, quarantined or a different size) is uploaded again
+    if s3_exists and is_lfs_object_verified(oid, size):
         # Tell client to skip upload
-        logger.info(
-            f"LFS object {oid[:8]} already exists "
-            f"(s3={s3_exists}, db={existing_file is not None}), skipping upload"
-        )
+        logger.info(f"LFS object {oid[:8]} already exists, skipping upload")
         return LFSObjectResponse(
             oid=oid,
             size=size,
@@ -137,44 +184,40 @@ async def process_upload_object(
     # Check if multipart upload required
     # HuggingFace clients detect multipart by presence of 'chunk_size' in header
     multipart_threshold = get_multipart_threshold()
-    multipart_chunk_size = get_multipart_chunk_size()
     use_multipart = size > multipart_threshold
 
     if use_multipart:
         # Multipart upload for large files
+        part_count = None
         try:
-            # Calculate number of parts needed
-            part_count = (size + multipart_chunk_size - 1) // multipart_chunk_size
-
-            # S3 has a hard limit of 10,000 parts per upload
-            MAX_PARTS = 10000
-            if part_count > MAX_PARTS:
-                # Increase chunk size to stay within limit
-                adjusted_chunk_size = (size + MAX_PARTS - 1) // MAX_PARTS
-                # Round up to nearest MB for cleaner chunks
-                adjusted_chunk_size = (
-                    (adjusted_chunk_size + 1048575) // 1048576
-                ) * 1048576
-                part_count = (size + adjusted_chunk_size - 1) // adjusted_chunk_size
-
-                logger.warning(
-                    f"File size {size:,} bytes would require {part_count} parts with {multipart_chunk_size:,} byte chunks. "
-                    f"Increased chunk size to {adjusted_chunk_size:,} bytes to stay under {MAX_PARTS} part limit. "
-                    f"New part count: {part_count}"
-                )
-                multipart_chunk_size = adjusted_chunk_size
-
-            # Generate multipart upload URLs with longer expiration for large files
+            # Resume the user's open upload (keeping its parts) or start one
+            session, uploaded_parts = await open_upload_session(oid, size, user)
+            part_count = session.part_count
+            multipart_chunk_size = session.chunk_size
+
+            # HuggingFace clients need a URL for every part (re-sent parts
+            # replace the uploaded ones); resuming clients skip uploaded parts,
+            # lazy clients fetch them later
+            part_numbers = [
+                number
+                for number in range(1, part_count + 1)
+                if not lazy_part_urls
+                and not (resume_multipart and number in uploaded_parts)
+            ]
+
+            # Generate multipart upload URLs, valid as long as the session
             multipart_info = await generate_multipart_upload_urls(
                 bucket=cfg.s3.bucket,
-                key=lfs_key,
+                key=session.s3_key,
                 part_count=part_count,
-                expires_in=86400 * 7,
+                upload_id=session.upload_id,
+                expires_in=cfg.app.lfs_multipart_session_ttl_seconds,
+                part_numbers=part_numbers,
             )
 
             logger.info(
                 f"Generated multipart upload for {oid[:8]}: "
-                f"{part_count} parts, chunk_size={multipart_chunk_size}"
+                f"{len(part_numbers)}/{part_count} parts, chunk_size={multipart_chunk_size}"
             )
 
             # Build response compatible with HuggingFace clients
@@ -184,6 +227,16 @@ async def process_upload_object(
                 "chunk_size": str(multipart_chunk_size),  # Signal multipart upload
                 "upload_id": multipart_info["upload_id"],
             }
+            if resume_multipart:
+                header["uploaded_parts"] = ",".join(
+                    str(number) for number in sorted(uploaded_parts)
+                )
+            if lazy_part_urls:
+                header["part_count"] = str(part_count)
+                header["parts_href"] = (
+                    f"{cfg.app.base_url}/api/{repo_id}.git/info/lfs/parts/{session.upload_id}"
+                    f"?oid={oid}"
+                )
 
             # Add part URLs with numeric keys (HuggingFace client expects this format)
             for part in multipart_info["part_urls"]:
@@ -230,9 +283,10 @@ async def process_upload_object(
         # For CLI clients, we don't include it because they might not send it
         content_type = "application/octet-stream" if is_browser else None
 
+        token = new_staging_token()
         upload_info = await generate_upload_presigned_url(
             bucket=cfg.s3.bucket,
-            key=lfs_key,
+            key=staging_key(oid, token),
             expires_in=86400,
             content_type=content_type,
             checksum_sha256=checksum_sha256,
@@ -249,7 +303,7 @@ async def process_upload_object(
                     "header": upload_info.get("headers", {}),
                 },
                 "verify": {
-                    "href": f"{cfg.app.base_url}/api/{repo_id}.git/info/lfs/verify",
+                    "href": f"{cfg.app.base_url}/api/{repo_id}.git/info/lfs/verify?upload={token}",
                     "expires_at": upload_info["expires_at"],
                 },
             },
@@ -332,7 +386,7 @@ async def lfs_batch(
     namespace: str,
     name: str,
     request: Request,
-    repo_type: str | None = "model",
+    repo_type: str | None = None,
     user: User | None = Depends(get_optional_user),
 ):
     """Git LFS Batch API endpoint.
@@ -344,7 +398,7 @@ async def lfs_batch(
         namespace: Repository namespace
         name: Repository name
         request: FastAPI request with LFS batch payload
-        repo_type: Repository type (default: model)
+        repo_type: Repository type (resolved from namespace/name if not given)
         user: Current authenticated user (optional for downloads)
 
     Returns:
@@ -362,8 +416,8 @@ async def lfs_batch(
     except Exception as e:
         raise HTTPException(400, detail={"error": f"Invalid LFS batch request: {e}"})
 
-    # Get repository using get_repository() which returns Repository FK object
-    repo = get_repository(repo_type, namespace, name)
+    # Resolve repository (git clients use the URL without repo type)
+    repo = resolve_repository(namespace, name, repo_type)
 
     if repo:
         operation = batch_req.operation
@@ -402,6 +456,10 @@ async def lfs_batch(
                 # Download requires read permission (may be public)
                 check_repo_read_permission(repo, user)
 
+    if batch_req.operation == "upload":
+        # Abort multipart uploads abandoned by earlier clients
+        schedule_session_sweep()
+
     if cfg.app.debug_log_payloads:
         logger.debug("==== LFS Batch Request ====")
         logger.debug(body)
@@ -412,7 +470,13 @@ async def lfs_batch(
         match batch_req.operation:
             case "upload":
                 return await process_upload_object(
-                    obj.oid, obj.size, repo_id, batch_req.is_browser
+                    obj.oid,
+                    obj.size,
+                    repo_id,
+                    user,
+                    batch_req.is_browser,
+                    batch_req.resume_multipart,
+                    batch_req.lazy_part_urls,
                 )
             case "download":
                 return await process_download_object(obj.oid, obj.size)
@@ -442,6 +506,174 @@ async def lfs_batch(
     )
 
 
+@router.get("/api/{namespace}/{name}.git/info/lfs/parts/{upload_id}")
+async def lfs_part_urls(
+    namespace: str,
+    name: str,
+    upload_id: str,
+    oid: str = Query(..., pattern="^[0-9a-f]{64}$"),
+    start: int = Query(1, alias="from", ge=1),
+    count: int = Query(PART_URL_WINDOW, ge=1, le=MAX_PART_URL_WINDOW),
+    user: User | None = Depends(get_optional_user),
+):
+    """Presign a window of part URLs of a multipart LFS upload.
+
+    Used by clients that asked for lazy_part_urls in the batch request, so
+    large uploads fetch short-lived URLs as they go instead of receiving
+    every part URL up front.
+
+    Sessions belong to the user who started them, so only that user gets
+    part URLs, and only when naming the object of the upload (parts_href
+    carries its oid): the same access a batch request for it on a writable
+    repository would grant.
+
+    Args:
+        namespace: Repository namespace
+        name: Repository name
+        upload_id: S3 upload ID (from the batch response)
+        oid: LFS object SHA256 the upload belongs to
+        start: First part number ("from" query parameter)
+        count: Number of parts to presign
+        user: Current authenticated user
+
+    Returns:
+        Part URLs of parts start..start+count-1 (capped at the part count)
+        and the first part of the next window (null after the last part)
+    """
+    repo = resolve_repository(namespace, name)
+    if not repo:
+        raise HTTPException(404, detail={"error": "Repository not found"})
+    if not user:
+        raise HTTPException(401, detail={"error": "Authentication required for upload"})
+    check_repo_write_permission(repo, user)
+
+    session = get_lfs_multipart_upload_by_id(upload_id)
+    if not session or session.sha256 != oid or session.user_id != user.id:
+        raise HTTPException(404, detail={"error": "Multipart upload not found"})
+
+    end = min(start + count, session.part_count + 1)
+    part_urls = await presign_upload_part_urls(
+        bucket=cfg.s3.bucket,
+        key=session.s3_key,
+        upload_id=upload_id,
+        part_numbers=list(range(start, end)),
+        expires_in=PART_URL_EXPIRES_IN,
+    )
+    expires_at = (
+        datetime.now(timezone.utc) + timedelta(seconds=PART_URL_EXPIRES_IN)
+    ).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    return {
+        "upload_id": upload_id,
+        "chunk_size": session.chunk_size,
+        "part_count": session.part_count,
+        "parts": {str(part["part_number"]): part["url"] for part in part_urls},
+        "next": end if end <= session.part_count else None,
+        "expires_at": expires_at,
+    }
+
+
+def normalize_parts(parts: list[dict]) -> list[dict]:
+    """Normalize completion parts to the S3 format.
+
+    HuggingFace uses partNumber/etag, S3 uses PartNumber/ETag.
+
+    Raises:
+        HTTPException: If a part has neither format
+    """
+    normalized_parts = []
+    for part in parts:
+        # Support both formats
+        part_number = part.get("PartNumber") or part.get("partNumber")
+        etag = part.get("ETag") or part.get("etag")
+
+        if not part_number or not etag:
+            raise HTTPException(
+                400,
+                detail={
+                    "error": f"Invalid part format: {part}",
+                    "expected": "PartNumber/partNumber and ETag/etag",
+                },
+            )
+
+        normalized_parts.append({"PartNumber": int(part_number), "ETag": etag})
+    return normalized_parts
+
+
+async def get_published_object(oid: str, size: int | None) -> dict | None:
+    """Metadata of lfs/<oid> if it exists, is verified and has the given size."""
+    try:
+        metadata = await get_object_metadata(cfg.s3.bucket, get_lfs_key(oid))
+    except Exception:
+        return None
+    if size and metadata["size"] != size:
+        return None
+    if not is_lfs_object_verified(oid, metadata["size"]):
+        return None
+    return metadata
+
+
+async def check_verification(result: str | None, oid: str, size: int | None) -> None:
+    """Turn the outcome of verify_staged_upload into an HTTP error.
+
+    Raises:
+        HTTPException: 422 if the content does not match, 404 if neither
+            the staged upload nor a verified object exists
+    """
+    if result == "quarantined":
+        raise HTTPException(
+            422, detail={"error": "Uploaded content does not match its OID and size"}
+        )
+    if result is None and not await get_published_object(oid, size):
+        raise HTTPException(404, detail={"error": "Object not found in storage"})
+
+
+async def finish_multipart_upload(
+    session: LFSMultipartUpload, parts: list[dict]
+) -> str | None:
+    """Complete the S3 upload of a session and verify the staged object.
+
+    Args:
+        session: Upload session
+        parts: Parts reported by the client ({"PartNumber", "ETag"})
+
+    Returns:
+        Outcome of verify_staged_upload
+    """
+    # Add the parts uploaded before the client resumed
+    parts = await complete_parts(session, parts)
+
+    logger.info(
+        f"Completing multipart upload for {session.sha256[:8]}: "
+        f"{len(parts)} parts, upload_id={session.upload_id}"
+    )
+    if parts:
+        logger.debug(
+            f"Parts sample for {session.sha256[:8]}: "
+            f"first={parts[0]}, last={parts[-1]}, total={len(parts)}"
+        )
+
+    try:
+        await complete_multipart_upload(
+            bucket=cfg.s3.bucket,
+            key=session.s3_key,
+            upload_id=session.upload_id,
+            parts=parts,
+        )
+    except Exception as e:
+        # A concurrent completion of the same session got there first
+        if not await upload_completed_elsewhere(e, session):
+            raise
+        logger.info(
+            f"Multipart upload {session.upload_id} of {session.sha256[:8]} "
+            "was already completed"
+        )
+
+    result = await verify_staged_upload(session.sha256, session.size, session.s3_key)
+    close_upload_session(session.upload_id)
+    return result
+
+
 @router.post("/api/{namespace}/{name}.git/info/lfs/complete/{upload_id}")
 @router.post("/api/{namespace}/{name}.git/info/lfs/complete")
 async def lfs_complete_multipart(
@@ -449,7 +681,10 @@ async def lfs_complete_multipart(
 ):
     """Complete multipart LFS upload.
 
-    Called by client after uploading all parts to finalize S3 multipart upload.
+    Called by client after uploading all parts to finalize S3 multipart
+    upload. The assembled object is verified before it is published as
+    lfs/<oid>. HuggingFace clients send no credentials here; the upload ID
+    (from an authorized batch request) identifies the upload.
 
     Args:
         namespace: Repository namespace
@@ -488,103 +723,74 @@ async def lfs_complete_multipart(
 
     parts = body.get("parts", [])
 
-    if not oid or not upload_id or not parts:
+    if not oid or not upload_id:
         raise HTTPException(
             400,
             detail={
-                "error": "Missing required fields: oid, upload_id, parts",
-                "received": {
-                    "oid": bool(oid),
-                    "upload_id": bool(upload_id),
-                    "parts": bool(parts),
-                },
+                "error": "Missing required fields: oid, upload_id",
+                "received": {"oid": bool(oid), "upload_id": bool(upload_id)},
             },
         )
 
-    # Normalize parts format (HuggingFace uses partNumber/etag, S3 uses PartNumber/ETag)
-    normalized_parts = []
-    for part in parts:
-        # Support both formats
-        part_number = part.get("PartNumber") or part.get("partNumber")
-        etag = part.get("ETag") or part.get("etag")
-
-        if not part_number or not etag:
-            raise HTTPException(
-                400,
-                detail={
-                    "error": f"Invalid part format: {part}",
-                    "expected": "PartNumber/partNumber and ETag/etag",
-                },
-            )
-
-        normalized_parts.append({"PartNumber": int(part_number), "ETag": etag})
-
-    lfs_key = get_lfs_key(oid)
-
-    try:
-        # Complete the multipart upload on S3
-        logger.info(
-            f"Completing multipart upload for {oid[:8]}: "
-            f"{len(parts)} parts, upload_id={upload_id}"
-        )
+    session = get_lfs_multipart_upload_by_id(upload_id)
+    if session is None or session.sha256 != oid:
+        # Completed by an earlier (retried) request
+        metadata = None if session else await get_published_object(oid, size)
+        if metadata is None:
+            raise HTTPException(404, detail={"error": "Multipart upload not found"})
+    else:
+        if size and size != session.size:
+            raise HTTPException(400, detail={"error": "Size mismatch after upload"})
 
-        # Debug: Log first and last few parts
-        if len(normalized_parts) > 0:
-            logger.debug(
-                f"Parts sample for {oid[:8]}: "
-                f"first={normalized_parts[0]}, last={normalized_parts[-1]}, total={len(normalized_parts)}"
+        try:
+            result = await finish_multipart_upload(session, normalize_parts(parts))
+            await check_verification(result, oid, session.size)
+            metadata = await get_object_metadata(cfg.s3.bucket, get_lfs_key(oid))
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.exception(
+                f"Failed to complete multipart upload for {oid[:8]} "
+                f"(upload_id={upload_id})",
+                e,
             )
-
-        result = await complete_multipart_upload(
-            bucket=cfg.s3.bucket,
-            key=lfs_key,
-            upload_id=upload_id,
-            parts=normalized_parts,
-        )
-
-        # Verify the completed object
-        metadata = await get_object_metadata(cfg.s3.bucket, lfs_key)
-
-        if size and metadata["size"] != size:
-            logger.error(
-                f"Size mismatch after multipart completion: "
-                f"expected {size}, got {metadata['size']}"
+            raise HTTPException(
+                500, detail={"error": f"Failed to complete multipart upload: {str(e)}"}
             )
-            raise HTTPException(400, detail={"error": "Size mismatch after upload"})
-
-        logger.success(
-            f"Multipart upload completed for {oid[:8]}: "
-            f"size={metadata['size']}, etag={metadata['etag']}"
-        )
 
-        return {
-            "message": "Multipart upload completed successfully",
-            "size": metadata["size"],
-            "etag": metadata["etag"],
-        }
-
-    except Exception as e:
-        logger.exception(
-            f"Failed to complete multipart upload for {oid[:8]} "
-            f"(upload_id={upload_id})",
-            e,
-        )
-        raise HTTPException(
-            500, detail={"error": f"Failed to complete multipart upload: {str(e)}"}
-        )
+    logger.success(
+        f"Multipart upload completed for {oid[:8]}: "
+        f"size={metadata['size']}, etag={metadata['etag']}"
+    )
+    return {
+        "message": "Multipart upload completed successfully",
+        "size": metadata["size"],
+        "etag": metadata["etag"],
+    }
 
 
 @router.post("/api/{namespace}/{name}.git/info/lfs/verify")
-async def lfs_verify(namespace: str, name: str, request: Request):
+async def lfs_verify(
+    namespace: str,
+    name: str,
+    request: Request,
+    upload: str | None = Query(None),
+    user: User | None = Depends(get_optional_user),
+):
     """Verify LFS upload completion.
 
-    Called by client after successful upload to confirm the file.
-    Supports both single-part and multipart uploads.
+    Called by client after successful upload to confirm the file. The
+    staged upload is hashed and published as lfs/<oid> if it matches;
+    objects verified before are confirmed without hashing them again.
+    Requires write permission, like the upload itself.
 
     Args:
         namespace: Repository namespace
         name: Repository name
         request: FastAPI request with verification data
+        upload: Staging token of a single PUT upload (part of the verify
+            href returned by the batch request)
+        user: Current authenticated user
 
     Returns:
         Verification result
@@ -603,7 +809,13 @@ async def lfs_verify(namespace: str, name: str, request: Request):
             "parts": [{"PartNumber": 1, "ETag": "etag1"}, ...]
         }
     """
-    repo_id = f"{namespace}/{name}"
+    repo = resolve_repository(namespace, name)
+    if not repo:
+        raise HTTPException(404, detail={"error": "Repository not found"})
+    if not user:
+        raise HTTPException(401, detail={"error": "Authentication required for upload"})
+    check_repo_write_permission(repo, user)
+
     try:
         body = await request.json()
     except Exception as e:
@@ -616,23 +828,18 @@ async def lfs_verify(namespace: str, name: str, request: Request):
 
     if not oid:
         raise HTTPException(400, detail={"error": "Missing OID"})
-
-    lfs_key = get_lfs_key(oid)
+    if not is_lfs_oid(oid):
+        raise HTTPException(400, detail={"error": f"Invalid OID: {oid}"})
+    if upload is not None and not is_staging_token(upload):
+        raise HTTPException(400, detail={"error": "Invalid upload token"})
 
     # If this is a multipart upload, complete it first
-    if upload_id and parts:
+    session = get_lfs_multipart_upload_by_id(upload_id) if upload_id else None
+    if session and parts and session.sha256 == oid and session.user_id == user.id:
         try:
-            logger.info(
-                f"Completing multipart upload during verify for {oid[:8]}: "
-                f"{len(parts)} parts, upload_id={upload_id}"
-            )
-
-            await complete_multipart_upload(
-                bucket=cfg.s3.bucket, key=lfs_key, upload_id=upload_id, parts=parts
-            )
-
-            logger.success(f"Multipart upload completed for {oid[:8]}")
-
+            result = await finish_multipart_upload(session, normalize_parts(parts))
+        except HTTPException:
+            raise
         except Exception as e:
             logger.exception(
                 f"Failed to complete multipart upload for {oid[:8]} "
@@ -643,24 +850,22 @@ async def lfs_verify(namespace: str, name: str, request: Request):
                 500,
                 detail={"error": f"Failed to complete multipart upload: {str(e)}"},
             )
+        await check_verification(result, oid, size)
+        return {"message": "Object verified successfully"}
 
-    # Verify object exists in S3
-    if not await object_exists(cfg.s3.bucket, lfs_key):
-        raise HTTPException(404, detail={"error": "Object not found in storage"})
+    # Verified before (e.g. by the multipart completion): don't hash it again
+    if await get_published_object(oid, size):
+        if upload:
+            await discard_staged_upload(staging_key(oid, upload))
+        return {"message": "Object verified successfully"}
 
-    # Optionally verify size
-    if size:
-        try:
-            metadata = await get_object_metadata(cfg.s3.bucket, lfs_key)
-            if metadata["size"] != size:
-                logger.error(
-                    f"Size mismatch for {oid[:8]}: expected {size}, got {metadata['size']}"
-                )
-                raise HTTPException(400, detail={"error": "Size mismatch"})
-        except HTTPException:
-            raise
-        except Exception as e:
-            # If metadata retrieval fails, still accept the verification
-            logger.warning(f"Failed to verify size for {oid[:8]}: {e}")
+    if not upload:
+        raise HTTPException(404, detail={"error": "Object not found in storage"})
 
+    try:
+        result = await verify_staged_upload(oid, size, staging_key(oid, upload))
+    except Exception as e:
+        logger.exception(f"Failed to verify LFS upload of {oid[:8]}", e)
+        raise HTTPException(500, detail={"error": f"Failed to verify upload: {str(e)}"})
+    await check_verification(result, oid, size)
     return {"message": "Object verified successfully"}
@@ -0,0 +1,211 @@
+"""Bounded, prioritized blob fetching for the git bridge.
+
+Every blob download of the bridge (LakeFS or object store) goes through one
+per-worker limiter, so concurrent clones share cfg.app.git_fetch_concurrency
+open downloads instead of each starting one per file. Waiting fetches are
+served by priority: how far ahead of its pack writer a blob was when it was
+queued. A priority is not fixed, though: when a writer reaches a blob that
+is still queued, it is moved to the front (priority 0), so the blob a
+writer waits for goes before blobs read ahead (for it or for other
+requests), however long ago they were queued. Failed downloads are retried
+with backoff.
+
+iter_fetched feeds a pack writer in order, keeping at most
+cfg.app.git_fetch_window blobs and about cfg.app.git_fetch_buffer_bytes of
+fetched content ahead of it; nothing new is started while the writer is
+behind.
+"""
+
+import asyncio
+import heapq
+import itertools
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Iterable, TypeVar
+
+from kohakuhub.config import cfg
+from kohakuhub.logger import get_logger
+from kohakuhub.api.repo.utils.hf import is_lakefs_not_found_error
+
+logger = get_logger("GIT_FETCH")
+
+T = TypeVar("T")
+
+RETRY_BASE_DELAY = 0.5  # Seconds, doubled on every retry
+
+_limiter = None
+
+
+class FetchPriority:
+    """Priority of one fetch that can be lowered while it is queued."""
+
+    def __init__(self, value: int = 0):
+        self.value = value
+        self._queued = None  # (semaphore, future) while waiting for a slot
+
+    def lower(self, value: int) -> None:
+        """Lower the priority value, moving a queued fetch ahead."""
+        if value >= self.value:
+            return
+        self.value = value
+        if self._queued is not None:
+            semaphore, future = self._queued
+            semaphore._push(value, future)
+
+
+class PrioritySemaphore:
+    """Semaphore whose waiters are woken lowest priority value first (FIFO on ties)."""
+
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters = []  # Heap of (priority, seq, future), stale entries skipped
+        self._seq = itertools.count()
+
+    def _push(self, priority: int, future: asyncio.Future) -> None:
+        # A re-prioritized waiter gets a new entry; the old one is skipped
+        # once the future is done
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+
+    async def acquire(self, priority: int | FetchPriority = 0) -> None:
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        if isinstance(priority, FetchPriority):
+            self._push(priority.value, future)
+            priority._queued = (self, future)
+        else:
+            self._push(priority, future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Woken and cancelled at once: hand the slot on
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        finally:
+            if isinstance(priority, FetchPriority):
+                priority._queued = None
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._value += 1
+
+
+def get_fetch_limiter() -> PrioritySemaphore:
+    """Per-worker limiter of concurrent blob downloads."""
+    global _limiter
+    if _limiter is None:
+        _limiter = PrioritySemaphore(max(cfg.app.git_fetch_concurrency, 1))
+    return _limiter
+
+
+async def fetch_with_retry(
+    fetch: Callable[[], Awaitable[T]], priority: int | FetchPriority = 0
+) -> T:
+    """Run a download under the fetch limiter, retrying transient failures.
+
+    Not-found errors and ValueErrors (e.g. content not matching its hash)
+    are not transient and raised right away.
+
+    Args:
+        fetch: Coroutine function doing one download attempt
+        priority: Lower is served first when downloads are queued; a
+            FetchPriority can be lowered while the download waits
+
+    Raises:
+        Exception: The last error of the download
+    """
+    limiter = get_fetch_limiter()
+    retries = max(cfg.app.git_fetch_retries, 0)
+    for attempt in range(retries + 1):
+        await limiter.acquire(priority)
+        try:
+            return await fetch()
+        except Exception as e:
+            if (
+                attempt >= retries
+                or isinstance(e, ValueError)
+                or is_lakefs_not_found_error(e)
+            ):
+                raise
+            logger.warning(f"Fetch failed (attempt {attempt + 1}), retrying: {e}")
+        finally:
+            limiter.release()
+        await asyncio.sleep(RETRY_BASE_DELAY * 2**attempt)
+
+
+async def iter_fetched(
+    items: Iterable[T | bytes], fetch: Callable[[T], Awaitable[bytes]]
+) -> AsyncIterator[bytes]:
+    """Fetch items concurrently and yield their contents in order.
+
+    Items that already are bytes are yielded as they are, without a fetch.
+
+    Downloads run ahead of the consumer up to cfg.app.git_fetch_window items
+    and cfg.app.git_fetch_buffer_bytes of fetched, not yet consumed content
+    (at least one item is always in flight).
+
+    Args:
+        items: Items (or contents) in output order
+        fetch: Coroutine function downloading one item (one attempt; it is
+            retried by the pipeline)
+    """
+    window = max(cfg.app.git_fetch_window, 1)
+    max_buffer = cfg.app.git_fetch_buffer_bytes
+    pending = deque()
+    buffered = 0  # Bytes fetched but not yet yielded
+    source = iter(items)
+    exhausted = False
+
+    def account(task: asyncio.Task) -> None:
+        nonlocal buffered
+        if not task.cancelled() and task.exception() is None:
+            buffered += len(task.result())
+
+    def schedule() -> None:
+        nonlocal buffered, exhausted
+        while not exhausted and len(pending) < window:
+            if pending and buffered >= max_buffer:
+                return  # Backpressure: the consumer is behind
+            try:
+                item = next(source)
+            except StopIteration:
+                exhausted = True
+                return
+            if isinstance(item, bytes):
+                buffered += len(item)
+                pending.append(item)
+                continue
+            # Priority: distance from the blob the consumer waits for,
+            # lowered to 0 once the consumer reaches it
+            priority = FetchPriority(len(pending))
+            task = asyncio.create_task(
+                fetch_with_retry(lambda item=item: fetch(item), priority)
+            )
+            task.add_done_callback(account)
+            pending.append((task, priority))
+
+    try:
+        schedule()
+        while pending:
+            item = pending.popleft()
+            if isinstance(item, bytes):
+                data = item
+            else:
+                task, priority = item
+                priority.lower(0)
+                data = await task
+            buffered -= len(data)
+            schedule()
+            yield data
+    finally:
+        for item in pending:
+            if not isinstance(item, bytes):
+                item[0].cancel()
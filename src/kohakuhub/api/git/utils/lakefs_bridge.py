@@ -1,9 +1,11 @@
 """Git-LakeFS bridge - Pure Python implementation (no pygit2, no file I/O)."""
 
-from datetime import datetime
+from datetime import timezone
+from typing import AsyncIterator
 import asyncio
 import fnmatch
 import hashlib
+import json
 
 from kohakuhub.config import cfg
 from kohakuhub.constants import (
@@ -11,20 +13,57 @@ from kohakuhub.constants import (
     DEFAULT_EMAIL,
     GIT_ATTRIBUTES_FILE,
 )
-from kohakuhub.db import File
-from kohakuhub.db_operations import get_repository, should_use_lfs
+from kohakuhub.db import Commit, File, GitCommitMapping, Repository
+from kohakuhub.db_operations import (
+    get_commits_by_ids,
+    get_git_blob_sha1s,
+    get_git_commit_mapping,
+    get_git_commit_mappings,
+    get_git_commit_mappings_by_sha1,
+    get_repository,
+    save_git_blob_sha1s,
+    save_git_commit_mapping,
+    should_use_lfs,
+)
 from kohakuhub.logger import get_logger
-from kohakuhub.utils.lakefs import get_lakefs_client, lakefs_repo_name
+from kohakuhub.utils.datetime_utils import ensure_datetime
+from kohakuhub.utils.lakefs import (
+    get_lakefs_client,
+    lakefs_repo_name,
+    list_all_objects,
+)
 from kohakuhub.api.git.utils.objects import (
     build_nested_trees,
+    compute_git_object_sha1,
     create_blob_object,
     create_commit_object,
-    create_pack_file,
+    create_tree_object,
+    parse_tree_object,
+    stream_pack_file,
+)
+from kohakuhub.api.git.utils.fetch_pipeline import fetch_with_retry, iter_fetched
+from kohakuhub.api.git.utils.object_store import GitObjectStore, get_object_store
+from kohakuhub.api.git.utils.pack_cache import (
+    get_pack_store,
+    is_pack_cached,
+    open_cached_pack,
+    tee_into_pack_cache,
 )
 from kohakuhub.api.git.utils.server import create_empty_pack
+from kohakuhub.api.repo.utils.manifest import get_manifest, lfs_oid_from_address
 
 logger = get_logger("GIT_LAKEFS")
 
+# Tree of a commit without files
+EMPTY_TREE_SHA1, EMPTY_TREE_DATA = create_tree_object([])
+
+_history_locks: dict[int, asyncio.Lock] = {}
+# (repository ID, LakeFS commit) -> (history mapping in flight, LakeFS commit
+# advertised until it finishes)
+_backfills: dict[tuple[int, str], tuple[asyncio.Task, str | None]] = {}
+_warming: set[tuple[int, str]] = set()
+_background_warms: set[asyncio.Task] = set()
+
 
 def create_lfs_pointer(sha256: str, size: int) -> bytes:
     """Create Git LFS pointer file content."""
@@ -35,6 +74,40 @@ size {size}
     return pointer.encode("utf-8")
 
 
+def create_lfs_pointer_blob(sha256: str, size: int) -> tuple[str, bytes]:
+    """Create Git LFS pointer blob.
+
+    Stored on File rows when an LFS file is committed, so trees can be built
+    without regenerating and rehashing pointers.
+
+    Returns:
+        (blob SHA-1, pointer content)
+    """
+    pointer = create_lfs_pointer(sha256, size)
+    return compute_git_object_sha1("blob", pointer), pointer
+
+
+def parse_lfs_pointer(content: bytes) -> tuple[str, int] | None:
+    """Parse Git LFS pointer file content.
+
+    Returns:
+        (sha256, size), or None if content is not an LFS pointer
+    """
+    if len(content) > 1024 or not content.startswith(b"version https://git-lfs"):
+        return None
+
+    fields = {}
+    for line in content.decode("utf-8", errors="replace").splitlines():
+        key, _, value = line.partition(" ")
+        fields[key] = value
+
+    oid = fields.get("oid", "")
+    size = fields.get("size", "")
+    if not oid.startswith("sha256:") or len(oid) != 71 or not size.isdigit():
+        return None
+    return oid[7:], int(size)
+
+
 def generate_lfsconfig(base_url: str, namespace: str, name: str) -> bytes:
     """Generate .lfsconfig."""
     lfs_url = f"{base_url}/{namespace}/{name}.git/info/lfs"
@@ -44,6 +117,100 @@ def generate_lfsconfig(base_url: str, namespace: str, name: str) -> bytes:
     return config.encode("utf-8")
 
 
+def get_history_lock(repository_id: int) -> asyncio.Lock:
+    """Lock serializing commit mapping (and pushes) of one repository."""
+    return _history_locks.setdefault(repository_id, asyncio.Lock())
+
+
+def _unix_timestamp(value) -> int:
+    """Convert LakeFS creation_date or a DB datetime to a Unix timestamp."""
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    try:
+        dt = ensure_datetime(value)
+    except ValueError:
+        return 0
+    if dt is None:
+        return 0
+    if dt.tzinfo is None:
+        # DB datetimes are stored in UTC
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def build_git_commit(
+    lakefs_commit: dict,
+    commit_row: Commit | None,
+    tree_sha1: str,
+    parent_sha1s: list[str],
+) -> tuple[str, bytes]:
+    """Build Git commit object for a LakeFS commit.
+
+    Author and message come from the Commit table (the user who made the
+    commit); LakeFS only knows the service account. Commits made outside
+    the API fall back to LakeFS metadata.
+
+    Returns:
+        (commit_sha1, commit_data_with_header)
+    """
+    committer_timestamp = _unix_timestamp(lakefs_commit.get("creation_date", 0))
+
+    if commit_row:
+        author_name = commit_row.username
+        author_timestamp = _unix_timestamp(commit_row.created_at)
+        message = commit_row.message
+        if commit_row.description:
+            message = f"{message}\n\n{commit_row.description}"
+    else:
+        author_name = lakefs_commit.get("committer") or "KohakuHub"
+        author_timestamp = committer_timestamp
+        message = lakefs_commit.get("message") or DEFAULT_COMMIT_MESSAGE
+
+    return create_commit_object(
+        tree_sha1=tree_sha1,
+        parent_sha1s=parent_sha1s,
+        author_name=author_name,
+        author_email=DEFAULT_EMAIL,
+        committer_name=author_name,
+        committer_email=DEFAULT_EMAIL,
+        author_timestamp=author_timestamp,
+        committer_timestamp=committer_timestamp,
+        timezone="+0000",
+        message=message,
+    )
+
+
+def _blob_size(path: str, blob_with_header: bytes | None, sizes: dict) -> int:
+    """Content size of a blob, from its data or from the listed file size."""
+    if blob_with_header is None:
+        return sizes.get(path, 0)
+    return len(blob_with_header) - blob_with_header.index(b"\0") - 1
+
+
+def _parents_first(commits: dict[str, dict]) -> list[str]:
+    """Order LakeFS commits so every parent comes before its children."""
+    order = []
+    visited = set()
+
+    for root in commits:
+        stack = [(root, False)]
+        while stack:
+            cid, expanded = stack.pop()
+            if expanded:
+                order.append(cid)
+                continue
+            if cid in visited:
+                continue
+            visited.add(cid)
+            stack.append((cid, True))
+            for parent in commits[cid].get("parents") or []:
+                if parent in commits and parent not in visited:
+                    stack.append((parent, False))
+
+    return order
+
+
 class GitLakeFSBridge:
     """Git-LakeFS bridge - Pure Python, in-memory only (no pygit2, no temp files)."""
 
@@ -56,7 +223,12 @@ class GitLakeFSBridge:
         self.lakefs_client = get_lakefs_client()
 
     async def get_refs(self, branch: str = "main") -> dict[str, str]:
-        """Get Git refs - pure logical, no temp files."""
+        """Get Git refs - constant-time lookup once the head commit is mapped.
+
+        A head with a long unmapped history is mapped in the background; its
+        newest mapped ancestor is advertised until then (see
+        get_advertised_mapping).
+        """
         try:
             # Get branch info
             branch_info = await self.lakefs_client.get_branch(
@@ -67,113 +239,509 @@ class GitLakeFSBridge:
             if not commit_id:
                 return {}
 
-            # Build commit SHA-1 in memory
-            commit_sha1 = await self._build_commit_sha1(branch, commit_id)
+            mapping = await self.get_advertised_mapping(commit_id)
 
-            if not commit_sha1:
+            # Nothing to clone yet
+            if not mapping or mapping.tree_sha1 == EMPTY_TREE_SHA1:
                 return {}
 
             return {
-                f"refs/heads/{branch}": commit_sha1,
-                "HEAD": commit_sha1,
+                f"refs/heads/{branch}": mapping.commit_sha1,
+                "HEAD": mapping.commit_sha1,
             }
 
         except Exception as e:
             logger.exception(f"Failed to get refs for {self.repo_id}", e)
             return {}
 
-    async def _build_commit_sha1(self, branch: str, commit_id: str) -> str | None:
-        """Build Git commit SHA-1 purely in memory - no files created."""
-        try:
-            # Step 1: Get all objects from LakeFS
-            all_objects = []
-            after = ""
-            has_more = True
-
-            while has_more:
-                result = await self.lakefs_client.list_objects(
-                    repository=self.lakefs_repo,
-                    ref=branch,
-                    prefix="",
-                    after=after,
-                    amount=1000,
-                )
-                all_objects.extend(result.get("results", []))
-                pagination = result.get("pagination", {})
-                has_more = pagination.get("has_more", False)
-                if has_more:
-                    after = pagination.get("next_offset", "")
-
-            file_objects = [
-                obj for obj in all_objects if obj.get("path_type") == "object"
-            ]
-            logger.info(f"Found {len(file_objects)} files in LakeFS")
+    async def get_commit_sha1(self, commit_id: str) -> str | None:
+        """Get Git commit SHA-1 for a LakeFS commit (persisted after first build)."""
+        mapping = await self.get_commit_mapping(commit_id)
+        return mapping.commit_sha1 if mapping else None
 
-            if not file_objects:
-                return None
+    async def get_commit_mapping(self, commit_id: str) -> GitCommitMapping | None:
+        """Get Git commit mapping for a LakeFS commit.
+
+        The commit and all its unmapped ancestors are mapped on first use and
+        persisted, so later calls (from any worker) are a single lookup.
+        Concurrent calls for the same commit share one mapping run.
+        """
+        repo = get_repository(self.repo_type, self.namespace, self.name)
+        if not repo:
+            return None
 
-            # Step 2: Build blob objects (in memory, no download for large files!)
-            blob_data = await self._build_blob_sha1s(file_objects, branch)
+        mapping = get_git_commit_mapping(repo, commit_id)
+        if mapping:
+            return mapping
 
-            if not blob_data:
+        task, _ = self._schedule_history_mapping(repo, commit_id)
+        await asyncio.shield(task)
+        return get_git_commit_mapping(repo, commit_id)
+
+    async def get_advertised_mapping(self, commit_id: str) -> GitCommitMapping | None:
+        """Mapping of the commit to advertise for a LakeFS branch head.
+
+        Up to cfg.app.git_history_inline_commits unmapped commits are mapped
+        right away. A longer unmapped history (e.g. the first clone of a
+        repository with a long LakeFS history) is mapped in the background,
+        and the newest ancestor mapped before is advertised meanwhile: its
+        SHA-1 stays valid and the head is a fast-forward of it. Only a
+        history without any mapped commit is waited for, as commit SHA-1s
+        depend on those of all their ancestors.
+        """
+        repo = get_repository(self.repo_type, self.namespace, self.name)
+        if not repo:
+            return None
+
+        mapping = get_git_commit_mapping(repo, commit_id)
+        if mapping:
+            return mapping
+
+        key = (repo.id, commit_id)
+        if key not in _backfills:
+            try:
+                pending, _, newest = await self._plan_commit_history(repo, commit_id)
+            except Exception as e:
+                logger.exception(f"Failed to read history of {self.repo_id}", e)
                 return None
+            if len(pending) <= max(cfg.app.git_history_inline_commits, 0):
+                return await self.get_commit_mapping(commit_id)
+            logger.info(
+                f"Mapping {len(pending)} commit(s) of {self.repo_id} in the background"
+            )
+            task, advertised = self._schedule_history_mapping(repo, commit_id, newest)
+        else:
+            task, advertised = _backfills[key]
 
-            # Step 3: Build nested tree structure (pure logic, no I/O)
-            flat_entries = [
-                (mode, path, sha1) for path, (sha1, _, mode) in blob_data.items()
-            ]
-            root_tree_sha1, tree_objects = build_nested_trees(flat_entries)
+        if advertised is None:
+            await asyncio.shield(task)
+            return get_git_commit_mapping(repo, commit_id)
+        return get_git_commit_mapping(repo, advertised)
+
+    def _schedule_history_mapping(
+        self, repo: Repository, commit_id: str, advertised: str | None = None
+    ) -> tuple[asyncio.Task, str | None]:
+        """Start mapping the history of a commit, or join the run in flight.
+
+        Args:
+            repo: Repository
+            commit_id: LakeFS commit to map
+            advertised: Mapped ancestor to advertise until the run finishes
+
+        Returns:
+            (mapping task, LakeFS commit advertised meanwhile)
+        """
+        key = (repo.id, commit_id)
+        if key in _backfills:
+            return _backfills[key]
+
+        async def run():
+            async with get_history_lock(repo.id):
+                if get_git_commit_mapping(repo, commit_id):
+                    return
+                try:
+                    await self._map_commit_history(repo, commit_id)
+                except Exception as e:
+                    logger.exception(f"Failed to map history of {self.repo_id}", e)
+
+        task = asyncio.ensure_future(run())
+        _backfills[key] = (task, advertised)
+        task.add_done_callback(lambda _: _backfills.pop(key, None))
+        return task, advertised
 
-            logger.success(
-                f"Built tree structure: {len(tree_objects)} tree objects, root={root_tree_sha1[:8]}"
+    async def _plan_commit_history(
+        self, repo: Repository, commit_id: str
+    ) -> tuple[dict[str, dict], dict[str, str], str | None]:
+        """Find the unmapped history of a LakeFS commit.
+
+        Walks the LakeFS log until every open parent is already mapped.
+        History deeper than cfg.app.git_history_max_commits is cut off.
+
+        Returns:
+            (unmapped LakeFS commits by ID, mapped ancestors where the walk
+            stopped as LakeFS commit ID -> Git commit SHA-1, newest of those
+            mapped ancestors or None)
+        """
+        limit = max(cfg.app.git_history_max_commits, 1)
+        needed = {commit_id}
+        pending = {}  # LakeFS commit ID -> LakeFS commit, not mapped yet
+        mapped = {}  # LakeFS commit ID -> Git commit SHA-1
+        newest = None
+        after = ""
+
+        while needed and len(pending) < limit:
+            result = await self.lakefs_client.log_commits(
+                repository=self.lakefs_repo, ref=commit_id, after=after, amount=1000
             )
+            commits = result.get("results", [])
+            known = get_git_commit_mappings(repo, [c["id"] for c in commits])
+
+            for commit in commits:
+                cid = commit["id"]
+                if cid not in needed:
+                    continue
+                needed.discard(cid)
+
+                if cid in known:
+                    mapped[cid] = known[cid].commit_sha1
+                    newest = newest or cid  # The log lists newest first
+                    continue
+
+                pending[cid] = commit
+                if len(pending) >= limit:
+                    logger.warning(
+                        f"History of {self.repo_id} cut off at {limit} commits"
+                    )
+                    break
+                needed.update(
+                    parent
+                    for parent in commit.get("parents") or []
+                    if parent not in pending and parent not in mapped
+                )
 
-            # Step 4: Build commit object (in memory)
-            commit_info = await self.lakefs_client.get_commit(
-                repository=self.lakefs_repo, commit_id=commit_id
+            pagination = result.get("pagination") or {}
+            if not pagination.get("has_more"):
+                break
+            after = pagination["next_offset"]
+
+        return pending, mapped, newest
+
+    async def _map_commit_history(self, repo: Repository, commit_id: str) -> None:
+        """Map a LakeFS commit and its unmapped ancestors to Git commits.
+
+        Builds the commits found by _plan_commit_history parents first, so
+        each one links to real parents; the oldest mapped commit of a cut off
+        history becomes a root. Mappings are persisted as they are built, so
+        an interrupted run resumes where it stopped and the result stays
+        stable afterwards.
+        """
+        pending, mapped, _ = await self._plan_commit_history(repo, commit_id)
+        commit_rows = get_commits_by_ids(repo, list(pending))
+
+        for cid in _parents_first(pending):
+            commit = pending[cid]
+            _, root_tree_sha1, _ = await self.load_commit_tree(repo, cid)
+            parent_ids = [p for p in commit.get("parents") or [] if p in mapped]
+
+            commit_sha1, commit_data = build_git_commit(
+                commit,
+                commit_rows.get(cid),
+                root_tree_sha1 or EMPTY_TREE_SHA1,
+                [mapped[p] for p in parent_ids],
+            )
+            save_git_commit_mapping(
+                repo,
+                cid,
+                commit_sha1,
+                root_tree_sha1 or EMPTY_TREE_SHA1,
+                parent_ids,
+                commit_data,
             )
+            mapped[cid] = commit_sha1
 
-            author_name = commit_info.get("committer", "KohakuHub")
-            message = commit_info.get("message", DEFAULT_COMMIT_MESSAGE)
-            timestamp = commit_info.get("creation_date", 0)
+        logger.success(f"Mapped {len(pending)} commit(s) of {self.repo_id}")
 
-            # Parse timestamp
-            if isinstance(timestamp, str):
-                try:
-                    dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-                    timestamp = int(dt.timestamp())
-                except (ValueError, AttributeError, TypeError):
-                    timestamp = 0
-
-            # Create commit object
-            commit_sha1, commit_data = create_commit_object(
-                tree_sha1=root_tree_sha1,
-                parent_sha1s=[],  # No parents for now
-                author_name=author_name,
-                author_email=DEFAULT_EMAIL,
-                committer_name=author_name,
-                committer_email=DEFAULT_EMAIL,
-                author_timestamp=timestamp,
-                committer_timestamp=timestamp,
-                timezone="+0000",
-                message=message,
+    def _load_ancestry(
+        self,
+        repo: Repository,
+        commit_ids: list[str],
+        stop: dict[str, GitCommitMapping] | None = None,
+        depth: int | None = None,
+        shallow: set[str] | None = None,
+    ) -> dict[str, GitCommitMapping]:
+        """Collect mapped commits reachable from commit_ids (inclusive).
+
+        Args:
+            repo: Repository
+            commit_ids: LakeFS commit IDs to start from
+            stop: Commits not to enter (and not to walk past)
+            depth: Only walk this many generations (commit_ids are the first)
+            shallow: Commits whose parents are not walked
+
+        Returns:
+            Dict of LakeFS commit ID -> GitCommitMapping
+        """
+        stop = stop or {}
+        shallow = shallow or set()
+        ancestry = {}
+        frontier = [cid for cid in dict.fromkeys(commit_ids) if cid not in stop]
+        generation = 1
+
+        while frontier:
+            found = get_git_commit_mappings(repo, frontier)
+            ancestry.update(found)
+            if depth is not None and generation >= depth:
+                break
+
+            next_frontier = set()
+            for cid, mapping in found.items():
+                if cid in shallow:
+                    continue
+                for parent in json.loads(mapping.parent_commit_ids):
+                    if parent not in ancestry and parent not in stop:
+                        next_frontier.add(parent)
+            frontier = list(next_frontier)
+            generation += 1
+
+        return ancestry
+
+    def _plan_history(
+        self,
+        repo: Repository,
+        commit_id: str,
+        have_commit_ids: list[str],
+        depth: int | None = None,
+        shallow_commit_ids: list[str] | None = None,
+    ) -> tuple[dict[str, GitCommitMapping], set[str], set[str]]:
+        """Select the commits a fetch sends.
+
+        Args:
+            repo: Repository
+            commit_id: LakeFS commit the client wants
+            have_commit_ids: LakeFS commits the client has
+            depth: Limit history to this many generations (deepen)
+            shallow_commit_ids: Client's shallow commits (it has them, but
+                not their parents)
+
+        Returns:
+            (commits to send, edge commits whose trees and blobs the client
+            has, shallow boundary: walked commits whose parents are not sent)
+        """
+        shallow = set(shallow_commit_ids or [])
+        have_ancestry = self._load_ancestry(repo, have_commit_ids, shallow=shallow)
+
+        # Deepening walks through the client's shallow commits
+        stop = (
+            {cid: m for cid, m in have_ancestry.items() if cid not in shallow}
+            if depth
+            else have_ancestry
+        )
+        ancestry = self._load_ancestry(repo, [commit_id], stop=stop, depth=depth)
+
+        # Trees and blobs the client has: those of the haves and of the
+        # commits where the sent history meets the client's history
+        edge_ids = {cid for cid in have_commit_ids if cid in have_ancestry}
+        boundary = set()
+        for cid, mapping in ancestry.items():
+            for parent in json.loads(mapping.parent_commit_ids):
+                if parent in have_ancestry:
+                    edge_ids.add(parent)
+                elif parent not in ancestry:
+                    boundary.add(cid)
+
+        sent = {cid: m for cid, m in ancestry.items() if cid not in have_ancestry}
+        return sent, edge_ids, boundary
+
+    async def _list_commit_objects(self, commit_id: str) -> list[dict]:
+        """List all files of a LakeFS commit, from its manifest when possible."""
+        repo = get_repository(self.repo_type, self.namespace, self.name)
+        manifest = (
+            await get_manifest(repo, self.lakefs_repo, commit_id) if repo else None
+        )
+        if manifest is not None:
+            return list(manifest.iter_entries())
+        return await list_all_objects(self.lakefs_repo, commit_id)
+
+    async def build_commit_tree(
+        self, commit_id: str
+    ) -> tuple[dict[str, tuple[str, bytes | None, str]], str | None, list]:
+        """Build blob SHA-1s and nested trees of a LakeFS commit.
+
+        Only blobs whose physical address has never been hashed are downloaded,
+        and their contents are not kept.
+
+        Returns:
+            (blob_data, root_tree_sha1, tree_objects); root_tree_sha1 is None
+            for a commit without files
+        """
+        file_objects = await self._list_commit_objects(commit_id)
+        logger.info(f"Found {len(file_objects)} files in LakeFS")
+
+        # Blob SHA-1s (LFS pointers and generated files carry their data)
+        blob_data = (
+            await self._build_blob_sha1s(file_objects, commit_id, with_data=False)
+            if file_objects
+            else {}
+        )
+        if not blob_data:
+            return {}, None, []
+
+        # Build nested tree structure (pure logic, no I/O)
+        flat_entries = [
+            (mode, path, sha1) for path, (sha1, _, mode) in blob_data.items()
+        ]
+        root_tree_sha1, tree_objects = build_nested_trees(flat_entries)
+
+        logger.success(
+            f"Built tree structure: {len(tree_objects)} tree objects, root={root_tree_sha1[:8]}"
+        )
+        return blob_data, root_tree_sha1, tree_objects
+
+    async def load_commit_tree(
+        self, repo: Repository, commit_id: str, tree_sha1: str | None = None
+    ) -> tuple[dict[str, tuple[str, bytes | None, str]], str | None, list]:
+        """Blob SHA-1s and nested trees of a LakeFS commit, mirrored in the object store.
+
+        Given the tree SHA-1 the commit was mapped to, trees are read from the
+        object store when they are all there (blobs then carry no data).
+        Otherwise the commit is built from LakeFS (see build_commit_tree) and
+        its trees and generated blobs are stored.
+
+        Returns:
+            (blob_data, root_tree_sha1, tree_objects), as build_commit_tree
+        """
+        store = get_object_store(repo)
+        if store and tree_sha1 and tree_sha1 != EMPTY_TREE_SHA1:
+            try:
+                walked = await store.walk_tree(tree_sha1)
+            except Exception as e:
+                logger.warning(f"Failed to read tree {tree_sha1[:8]} from store: {e}")
+                walked = None
+            if walked:
+                files, tree_objects = walked
+                blob_data = {
+                    path: (sha1, None, mode) for path, (sha1, mode) in files.items()
+                }
+                return blob_data, tree_sha1, tree_objects
+
+        blob_data, root_tree_sha1, tree_objects = await self.build_commit_tree(
+            commit_id
+        )
+        if store:
+            await self.mirror_objects(
+                repo,
+                tree_objects
+                + [(3, data) for _, data, _ in blob_data.values() if data is not None],
             )
+        return blob_data, root_tree_sha1, tree_objects
 
-            logger.success(f"Created commit: {commit_sha1}")
+    async def mirror_objects(
+        self, repo: Repository, objects: list[tuple[int, bytes]]
+    ) -> None:
+        """Store objects in the object store; failures are only logged.
 
-            return commit_sha1
+        Args:
+            repo: Repository
+            objects: List of (type, object_data_with_header)
+        """
+        store = get_object_store(repo)
+        if not store or not objects:
+            return
 
+        try:
+            written = await store.put_many(objects)
+            if written:
+                logger.debug(f"Mirrored {written} object(s) of {self.repo_id}")
         except Exception as e:
-            logger.exception("Failed to build commit SHA-1", e)
-            return None
+            logger.warning(f"Failed to mirror objects of {self.repo_id}: {e}")
+
+    async def _iter_new_objects(
+        self,
+        repo: Repository,
+        store: GitObjectStore | None,
+        commit_id: str,
+        mapping: GitCommitMapping,
+        seen: set[str],
+    ) -> AsyncIterator[tuple[int, str, str, bytes | None]]:
+        """Trees and blobs of a mapped commit that are not in seen yet.
+
+        The commit's tree is walked level by level from the object store,
+        without entering subtrees already in seen: everything below a seen
+        tree was seen with it. Consecutive commits share the SHA-1s of the
+        directories they didn't change, so walking a history reads only the
+        trees that differ from the commits walked before. Commits whose trees
+        are not all stored fall back to load_commit_tree.
+
+        Every yielded object is added to seen.
+
+        Yields:
+            (type, sha1, path, data): trees with their data, blobs with their
+            path in commit_id and their data if generated (None otherwise)
+
+        Raises:
+            RuntimeError: If a rebuilt tree does not match the mapped commit
+        """
+        root = mapping.tree_sha1
+        if root in seen:
+            return
+        if root == EMPTY_TREE_SHA1:
+            seen.add(root)
+            yield 2, root, "", EMPTY_TREE_DATA
+            return
+
+        level = {root: ""}  # Tree SHA-1 -> path prefix
+        while store and level:
+            trees = await store.get_many(list(level))
+            if len(trees) < len(level):
+                break  # Not (all) mirrored, build the rest from LakeFS
+
+            next_level = {}
+            for sha1, prefix in level.items():
+                data = trees[sha1]
+                seen.add(sha1)
+                yield 2, sha1, prefix, data
+                for mode, name, child in parse_tree_object(
+                    data[data.index(b"\0") + 1 :]
+                ):
+                    if child in seen or child in next_level:
+                        continue
+                    if mode in ("40000", "040000"):
+                        next_level[child] = f"{prefix}{name}/"
+                    else:
+                        seen.add(child)
+                        yield 3, child, f"{prefix}{name}", None
+            level = {sha1: p for sha1, p in next_level.items() if sha1 not in seen}
+        if not level:
+            return
+
+        blob_data, root_tree_sha1, tree_objects = await self.load_commit_tree(
+            repo, commit_id, mapping.tree_sha1
+        )
+        if (root_tree_sha1 or EMPTY_TREE_SHA1) != mapping.tree_sha1:
+            # Only happens if LFS classification or base_url changed since
+            # the commit was mapped. Mappings are kept: clients already hold
+            # these commit SHA-1s, and a rebuild may just have hit a transient
+            # error. Fail instead of sending a pack whose trees don't match
+            # the commit.
+            logger.error(
+                f"Tree of commit {commit_id} of {self.repo_id} rebuilt as "
+                f"{(root_tree_sha1 or EMPTY_TREE_SHA1)[:8]}, mapped as "
+                f"{mapping.tree_sha1[:8]} (commit {mapping.commit_sha1[:8]})"
+            )
+            raise RuntimeError(
+                f"Tree of commit {commit_id} changed since it was mapped"
+            )
+
+        for _, data in tree_objects:
+            sha1 = hashlib.sha1(data).hexdigest()
+            if sha1 not in seen:
+                seen.add(sha1)
+                yield 2, sha1, "", data
+        for path, (sha1, blob_with_header, _) in blob_data.items():
+            if sha1 not in seen:
+                seen.add(sha1)
+                yield 3, sha1, path, blob_with_header
 
     async def _build_blob_sha1s(
-        self, file_objects: list[dict], branch: str
-    ) -> dict[str, tuple[str, bytes, str]]:
+        self, file_objects: list[dict], ref: str, with_data: bool = True
+    ) -> dict[str, tuple[str, bytes | None, str]]:
         """Build blob SHA-1s AND data for all files (LFS pointers for large files).
 
+        Blob SHA-1s of regular files are persisted by physical address, so
+        without with_data only files that were never hashed are downloaded.
+
+        Args:
+            file_objects: LakeFS ObjectStats of the files
+            ref: Branch name or commit ID the objects were listed from
+            with_data: Also return blob data (needed for pack files)
+
         Returns:
-            Dict of path -> (blob_sha1, blob_data, mode)
+            Dict of path -> (blob_sha1, blob_data, mode); blob_data is None for
+            blobs resolved from the mapping store when with_data is False
+
+        Raises:
+            Exception: If any file can't be read; a tree missing files must
+                never be built (its SHA-1s would be persisted)
         """
 
         # Get repository and File table records for LFS tracking
@@ -181,12 +749,20 @@ class GitLakeFSBridge:
         if not repo:
             return {}
 
-        file_records = {
-            f.path_in_repo: f
-            for f in File.select().where(
-                (File.repository == repo) & (File.is_deleted == False)
-            )
-        }
+        # Manifest entries already carry their LFS flag, oid and pointer.
+        # Otherwise File rows fill them in, but they describe the branch
+        # head, so they are never used for the trees of older commits
+        file_records = (
+            {
+                f.path_in_repo: f
+                for f in File.select().where(
+                    (File.repository == repo) & (File.is_deleted == False)
+                )
+            }
+            if any("lfs" not in obj for obj in file_objects)
+            and await self._is_branch_head(ref)
+            else {}
+        )
 
         # Check for .gitattributes and parse LFS patterns
         existing_lfs_patterns = set()
@@ -196,17 +772,19 @@ class GitLakeFSBridge:
         for obj in file_objects:
             if obj["path"] == GIT_ATTRIBUTES_FILE:
                 gitattributes_obj = obj
-                try:
-                    gitattributes_content = await self.lakefs_client.get_object(
-                        repository=self.lakefs_repo, ref=branch, path=".gitattributes"
+                gitattributes_content = await fetch_with_retry(
+                    lambda: self.lakefs_client.get_object(
+                        repository=self.lakefs_repo, ref=ref, path=".gitattributes"
                     )
+                )
+                try:
                     existing_lfs_patterns = self._parse_gitattributes(
                         gitattributes_content.decode("utf-8")
                     )
                     logger.info(
                         f"Found .gitattributes with {len(existing_lfs_patterns)} LFS patterns"
                     )
-                except Exception as e:
+                except UnicodeDecodeError as e:
                     logger.warning(f"Failed to parse .gitattributes: {e}")
                 break
 
@@ -223,14 +801,22 @@ class GitLakeFSBridge:
             file_record = file_records.get(path)
 
             # Should be LFS if:
-            # 1. Marked in File table, OR
+            # 1. Marked in the commit manifest or File table, OR
             # 2. Size >= threshold OR matches suffix rules, OR
             # 3. Matches existing LFS pattern
-            should_be_lfs = (
-                (file_record and file_record.lfs)
-                or should_use_lfs(repo, path, size)
-                or self._matches_pattern(path, existing_lfs_patterns)
-            )
+            if "lfs" in obj:
+                # Fixed when the commit was materialized, so trees of old
+                # commits don't change with later File rows or repo settings
+                should_be_lfs = obj["lfs"] or self._matches_pattern(
+                    path, existing_lfs_patterns
+                )
+            else:
+                should_be_lfs = (
+                    (file_record and file_record.lfs)
+                    or lfs_oid_from_address(obj.get("physical_address", ""))
+                    or should_use_lfs(repo, path, size)
+                    or self._matches_pattern(path, existing_lfs_patterns)
+                )
 
             if should_be_lfs:
                 large_files.append((obj, file_record))
@@ -241,33 +827,73 @@ class GitLakeFSBridge:
             f"Classified: {len(small_files)} regular files, {len(large_files)} LFS files"
         )
 
+        known_sha1s = (
+            {}
+            if with_data
+            else get_git_blob_sha1s(
+                [obj.get("physical_address") for obj, _ in small_files]
+            )
+        )
+        new_sha1s = []  # (physical_address, checksum, blob_sha1)
+
         # Process files concurrently - return (path, sha1, data, mode)
         async def process_small(obj, file_record):
-            """Download and create blob."""
+            """Download and create blob (unless already mapped)."""
             path = obj["path"]
+            known_sha1 = known_sha1s.get(obj.get("physical_address"))
+            if known_sha1:
+                return path, known_sha1, None, "100644", False
+
             try:
-                content = await self.lakefs_client.get_object(
-                    repository=self.lakefs_repo, ref=branch, path=path
+                content = await fetch_with_retry(
+                    lambda: self.lakefs_client.get_object(
+                        repository=self.lakefs_repo, ref=ref, path=path
+                    )
                 )
-                sha1, blob_with_header = create_blob_object(content)
-                logger.debug(f"Blob {path}: {len(content)} bytes → {sha1[:8]}")
-                return path, sha1, blob_with_header, "100644", False
             except Exception as e:
                 logger.warning(f"Failed to download {path}: {e}")
-                return None
+                raise
+            sha1, blob_with_header = create_blob_object(content)
+            new_sha1s.append((obj.get("physical_address"), obj.get("checksum"), sha1))
+            logger.debug(f"Blob {path}: {len(content)} bytes → {sha1[:8]}")
+            if not with_data:
+                # Don't hold file contents, the pack stream refetches them
+                blob_with_header = None
+            return path, sha1, blob_with_header, "100644", False
 
         async def process_large(obj, file_record):
             """Create LFS pointer blob."""
             path = obj["path"]
             try:
-                # Use File table SHA256
-                if file_record and file_record.lfs:
+                oid = obj.get("oid") or ""
+                size = obj.get("size_bytes", 0)
+                address_oid = lfs_oid_from_address(obj.get("physical_address", ""))
+                if obj.get("lfs") and len(oid) == 64:
+                    # Manifest oid (SHA256 of this commit's content)
+                    pointer = create_lfs_pointer(oid, size)
+                    if obj.get("pointer_sha1"):
+                        # Pointer SHA-1 stored when the file was committed
+                        blob_with_header = f"blob {len(pointer)}\0".encode() + pointer
+                        sha1 = obj["pointer_sha1"]
+                        return path, sha1, blob_with_header, "100644", True
+                    sha256 = oid
+                elif address_oid:
+                    # lfs/ addresses identify the content of any commit
+                    sha256 = address_oid
+                elif file_record and file_record.lfs and file_record.lfs_pointer_sha1:
+                    # Pointer blob stored when the head's file was committed
+                    pointer = bytes(file_record.lfs_pointer)
+                    blob_with_header = f"blob {len(pointer)}\0".encode() + pointer
+                    sha1 = file_record.lfs_pointer_sha1
+                    return path, sha1, blob_with_header, "100644", True
+                elif file_record and file_record.lfs:
+                    # Use File table SHA256
                     sha256 = file_record.sha256
                     size = file_record.size
                 else:
                     # Fallback to LakeFS stat
                     stat = await self.lakefs_client.stat_object(
-                        repository=self.lakefs_repo, ref=branch, path=path
+                        repository=self.lakefs_repo, ref=ref, path=path
                     )
                     size = stat.get("size_bytes", 0)
                     checksum = stat.get("checksum", "")
@@ -279,8 +905,10 @@ class GitLakeFSBridge:
 
                     if not sha256:
                         # Last resort: download
-                        content = await self.lakefs_client.get_object(
-                            repository=self.lakefs_repo, ref=branch, path=path
+                        content = await fetch_with_retry(
+                            lambda: self.lakefs_client.get_object(
+                                repository=self.lakefs_repo, ref=ref, path=path
+                            )
                         )
                         sha256 = hashlib.sha256(content).hexdigest()
                         size = len(content)
@@ -292,29 +920,29 @@ class GitLakeFSBridge:
                 return path, sha1, blob_with_header, "100644", True
             except Exception as e:
                 logger.warning(f"Failed to create LFS pointer for {path}: {e}")
-                return None
+                raise
 
-        # Process concurrently
-        small_results = await asyncio.gather(
-            *[process_small(obj, rec) for obj, rec in small_files]
-        )
-        large_results = await asyncio.gather(
-            *[process_large(obj, rec) for obj, rec in large_files]
-        )
+        # Process concurrently, downloads are bounded by the fetch limiter
+        tasks = [
+            asyncio.ensure_future(process_small(obj, rec)) for obj, rec in small_files
+        ] + [asyncio.ensure_future(process_large(obj, rec)) for obj, rec in large_files]
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            # Blobs hashed before a failure are still valid for the next attempt
+            if new_sha1s:
+                save_git_blob_sha1s(new_sha1s)
+                logger.info(f"Mapped {len(new_sha1s)} new blob SHA-1s")
+            for task in tasks:
+                task.cancel()
 
         # Collect results
         blob_data = {}  # path -> (sha1, blob_data_with_header, mode)
         lfs_paths = []
 
-        for result in small_results:
-            if result:
-                path, sha1, data, mode, is_lfs = result
-                blob_data[path] = (sha1, data, mode)
-
-        for result in large_results:
-            if result:
-                path, sha1, data, mode, is_lfs = result
-                blob_data[path] = (sha1, data, mode)
+        for path, sha1, data, mode, is_lfs in results:
+            blob_data[path] = (sha1, data, mode)
+            if is_lfs:
                 lfs_paths.append(path)
 
         # Add .gitattributes
@@ -334,6 +962,19 @@ class GitLakeFSBridge:
 
         return blob_data
 
+    async def _is_branch_head(self, ref: str, branch: str = "main") -> bool:
+        """Whether ref names the current head of branch (File rows describe it)."""
+        if ref == branch:
+            return True
+        try:
+            branch_info = await self.lakefs_client.get_branch(
+                repository=self.lakefs_repo, branch=branch
+            )
+        except Exception as e:
+            logger.warning(f"Failed to get {branch} of {self.repo_id}: {e}")
+            return False
+        return branch_info.get("commit_id") == ref
+
     def _parse_gitattributes(self, content: str) -> set[str]:
         """Parse LFS patterns from .gitattributes."""
         patterns = set()
@@ -366,129 +1007,465 @@ class GitLakeFSBridge:
             lines.append(f"{path} filter=lfs diff=lfs merge=lfs -text\n")
         return "".join(lines).encode("utf-8")
 
-    async def build_pack_file(
-        self, wants: list[str], haves: list[str], branch: str = "main"
-    ) -> bytes:
-        """Build Git pack file - pure in-memory, no temp dirs.
+    async def _iter_blob_objects(
+        self,
+        blobs: list[tuple[str, str, str, bytes | None]],
+        store: GitObjectStore | None = None,
+    ) -> AsyncIterator[tuple[int, bytes]]:
+        """Yield blob pack objects in order, reading contents not in memory.
 
-        Args:
-            wants: Commit SHAs client wants
-            haves: Commit SHAs client has (ignored for now)
-            branch: Branch name
+        Contents are read from the object store when mirrored, otherwise
+        downloaded from LakeFS and written to the store as loose objects.
+        Reads go through the shared fetch pipeline (see fetch_pipeline), so
+        only a bounded number of file contents is held at a time.
 
-        Returns:
-            Pack file bytes
+        Args:
+            blobs: List of (blob_sha1, ref, path, blob_data_with_header or None)
+            store: Object store of the repository, None to always use LakeFS
         """
-        try:
-            # Get all objects from LakeFS
-            all_objects = []
-            after = ""
-            has_more = True
-
-            while has_more:
-                result = await self.lakefs_client.list_objects(
-                    repository=self.lakefs_repo,
-                    ref=branch,
-                    prefix="",
-                    after=after,
-                    amount=1000,
-                )
-                all_objects.extend(result.get("results", []))
-                pagination = result.get("pagination", {})
-                has_more = pagination.get("has_more", False)
-                if has_more:
-                    after = pagination.get("next_offset", "")
-
-            file_objects = [
-                obj for obj in all_objects if obj.get("path_type") == "object"
-            ]
+        stored = (
+            store.lookup([sha1 for sha1, _, _, data in blobs if data is None])
+            if store
+            else {}
+        )
+        mirrored = []  # Index rows of blobs written to the store
 
-            if not file_objects:
-                logger.warning("No files found, returning empty pack")
-                return create_empty_pack()
+        async def fetch(blob: tuple[str, str, str, None]) -> bytes:
+            sha1, ref, path, _ = blob
+            if sha1 in stored:
+                blob_with_header = await store.read(stored[sha1])
+                if blob_with_header is not None:
+                    return blob_with_header
 
-            # Build blob objects with data (in memory, LFS pointers for large files!)
-            blob_data = await self._build_blob_sha1s(file_objects, branch)
+            content = await self.lakefs_client.get_object(
+                repository=self.lakefs_repo, ref=ref, path=path
+            )
+            blob_sha1, blob_with_header = create_blob_object(content)
+            if blob_sha1 != sha1:
+                # e.g. an LFS pointer missing from the store, never send the file
+                raise ValueError(f"Content of {path} is not blob {sha1}")
+            if store:
+                try:
+                    mirrored.append(await store.write_loose(3, blob_with_header))
+                except Exception as e:
+                    logger.warning(f"Failed to mirror blob {sha1[:8]}: {e}")
+            return blob_with_header
 
-            if not blob_data:
-                logger.warning("No blobs created, returning empty pack")
-                return create_empty_pack()
+        # Blobs held in memory pass through as their contents
+        items = (blob if blob[3] is None else blob[3] for blob in blobs)
+        try:
+            async for blob_with_header in iter_fetched(items, fetch):
+                yield 3, blob_with_header
+        finally:
+            if mirrored:
+                try:
+                    store.index_objects(mirrored)
+                except Exception as e:
+                    logger.warning(f"Failed to index mirrored blobs: {e}")
 
-            # Build tree objects (pure logic, no I/O)
-            flat_entries = [
-                (mode, path, sha1) for path, (sha1, _, mode) in blob_data.items()
-            ]
-            root_tree_sha1, tree_objects = build_nested_trees(flat_entries)
+    async def find_common_commits(self, haves: list[str]) -> list[str]:
+        """Filter have lines down to commits this repository knows.
 
-            logger.info(
-                f"Built {len(tree_objects)} tree objects, root={root_tree_sha1[:8]}"
-            )
+        Returns:
+            Known commit SHA-1s, in the client's order
+        """
+        repo = get_repository(self.repo_type, self.namespace, self.name)
+        if not repo or not haves:
+            return []
+
+        known = get_git_commit_mappings_by_sha1(repo, haves)
+        return [sha1 for sha1 in dict.fromkeys(haves) if sha1 in known]
+
+    async def _resolve_fetch(
+        self,
+        repo: Repository | None,
+        wants: list[str],
+        haves: list[str],
+        shallows: list[str],
+        branch: str,
+    ) -> tuple[str | None, list[str], list[str], list[str]]:
+        """Resolve fetch SHA-1s to LakeFS commits.
 
-            # Get branch info for commit
-            branch_info = await self.lakefs_client.get_branch(
-                repository=self.lakefs_repo, branch=branch
-            )
+        Returns:
+            (wanted commit ID or None, have commit IDs, shallow commit IDs,
+            wanted SHA-1s that are not known commits)
+        """
+        mappings = (
+            get_git_commit_mappings_by_sha1(repo, wants + haves + shallows)
+            if repo
+            else {}
+        )
 
-            commit_id = branch_info.get("commit_id")
-            if not commit_id:
-                logger.warning("No commit_id in branch, using defaults")
-                author_name = "KohakuHub"
-                message = "Initial commit"
-                timestamp = 0
-            else:
-                # Build commit object
-                commit_info = await self.lakefs_client.get_commit(
-                    repository=self.lakefs_repo, commit_id=commit_id
+        # Serve the advertised commit even if the branch moved since
+        want_ids = [mappings[sha1].commit_id for sha1 in wants if sha1 in mappings]
+        commit_id = want_ids[0] if want_ids else None
+        if not commit_id:
+            try:
+                # Resolve branch to a commit so listing and commit metadata agree
+                branch_info = await self.lakefs_client.get_branch(
+                    repository=self.lakefs_repo, branch=branch
                 )
+                commit_id = branch_info.get("commit_id")
+            except Exception as e:
+                logger.exception(f"Failed to resolve {branch} of {self.repo_id}", e)
+
+        have_ids = [mappings[sha1].commit_id for sha1 in haves if sha1 in mappings]
+        shallow_ids = [
+            mappings[sha1].commit_id for sha1 in shallows if sha1 in mappings
+        ]
+        object_wants = [sha1 for sha1 in wants if sha1 not in mappings]
+        return commit_id, have_ids, shallow_ids, object_wants
+
+    async def get_shallow_info(
+        self,
+        wants: list[str],
+        haves: list[str],
+        depth: int | None = None,
+        shallows: list[str] | None = None,
+        branch: str = "main",
+    ) -> tuple[list[str], list[str]]:
+        """Shallow boundary of a fetch (protocol v2 shallow-info section).
 
-                author_name = commit_info.get("committer", "KohakuHub")
-                message = commit_info.get("message", DEFAULT_COMMIT_MESSAGE)
-                timestamp = commit_info.get("creation_date", 0)
-
-                if isinstance(timestamp, str):
-                    try:
-                        dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-                        timestamp = int(dt.timestamp())
-                    except (ValueError, AttributeError, TypeError):
-                        timestamp = 0
-
-            commit_sha1, commit_with_header = create_commit_object(
-                tree_sha1=root_tree_sha1,
-                parent_sha1s=[],
-                author_name=author_name,
-                author_email=DEFAULT_EMAIL,
-                committer_name=author_name,
-                committer_email=DEFAULT_EMAIL,
-                author_timestamp=timestamp,
-                committer_timestamp=timestamp,
-                timezone="+0000",
-                message=message,
-            )
+        Args:
+            wants: Commit SHAs client wants
+            haves: Common commit SHAs (see find_common_commits)
+            depth: Requested history depth (deepen), None for full history
+            shallows: Client's current shallow commit SHAs
+            branch: Branch name, used if no want is a known commit
 
-            # Build pack file (in memory) - ALL objects
-            pack_objects = []
+        Returns:
+            (commit SHAs that are shallow after the fetch, client shallow
+            commit SHAs whose parents are now sent)
+        """
+        repo = get_repository(self.repo_type, self.namespace, self.name)
+        commit_id, have_ids, shallow_ids, _ = await self._resolve_fetch(
+            repo, wants, haves, shallows or [], branch
+        )
+        if not repo or not commit_id or not await self.get_commit_mapping(commit_id):
+            return [], []
 
-            # Add commit (type 1)
-            pack_objects.append((1, commit_with_header))
+        _, _, boundary = self._plan_history(
+            repo, commit_id, have_ids, depth, shallow_ids
+        )
+        boundary_mappings = get_git_commit_mappings(repo, list(boundary))
+        shallow_sha1s = [m.commit_sha1 for m in boundary_mappings.values()]
+
+        # Client shallow commits inside the new history get their parents
+        if depth:
+            walked = self._load_ancestry(repo, [commit_id], depth=depth)
+            unshallow_ids = [
+                cid for cid in shallow_ids if cid in walked and cid not in boundary
+            ]
+        else:
+            unshallow_ids = []
+        unshallow_mappings = get_git_commit_mappings(repo, unshallow_ids)
+        unshallow_sha1s = [m.commit_sha1 for m in unshallow_mappings.values()]
+
+        return shallow_sha1s, unshallow_sha1s
+
+    async def stream_pack_file(
+        self,
+        wants: list[str],
+        haves: list[str],
+        branch: str = "main",
+        depth: int | None = None,
+        shallows: list[str] | None = None,
+        blob_limit: int | None = None,
+        send_trees: bool = True,
+    ) -> AsyncIterator[bytes]:
+        """Stream Git pack file for the wanted commit.
+
+        Objects reachable from common haves are left out. Unfiltered fresh
+        clones (no common haves, no shallow commits) are served from the pack
+        cache when possible, otherwise the pack is built while streaming and
+        cached on the way. Wants that are trees or blobs (lazy fetches of a
+        partial clone) get just those objects.
 
-            # Add trees (type 2)
-            pack_objects.extend(tree_objects)
+        Args:
+            wants: Commit SHAs client wants
+            haves: Common commit SHAs (see find_common_commits)
+            branch: Branch name, used if no want is a known commit
+            depth: Requested history depth (deepen), None for full history
+            shallows: Client's current shallow commit SHAs
+            blob_limit: Omit blobs of this size or larger (partial clone
+                filter), None to send all blobs
+            send_trees: False to omit trees and blobs (tree:0 filter)
+
+        Yields:
+            Pack file bytes
+        """
+        repo = get_repository(self.repo_type, self.namespace, self.name)
+        commit_id, have_ids, shallow_ids, object_wants = await self._resolve_fetch(
+            repo, wants, haves, shallows or [], branch
+        )
 
-            # Add blobs (type 3) - includes LFS pointers!
-            for path, (sha1, blob_with_header, mode) in blob_data.items():
-                pack_objects.append((3, blob_with_header))
+        if not commit_id:
+            logger.warning("No commit found, returning empty pack")
+            yield create_empty_pack()
+            return
+
+        if repo and object_wants and len(object_wants) == len(wants):
+            found = await self._find_objects(repo, commit_id, set(object_wants))
+            if found:
+                async for chunk in self._stream_object_pack(
+                    *found, get_object_store(repo)
+                ):
+                    yield chunk
+                return
+
+        filtered = blob_limit is not None or not send_trees
+        if have_ids or shallow_ids or filtered or not repo:
+            async for chunk in self._stream_commit_pack(
+                commit_id, have_ids, depth, shallow_ids, blob_limit, send_trees
+            ):
+                yield chunk
+            return
+
+        # Only fresh clones share one pack per (commit, depth)
+        cached = await open_cached_pack(repo.id, commit_id, depth)
+        if cached is not None:
+            logger.info(f"Serving cached pack for {self.repo_id}@{commit_id[:8]}")
+            async for chunk in cached:
+                yield chunk
+            return
+
+        async for chunk in tee_into_pack_cache(
+            repo.id,
+            commit_id,
+            self._stream_commit_pack(commit_id, depth=depth),
+            depth,
+        ):
+            yield chunk
+
+    async def _find_objects(
+        self, repo: Repository, commit_id: str, sha1s: set[str]
+    ) -> (
+        tuple[list[tuple[int, bytes]], list[tuple[str, str, str, bytes | None]]] | None
+    ):
+        """Locate trees and blobs by SHA-1 in the history of a commit.
+
+        Commits are searched newest first, so lazy fetches of a partial clone
+        of the tip are answered from its own tree.
 
-            logger.info(
-                f"Pack contains: {len(pack_objects)} objects (1 commit + {len(tree_objects)} trees + {len(blob_data)} blobs)"
+        Returns:
+            (tree objects, blobs as (sha1, commit_id, path, blob_with_header)),
+            or None if not all SHA-1s were found
+        """
+        if not await self.get_commit_mapping(commit_id):
+            return None
+
+        missing = set(sha1s)
+        trees = []
+        blobs = []
+        for cid, mapping in self._load_ancestry(repo, [commit_id]).items():
+            blob_data, _, tree_objects = await self.load_commit_tree(
+                repo, cid, mapping.tree_sha1
             )
+            for obj_type, data in tree_objects:
+                sha1 = hashlib.sha1(data).hexdigest()
+                if sha1 in missing:
+                    missing.discard(sha1)
+                    trees.append((obj_type, data))
+            for path, (sha1, blob_with_header, _) in blob_data.items():
+                if sha1 in missing:
+                    missing.discard(sha1)
+                    blobs.append((sha1, cid, path, blob_with_header))
+            if not missing:
+                return trees, blobs
+
+        logger.warning(f"{len(missing)} wanted object(s) not found in {self.repo_id}")
+        return None
+
+    async def _stream_object_pack(
+        self,
+        trees: list[tuple[int, bytes]],
+        blobs: list[tuple[str, str, str, bytes | None]],
+        store: GitObjectStore | None = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream pack of individual trees and blobs (see _find_objects)."""
+        logger.info(f"Streaming pack: {len(trees)} trees + {len(blobs)} blobs")
+
+        async def pack_objects():
+            for tree in trees:
+                yield tree
+            async for blob in self._iter_blob_objects(blobs, store):
+                yield blob
+
+        async for chunk in stream_pack_file(len(trees) + len(blobs), pack_objects()):
+            yield chunk
+
+    async def _blob_sizes(
+        self,
+        store: GitObjectStore | None,
+        commit_id: str,
+        blob_data: dict[str, tuple[str, bytes | None, str]],
+    ) -> dict[str, int]:
+        """Content sizes of the blobs of a commit that carry no data, by path.
+
+        Taken from the object store index, the commit listing is only read
+        for blobs not mirrored yet.
+        """
+        missing = {
+            path: sha1 for path, (sha1, data, _) in blob_data.items() if data is None
+        }
+        stored = store.lookup(list(missing.values())) if store else {}
+        sizes = {
+            path: stored[sha1].size for path, sha1 in missing.items() if sha1 in stored
+        }
+        if len(sizes) < len(missing):
+            for obj in await self._list_commit_objects(commit_id):
+                sizes.setdefault(obj["path"], obj.get("size_bytes", 0))
+        return sizes
 
-            # Create pack
-            pack_bytes = create_pack_file(pack_objects)
+    async def warm_pack_cache(self, commit_id: str) -> None:
+        """Build and cache the full pack of a commit unless already cached."""
+        repo = get_repository(self.repo_type, self.namespace, self.name)
+        if not repo or await is_pack_cached(repo.id, commit_id):
+            return
+
+        async for _ in tee_into_pack_cache(
+            repo.id, commit_id, self._stream_commit_pack(commit_id)
+        ):
+            pass
+
+    async def _stream_commit_pack(
+        self,
+        commit_id: str,
+        have_commit_ids: list[str] | None = None,
+        depth: int | None = None,
+        shallow_commit_ids: list[str] | None = None,
+        blob_limit: int | None = None,
+        send_trees: bool = True,
+    ) -> AsyncIterator[bytes]:
+        """Stream pack of a commit and its history - objects compressed as they come.
+
+        Sends every commit reachable from commit_id but not from the haves
+        (down to depth generations), with their trees and blobs. Each commit
+        only contributes the trees and blobs no commit before it had (see
+        _iter_new_objects), so only the SHA-1s of the objects sent and the
+        new objects of one commit are held at a time. The history is walked
+        twice, once for the object count of the pack header and once while
+        streaming; file contents are only downloaded while the pack is
+        streamed.
 
-            logger.success(f"Created pack: {len(pack_bytes)} bytes")
+        Args:
+            commit_id: LakeFS commit to send
+            have_commit_ids: LakeFS commits the client already has; objects
+                reachable from them are not sent
+            depth: Requested history depth (deepen), None for full history
+            shallow_commit_ids: Client's shallow commits
+            blob_limit: Omit blobs of this size or larger, None to send all
+            send_trees: False to send commits only
+
+        Raises:
+            Exception: LakeFS errors, so a failed build is never cached
+        """
+        repo = get_repository(self.repo_type, self.namespace, self.name)
+        if not repo or not await self.get_commit_mapping(commit_id):
+            raise RuntimeError(f"Failed to map commit {commit_id} of {self.repo_id}")
 
-            return pack_bytes
+        ancestry, edge_ids, _ = self._plan_history(
+            repo, commit_id, have_commit_ids or [], depth, shallow_commit_ids
+        )
+        store = get_object_store(repo)
+
+        # Objects the client has: everything reachable from the edge commits
+        have_sha1s = set()
+        if send_trees:
+            for cid, mapping in get_git_commit_mappings(repo, list(edge_ids)).items():
+                async for _ in self._iter_new_objects(
+                    repo, store, cid, mapping, have_sha1s
+                ):
+                    pass
+
+        async def commit_objects():
+            """Trees and blobs to send, one commit at a time.
+
+            Identical files/directories share one object, each is sent with
+            the first commit that has it. Yields (trees, blobs) per commit.
+            """
+            seen = set(have_sha1s)
+            for cid, mapping in ancestry.items():
+                trees = []
+                blobs = []  # (sha1, commit_id, path, blob_with_header)
+                async for obj_type, sha1, path, data in self._iter_new_objects(
+                    repo, store, cid, mapping, seen
+                ):
+                    if obj_type == 2:
+                        trees.append((2, data))
+                    elif blob_limit != 0:
+                        blobs.append((sha1, cid, path, data))
+
+                if blobs and blob_limit:
+                    sizes = await self._blob_sizes(
+                        store,
+                        cid,
+                        {path: (sha1, data, None) for sha1, _, path, data in blobs},
+                    )
+                    blobs = [
+                        blob
+                        for blob in blobs
+                        if _blob_size(blob[2], blob[3], sizes) < blob_limit
+                    ]
+                yield trees, blobs
+
+        # The pack header needs the object count: a first walk only counts,
+        # the second streams objects as they are resolved
+        tree_count = 0
+        blob_count = 0
+        if send_trees:
+            async for trees, blobs in commit_objects():
+                tree_count += len(trees)
+                blob_count += len(blobs)
+        count = len(ancestry) + tree_count + blob_count
+        logger.info(
+            f"Streaming pack: {count} objects ({len(ancestry)} commits + {tree_count} trees + {blob_count} blobs)"
+        )
 
+        async def pack_objects():
+            # Commits (type 1) first, then trees (type 2) and blobs (type 3)
+            # of one commit after the other
+            for mapping in ancestry.values():
+                yield 1, bytes(mapping.commit_object)
+            if not send_trees:
+                return
+            async for trees, blobs in commit_objects():
+                for tree in trees:
+                    yield tree
+                async for blob in self._iter_blob_objects(blobs, store):
+                    yield blob
+
+        async for chunk in stream_pack_file(count, pack_objects()):
+            yield chunk
+
+
+def schedule_pack_warm(repository: Repository, branch: str, commit_id: str) -> None:
+    """Prebuild the clone pack of a fresh main branch commit in the background.
+
+    Git clients only see main, so other branches are not warmed.
+    """
+    if branch != "main" or get_pack_store() is None:
+        return
+
+    key = (repository.id, commit_id)
+    if key in _warming:
+        return
+    _warming.add(key)
+
+    bridge = GitLakeFSBridge(
+        repository.repo_type, repository.namespace, repository.name
+    )
+
+    async def _warm():
+        try:
+            await bridge.warm_pack_cache(commit_id)
         except Exception as e:
-            logger.exception("Failed to build pack file", e)
-            return create_empty_pack()
+            logger.warning(
+                f"Failed to warm pack for {bridge.repo_id}@{commit_id[:8]}: {e}"
+            )
+        finally:
+            _warming.discard(key)
+
+    task = asyncio.create_task(_warm())
+    _background_warms.add(task)
+    task.add_done_callback(_background_warms.discard)
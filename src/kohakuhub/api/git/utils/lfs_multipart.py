@@ -0,0 +1,264 @@
+"""Resumable multipart LFS upload sessions.
+
+Every multipart LFS upload is recorded in the LFSMultipartUpload table,
+keyed by (oid, size, user). Like single PUT uploads, it writes to a staging
+key of its own, which is only published as lfs/<oid> once its content was
+verified (see lfs_verify). A retried batch request of the same user resumes
+the recorded S3 upload: the parts already in S3 are listed and kept, so a
+client crashing halfway through a large upload neither restarts from zero
+nor leaves the old upload's parts orphaned in the bucket. Clients that can
+skip parts (resume_multipart in the batch request) only get URLs for the
+missing ones. Sessions are never shared between users: the upload ID and
+part URLs of an upload are only handed to the user who started it.
+
+Concurrent clients of one user share a session, so only the first
+completion finds the S3 upload; the others see NoSuchUpload and are
+answered from the object it created (see upload_completed_elsewhere).
+
+Sessions idle for cfg.app.lfs_multipart_session_ttl_seconds are aborted
+(and staged objects never confirmed deleted) by the sweeper, which runs in
+the background at most every SWEEP_INTERVAL seconds per worker, triggered
+by LFS batch requests.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from kohakuhub.config import cfg
+from kohakuhub.db import LFSMultipartUpload, User
+from kohakuhub.db_operations import (
+    create_lfs_multipart_upload,
+    delete_lfs_multipart_upload,
+    get_lfs_multipart_upload,
+    get_lfs_multipart_upload_by_id,
+    list_expired_lfs_multipart_uploads,
+    update_lfs_multipart_upload,
+)
+from kohakuhub.logger import get_logger
+from kohakuhub.api.git.utils.lfs_verify import (
+    is_lfs_object_verified,
+    lfs_object_key,
+    new_staging_token,
+    staging_key,
+    sweep_staged_uploads,
+)
+from kohakuhub.utils.s3 import (
+    abort_multipart_upload,
+    create_multipart_upload,
+    get_multipart_chunk_size,
+    get_object_metadata,
+    list_multipart_parts,
+)
+
+logger = get_logger("LFS_MULTIPART")
+
+MAX_PARTS = 10000  # S3 hard limit of parts per upload
+SWEEP_INTERVAL = 600  # Seconds between sweeps of a worker
+
+_last_sweep = None  # time.monotonic() of the last sweep
+_background_sweeps: set[asyncio.Task] = set()
+
+
+def plan_parts(size: int) -> tuple[int, int]:
+    """Choose the chunk size and part count of a multipart upload.
+
+    Returns:
+        (chunk_size, part_count)
+    """
+    chunk_size = get_multipart_chunk_size()
+    part_count = (size + chunk_size - 1) // chunk_size
+
+    if part_count > MAX_PARTS:
+        # Increase chunk size to stay within limit
+        adjusted_chunk_size = (size + MAX_PARTS - 1) // MAX_PARTS
+        # Round up to nearest MB for cleaner chunks
+        adjusted_chunk_size = ((adjusted_chunk_size + 1048575) // 1048576) * 1048576
+        logger.warning(
+            f"File size {size:,} bytes would require {part_count} parts with {chunk_size:,} byte chunks. "
+            f"Increased chunk size to {adjusted_chunk_size:,} bytes to stay under {MAX_PARTS} part limit."
+        )
+        chunk_size = adjusted_chunk_size
+        part_count = (size + chunk_size - 1) // chunk_size
+
+    return chunk_size, part_count
+
+
+def _is_expired(session: LFSMultipartUpload) -> bool:
+    expires_at = session.expires_at
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at <= datetime.now(timezone.utc)
+
+
+def _session_expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(
+        seconds=cfg.app.lfs_multipart_session_ttl_seconds
+    )
+
+
+async def _abort_session(session: LFSMultipartUpload) -> None:
+    """Abort the S3 upload of a session (if this worker removed the record)."""
+    if not delete_lfs_multipart_upload(session):
+        return  # Already taken care of by another request
+    try:
+        await abort_multipart_upload(cfg.s3.bucket, session.s3_key, session.upload_id)
+    except Exception as e:
+        # Gone already (completed or aborted by S3 lifecycle rules)
+        logger.debug(f"Failed to abort multipart upload {session.upload_id}: {e}")
+
+
+async def open_upload_session(
+    oid: str, size: int, user: User
+) -> tuple[LFSMultipartUpload, dict[int, str]]:
+    """Resume a user's multipart upload of an object, or start a new one.
+
+    Sessions belong to the user who started them; other users uploading the
+    same object get a session (and staging key) of their own.
+
+    Args:
+        oid: LFS object SHA256
+        size: Object size
+        user: Uploading user
+
+    Returns:
+        (session, {part_number: etag} of the parts already uploaded)
+    """
+    session = get_lfs_multipart_upload(oid, size, user)
+    if session and _is_expired(session):
+        await _abort_session(session)
+        session = None
+
+    uploaded = {}
+    if session:
+        try:
+            parts = await list_multipart_parts(
+                cfg.s3.bucket, session.s3_key, session.upload_id
+            )
+            uploaded = {part["PartNumber"]: part["ETag"] for part in parts}
+            logger.info(
+                f"Resuming multipart upload of {oid[:8]}: "
+                f"{len(uploaded)}/{session.part_count} parts already uploaded"
+            )
+        except Exception as e:
+            # Completed, aborted or expired in S3 meanwhile
+            logger.info(f"Multipart upload {session.upload_id} is gone ({e})")
+            delete_lfs_multipart_upload(session)
+            session = None
+
+    if session is None:
+        chunk_size, part_count = plan_parts(size)
+        key = staging_key(oid, new_staging_token())
+        upload_id = await create_multipart_upload(cfg.s3.bucket, key)
+        session = create_lfs_multipart_upload(
+            oid, size, user, upload_id, key, chunk_size, part_count, _session_expiry()
+        )
+        if session.upload_id != upload_id:
+            # A concurrent request recorded its upload first, use that one
+            try:
+                await abort_multipart_upload(cfg.s3.bucket, key, upload_id)
+            except Exception as e:
+                logger.debug(f"Failed to abort duplicate upload {upload_id}: {e}")
+            return await open_upload_session(oid, size, user)
+
+    update_lfs_multipart_upload(
+        session,
+        [[number, etag] for number, etag in sorted(uploaded.items())],
+        _session_expiry(),
+    )
+    return session, uploaded
+
+
+async def complete_parts(session: LFSMultipartUpload, parts: list[dict]) -> list[dict]:
+    """Parts to complete an upload with, including those sent before a resume.
+
+    Clients resuming an upload only report the parts they sent themselves;
+    the other parts are taken from S3.
+
+    Args:
+        session: Upload session
+        parts: Parts reported by the client ({"PartNumber", "ETag"})
+
+    Returns:
+        Parts sorted by part number
+    """
+    by_number = {part["PartNumber"]: part for part in parts}
+    if len(by_number) < session.part_count:
+        for part in await list_multipart_parts(
+            cfg.s3.bucket, session.s3_key, session.upload_id
+        ):
+            by_number.setdefault(
+                part["PartNumber"],
+                {"PartNumber": part["PartNumber"], "ETag": part["ETag"]},
+            )
+    return [by_number[number] for number in sorted(by_number)]
+
+
+async def upload_completed_elsewhere(
+    error: Exception, session: LFSMultipartUpload
+) -> bool:
+    """Whether a failed completion is one another request already did.
+
+    Args:
+        error: Error of complete_multipart_upload
+        session: Upload session
+
+    Returns:
+        True if the upload is gone (NoSuchUpload) and either its staged
+        object (being verified) or the verified object exists
+    """
+    code = getattr(error, "response", {}).get("Error", {}).get("Code")
+    if code != "NoSuchUpload":
+        return False
+    keys = [session.s3_key]
+    if is_lfs_object_verified(session.sha256, session.size):
+        keys.append(lfs_object_key(session.sha256))
+    for key in keys:
+        try:
+            metadata = await get_object_metadata(cfg.s3.bucket, key)
+        except Exception:
+            continue
+        if metadata["size"] == session.size:
+            return True
+    return False
+
+
+def close_upload_session(upload_id: str) -> None:
+    """Forget the session of a completed upload."""
+    session = get_lfs_multipart_upload_by_id(upload_id)
+    if session:
+        delete_lfs_multipart_upload(session)
+
+
+async def sweep_expired_sessions() -> int:
+    """Abort multipart uploads abandoned past their TTL.
+
+    Returns:
+        Number of sessions aborted
+    """
+    expired = list_expired_lfs_multipart_uploads(datetime.now(timezone.utc))
+    for session in expired:
+        await _abort_session(session)
+    if expired:
+        logger.info(f"Aborted {len(expired)} abandoned multipart LFS upload(s)")
+    return len(expired)
+
+
+def schedule_session_sweep() -> None:
+    """Sweep expired sessions in the background, at most every SWEEP_INTERVAL."""
+    global _last_sweep
+    now = time.monotonic()
+    if _last_sweep is not None and now - _last_sweep < SWEEP_INTERVAL:
+        return
+    _last_sweep = now
+
+    async def _sweep():
+        try:
+            await sweep_expired_sessions()
+            await sweep_staged_uploads()
+        except Exception as e:
+            logger.exception("Failed to sweep multipart LFS uploads", e)
+
+    task = asyncio.create_task(_sweep())
+    _background_sweeps.add(task)
+    task.add_done_callback(_background_sweeps.discard)
@@ -0,0 +1,243 @@
+"""Server-side content verification of uploaded LFS objects.
+
+LFS objects are stored once per SHA256 under lfs/ and shared by every
+repository, so clients never write there. Each upload gets a staging key of
+its own (lfs-staging/<oid>/<token>); when the upload is confirmed (LFS
+verify or multipart completion), the staged object is hashed and copied to
+lfs/<oid> only if it matches its OID and size. Mismatching uploads are
+moved to the quarantine prefix; a failed upload never touches lfs/<oid>,
+so content that was already served stays in place.
+
+Verification runs within the confirming request, bounded per worker by
+cfg.app.lfs_verify_concurrency, so lfs/<oid> exists once the client goes on
+to commit. S3 only stores a SHA256 checksum sent with an upload after
+checking it against the body, so a staged object whose stored checksum is
+the OID is trusted without reading it again. Objects the server verified
+are recorded in LFSObjectVerification, and only those are used for upload
+deduplication.
+
+Staged objects never confirmed are deleted by the multipart session
+sweeper once older than cfg.app.lfs_multipart_session_ttl_seconds.
+"""
+
+import asyncio
+import base64
+import hashlib
+import re
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from kohakuhub.async_utils import run_in_s3_executor
+from kohakuhub.config import cfg
+from kohakuhub.db_operations import get_lfs_verification, set_lfs_verification_result
+from kohakuhub.logger import get_logger
+from kohakuhub.utils.s3 import get_s3_client
+
+logger = get_logger("LFS_VERIFY")
+
+STAGING_PREFIX = "lfs-staging/"
+QUARANTINE_PREFIX = "lfs-quarantine/"
+HASH_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MiB
+OID_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+STAGING_TOKEN_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+_verifying: dict[str, asyncio.Task] = {}  # Staging key -> verification in flight
+_limiter = None
+
+
+def lfs_object_key(oid: str) -> str:
+    """S3 key of an LFS object."""
+    return f"lfs/{oid[:2]}/{oid[2:4]}/{oid}"
+
+
+def is_lfs_oid(oid: str) -> bool:
+    """Whether oid is a lowercase hex SHA256."""
+    return bool(OID_PATTERN.match(oid))
+
+
+def new_staging_token() -> str:
+    """Random token naming the staged object of one upload."""
+    return secrets.token_hex(16)
+
+
+def is_staging_token(token: str) -> bool:
+    return bool(STAGING_TOKEN_PATTERN.match(token))
+
+
+def staging_key(oid: str, token: str) -> str:
+    """S3 key an upload of an LFS object is written to before verification."""
+    return f"{STAGING_PREFIX}{oid}/{token}"
+
+
+def is_lfs_object_verified(oid: str, size: int) -> bool:
+    """Whether the stored object was hashed by the server and matches oid/size.
+
+    Always True when verification is disabled (uploads are trusted).
+    """
+    if not cfg.app.lfs_verify_enabled:
+        return True
+    verification = get_lfs_verification(oid)
+    return (
+        verification is not None
+        and verification.status == "verified"
+        and verification.size == size
+    )
+
+
+def _get_limiter() -> asyncio.Semaphore:
+    global _limiter
+    if _limiter is None:
+        _limiter = asyncio.Semaphore(max(cfg.app.lfs_verify_concurrency, 1))
+    return _limiter
+
+
+def _head_object_sync(bucket: str, key: str) -> tuple[int, str | None] | None:
+    """Size and stored SHA256 checksum (base64, if any) of an S3 object.
+
+    Returns:
+        (size, checksum), or None if the object does not exist
+    """
+    s3 = get_s3_client()
+    try:
+        response = s3.head_object(Bucket=bucket, Key=key, ChecksumMode="ENABLED")
+    except Exception as e:
+        if getattr(e, "response", {}).get("Error", {}).get("Code") in (
+            "404",
+            "NoSuchKey",
+            "NotFound",
+        ):
+            return None
+        raise
+    return response["ContentLength"], response.get("ChecksumSHA256")
+
+
+def _hash_object_sync(bucket: str, key: str) -> tuple[str, int] | None:
+    """Stream an S3 object through SHA256.
+
+    Returns:
+        (sha256 hex, size), or None if the object does not exist
+    """
+    s3 = get_s3_client()
+    try:
+        body = s3.get_object(Bucket=bucket, Key=key)["Body"]
+    except s3.exceptions.NoSuchKey:
+        return None
+
+    sha256 = hashlib.sha256()
+    size = 0
+    with body:
+        while chunk := body.read(HASH_CHUNK_SIZE):
+            sha256.update(chunk)
+            size += len(chunk)
+    return sha256.hexdigest(), size
+
+
+def _move_object_sync(bucket: str, key: str, target_key: str) -> None:
+    s3 = get_s3_client()
+    s3.copy({"Bucket": bucket, "Key": key}, bucket, target_key)
+    s3.delete_object(Bucket=bucket, Key=key)
+
+
+def _delete_object_sync(bucket: str, key: str) -> None:
+    get_s3_client().delete_object(Bucket=bucket, Key=key)
+
+
+async def _check_staged_object(oid: str, size: int | None, key: str) -> str | None:
+    """Hash a staged upload and move it to lfs/<oid> or the quarantine."""
+    async with _get_limiter():
+        head = await run_in_s3_executor(_head_object_sync, cfg.s3.bucket, key)
+        if head is None:
+            return None
+        stored_size, checksum = head
+
+        if not cfg.app.lfs_verify_enabled:
+            actual_sha256, actual_size = oid, stored_size  # Uploads are trusted
+        elif checksum == base64.b64encode(bytes.fromhex(oid)).decode():
+            # S3 checked the body against the checksum sent with it
+            actual_sha256, actual_size = oid, stored_size
+        else:
+            result = await run_in_s3_executor(_hash_object_sync, cfg.s3.bucket, key)
+            if result is None:
+                return None
+            actual_sha256, actual_size = result
+
+    expected_size = actual_size if size is None else size
+    if actual_sha256 == oid and actual_size == expected_size:
+        await run_in_s3_executor(
+            _move_object_sync, cfg.s3.bucket, key, lfs_object_key(oid)
+        )
+        set_lfs_verification_result(oid, actual_size, "verified")
+        logger.info(f"Verified LFS object {oid[:8]} ({actual_size:,} bytes)")
+        return "verified"
+
+    quarantine_key = f"{QUARANTINE_PREFIX}{key[len(STAGING_PREFIX):]}"
+    await run_in_s3_executor(_move_object_sync, cfg.s3.bucket, key, quarantine_key)
+    set_lfs_verification_result(oid, expected_size, "quarantined", actual_sha256)
+    logger.error(
+        f"LFS upload of {oid} does not match its content "
+        f"(sha256={actual_sha256}, size={actual_size:,}, expected {expected_size:,}); "
+        f"moved to {quarantine_key}"
+    )
+    return "quarantined"
+
+
+async def verify_staged_upload(oid: str, size: int | None, key: str) -> str | None:
+    """Verify a staged upload and publish it as lfs/<oid> if it matches.
+
+    Concurrent calls for the same staged object share one verification.
+
+    Args:
+        oid: Claimed SHA256
+        size: Claimed size (None to accept the uploaded size)
+        key: Staging key of the upload
+
+    Returns:
+        "verified", "quarantined", or None if there is no staged object
+    """
+    task = _verifying.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_check_staged_object(oid, size, key))
+        _verifying[key] = task
+        task.add_done_callback(lambda _: _verifying.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def discard_staged_upload(key: str) -> None:
+    """Delete a staged upload that is no longer needed (best effort)."""
+    try:
+        await run_in_s3_executor(_delete_object_sync, cfg.s3.bucket, key)
+    except Exception as e:
+        logger.debug(f"Failed to delete staged upload {key}: {e}")
+
+
+def _delete_stale_staged_objects_sync(bucket: str, before: datetime) -> int:
+    s3 = get_s3_client()
+    deleted = 0
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=STAGING_PREFIX):
+        stale = [
+            {"Key": obj["Key"]}
+            for obj in page.get("Contents", [])
+            if obj["LastModified"] < before
+        ]
+        if stale:
+            s3.delete_objects(Bucket=bucket, Delete={"Objects": stale, "Quiet": True})
+            deleted += len(stale)
+    return deleted
+
+
+async def sweep_staged_uploads() -> int:
+    """Delete staged uploads never confirmed within the session TTL.
+
+    Returns:
+        Number of staged objects deleted
+    """
+    before = datetime.now(timezone.utc) - timedelta(
+        seconds=cfg.app.lfs_multipart_session_ttl_seconds
+    )
+    deleted = await run_in_s3_executor(
+        _delete_stale_staged_objects_sync, cfg.s3.bucket, before
+    )
+    if deleted:
+        logger.info(f"Deleted {deleted} abandoned staged LFS upload(s)")
+    return deleted
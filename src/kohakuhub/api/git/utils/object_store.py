@@ -0,0 +1,403 @@
+"""Content-addressed git object store, mirrored into S3 per repository.
+
+Git objects the bridge synthesizes or downloads from LakeFS are written once
+under s3://{bucket}/git-objects/{repository_id}/ and indexed by SHA-1 in the
+GitObject table, so later ref advertisements, fetches and pushes read trees
+and blobs from here and only touch LakeFS for content not yet mirrored:
+
+- loose objects: objects/{sha1[:2]}/{sha1[2:]}, zlib-compressed with the git
+  object header (the layout of .git/objects)
+- packs: packs/{name}.pack, git pack files without deltas; the offset and
+  length of every entry are indexed, so objects are read with ranged GETs
+
+Small batches are written loose, batches of cfg.app.git_object_store_pack_threshold
+objects or more go straight to a pack. Once a repository has
+cfg.app.git_object_store_repack_threshold loose objects they are repacked in
+the background. Set cfg.app.git_object_store_enabled to False to disable the
+store.
+"""
+
+import asyncio
+import hashlib
+import tempfile
+import zlib
+from typing import AsyncIterator
+
+from kohakuhub.async_utils import run_in_s3_executor
+from kohakuhub.config import cfg
+from kohakuhub.db import GitObject, Repository
+from kohakuhub.db_operations import (
+    count_loose_git_objects,
+    get_git_objects,
+    list_loose_git_objects,
+    mark_git_objects_packed,
+    save_git_objects,
+)
+from kohakuhub.logger import get_logger
+from kohakuhub.utils.s3 import delete_objects_with_prefix, get_s3_client
+from kohakuhub.api.git.utils.objects import (
+    encode_pack_header,
+    encode_pack_object,
+    parse_tree_object,
+)
+
+logger = get_logger("GIT_OBJECT_STORE")
+
+S3_OBJECT_PREFIX = "git-objects/"
+OBJECT_TYPE_NAMES = {1: "commit", 2: "tree", 3: "blob"}
+
+# Pack entries this close together are read with one ranged GET
+READ_GAP_BYTES = 1024 * 1024  # 1 MiB
+# Loose objects downloaded at a time while repacking
+REPACK_FETCH_WINDOW = 32
+
+_repacking: set[int] = set()
+_background_repacks: set[asyncio.Task] = set()
+
+
+def _content_size(data: bytes) -> int:
+    """Content size of an object with "type size\\0" header."""
+    return len(data) - data.index(b"\0") - 1
+
+
+class GitObjectStore:
+    """Git objects of one repository in the hub S3 bucket."""
+
+    def __init__(
+        self, repository: Repository, bucket: str, prefix: str = S3_OBJECT_PREFIX
+    ):
+        self.repository = repository
+        self.bucket = bucket
+        self.root = f"{prefix}{repository.id}/"
+
+    def _loose_key(self, sha1: str) -> str:
+        return f"{self.root}objects/{sha1[:2]}/{sha1[2:]}"
+
+    def _pack_key(self, pack: str) -> str:
+        return f"{self.root}packs/{pack}.pack"
+
+    def lookup(self, sha1s: list[str]) -> dict[str, GitObject]:
+        """Index entries of stored objects (objects not stored are omitted)."""
+        return get_git_objects(self.repository, sha1s)
+
+    async def read(self, obj: GitObject) -> bytes | None:
+        """Read one indexed object (with header), None if unreadable."""
+        return (await self.get_many([obj.sha1], {obj.sha1: obj})).get(obj.sha1)
+
+    async def get_many(
+        self, sha1s: list[str], index: dict[str, GitObject] | None = None
+    ) -> dict[str, bytes]:
+        """Read objects (with header) from the store.
+
+        Args:
+            sha1s: Object SHA-1s
+            index: Index entries of sha1s if already looked up
+
+        Returns:
+            Dict of sha1 -> object data; objects not stored or unreadable
+            are omitted
+        """
+        if index is None:
+            index = self.lookup(sha1s)
+        wanted = [index[sha1] for sha1 in dict.fromkeys(sha1s) if sha1 in index]
+
+        reads = []
+        packed = {}
+        for obj in wanted:
+            if obj.pack is None:
+                reads.append(self._read_loose(obj))
+            else:
+                packed.setdefault(obj.pack, []).append(obj)
+        for pack, objs in packed.items():
+            reads.extend(self._read_pack_range(pack, group) for group in _group(objs))
+
+        results = {}
+        for result in await asyncio.gather(*reads, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to read objects of {self.root}: {result}")
+                continue
+            for sha1, data in result:
+                if hashlib.sha1(data).hexdigest() != sha1:
+                    logger.warning(f"Corrupt object {sha1} in {self.root}, ignored")
+                    continue
+                results[sha1] = data
+        return results
+
+    async def _read_loose(self, obj: GitObject) -> list[tuple[str, bytes]]:
+        def get():
+            s3 = get_s3_client()
+            response = s3.get_object(Bucket=self.bucket, Key=self._loose_key(obj.sha1))
+            return response["Body"].read()
+
+        return [(obj.sha1, zlib.decompress(await run_in_s3_executor(get)))]
+
+    async def _read_pack_range(
+        self, pack: str, objs: list[GitObject]
+    ) -> list[tuple[str, bytes]]:
+        start = objs[0].offset
+        end = max(obj.offset + obj.length for obj in objs)
+
+        def get():
+            s3 = get_s3_client()
+            response = s3.get_object(
+                Bucket=self.bucket,
+                Key=self._pack_key(pack),
+                Range=f"bytes={start}-{end - 1}",
+            )
+            return response["Body"].read()
+
+        buf = await run_in_s3_executor(get)
+        results = []
+        for obj in objs:
+            entry = buf[obj.offset - start : obj.offset - start + obj.length]
+            # Skip the type/size header (continuation bit set on all but last)
+            pos = 0
+            while entry[pos] & 0x80:
+                pos += 1
+            content = zlib.decompress(entry[pos + 1 :])
+            header = f"{OBJECT_TYPE_NAMES[obj.obj_type]} {len(content)}\0".encode()
+            results.append((obj.sha1, header + content))
+        return results
+
+    async def walk_tree(
+        self, tree_sha1: str
+    ) -> tuple[dict[str, tuple[str, str]], list[tuple[int, bytes]]] | None:
+        """Read a tree and all its subtrees from the store.
+
+        Returns:
+            (path -> (blob_sha1, mode), tree objects as (2, data)), or None if
+            any tree is not stored
+        """
+        files = {}
+        tree_objects = []
+        seen = set()
+        level = {tree_sha1: [""]}  # Tree SHA-1 -> path prefixes it appears at
+
+        while level:
+            trees = await self.get_many(list(level))
+            if len(trees) < len(level):
+                return None
+
+            next_level = {}
+            for sha1, prefixes in level.items():
+                data = trees[sha1]
+                if sha1 not in seen:
+                    seen.add(sha1)
+                    tree_objects.append((2, data))
+
+                for mode, name, child in parse_tree_object(
+                    data[data.index(b"\0") + 1 :]
+                ):
+                    for prefix in prefixes:
+                        if mode in ("40000", "040000"):
+                            next_level.setdefault(child, []).append(f"{prefix}{name}/")
+                        else:
+                            files[f"{prefix}{name}"] = (child, mode)
+            level = next_level
+
+        return files, tree_objects
+
+    async def write_loose(self, obj_type: int, data: bytes) -> tuple:
+        """Write one loose object, to be indexed with index_objects.
+
+        Args:
+            obj_type: Git object type (1=commit, 2=tree, 3=blob)
+            data: Object data with header
+
+        Returns:
+            Index row (see save_git_objects)
+        """
+        sha1 = hashlib.sha1(data).hexdigest()
+        compressed = zlib.compress(data)
+
+        def put():
+            get_s3_client().put_object(
+                Bucket=self.bucket, Key=self._loose_key(sha1), Body=compressed
+            )
+
+        await run_in_s3_executor(put)
+        return sha1, obj_type, _content_size(data), None, None, None
+
+    def index_objects(self, rows: list[tuple]) -> None:
+        """Index written objects; schedules a repack once enough are loose."""
+        save_git_objects(self.repository, rows)
+        if any(row[3] is None for row in rows) and (
+            count_loose_git_objects(self.repository)
+            >= cfg.app.git_object_store_repack_threshold
+        ):
+            schedule_repack(self)
+
+    async def put_many(self, objects: list[tuple[int, bytes]]) -> int:
+        """Store objects that are not stored yet.
+
+        Args:
+            objects: List of (type, object_data_with_header)
+
+        Returns:
+            Number of objects written
+        """
+        by_sha1 = {hashlib.sha1(data).hexdigest(): (t, data) for t, data in objects}
+        known = self.lookup(list(by_sha1))
+        new = [(sha1, *obj) for sha1, obj in by_sha1.items() if sha1 not in known]
+        if not new:
+            return 0
+
+        if len(new) >= cfg.app.git_object_store_pack_threshold:
+
+            async def items():
+                for item in new:
+                    yield item
+
+            pack, entries = await self._write_pack(items())
+            sizes = {sha1: (t, _content_size(data)) for sha1, t, data in new}
+            rows = [
+                (sha1, *sizes[sha1], pack, offset, length)
+                for sha1, offset, length in entries
+            ]
+        else:
+            rows = await asyncio.gather(
+                *[self.write_loose(t, data) for _, t, data in new]
+            )
+
+        self.index_objects(list(rows))
+        return len(rows)
+
+    async def _write_pack(
+        self, objects: AsyncIterator[tuple[str, int, bytes]]
+    ) -> tuple[str | None, list[tuple[str, int, int]]]:
+        """Write objects as one pack, spooled through a temp file.
+
+        Args:
+            objects: Async iterator of (sha1, type, object_data_with_header)
+
+        Returns:
+            (pack name or None if no objects came, entries as (sha1, offset,
+            length))
+        """
+        entries = []
+        with tempfile.TemporaryFile() as spool:
+            # Object count is patched in once known
+            spool.write(encode_pack_header(0))
+            offset = spool.tell()
+            async for sha1, obj_type, data in objects:
+                entry = encode_pack_object(obj_type, data)
+                await asyncio.to_thread(spool.write, entry)
+                entries.append((sha1, offset, len(entry)))
+                offset += len(entry)
+            if not entries:
+                return None, []
+
+            def finish() -> str:
+                spool.seek(0)
+                spool.write(encode_pack_header(len(entries)))
+                spool.seek(0)
+                checksum = hashlib.sha1()
+                while chunk := spool.read(1024 * 1024):
+                    checksum.update(chunk)
+                digest = checksum.digest()
+                spool.write(digest)
+                spool.seek(0)
+                return digest.hex()
+
+            pack = await asyncio.to_thread(finish)
+
+            def upload():
+                get_s3_client().upload_fileobj(spool, self.bucket, self._pack_key(pack))
+
+            await run_in_s3_executor(upload)
+
+        return pack, entries
+
+    async def repack(self) -> int:
+        """Move all loose objects into one new pack.
+
+        Returns:
+            Number of objects packed
+        """
+        loose = list_loose_git_objects(self.repository)
+        if not loose:
+            return 0
+
+        async def items():
+            for i in range(0, len(loose), REPACK_FETCH_WINDOW):
+                batch = loose[i : i + REPACK_FETCH_WINDOW]
+                results = await asyncio.gather(
+                    *[self._read_loose(obj) for obj in batch], return_exceptions=True
+                )
+                for obj, result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        # Left loose (and unreadable); readers fall back to LakeFS
+                        logger.warning(f"Skipped loose object {obj.sha1}: {result}")
+                        continue
+                    yield obj.sha1, obj.obj_type, result[0][1]
+
+        pack, entries = await self._write_pack(items())
+        if not entries:
+            return 0
+        mark_git_objects_packed(self.repository, pack, entries)
+
+        # Loose copies go only after the index points at the pack
+        keys = [{"Key": self._loose_key(sha1)} for sha1, _, _ in entries]
+
+        def delete():
+            s3 = get_s3_client()
+            # delete_objects accepts at most 1000 keys per call
+            for i in range(0, len(keys), 1000):
+                s3.delete_objects(
+                    Bucket=self.bucket, Delete={"Objects": keys[i : i + 1000]}
+                )
+
+        await run_in_s3_executor(delete)
+        return len(entries)
+
+
+def _group(objs: list[GitObject]) -> list[list[GitObject]]:
+    """Group pack entries into ranges that are read together."""
+    groups = []
+    end = None
+    for obj in sorted(objs, key=lambda o: o.offset):
+        if end is not None and obj.offset - end <= READ_GAP_BYTES:
+            groups[-1].append(obj)
+        else:
+            groups.append([obj])
+        end = max(end or 0, obj.offset + obj.length)
+    return groups
+
+
+def get_object_store(repository: Repository | None) -> GitObjectStore | None:
+    """Get object store of a repository, or None if the store is disabled."""
+    if repository is None or not cfg.app.git_object_store_enabled:
+        return None
+    return GitObjectStore(repository, cfg.s3.bucket)
+
+
+def schedule_repack(store: GitObjectStore) -> None:
+    """Repack loose objects of a repository in the background (once per worker)."""
+    repository_id = store.repository.id
+    if repository_id in _repacking:
+        return
+    _repacking.add(repository_id)
+
+    async def _repack():
+        try:
+            packed = await store.repack()
+            logger.info(f"Repacked {packed} loose object(s) of {store.root}")
+        except Exception as e:
+            logger.warning(f"Failed to repack {store.root}: {e}")
+        finally:
+            _repacking.discard(repository_id)
+
+    task = asyncio.create_task(_repack())
+    _background_repacks.add(task)
+    task.add_done_callback(_background_repacks.discard)
+
+
+async def delete_object_store(repository: Repository) -> int:
+    """Delete all stored objects of a repository from S3 (index rows cascade).
+
+    Returns:
+        Number of S3 objects deleted
+    """
+    return await delete_objects_with_prefix(
+        cfg.s3.bucket, f"{S3_OBJECT_PREFIX}{repository.id}/"
+    )
@@ -6,6 +6,7 @@ All operations are in-memory and deterministic.
 import hashlib
 import struct
 import zlib
+from typing import AsyncIterator
 
 
 def compute_git_object_sha1(obj_type: str, content: bytes) -> str:
@@ -60,10 +61,10 @@ def create_tree_object(entries: list[tuple[str, str, str]]) -> tuple[str, bytes]
     sorted_entries = sorted(entries, key=sort_key)
 
     # Build tree content
-    tree_content = b""
-    for mode, name, sha1_hex in sorted_entries:
-        sha1_bytes = bytes.fromhex(sha1_hex)
-        tree_content += f"{mode} {name}\0".encode() + sha1_bytes
+    tree_content = b"".join(
+        f"{mode} {name}\0".encode() + bytes.fromhex(sha1_hex)
+        for mode, name, sha1_hex in sorted_entries
+    )
 
     # Add header
     header = f"tree {len(tree_content)}\0".encode()
@@ -133,6 +134,125 @@ def create_commit_object(
     return sha1, obj_data
 
 
+def parse_tree_object(content: bytes) -> list[tuple[str, str, str]]:
+    """Parse Git tree object content.
+
+    Args:
+        content: Tree content (without header)
+
+    Returns:
+        List of (mode, name, sha1_hex) in stored order
+
+    Raises:
+        ValueError: If the tree is malformed
+    """
+    entries = []
+    pos = 0
+    while pos < len(content):
+        space = content.index(b" ", pos)
+        null = content.index(b"\0", space)
+        if null + 21 > len(content):
+            raise ValueError("Truncated tree entry")
+
+        mode = content[pos:space].decode("ascii")
+        name = content[space + 1 : null].decode("utf-8")
+        entries.append((mode, name, content[null + 1 : null + 21].hex()))
+        pos = null + 21
+
+    return entries
+
+
+def parse_commit_object(content: bytes) -> dict:
+    """Parse Git commit object content.
+
+    Args:
+        content: Commit content (without header)
+
+    Returns:
+        Dict with tree, parents, author, committer and message
+    """
+    header, _, message = content.partition(b"\n\n")
+    commit = {"tree": None, "parents": [], "author": "", "committer": ""}
+
+    for line in header.split(b"\n"):
+        key, _, value = line.partition(b" ")
+        match key:
+            case b"tree":
+                commit["tree"] = value.decode("ascii")
+            case b"parent":
+                commit["parents"].append(value.decode("ascii"))
+            case b"author" | b"committer":
+                commit[key.decode()] = value.decode("utf-8", errors="replace")
+            # Other headers (gpgsig, encoding, continuation lines) are ignored
+
+    commit["message"] = message.decode("utf-8", errors="replace")
+    return commit
+
+
+def _read_delta_size(delta: bytes, pos: int) -> tuple[int, int]:
+    """Read a little-endian base-128 size from a delta header."""
+    size = 0
+    shift = 0
+    while True:
+        byte = delta[pos]
+        pos += 1
+        size |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return size, pos
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Apply a pack delta (OFS_DELTA/REF_DELTA payload) to its base object.
+
+    Args:
+        base: Base object content (without header)
+        delta: Inflated delta data
+
+    Returns:
+        Target object content
+
+    Raises:
+        ValueError: If the delta does not match the base or is malformed
+    """
+    base_size, pos = _read_delta_size(delta, 0)
+    if base_size != len(base):
+        raise ValueError(f"Delta base size {base_size} != {len(base)}")
+    result_size, pos = _read_delta_size(delta, pos)
+
+    result = bytearray()
+    while pos < len(delta):
+        opcode = delta[pos]
+        pos += 1
+        if opcode & 0x80:
+            # Copy from base: bits 0-3 select offset bytes, bits 4-6 size bytes
+            offset = 0
+            size = 0
+            for i in range(4):
+                if opcode & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if opcode & (0x10 << i):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            if size == 0:
+                size = 0x10000
+            if offset + size > len(base):
+                raise ValueError("Delta copy out of base bounds")
+            result += base[offset : offset + size]
+        elif opcode:
+            # Insert the next opcode bytes literally
+            result += delta[pos : pos + opcode]
+            pos += opcode
+        else:
+            raise ValueError("Invalid delta opcode 0")
+
+    if len(result) != result_size:
+        raise ValueError(f"Delta result size {len(result)} != {result_size}")
+    return bytes(result)
+
+
 def encode_pack_object_header(obj_type: int, size: int) -> bytes:
     """Encode pack object header (type + size in variable-length encoding).
 
@@ -166,6 +286,33 @@ def encode_pack_object_header(obj_type: int, size: int) -> bytes:
     return bytes(result)
 
 
+def encode_pack_header(count: int) -> bytes:
+    """Encode pack file header: "PACK" + version (2) + object count."""
+    return b"PACK" + struct.pack(">I", 2) + struct.pack(">I", count)
+
+
+def encode_pack_object(obj_type: int, obj_data: bytes) -> bytes:
+    """Encode one pack entry (type/size header + zlib-compressed content).
+
+    Args:
+        obj_type: Git object type (1=commit, 2=tree, 3=blob)
+        obj_data: Object data, with or without "type size\0" header
+
+    Returns:
+        Pack entry bytes
+    """
+    # Extract content (remove "type size\0" header)
+    null_pos = obj_data.find(b"\0")
+    if null_pos > 0:
+        content = obj_data[null_pos + 1 :]
+    else:
+        # No header, use as-is
+        content = obj_data
+
+    # Encode object header (type + size), then compressed content
+    return encode_pack_object_header(obj_type, len(content)) + zlib.compress(content)
+
+
 def create_pack_file(objects: list[tuple[int, bytes]]) -> bytes:
     """Create Git pack file from objects.
 
@@ -176,35 +323,51 @@ def create_pack_file(objects: list[tuple[int, bytes]]) -> bytes:
     Returns:
         Complete pack file bytes
     """
-    # Pack header: "PACK" + version (2) + count
-    pack_data = b"PACK"
-    pack_data += struct.pack(">I", 2)  # Version 2
-    pack_data += struct.pack(">I", len(objects))  # Object count
-
-    # Add each object
-    for obj_type, obj_data in objects:
-        # Extract content (remove "type size\0" header)
-        null_pos = obj_data.find(b"\0")
-        if null_pos > 0:
-            content = obj_data[null_pos + 1 :]
-        else:
-            # No header, use as-is
-            content = obj_data
+    parts = [encode_pack_header(len(objects))]
+    parts.extend(
+        encode_pack_object(obj_type, obj_data) for obj_type, obj_data in objects
+    )
+    pack_data = b"".join(parts)
 
-        # Encode object header (type + size)
-        header_bytes = encode_pack_object_header(obj_type, len(content))
+    # Add pack checksum (SHA-1 of everything above)
+    return pack_data + hashlib.sha1(pack_data).digest()
 
-        # Compress content with zlib
-        compressed = zlib.compress(content)
 
-        # Add to pack
-        pack_data += header_bytes + compressed
+async def stream_pack_file(
+    count: int, objects: AsyncIterator[tuple[int, bytes]]
+) -> AsyncIterator[bytes]:
+    """Stream Git pack file as objects are compressed.
 
-    # Add pack checksum (SHA-1 of everything above)
-    checksum = hashlib.sha1(pack_data).digest()
-    pack_data += checksum
+    Only one object is held at a time; the trailing checksum is updated
+    incrementally as each entry is yielded.
 
-    return pack_data
+    Args:
+        count: Number of objects that will be yielded by objects
+        objects: Async iterator of (type, object_data_with_header) tuples
+
+    Yields:
+        Pack file bytes (header, one chunk per object, SHA-1 trailer)
+
+    Raises:
+        ValueError: If objects yields a different number of objects than count
+    """
+    checksum = hashlib.sha1()
+
+    header = encode_pack_header(count)
+    checksum.update(header)
+    yield header
+
+    written = 0
+    async for obj_type, obj_data in objects:
+        entry = encode_pack_object(obj_type, obj_data)
+        checksum.update(entry)
+        written += 1
+        yield entry
+
+    if written != count:
+        raise ValueError(f"Pack declared {count} objects but got {written}")
+
+    yield checksum.digest()
 
 
 def create_empty_pack_file() -> bytes:
@@ -225,6 +388,10 @@ def build_nested_trees(
 ) -> tuple[str, list[tuple[int, bytes]]]:
     """Build nested tree structure from flat file list.
 
+    Paths are inserted into a directory trie in one pass, then every
+    directory's tree is created after its subdirectories (root last), so the
+    work is linear in the number of entries.
+
     Args:
         flat_entries: List of (mode, path, blob_sha1)
                      e.g., [("100644", "models/config.json", "abc123...")]
@@ -233,95 +400,36 @@ def build_nested_trees(
         (root_tree_sha1, list_of_tree_objects)
         tree_objects: List of (type=2, tree_data_with_header)
     """
-    # Organize entries by directory
-    dir_contents = {}  # dir_path -> [(mode, name, sha1)]
-    all_dirs = set()  # Track all directories we need to create
+    if not flat_entries:
+        return None, []
 
+    # Trie node: [files as (mode, name, sha1), subdirectories by name, tree sha1]
+    root = [[], {}, None]
     for mode, path, blob_sha1 in flat_entries:
-        parts = path.split("/")
-
-        # Add file to its parent directory
-        if len(parts) == 1:
-            # Root-level file
-            dir_path = ""
-        else:
-            # Nested file
-            dir_path = "/".join(parts[:-1])
-
-        if dir_path not in dir_contents:
-            dir_contents[dir_path] = []
-
-        file_name = parts[-1]
-        dir_contents[dir_path].append((mode, file_name, blob_sha1))
-
-        # Track all parent directories
-        for i in range(1, len(parts)):
-            parent_dir = "/".join(parts[:i])
-            all_dirs.add(parent_dir)
-
-    # Ensure all directories exist in dir_contents (even if empty)
-    for dir_path in all_dirs:
-        if dir_path not in dir_contents:
-            dir_contents[dir_path] = []
-
-    # Build trees bottom-up (deepest directories first, ROOT LAST!)
-    def sort_dirs(dir_path):
-        # Root ("") must be last, so give it LOWEST value (reverse=True → descending)
-        if dir_path == "":
-            return (-999, "")  # Lowest value, processed last
-        else:
-            return (dir_path.count("/"), dir_path)
+        *dir_names, file_name = path.split("/")
+        node = root
+        for dir_name in dir_names:
+            node = node[1].setdefault(dir_name, [[], {}, None])
+        node[0].append((mode, file_name, blob_sha1))
+
+    # Pre-order lists parents before children, so reversed it is bottom-up
+    nodes = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(node[1].values())
 
-    sorted_dirs = sorted(dir_contents.keys(), key=sort_dirs, reverse=True)
-
-    dir_sha1s = {}  # dir_path -> tree_sha1
     tree_objects = []  # List of (type, tree_data)
-
-    for dir_path in sorted_dirs:
-        entries = []
-
-        # Add files in this directory
-        for mode, name, entry_sha1 in dir_contents[dir_path]:
-            entries.append((mode, name, entry_sha1))
-
-        # Add subdirectories that have been processed (bottom-up)
-        # Find all direct children of this directory
-        for child_dir_path, child_tree_sha1 in dir_sha1s.items():
-            # Check if child_dir_path is a direct child of dir_path
-            if dir_path == "":
-                # Root directory - find top-level dirs
-                if "/" not in child_dir_path and child_dir_path:
-                    # Top-level directory like "images"
-                    dir_name = child_dir_path
-                    # Check not already added as file
-                    if not any(name == dir_name for _, name, _ in entries):
-                        entries.append(("40000", dir_name, child_tree_sha1))
-            else:
-                # Non-root directory - find direct children
-                prefix = dir_path + "/"
-                if child_dir_path.startswith(prefix):
-                    remainder = child_dir_path[len(prefix) :]
-                    if "/" not in remainder:
-                        # Direct child (e.g., "images/samples" is child of "images")
-                        dir_name = remainder
-                        if not any(name == dir_name for _, name, _ in entries):
-                            entries.append(("40000", dir_name, child_tree_sha1))
-
-        # Create tree object for this directory
-        if entries:
-            tree_sha1, tree_data = create_tree_object(entries)
-            dir_sha1s[dir_path] = tree_sha1
-            tree_objects.append((2, tree_data))  # Type 2 = tree
-        else:
-            # Empty directory - create empty tree
-            tree_sha1, tree_data = create_tree_object([])
-            dir_sha1s[dir_path] = tree_sha1
-            tree_objects.append((2, tree_data))
-
-    # Return root tree SHA-1
-    root_sha1 = dir_sha1s.get("")
-    if not root_sha1 and sorted_dirs:
-        # Fallback if no root (shouldn't happen)
-        root_sha1 = dir_sha1s[sorted_dirs[-1]]
-
-    return root_sha1, tree_objects
+    for node in reversed(nodes):
+        entries = list(node[0])
+        file_names = {name for _, name, _ in entries}
+        for dir_name, child in node[1].items():
+            # A file shadows a directory of the same name
+            if dir_name not in file_names:
+                entries.append(("40000", dir_name, child[2]))
+
+        node[2], tree_data = create_tree_object(entries)
+        tree_objects.append((2, tree_data))  # Type 2 = tree
+
+    return root[2], tree_objects
@@ -0,0 +1,268 @@
+"""Prebuilt clone pack files, cached per (repository, LakeFS commit, depth).
+
+A fresh clone (no have lines) of an unchanged commit always produces the same
+pack for a given --depth, so the first build is spooled to a temp file while
+it is streamed and then stored in the configured backend:
+
+- "local": files under cfg.app.git_pack_cache_dir (evicted least recently used)
+- "s3": objects under s3://{bucket}/git-packs/ (evicted oldest first)
+
+The total size of cached packs is kept under cfg.app.git_pack_cache_max_bytes.
+Set cfg.app.git_pack_cache_backend to "" to disable the cache.
+"""
+
+import asyncio
+import os
+import tempfile
+from typing import AsyncIterator
+
+from kohakuhub.async_utils import run_in_s3_executor
+from kohakuhub.config import cfg
+from kohakuhub.logger import get_logger
+from kohakuhub.utils.s3 import get_s3_client, object_exists
+
+logger = get_logger("GIT_PACK_CACHE")
+
+# Bump when the synthesized objects change, so stale packs are never served
+PACK_CACHE_VERSION = 2
+S3_PACK_PREFIX = "git-packs/"
+READ_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+
+def pack_cache_key(repo_id: int, commit_id: str, depth: int | None = None) -> str:
+    """Relative cache key of the clone pack of a commit (shallow if depth)."""
+    suffix = f"-depth{depth}" if depth else ""
+    return f"v{PACK_CACHE_VERSION}/{repo_id}/{commit_id}{suffix}.pack"
+
+
+class LocalPackStore:
+    """Pack files on local disk, evicted by least recent use (mtime)."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def spool_dir(self) -> str:
+        """Spool next to the cache so storing is an atomic rename."""
+        os.makedirs(self.root, exist_ok=True)
+        return self.root
+
+    async def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    async def open(self, key: str) -> AsyncIterator[bytes] | None:
+        path = self._path(key)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+
+        # Mark as recently used
+        os.utime(path)
+
+        async def read():
+            with f:
+                while chunk := await asyncio.to_thread(f.read, READ_CHUNK_SIZE):
+                    yield chunk
+
+        return read()
+
+    async def put(self, key: str, spool_path: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(spool_path, path)
+
+    def _evict_sync(self, max_bytes: int) -> int:
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if not filename.endswith(".pack"):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    async def evict(self, max_bytes: int) -> int:
+        return await asyncio.to_thread(self._evict_sync, max_bytes)
+
+
+class S3PackStore:
+    """Pack files in the hub S3 bucket, evicted oldest first."""
+
+    def __init__(self, bucket: str, prefix: str = S3_PACK_PREFIX):
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def spool_dir(self) -> str | None:
+        return None  # System temp dir
+
+    async def exists(self, key: str) -> bool:
+        return await object_exists(self.bucket, self.prefix + key)
+
+    async def open(self, key: str) -> AsyncIterator[bytes] | None:
+        def get_body():
+            s3 = get_s3_client()
+            try:
+                return s3.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"]
+            except s3.exceptions.NoSuchKey:
+                return None
+
+        body = await run_in_s3_executor(get_body)
+        if body is None:
+            return None
+
+        async def read():
+            try:
+                while chunk := await run_in_s3_executor(body.read, READ_CHUNK_SIZE):
+                    yield chunk
+            finally:
+                body.close()
+
+        return read()
+
+    async def put(self, key: str, spool_path: str) -> None:
+        def upload():
+            get_s3_client().upload_file(spool_path, self.bucket, self.prefix + key)
+
+        try:
+            await run_in_s3_executor(upload)
+        finally:
+            os.remove(spool_path)
+
+    def _evict_sync(self, max_bytes: int) -> int:
+        s3 = get_s3_client()
+        entries = []
+        paginator = s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                entries.append((obj["LastModified"], obj["Size"], obj["Key"]))
+
+        total = sum(size for _, size, _ in entries)
+        doomed = []
+        for _, size, key in sorted(entries):
+            if total <= max_bytes:
+                break
+            doomed.append({"Key": key})
+            total -= size
+
+        # delete_objects accepts at most 1000 keys per call
+        for i in range(0, len(doomed), 1000):
+            s3.delete_objects(
+                Bucket=self.bucket, Delete={"Objects": doomed[i : i + 1000]}
+            )
+        return len(doomed)
+
+    async def evict(self, max_bytes: int) -> int:
+        return await run_in_s3_executor(self._evict_sync, max_bytes)
+
+
+def get_pack_store() -> LocalPackStore | S3PackStore | None:
+    """Get configured pack store, or None if the cache is disabled."""
+    match cfg.app.git_pack_cache_backend:
+        case "local":
+            return LocalPackStore(cfg.app.git_pack_cache_dir)
+        case "s3":
+            return S3PackStore(cfg.s3.bucket)
+        case _:
+            return None
+
+
+async def is_pack_cached(
+    repo_id: int, commit_id: str, depth: int | None = None
+) -> bool:
+    """Check whether the clone pack of a commit is cached."""
+    store = get_pack_store()
+    if store is None:
+        return False
+
+    try:
+        return await store.exists(pack_cache_key(repo_id, commit_id, depth))
+    except Exception:
+        return False
+
+
+async def open_cached_pack(
+    repo_id: int, commit_id: str, depth: int | None = None
+) -> AsyncIterator[bytes] | None:
+    """Open cached clone pack of a commit (shallow if depth).
+
+    Returns:
+        Async iterator over the pack bytes, or None on cache miss
+    """
+    store = get_pack_store()
+    if store is None:
+        return None
+
+    try:
+        return await store.open(pack_cache_key(repo_id, commit_id, depth))
+    except Exception as e:
+        logger.warning(f"Failed to read cached pack for {commit_id[:8]}: {e}")
+        return None
+
+
+async def tee_into_pack_cache(
+    repo_id: int,
+    commit_id: str,
+    pack_stream: AsyncIterator[bytes],
+    depth: int | None = None,
+) -> AsyncIterator[bytes]:
+    """Pass pack bytes through while spooling them into the cache.
+
+    The pack is only stored if the stream is consumed to the end; cache
+    failures never interrupt the stream itself.
+    """
+    store = get_pack_store()
+    if store is None:
+        async for chunk in pack_stream:
+            yield chunk
+        return
+
+    fd, spool_path = tempfile.mkstemp(suffix=".pack.tmp", dir=store.spool_dir())
+    spool = os.fdopen(fd, "wb")
+    complete = False
+    try:
+        async for chunk in pack_stream:
+            if spool is not None:
+                try:
+                    await asyncio.to_thread(spool.write, chunk)
+                except OSError as e:
+                    logger.warning(f"Stopped spooling pack for {commit_id[:8]}: {e}")
+                    spool.close()
+                    spool = None
+            yield chunk
+        complete = spool is not None
+    finally:
+        if spool is not None:
+            spool.close()
+
+        if complete:
+            try:
+                await store.put(pack_cache_key(repo_id, commit_id, depth), spool_path)
+                evicted = await store.evict(cfg.app.git_pack_cache_max_bytes)
+                logger.info(
+                    f"Cached pack for commit {commit_id[:8]}"
+                    + (f", evicted {evicted} old pack(s)" if evicted else "")
+                )
+            except Exception as e:
+                logger.warning(f"Failed to cache pack for {commit_id[:8]}: {e}")
+
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
@@ -0,0 +1,272 @@
+"""Pushed pack file reader - inflates objects and resolves deltas.
+
+receive-pack spools the request body to a temporary file and reads the pack
+from there. Inflated objects larger than SPOOL_THRESHOLD are written to files
+in a temporary directory instead of being held in memory, so the memory used
+by a push is bounded by the small objects (trees, commits, small files) plus
+one delta base/result at a time.
+"""
+
+import hashlib
+import os
+import struct
+import tempfile
+import zlib
+from typing import BinaryIO, Callable
+
+from kohakuhub.api.git.utils.objects import apply_delta
+
+OBJ_OFS_DELTA = 6
+OBJ_REF_DELTA = 7
+OBJECT_TYPE_NAMES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+
+SPOOL_THRESHOLD = 1024 * 1024  # 1 MiB
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class PackError(ValueError):
+    """Malformed or incomplete pack file."""
+
+
+class PackObjectStore:
+    """Objects of a pushed pack, keyed by SHA-1 (large contents on disk)."""
+
+    def __init__(self):
+        self._tmpdir = tempfile.TemporaryDirectory(prefix="kohakuhub-push-")
+        # sha1 -> (type, size, content bytes or spool file path)
+        self._objects: dict[str, tuple[int, int, bytes | str]] = {}
+
+    def __contains__(self, sha1: str) -> bool:
+        return sha1 in self._objects
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __enter__(self) -> "PackObjectStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Remove spooled objects."""
+        self._objects.clear()
+        self._tmpdir.cleanup()
+
+    def type_of(self, sha1: str) -> int | None:
+        """Object type (1=commit, 2=tree, 3=blob, 4=tag), None if unknown."""
+        entry = self._objects.get(sha1)
+        return entry[0] if entry else None
+
+    def size_of(self, sha1: str) -> int | None:
+        """Object content size, None if unknown."""
+        entry = self._objects.get(sha1)
+        return entry[1] if entry else None
+
+    def get(self, sha1: str) -> bytes:
+        """Object content (without header), read back from disk if spooled."""
+        _, _, content = self._objects[sha1]
+        if isinstance(content, str):
+            with open(content, "rb") as f:
+                return f.read()
+        return content
+
+    def add(self, obj_type: int, content: bytes) -> str:
+        """Store object content and return its SHA-1."""
+        header = f"{OBJECT_TYPE_NAMES[obj_type]} {len(content)}\0".encode()
+        sha1 = hashlib.sha1(header + content).hexdigest()
+        if sha1 in self._objects:
+            return sha1
+
+        if len(content) > SPOOL_THRESHOLD:
+            path = self.spool_path(sha1)
+            with open(path, "wb") as f:
+                f.write(content)
+            self._objects[sha1] = (obj_type, len(content), path)
+        else:
+            self._objects[sha1] = (obj_type, len(content), content)
+        return sha1
+
+    def add_spooled(self, obj_type: int, size: int, sha1: str, path: str) -> None:
+        """Register object content already written to path."""
+        if sha1 in self._objects:
+            os.remove(path)
+            return
+        self._objects[sha1] = (obj_type, size, path)
+
+    def spool_path(self, name: str) -> str:
+        """Path of a spool file in the store's temporary directory."""
+        return os.path.join(self._tmpdir.name, name)
+
+
+def _read_byte(f: BinaryIO) -> int:
+    byte = f.read(1)
+    if not byte:
+        raise PackError("Unexpected end of pack")
+    return byte[0]
+
+
+def _read_object_header(f: BinaryIO) -> tuple[int, int]:
+    """Read pack entry type and inflated size (inverse of encode_pack_object_header)."""
+    byte = _read_byte(f)
+    obj_type = (byte >> 4) & 0x07
+    size = byte & 0x0F
+    shift = 4
+    while byte & 0x80:
+        byte = _read_byte(f)
+        size |= (byte & 0x7F) << shift
+        shift += 7
+    return obj_type, size
+
+
+def _read_ofs_delta_offset(f: BinaryIO) -> int:
+    """Read the (big-endian, offset-encoded) distance back to an OFS_DELTA base."""
+    byte = _read_byte(f)
+    offset = byte & 0x7F
+    while byte & 0x80:
+        byte = _read_byte(f)
+        offset = ((offset + 1) << 7) | (byte & 0x7F)
+    return offset
+
+
+def _inflate(f: BinaryIO, size: int, sink: Callable[[bytes], None]) -> None:
+    """Inflate one zlib stream from f into sink, leaving f right after it."""
+    decompressor = zlib.decompressobj()
+    written = 0
+
+    while not decompressor.eof:
+        data = f.read(READ_CHUNK_SIZE)
+        if not data:
+            raise PackError("Unexpected end of pack")
+        # Bounded output per call, so a small entry can't inflate unchecked
+        while data:
+            out = decompressor.decompress(data, READ_CHUNK_SIZE)
+            written += len(out)
+            if written > size:
+                raise PackError("Object larger than its declared size")
+            sink(out)
+            if decompressor.eof:
+                break
+            data = decompressor.unconsumed_tail
+
+    if written != size:
+        raise PackError(f"Object inflated to {written} bytes, expected {size}")
+
+    # Rewind over the input that belongs to the next entry
+    f.seek(-len(decompressor.unused_data), os.SEEK_CUR)
+
+
+def _inflate_bytes(f: BinaryIO, size: int) -> bytes:
+    parts = []
+    _inflate(f, size, parts.append)
+    return b"".join(parts)
+
+
+def _inflate_object(
+    f: BinaryIO, obj_type: int, size: int, store: PackObjectStore
+) -> str:
+    """Inflate a whole (non-delta) object into the store, streaming large ones to disk."""
+    if size <= SPOOL_THRESHOLD:
+        return store.add(obj_type, _inflate_bytes(f, size))
+
+    sha = hashlib.sha1(f"{OBJECT_TYPE_NAMES[obj_type]} {size}\0".encode())
+    fd, path = tempfile.mkstemp(dir=store.spool_path(""))
+    with os.fdopen(fd, "wb") as spool:
+
+        def sink(data: bytes):
+            sha.update(data)
+            spool.write(data)
+
+        _inflate(f, size, sink)
+
+    sha1 = sha.hexdigest()
+    store.add_spooled(obj_type, size, sha1, path)
+    return sha1
+
+
+def _verify_checksum(f: BinaryIO, start: int, end: int) -> None:
+    """Compare the pack trailer with the SHA-1 of everything before it."""
+    checksum = hashlib.sha1()
+    f.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        data = f.read(min(READ_CHUNK_SIZE, remaining))
+        if not data:
+            raise PackError("Unexpected end of pack")
+        checksum.update(data)
+        remaining -= len(data)
+
+    if f.read(20) != checksum.digest():
+        raise PackError("Pack checksum mismatch")
+
+
+def read_pack(f: BinaryIO, store: PackObjectStore) -> int:
+    """Read a pack file from f (at its current position) into store.
+
+    Deltas whose base was already read are applied right away; the others
+    (REF_DELTA against a later object) are resolved after the whole pack
+    was read. Thin packs are not supported (receive-pack advertises no-thin).
+
+    Returns:
+        Number of objects in the pack
+
+    Raises:
+        PackError: If the pack is malformed, truncated or references a
+            missing delta base
+    """
+    start = f.tell()
+    header = f.read(12)
+    if len(header) != 12 or header[:4] != b"PACK":
+        raise PackError("Missing pack header")
+
+    version, count = struct.unpack(">II", header[4:])
+    if version not in (2, 3):
+        raise PackError(f"Unsupported pack version {version}")
+
+    offsets: dict[int, str] = {}  # entry offset -> resolved object SHA-1
+    deferred = []  # (entry offset, base offset or SHA-1, delta data)
+
+    def resolve(base_sha1: str, delta: bytes) -> str:
+        try:
+            content = apply_delta(store.get(base_sha1), delta)
+        except (IndexError, ValueError) as e:
+            raise PackError(f"Invalid delta against {base_sha1}: {e}")
+        return store.add(store.type_of(base_sha1), content)
+
+    for _ in range(count):
+        offset = f.tell() - start
+        obj_type, size = _read_object_header(f)
+
+        if obj_type == OBJ_OFS_DELTA:
+            base = offset - _read_ofs_delta_offset(f)
+        elif obj_type == OBJ_REF_DELTA:
+            base = f.read(20).hex()
+        elif obj_type in OBJECT_TYPE_NAMES:
+            offsets[offset] = _inflate_object(f, obj_type, size, store)
+            continue
+        else:
+            raise PackError(f"Invalid object type {obj_type}")
+
+        delta = _inflate_bytes(f, size)
+        base_sha1 = offsets.get(base) if isinstance(base, int) else base
+        if base_sha1 and base_sha1 in store:
+            offsets[offset] = resolve(base_sha1, delta)
+        else:
+            deferred.append((offset, base, delta))
+
+    _verify_checksum(f, start, f.tell())
+
+    while deferred:
+        remaining = []
+        for offset, base, delta in deferred:
+            base_sha1 = offsets.get(base) if isinstance(base, int) else base
+            if base_sha1 and base_sha1 in store:
+                offsets[offset] = resolve(base_sha1, delta)
+            else:
+                remaining.append((offset, base, delta))
+
+        if len(remaining) == len(deferred):
+            raise PackError(f"{len(remaining)} delta(s) reference missing objects")
+        deferred = remaining
+
+    return count
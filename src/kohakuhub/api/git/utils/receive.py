@@ -0,0 +1,596 @@
+"""Git push ingestion - replays pushed commits onto a LakeFS branch.
+
+receive-pack hands over the ref updates and the objects of the pushed pack.
+Every pushed commit between the branch head and the new tip becomes one
+LakeFS commit made through the regular commit operations (process_*_file),
+so File rows, LFS tracking, quotas and post-commit hooks behave exactly like
+an API commit:
+
+- Regular blobs are uploaded to LakeFS (files that must use LFS by size or
+  suffix rules are rejected, like the commit API does)
+- LFS pointer blobs link the already uploaded LFS object (push it with
+  `git lfs push` / the pre-push hook first)
+- Blobs the server already had are linked from the previous head
+- .lfsconfig is not stored, the bridge generates it
+
+If replaying fails partway, the commits replayed so far stay on the branch,
+whatever the failing commit staged is discarded, and the ref update is
+reported as partially applied.
+
+A pushed commit keeps its SHA-1 when the bridge would synthesize the same
+tree for it; otherwise it is remapped like any other LakeFS commit and the
+client sees a rewritten commit on its next fetch.
+"""
+
+import base64
+import hashlib
+from collections import deque
+
+from fastapi import HTTPException
+
+from kohakuhub.config import cfg
+from kohakuhub.constants import DEFAULT_COMMIT_MESSAGE
+from kohakuhub.db import Repository, User
+from kohakuhub.db_operations import (
+    create_commit,
+    get_organization,
+    save_git_commit_mapping,
+    should_use_lfs,
+)
+from kohakuhub.logger import get_logger
+from kohakuhub.utils.lakefs import get_lakefs_client
+from kohakuhub.utils.s3 import get_object_metadata
+from kohakuhub.api.commit.routers.operations import (
+    process_copy_file,
+    process_deleted_file,
+    process_lfs_file,
+    process_regular_file,
+    track_commit_lfs_objects,
+    update_commit_storage,
+)
+from kohakuhub.api.git.utils.lakefs_bridge import (
+    EMPTY_TREE_SHA1,
+    GitLakeFSBridge,
+    build_git_commit,
+    get_history_lock,
+    parse_lfs_pointer,
+    schedule_pack_warm,
+)
+from kohakuhub.api.git.utils.objects import (
+    create_blob_object,
+    parse_commit_object,
+    parse_tree_object,
+)
+from kohakuhub.api.git.utils.pack_reader import PackObjectStore
+from kohakuhub.api.git.utils.server import ZERO_SHA1
+from kohakuhub.api.quota.util import check_quota
+from kohakuhub.api.repo.utils.head import HEAD_BRANCH, sync_repository_head
+from kohakuhub.api.repo.utils.manifest import schedule_manifest_build
+
+logger = get_logger("GIT_PUSH")
+
+# Generated per repository by the bridge, never stored
+LFS_CONFIG_FILE = ".lfsconfig"
+LFS_POINTER_MAX_SIZE = 1024
+
+
+class PushRejected(Exception):
+    """Ref update refused; the message is reported to the client."""
+
+
+async def apply_push(
+    repository: Repository,
+    user: User,
+    ref_updates: list[tuple[str, str, str]],
+    objects: PackObjectStore,
+) -> dict[str, str | None]:
+    """Apply pushed ref updates.
+
+    Args:
+        repository: Repository object
+        user: Pushing user (commit author)
+        ref_updates: List of (old_sha, new_sha, ref_name)
+        objects: Objects of the pushed pack
+
+    Returns:
+        Dict of ref_name -> error message (None if the update succeeded)
+    """
+    results = {}
+    for old_sha1, new_sha1, ref_name in ref_updates:
+        try:
+            await _apply_ref_update(
+                repository, user, old_sha1, new_sha1, ref_name, objects
+            )
+            results[ref_name] = None
+        except PushRejected as e:
+            logger.warning(f"Rejected push to {repository.full_id} {ref_name}: {e}")
+            results[ref_name] = str(e)
+        except HTTPException as e:
+            # Raised by the shared commit operations
+            reason = _http_error_reason(e)
+            logger.warning(
+                f"Rejected push to {repository.full_id} {ref_name}: {reason}"
+            )
+            results[ref_name] = reason
+        except Exception as e:
+            logger.exception(f"Failed to apply push to {repository.full_id}", e)
+            results[ref_name] = "internal server error"
+
+    return results
+
+
+def _http_error_reason(e: HTTPException) -> str:
+    """First line of an HTTPException's error, as reported to git clients."""
+    detail = e.detail
+    reason = detail.get("error") if isinstance(detail, dict) else detail
+    return str(reason).splitlines()[0]
+
+
+async def _discard_staged_changes(client, lakefs_repo: str, branch: str) -> None:
+    """Drop what a failed replay staged, so the next commit doesn't include it."""
+    try:
+        await client.reset_branch_changes(repository=lakefs_repo, branch=branch)
+    except Exception as e:
+        logger.exception(f"Failed to reset uncommitted changes of {lakefs_repo}", e)
+
+
+async def _apply_ref_update(
+    repository: Repository,
+    user: User,
+    old_sha1: str,
+    new_sha1: str,
+    ref_name: str,
+    objects: PackObjectStore,
+) -> None:
+    """Replay the pushed commits of one ref onto its LakeFS branch."""
+    # Only main is advertised, other branches are not mapped to git
+    if ref_name != f"refs/heads/{HEAD_BRANCH}":
+        raise PushRejected(f"only refs/heads/{HEAD_BRANCH} can be pushed")
+    if new_sha1 == ZERO_SHA1:
+        raise PushRejected("deleting branches is not supported")
+
+    branch = HEAD_BRANCH
+    bridge = GitLakeFSBridge(
+        repository.repo_type, repository.namespace, repository.name
+    )
+    client = get_lakefs_client()
+
+    branch_info = await client.get_branch(repository=bridge.lakefs_repo, branch=branch)
+    head_id = branch_info["commit_id"]
+    head_mapping = await bridge.get_commit_mapping(head_id)
+    if not head_mapping:
+        raise PushRejected("failed to read branch head")
+
+    # Nothing maps the new commits while they are replayed
+    async with get_history_lock(repository.id):
+        branch_info = await client.get_branch(
+            repository=bridge.lakefs_repo, branch=branch
+        )
+        if branch_info["commit_id"] != head_id:
+            raise PushRejected("fetch first")
+
+        empty = head_mapping.tree_sha1 == EMPTY_TREE_SHA1
+        current_sha1 = ZERO_SHA1 if empty else head_mapping.commit_sha1
+        if old_sha1 != current_sha1:
+            raise PushRejected("fetch first")
+        if new_sha1 == current_sha1:
+            return
+
+        chain = _find_pushed_commits(objects, new_sha1, None if empty else current_sha1)
+        if chain is None:
+            raise PushRejected("non-fast-forward")
+
+        head_blobs, head_tree_sha1, head_trees = await bridge.build_commit_tree(head_id)
+        server_trees = {}
+        for _, tree_data in head_trees:
+            header_end = tree_data.index(b"\0")
+            server_trees[hashlib.sha1(tree_data).hexdigest()] = tree_data[
+                header_end + 1 :
+            ]
+        server_blobs = {
+            sha1: (path, data) for path, (sha1, data, _) in head_blobs.items()
+        }
+
+        # Diff every pushed commit against its predecessor before writing anything
+        plans = []
+        previous_tree = head_tree_sha1
+        for sha1, commit in chain:
+            changes, deletions = {}, []
+            _diff_trees(
+                objects,
+                server_trees,
+                previous_tree,
+                commit["tree"],
+                "",
+                changes,
+                deletions,
+            )
+            plans.append((sha1, commit, changes, deletions))
+            previous_tree = commit["tree"]
+
+        await _check_push(repository, objects, server_blobs, plans)
+
+        logger.info(
+            f"Replaying {len(plans)} pushed commit(s) onto {repository.full_id}@{branch}"
+        )
+        last_commit = None
+        parent_id, parent_sha1 = head_id, None if empty else current_sha1
+        replayed = 0
+        failure = None
+
+        try:
+            for sha1, commit, changes, deletions in plans:
+                pending_lfs_tracking = []
+                changed = False
+                for path, blob_sha1 in changes.items():
+                    changed |= await _apply_blob(
+                        repository,
+                        bridge.lakefs_repo,
+                        branch,
+                        head_id,
+                        path,
+                        blob_sha1,
+                        objects,
+                        server_blobs,
+                        pending_lfs_tracking,
+                    )
+                for path in deletions:
+                    changed |= await process_deleted_file(
+                        path, repository, bridge.lakefs_repo, branch
+                    )
+
+                if not changed:
+                    logger.info(f"Pushed commit {sha1[:8]} changes nothing, skipping")
+                    replayed += 1
+                    continue
+
+                summary, _, description = commit["message"].strip().partition("\n")
+                description = description.strip()
+                commit_result = await client.commit(
+                    repository=bridge.lakefs_repo,
+                    branch=branch,
+                    message=summary or DEFAULT_COMMIT_MESSAGE,
+                    metadata={"description": description} if description else None,
+                )
+                commit_id = commit_result["id"]
+                last_commit = commit_result
+                replayed += 1
+
+                commit_row = None
+                try:
+                    commit_row = create_commit(
+                        commit_id=commit_id,
+                        repository=repository,
+                        repo_type=repository.repo_type,
+                        branch=branch,
+                        author=user,
+                        username=user.username,
+                        message=summary or DEFAULT_COMMIT_MESSAGE,
+                        description=description,
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to record commit in database: {e}")
+
+                schedule_manifest_build(repository, bridge.lakefs_repo, commit_id)
+                track_commit_lfs_objects(
+                    repository.repo_type,
+                    repository.namespace,
+                    repository.name,
+                    commit_id,
+                    pending_lfs_tracking,
+                )
+
+                parent_sha1 = await _map_pushed_commit(
+                    bridge,
+                    repository,
+                    commit_result,
+                    commit_row,
+                    sha1,
+                    commit,
+                    objects,
+                    parent_id if parent_sha1 else None,
+                    parent_sha1,
+                )
+                parent_id = commit_id
+        except Exception as e:
+            # Commits replayed so far stay on the branch, the rest is dropped
+            failure = e
+            await _discard_staged_changes(client, bridge.lakefs_repo, branch)
+
+    if last_commit:
+        await sync_repository_head(repository, bridge.lakefs_repo, branch, last_commit)
+        schedule_pack_warm(repository, branch, last_commit["id"])
+        await update_commit_storage(repository, repository.namespace)
+
+    if failure is not None:
+        if last_commit is None:
+            raise failure  # Nothing was written
+        if isinstance(failure, HTTPException):
+            reason = _http_error_reason(failure)
+        elif isinstance(failure, PushRejected):
+            reason = str(failure)
+        else:
+            logger.exception(f"Failed to replay push to {repository.full_id}", failure)
+            reason = "internal server error"
+        raise PushRejected(
+            f"partially applied, {replayed} of {len(plans)} commits replayed "
+            f"({reason}); fetch and push again"
+        ) from failure
+
+
+def _find_pushed_commits(
+    objects: PackObjectStore, tip: str, stop: str | None
+) -> list[tuple[str, dict]] | None:
+    """Find the pushed commits leading from stop (exclusive) to tip.
+
+    Follows the shortest parent path, so merges of other histories are
+    replayed as their resulting tree. With stop None (empty branch) the
+    path ends at a root commit, which is replayed as well.
+
+    Returns:
+        List of (sha1, parsed commit), oldest first; None if tip does not
+        descend from stop (non-fast-forward)
+    """
+    commits = {}
+    came_from = {tip: None}  # commit -> child on the path to tip
+    queue = deque([tip])
+
+    while queue:
+        sha1 = queue.popleft()
+        if sha1 == stop:
+            start = came_from[sha1]
+            break
+        if objects.type_of(sha1) != 1:
+            # Not pushed: a commit the server doesn't have
+            continue
+
+        commit = commits[sha1] = parse_commit_object(objects.get(sha1))
+        if stop is None and not commit["parents"]:
+            start = sha1
+            break
+        for parent in commit["parents"]:
+            if parent not in came_from:
+                came_from[parent] = sha1
+                queue.append(parent)
+    else:
+        return None
+
+    chain = []
+    while start is not None:
+        chain.append((start, commits[start]))
+        start = came_from[start]
+    return chain
+
+
+def _tree_entries(
+    objects: PackObjectStore, server_trees: dict[str, bytes], tree_sha1: str | None
+) -> dict[str, tuple[str, str]]:
+    """Entries of a pushed or server tree as name -> (mode, sha1)."""
+    if tree_sha1 is None:
+        return {}
+    if objects.type_of(tree_sha1) == 2:
+        content = objects.get(tree_sha1)
+    elif tree_sha1 in server_trees:
+        content = server_trees[tree_sha1]
+    else:
+        raise PushRejected(f"missing tree {tree_sha1}")
+    return {name: (mode, sha1) for mode, name, sha1 in parse_tree_object(content)}
+
+
+def _diff_trees(
+    objects: PackObjectStore,
+    server_trees: dict[str, bytes],
+    old_tree: str | None,
+    new_tree: str | None,
+    prefix: str,
+    changes: dict[str, str],
+    deletions: list[str],
+) -> None:
+    """Collect changed files (path -> blob SHA-1) and deleted paths between trees.
+
+    Identical subtrees are skipped without being read.
+    """
+    if old_tree == new_tree:
+        return
+
+    old_entries = _tree_entries(objects, server_trees, old_tree)
+    new_entries = _tree_entries(objects, server_trees, new_tree)
+
+    for name in sorted(old_entries.keys() | new_entries.keys()):
+        path = prefix + name
+        old_mode, old_sha1 = old_entries.get(name, (None, None))
+        new_mode, new_sha1 = new_entries.get(name, (None, None))
+        if old_sha1 == new_sha1 or path == LFS_CONFIG_FILE:
+            continue
+
+        old_is_dir = old_mode in ("40000", "040000")
+        new_is_dir = new_mode in ("40000", "040000")
+        if new_mode == "160000":
+            raise PushRejected(f"submodules are not supported ({path})")
+        if new_mode == "120000":
+            raise PushRejected(f"symlinks are not supported ({path})")
+
+        if old_is_dir or new_is_dir:
+            _diff_trees(
+                objects,
+                server_trees,
+                old_sha1 if old_is_dir else None,
+                new_sha1 if new_is_dir else None,
+                path + "/",
+                changes,
+                deletions,
+            )
+        if old_mode and not old_is_dir and (new_mode is None or new_is_dir):
+            deletions.append(path)
+        if new_mode and not new_is_dir:
+            changes[path] = new_sha1
+
+
+async def _check_push(
+    repository: Repository,
+    objects: PackObjectStore,
+    server_blobs: dict[str, tuple[str, bytes | None]],
+    plans: list,
+) -> None:
+    """Validate all pushed blobs and the storage quota before writing anything."""
+    new_bytes = 0
+    checked = set()
+
+    for _, _, changes, _ in plans:
+        for path, blob_sha1 in changes.items():
+            if (path, blob_sha1) in checked:
+                continue
+            checked.add((path, blob_sha1))
+
+            if objects.type_of(blob_sha1) != 3:
+                if blob_sha1 not in server_blobs:
+                    raise PushRejected(f"missing blob {blob_sha1} for {path}")
+                continue
+
+            size = objects.size_of(blob_sha1)
+            pointer = (
+                parse_lfs_pointer(objects.get(blob_sha1))
+                if size <= LFS_POINTER_MAX_SIZE
+                else None
+            )
+            if pointer:
+                oid, pointer_size = pointer
+                lfs_key = f"lfs/{oid[:2]}/{oid[2:4]}/{oid}"
+                try:
+                    metadata = await get_object_metadata(cfg.s3.bucket, lfs_key)
+                except Exception:
+                    raise PushRejected(
+                        f"LFS object {oid} of {path} not uploaded, run git lfs push first"
+                    )
+                if metadata["size"] != pointer_size:
+                    raise PushRejected(
+                        f"LFS pointer of {path} declares {pointer_size} bytes, "
+                        f"stored object {oid} has {metadata['size']}"
+                    )
+                continue
+
+            if should_use_lfs(repository, path, size):
+                raise PushRejected(f"{path} must be tracked with Git LFS")
+            new_bytes += size
+
+    is_org = get_organization(repository.namespace) is not None
+    allowed, error_msg = check_quota(
+        repository.namespace, new_bytes, repository.private, is_org
+    )
+    if not allowed:
+        raise PushRejected(error_msg)
+
+
+async def _apply_blob(
+    repository: Repository,
+    lakefs_repo: str,
+    branch: str,
+    head_id: str,
+    path: str,
+    blob_sha1: str,
+    objects: PackObjectStore,
+    server_blobs: dict[str, tuple[str, bytes | None]],
+    pending_lfs_tracking: list[dict],
+) -> bool:
+    """Stage one changed file on the branch.
+
+    Returns:
+        True if the branch changed
+    """
+    if objects.type_of(blob_sha1) == 3:
+        content = objects.get(blob_sha1)
+    else:
+        src_path, blob_with_header = server_blobs[blob_sha1]
+        if blob_with_header is None:
+            # Content stored in LakeFS, link the same physical object
+            return await process_copy_file(
+                dest_path=path,
+                src_path=src_path,
+                src_revision=head_id,
+                repo=repository,
+                lakefs_repo=lakefs_repo,
+                revision=branch,
+            )
+        content = blob_with_header[blob_with_header.index(b"\0") + 1 :]
+
+    pointer = parse_lfs_pointer(content)
+    if pointer:
+        oid, size = pointer
+        changed, lfs_info = await process_lfs_file(
+            path=path,
+            oid=oid,
+            size=size,
+            algo="sha256",
+            repo=repository,
+            lakefs_repo=lakefs_repo,
+            revision=branch,
+        )
+        if lfs_info:
+            pending_lfs_tracking.append(lfs_info)
+        return changed
+
+    return await process_regular_file(
+        path=path,
+        content_b64=base64.b64encode(content).decode("ascii"),
+        encoding="base64",
+        repo=repository,
+        lakefs_repo=lakefs_repo,
+        revision=branch,
+    )
+
+
+async def _map_pushed_commit(
+    bridge: GitLakeFSBridge,
+    repository: Repository,
+    commit_result: dict,
+    commit_row,
+    pushed_sha1: str,
+    pushed_commit: dict,
+    objects: PackObjectStore,
+    parent_id: str | None,
+    parent_sha1: str | None,
+) -> str:
+    """Map a replayed LakeFS commit, keeping the pushed SHA-1 when possible.
+
+    Returns:
+        Git commit SHA-1 of the LakeFS commit
+    """
+    commit_id = commit_result["id"]
+    blob_data, root_tree_sha1, _ = await bridge.load_commit_tree(repository, commit_id)
+    tree_sha1 = root_tree_sha1 or EMPTY_TREE_SHA1
+
+    # Pushed contents are at hand, store them so fetches skip LakeFS
+    pushed_blobs = {
+        sha1
+        for sha1, data, _ in blob_data.values()
+        if data is None and objects.type_of(sha1) == 3
+    }
+    await bridge.mirror_objects(
+        repository,
+        [(3, create_blob_object(objects.get(sha1))[1]) for sha1 in pushed_blobs],
+    )
+
+    parent_sha1s = [parent_sha1] if parent_sha1 else []
+
+    if tree_sha1 == pushed_commit["tree"] and pushed_commit["parents"] == parent_sha1s:
+        content = objects.get(pushed_sha1)
+        commit_sha1 = pushed_sha1
+        commit_data = f"commit {len(content)}\0".encode() + content
+    else:
+        logger.warning(
+            f"Pushed commit {pushed_sha1[:8]} can't be kept as is "
+            f"(tree or parents differ), remapping LakeFS commit {commit_id[:8]}"
+        )
+        commit_sha1, commit_data = build_git_commit(
+            commit_result, commit_row, tree_sha1, parent_sha1s
+        )
+
+    save_git_commit_mapping(
+        repository,
+        commit_id,
+        commit_sha1,
+        tree_sha1,
+        [parent_id] if parent_id else [],
+        commit_data,
+    )
+    return commit_sha1
@@ -0,0 +1,209 @@
+"""Cache system for namespace/name → repository resolutions.
+
+Git and LFS URLs carry no repository type, so resolving one used to cost a
+query per type. Resolutions (ResolvedRepository, the fields permission
+checks and the git bridge need) are kept in a per-worker TTL cache and dropped
+when a repository is created, moved, deleted or changes visibility. Other
+workers only see such changes once their entry expires, so keep
+cfg.app.git_repo_cache_ttl_seconds short; 0 disables the cache.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from cachetools import TTLCache
+
+from kohakuhub.config import cfg
+from kohakuhub.db import Repository
+from kohakuhub.db_operations import get_repository
+from kohakuhub.logger import get_logger
+
+logger = get_logger("GIT_REPO_CACHE")
+
+REPO_TYPES = ["model", "dataset", "space"]
+
+
+@dataclass(frozen=True)
+class ResolvedRepository:
+    """Repository a git/LFS URL resolves to, as far as it is cached.
+
+    Enough for permission checks and the git bridge; anything else (quota,
+    LFS settings) needs the row, see load().
+    """
+
+    id: int
+    repo_type: str
+    namespace: str
+    name: str
+    private: bool
+    owner_id: int
+
+    @property
+    def full_id(self) -> str:
+        return f"{self.namespace}/{self.name}"
+
+    @classmethod
+    def from_row(cls, repo: Repository) -> "ResolvedRepository":
+        return cls(
+            id=repo.id,
+            repo_type=repo.repo_type,
+            namespace=repo.namespace,
+            name=repo.name,
+            private=repo.private,
+            owner_id=repo.owner_id,
+        )
+
+    def load(self) -> Repository | None:
+        """Fetch the full repository row (None if it was deleted since)."""
+        return Repository.get_or_none(Repository.id == self.id)
+
+
+class RepoResolutionCache:
+    """TTL cache for namespace/name → repository mappings."""
+
+    def __init__(self, ttl_seconds: int = 30, maxsize: int = 10000):
+        """Initialize cache.
+
+        Args:
+            ttl_seconds: Time-to-live for cache entries
+            maxsize: Maximum number of entries
+        """
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self.ttl = ttl_seconds
+
+    def get_key(self, namespace: str, name: str, repo_type: str | None = None) -> str:
+        """Generate cache key.
+
+        Args:
+            namespace: Repository namespace
+            name: Repository name
+            repo_type: Repository type if the URL names one, None for any type
+
+        Returns:
+            Cache key string
+        """
+        return f"git:repo:{repo_type or 'any'}:{namespace}/{name}"
+
+    def get(
+        self, namespace: str, name: str, repo_type: str | None = None
+    ) -> Optional[ResolvedRepository]:
+        """Get cached resolution.
+
+        Args:
+            namespace: Repository namespace
+            name: Repository name
+            repo_type: Repository type if the URL names one, None for any type
+
+        Returns:
+            Cached resolution or None if not found/expired
+        """
+        key = self.get_key(namespace, name, repo_type)
+        cached = self.cache.get(key)
+
+        if cached:
+            logger.debug(f"Cache HIT: {namespace}/{name} -> {cached.repo_type}")
+            return cached
+        else:
+            logger.debug(f"Cache MISS: {namespace}/{name}")
+            return None
+
+    def set(self, repo: ResolvedRepository, repo_type: str | None = None):
+        """Cache resolution of a repository.
+
+        Args:
+            repo: Resolved repository
+            repo_type: Repository type the lookup was made with, None for any
+        """
+        key = self.get_key(repo.namespace, repo.name, repo_type)
+        self.cache[key] = repo
+        logger.debug(
+            f"Cache SET: {repo.namespace}/{repo.name} -> {repo.repo_type} (TTL={self.ttl}s)"
+        )
+
+    def invalidate(self, namespace: str, name: str):
+        """Invalidate cache entry.
+
+        Args:
+            namespace: Repository namespace
+            name: Repository name
+        """
+        for repo_type in [None, *REPO_TYPES]:
+            key = self.get_key(namespace, name, repo_type)
+            if key in self.cache:
+                del self.cache[key]
+                logger.debug(f"Cache INVALIDATE: {namespace}/{name}")
+
+    def clear(self):
+        """Clear all cache entries."""
+        self.cache.clear()
+        logger.info("Cache cleared")
+
+    def stats(self) -> dict:
+        """Get cache statistics.
+
+        Returns:
+            Dict with cache stats (size, maxsize, ttl)
+        """
+        return {
+            "size": len(self.cache),
+            "maxsize": self.cache.maxsize,
+            "ttl_seconds": self.ttl,
+        }
+
+
+# Global cache instance
+_cache = None
+
+
+def get_repo_cache() -> RepoResolutionCache:
+    """Get global cache instance (singleton).
+
+    Returns:
+        Global RepoResolutionCache instance
+    """
+    global _cache
+    if _cache is None:
+        ttl = cfg.app.git_repo_cache_ttl_seconds
+        _cache = RepoResolutionCache(ttl_seconds=ttl)
+        logger.info(f"Initialized git repository cache (TTL={ttl}s)")
+    return _cache
+
+
+def invalidate_repo_resolution(namespace: str, name: str) -> None:
+    """Drop the cached resolution of namespace/name (any repository type)."""
+    get_repo_cache().invalidate(namespace, name)
+
+
+def resolve_repository(
+    namespace: str, name: str, repo_type: str | None = None
+) -> ResolvedRepository | None:
+    """Resolve a git/LFS URL to its repository.
+
+    Served from the cache when possible. Use ResolvedRepository.load() for
+    the full row.
+
+    Args:
+        namespace: Repository namespace
+        name: Repository name
+        repo_type: Repository type if known from the URL, else any type
+            (model, then dataset, then space)
+
+    Returns:
+        ResolvedRepository or None if not found
+    """
+    cache = get_repo_cache()
+    cached = cache.get(namespace, name, repo_type) if cache.ttl > 0 else None
+    if cached:
+        return cached
+
+    for candidate in [repo_type] if repo_type else REPO_TYPES:
+        repo = get_repository(candidate, namespace, name)
+        if repo:
+            break
+    else:
+        return None
+
+    resolved = ResolvedRepository.from_row(repo)
+    if cache.ttl > 0:
+        cache.set(resolved, repo_type)
+    return resolved
@@ -3,14 +3,26 @@
 This module implements the Git Smart HTTP protocol for clone, fetch, pull, and push operations.
 """
 
+import asyncio
 import base64
 import hashlib
 import struct
+import zlib
+from typing import AsyncIterator, BinaryIO
 
 from kohakuhub.logger import get_logger
+from kohakuhub.api.git.utils.pack_reader import PackError, PackObjectStore, read_pack
 
 logger = get_logger("GIT")
 
+# pkt-line max length is 65520 bytes: 4 length bytes + 1 band byte + data
+SIDE_BAND_MAX_DATA = 65515
+
+ZERO_SHA1 = "0" * 40
+
+# Protocol v2 delimiter packet, separates sections of a request or response
+DELIM_PKT = b"0001"
+
 
 def create_empty_pack() -> bytes:
     """Create an empty Git pack file.
@@ -59,6 +71,34 @@ def pkt_line_stream(lines: list[bytes | str | None]) -> bytes:
     return b"".join(pkt_line(line) for line in lines)
 
 
+async def side_band_stream(
+    chunks: AsyncIterator[bytes], band: int = 1
+) -> AsyncIterator[bytes]:
+    """Re-frame a byte stream as side-band-64k pkt-lines.
+
+    Small chunks are coalesced and large ones split, so every pkt-line
+    except the last carries a full SIDE_BAND_MAX_DATA payload.
+
+    Args:
+        chunks: Async iterator of raw bytes
+        band: Side-band channel (1 = pack data, 2 = progress, 3 = error)
+
+    Yields:
+        Encoded pkt-lines
+    """
+    band_byte = bytes([band])
+    buffer = bytearray()
+
+    async for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= SIDE_BAND_MAX_DATA:
+            yield pkt_line(band_byte + bytes(buffer[:SIDE_BAND_MAX_DATA]))
+            del buffer[:SIDE_BAND_MAX_DATA]
+
+    if buffer:
+        yield pkt_line(band_byte + bytes(buffer))
+
+
 def parse_pkt_line(data: bytes) -> tuple[bytes | None, bytes]:
     """Parse a single pkt-line from data.
 
@@ -95,6 +135,81 @@ def parse_pkt_line(data: bytes) -> tuple[bytes | None, bytes]:
     return line_data, remaining
 
 
+def parse_v2_request(data: bytes) -> tuple[str | None, list[str], list[str]]:
+    """Parse a protocol v2 command request.
+
+    Format: command=<name> and capability lines, delim-pkt (0001), argument
+    lines, flush-pkt (0000).
+
+    Args:
+        data: Raw request body
+
+    Returns:
+        Tuple of (command name or None, capability lines, argument lines)
+    """
+    command = None
+    capabilities = []
+    arguments = []
+    section = capabilities
+    pos = 0
+
+    while pos + 4 <= len(data):
+        try:
+            length = int(data[pos : pos + 4].decode("ascii"), 16)
+        except (ValueError, UnicodeDecodeError):
+            logger.error(f"Invalid pkt-line length: {data[pos : pos + 4]}")
+            break
+        if length == 0:
+            # Flush packet ends the request
+            break
+        if length == 1:
+            # Delimiter packet separates capabilities from arguments
+            section = arguments
+            pos += 4
+            continue
+        if length < 4:
+            logger.error(f"Invalid pkt-line length: {length}")
+            break
+
+        line = data[pos + 4 : pos + length].decode("utf-8").rstrip("\n")
+        pos += length
+        if section is capabilities and line.startswith("command="):
+            command = line[len("command=") :]
+        else:
+            section.append(line)
+
+    return command, capabilities, arguments
+
+
+def parse_filter_spec(spec: str) -> tuple[int | None, bool]:
+    """Parse a partial clone filter (git rev-list --filter syntax).
+
+    Supported: blob:none, blob:limit=<n>[kmg], tree:0.
+
+    Args:
+        spec: Filter spec sent by the client
+
+    Returns:
+        Tuple of (blob_limit, send_trees); blobs of blob_limit bytes or more
+        are omitted (None = no limit)
+
+    Raises:
+        ValueError: If the filter is not supported
+    """
+    if spec == "blob:none":
+        return 0, True
+    if spec == "tree:0":
+        return 0, False
+    if spec.startswith("blob:limit="):
+        value = spec[len("blob:limit=") :].lower()
+        scale = {"k": 1024, "m": 1024**2, "g": 1024**3}.get(value[-1:], 1)
+        if scale > 1:
+            value = value[:-1]
+        if value.isdigit():
+            return int(value) * scale, True
+    raise ValueError(f"Unsupported filter {spec}")
+
+
 def parse_pkt_lines(data: bytes) -> list[bytes | None]:
     """Parse multiple pkt-lines from data.
 
@@ -131,17 +246,22 @@ class GitServiceInfo:
         self.refs = refs
         self.capabilities = capabilities
 
-    def to_bytes(self) -> bytes:
+    def to_bytes(self, service_header: bool = True) -> bytes:
         """Encode service info as pkt-line stream.
 
+        Args:
+            service_header: Start with the "# service=" section (smart HTTP
+                only, SSH clients get the refs right away)
+
         Returns:
             Encoded bytes for info/refs response
         """
         lines = []
 
         # Service header
-        lines.append(f"# service=git-{self.service}\n")
-        lines.append(None)  # Flush packet
+        if service_header:
+            lines.append(f"# service=git-{self.service}\n")
+            lines.append(None)  # Flush packet
 
         # Sort refs: HEAD first, then alphabetically
         def sort_refs(item):
@@ -195,33 +315,63 @@ class GitUploadPackHandler:
             "side-band-64k",
             "thin-pack",
             "ofs-delta",
+            "filter",
+            "allow-reachable-sha1-in-want",
+            "agent=kohakuhub/0.0.1",
+        ]
+        self.v2_capabilities = [
             "agent=kohakuhub/0.0.1",
+            "ls-refs",
+            "fetch=shallow filter",
+            "server-option",
+            "object-format=sha1",
         ]
 
-    def get_service_info(self, refs: dict[str, str]) -> bytes:
+    def get_v2_service_info(self) -> bytes:
+        """Generate protocol v2 capability advertisement.
+
+        Unlike v0, refs are not advertised up front; the client asks for the
+        ones it needs with ls-refs.
+
+        Returns:
+            Encoded capability advertisement
+        """
+        lines = ["version 2\n"]
+        lines.extend(f"{cap}\n" for cap in self.v2_capabilities)
+        lines.append(None)
+        return pkt_line_stream(lines)
+
+    def get_service_info(
+        self, refs: dict[str, str], service_header: bool = True
+    ) -> bytes:
         """Generate service advertisement for upload-pack.
 
         Args:
             refs: Dictionary of ref_name -> commit_sha
+            service_header: Include the smart HTTP "# service=" section
 
         Returns:
             Encoded service info
         """
         info = GitServiceInfo("upload-pack", refs, self.capabilities)
-        return info.to_bytes()
+        return info.to_bytes(service_header)
 
-    async def handle_upload_pack(self, request_body: bytes) -> bytes:
+    async def handle_upload_pack(self, request_body: bytes) -> AsyncIterator[bytes]:
         """Handle upload-pack request (clone/fetch).
 
         Args:
             request_body: Raw request body from client
 
-        Returns:
-            Pack file with requested objects
+        Yields:
+            Response pkt-lines: ACK/NAK for the haves, then (once the client
+            sent "done") the pack file on side-band 1
         """
         # Parse want/have lines
         wants = []
         haves = []
+        client_caps = set()
+        filter_spec = None
+        done = False
 
         lines = parse_pkt_lines(request_body)
 
@@ -232,139 +382,394 @@ class GitUploadPackHandler:
             line_str = line.decode("utf-8").strip()
 
             if line_str.startswith("want "):
-                # Extract SHA and capabilities
+                # Extract SHA and capabilities (first want line only)
                 parts = line_str.split()
                 want_sha = parts[1]
                 wants.append(want_sha)
+                if len(wants) == 1:
+                    client_caps.update(parts[2:])
             elif line_str.startswith("have "):
                 # Extract SHA
                 have_sha = line_str.split()[1]
                 haves.append(have_sha)
+            elif line_str.startswith("filter "):
+                filter_spec = line_str[len("filter ") :]
             elif line_str == "done":
+                done = True
                 break
 
-        logger.info(f"Upload-pack: wants={len(wants)}, haves={len(haves)}")
-
-        # Send NAK (no common commits)
-        nak_response = pkt_line_stream([b"NAK\n"])
+        logger.info(
+            f"Upload-pack: wants={len(wants)}, haves={len(haves)}, "
+            f"filter={filter_spec}, done={done}"
+        )
 
-        # Generate pack file
+        try:
+            blob_limit, send_trees = (
+                parse_filter_spec(filter_spec) if filter_spec else (None, True)
+            )
+        except ValueError as e:
+            yield pkt_line(f"ERR {e}\n")
+            return
+
+        # Negotiation: acknowledge the haves we know (see git's upload-pack.c)
+        common = (
+            await self.bridge.find_common_commits(haves)
+            if self.bridge and haves
+            else []
+        )
+        if "multi_ack_detailed" in client_caps:
+            multi_ack = 2
+        elif "multi_ack" in client_caps:
+            multi_ack = 1
+        else:
+            multi_ack = 0
+
+        if multi_ack:
+            status = "common" if multi_ack == 2 else "continue"
+            for sha in common:
+                yield pkt_line(f"ACK {sha} {status}\n")
+        elif common:
+            yield pkt_line(f"ACK {common[0]}\n")
+
+        if not done:
+            # Stateless negotiation round, client sends "done" next. Each known
+            # have is enough to cut the pack, so we are ready right away.
+            if common and multi_ack == 2:
+                yield pkt_line(f"ACK {common[-1]} ready\n")
+            if not common or multi_ack:
+                yield pkt_line(b"NAK\n")
+            return
+
+        if not common:
+            yield pkt_line(b"NAK\n")
+        elif multi_ack:
+            yield pkt_line(f"ACK {common[-1]}\n")
+
+        # Generate pack file (objects reachable from wants minus common haves)
         if self.bridge:
-            # Use bridge to build pack from LakeFS
-            pack_data = await self.bridge.build_pack_file(wants, haves, branch="main")
+            # Use bridge to stream pack from LakeFS
+            pack_stream = self.bridge.stream_pack_file(
+                wants,
+                common,
+                branch="main",
+                blob_limit=blob_limit,
+                send_trees=send_trees,
+            )
         else:
             # Fallback to empty pack
-            pack_data = create_empty_pack()
+            pack_stream = _single_chunk(create_empty_pack())
 
         # Side-band protocol: prefix chunks with band number
         # Band 1 = pack data, Band 2 = progress, Band 3 = error
-        # IMPORTANT: pkt-line max length is 65520 bytes (0xFFFF)
-        # Must chunk large packs into multiple pkt-lines!
+        total_bytes = 0
+        try:
+            async for band_chunk in side_band_stream(pack_stream):
+                total_bytes += len(band_chunk)
+                yield band_chunk
+        except Exception as e:
+            # Headers are already sent, report the failure to the client
+            logger.exception("Failed to stream pack file", e)
+            yield pkt_line(b"\x03" + f"error: {e}\n".encode("utf-8"))
+            return
 
-        MAX_CHUNK_SIZE = 65500  # Leave room for band byte and pkt-line header
+        # Final flush packet
+        yield pkt_line(None)
 
-        response_parts = [nak_response]
+        logger.info(f"Sent pack: {total_bytes} bytes")
 
-        # Chunk pack data if needed
-        offset = 0
-        while offset < len(pack_data):
-            chunk = pack_data[offset : offset + MAX_CHUNK_SIZE]
-            # Prefix with band 1 indicator
-            band_chunk = b"\x01" + chunk
-            response_parts.append(pkt_line(band_chunk))
-            offset += MAX_CHUNK_SIZE
+    async def handle_v2_request(self, request_body: bytes) -> AsyncIterator[bytes]:
+        """Handle a protocol v2 command request (ls-refs or fetch).
 
-        # Final flush packet
-        response_parts.append(pkt_line(None))
+        Args:
+            request_body: Raw request body from client
 
-        response = b"".join(response_parts)
+        Yields:
+            Response pkt-lines
+        """
+        command, _, arguments = parse_v2_request(request_body)
+        logger.info(f"Upload-pack v2: command={command}")
+
+        if command == "ls-refs":
+            yield await self._ls_refs(arguments)
+        elif command == "fetch":
+            async for chunk in self._fetch(arguments):
+                yield chunk
+        else:
+            yield pkt_line(f"ERR unknown command {command}\n")
+
+    async def _ls_refs(self, arguments: list[str]) -> bytes:
+        """Answer ls-refs, only listing refs matching a ref-prefix (if any)."""
+        prefixes = [
+            arg[len("ref-prefix ") :]
+            for arg in arguments
+            if arg.startswith("ref-prefix ")
+        ]
+        symrefs = "symrefs" in arguments
+
+        def wanted(ref_name: str) -> bool:
+            return not prefixes or any(ref_name.startswith(p) for p in prefixes)
+
+        # Only HEAD and main exist, skip the lookup if neither can match
+        refs = {}
+        if self.bridge and (wanted("HEAD") or wanted("refs/heads/main")):
+            refs = await self.bridge.get_refs(branch="main")
+
+        lines = []
+        for ref_name, commit_sha in refs.items():
+            if not wanted(ref_name):
+                continue
+            if ref_name == "HEAD" and symrefs:
+                lines.append(f"{commit_sha} HEAD symref-target:refs/heads/main\n")
+            else:
+                lines.append(f"{commit_sha} {ref_name}\n")
+        lines.append(None)
+
+        logger.info(f"ls-refs: {len(lines) - 1} refs (prefixes={prefixes})")
+        return pkt_line_stream(lines)
+
+    async def _fetch(self, arguments: list[str]) -> AsyncIterator[bytes]:
+        """Answer fetch: acknowledgments, shallow-info, then packfile."""
+        wants = []
+        haves = []
+        shallows = []
+        depth = None
+        filter_spec = None
+        done = False
+
+        for arg in arguments:
+            keyword, _, value = arg.partition(" ")
+            if keyword == "want":
+                wants.append(value)
+            elif keyword == "have":
+                haves.append(value)
+            elif keyword == "shallow":
+                shallows.append(value)
+            elif keyword == "deepen":
+                if not (value.isascii() and value.isdigit()) or int(value) < 1:
+                    yield pkt_line(f"ERR invalid deepen {value}\n")
+                    return
+                depth = int(value)
+            elif keyword == "filter":
+                filter_spec = value
+            elif keyword == "done":
+                done = True
+            elif keyword in ("deepen-since", "deepen-not", "deepen-relative"):
+                yield pkt_line(f"ERR {keyword} is not supported\n")
+                return
 
         logger.info(
-            f"Sending pack in {len(response_parts) - 2} chunk(s), total {len(response)} bytes"
+            f"Fetch v2: wants={len(wants)}, haves={len(haves)}, "
+            f"shallows={len(shallows)}, depth={depth}, filter={filter_spec}, "
+            f"done={done}"
         )
 
-        return response
+        try:
+            blob_limit, send_trees = (
+                parse_filter_spec(filter_spec) if filter_spec else (None, True)
+            )
+        except ValueError as e:
+            yield pkt_line(f"ERR {e}\n")
+            return
+
+        common = (
+            await self.bridge.find_common_commits(haves)
+            if self.bridge and haves
+            else []
+        )
+
+        if not done:
+            # Any known have is enough to cut the pack, so send it right away;
+            # without common ground the client goes on with more haves
+            lines = ["acknowledgments\n"]
+            lines.extend(f"ACK {sha}\n" for sha in common)
+            if not common:
+                lines.extend(["NAK\n", None])
+                yield pkt_line_stream(lines)
+                return
+            lines.append("ready\n")
+            yield pkt_line_stream(lines) + DELIM_PKT
+
+        if depth or shallows:
+            shallow, unshallow = (
+                await self.bridge.get_shallow_info(
+                    wants, common, depth, shallows, branch="main"
+                )
+                if self.bridge
+                else ([], [])
+            )
+            lines = ["shallow-info\n"]
+            lines.extend(f"shallow {sha}\n" for sha in shallow)
+            lines.extend(f"unshallow {sha}\n" for sha in unshallow)
+            yield pkt_line_stream(lines) + DELIM_PKT
+
+        yield pkt_line("packfile\n")
+
+        if self.bridge:
+            pack_stream = self.bridge.stream_pack_file(
+                wants,
+                common,
+                branch="main",
+                depth=depth,
+                shallows=shallows,
+                blob_limit=blob_limit,
+                send_trees=send_trees,
+            )
+        else:
+            pack_stream = _single_chunk(create_empty_pack())
+
+        total_bytes = 0
+        try:
+            async for band_chunk in side_band_stream(pack_stream):
+                total_bytes += len(band_chunk)
+                yield band_chunk
+        except Exception as e:
+            # Headers are already sent, report the failure to the client
+            logger.exception("Failed to stream pack file", e)
+            yield pkt_line(b"\x03" + f"error: {e}\n".encode("utf-8"))
+            return
+
+        yield pkt_line(None)
+
+        logger.info(f"Sent pack: {total_bytes} bytes")
 
 
 class GitReceivePackHandler:
     """Handler for git-receive-pack (push)."""
 
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, ingest=None):
         """Initialize receive-pack handler.
 
         Args:
             repo_path: Path to git repository
+            ingest: Optional async callable(ref_updates, objects) applying the
+                pushed ref updates; returns ref_name -> error (None if ok)
         """
         self.repo_path = repo_path
+        self.ingest = ingest
         self.capabilities = [
             "report-status",
             "side-band-64k",
-            "delete-refs",
             "ofs-delta",
+            "no-thin",
             "agent=kohakuhub/0.0.1",
         ]
 
-    def get_service_info(self, refs: dict[str, str]) -> bytes:
+    def get_service_info(
+        self, refs: dict[str, str], service_header: bool = True
+    ) -> bytes:
         """Generate service advertisement for receive-pack.
 
         Args:
             refs: Dictionary of ref_name -> commit_sha
+            service_header: Include the smart HTTP "# service=" section
 
         Returns:
             Encoded service info
         """
         info = GitServiceInfo("receive-pack", refs, self.capabilities)
-        return info.to_bytes()
+        return info.to_bytes(service_header)
 
-    async def handle_receive_pack(self, request_body: bytes) -> bytes:
+    async def handle_receive_pack(self, request_body: BinaryIO) -> bytes:
         """Handle receive-pack request (push).
 
         Args:
-            request_body: Raw request body from client (contains ref updates + pack)
+            request_body: Request body spooled to a file (ref update commands,
+                then the pack file)
 
         Returns:
-            Status report
+            Status report (wrapped in side-band 1 if the client asked for it)
         """
-        # Parse ref updates
-        ref_updates = []
+        ref_updates, client_caps = read_receive_commands(request_body)
+        logger.info(f"Receive-pack: {len(ref_updates)} ref updates")
+        if not ref_updates:
+            return b""
+
+        statuses = {}
+        unpack_status = "ok"
+        with PackObjectStore() as objects:
+            # Deletions only come without a pack
+            if any(new_sha != ZERO_SHA1 for _, new_sha, _ in ref_updates):
+                try:
+                    count = await asyncio.to_thread(read_pack, request_body, objects)
+                    logger.info(f"Received pack: {count} objects")
+                except (PackError, OSError, zlib.error) as e:
+                    logger.warning(f"Failed to read pushed pack: {e}")
+                    unpack_status = str(e)
+
+            if unpack_status != "ok":
+                statuses = {ref: "unpacker error" for _, _, ref in ref_updates}
+            elif self.ingest:
+                statuses = await self.ingest(ref_updates, objects)
+            else:
+                statuses = {ref: "push not supported" for _, _, ref in ref_updates}
 
-        lines = parse_pkt_lines(request_body)
-        pack_data_start = None
+        report = [f"unpack {unpack_status}\n"]
+        for _, _, ref_name in ref_updates:
+            error = statuses.get(ref_name)
+            report.append(f"ng {ref_name} {error}\n" if error else f"ok {ref_name}\n")
+        report.append(None)
 
-        for i, line in enumerate(lines):
-            if line is None:
-                # Flush packet marks end of commands
-                # Pack data follows
-                pack_data_start = i + 1
-                break
+        if "report-status" not in client_caps:
+            report = []
+        report_data = pkt_line_stream(report)
 
-            line_str = line.decode("utf-8").strip()
+        if "side-band-64k" not in client_caps:
+            return report_data
+
+        # The report travels inside band 1, followed by a flush
+        framed = [
+            pkt_line(b"\x01" + report_data[i : i + SIDE_BAND_MAX_DATA])
+            for i in range(0, len(report_data), SIDE_BAND_MAX_DATA)
+        ]
+        return b"".join(framed) + pkt_line(None)
 
-            # Format: old-sha new-sha ref-name
-            parts = line_str.split()
-            if len(parts) >= 3:
-                old_sha = parts[0]
-                new_sha = parts[1]
-                ref_name = parts[2]
-                ref_updates.append((old_sha, new_sha, ref_name))
 
-        logger.info(f"Receive-pack: {len(ref_updates)} ref updates")
+def read_receive_commands(
+    request_body: BinaryIO,
+) -> tuple[list[tuple[str, str, str]], set[str]]:
+    """Read receive-pack commands up to the flush packet.
 
-        # TODO: Process pack file and update refs
-        # This will be implemented in git_lakefs_bridge.py
+    Leaves request_body positioned at the start of the pack data.
 
-        # Send success status
-        status_lines = [
-            None,  # Flush
-            b"\x01unpack ok\n",
-        ]
+    Returns:
+        (ref_updates as (old_sha, new_sha, ref_name), client capabilities)
+    """
+    ref_updates = []
+    client_caps = set()
+
+    while True:
+        length_hex = request_body.read(4)
+        if len(length_hex) < 4:
+            break
+        try:
+            length = int(length_hex, 16)
+        except ValueError:
+            logger.error(f"Invalid pkt-line length: {length_hex}")
+            break
+        if length == 0:
+            # Flush packet marks end of commands, pack data follows
+            break
+        if length < 4:
+            logger.error(f"Invalid pkt-line length: {length}")
+            break
+
+        line = request_body.read(length - 4)
+        # First command carries the capabilities after a NUL byte
+        command, _, caps = line.rstrip(b"\n").partition(b"\0")
+        if caps:
+            client_caps.update(caps.decode("utf-8").split())
+
+        # Format: old-sha new-sha ref-name (shallow lines are ignored)
+        parts = command.decode("utf-8").split()
+        if len(parts) == 3:
+            ref_updates.append((parts[0], parts[1], parts[2]))
 
-        for old_sha, new_sha, ref_name in ref_updates:
-            status_lines.append(f"\x01ok {ref_name}\n".encode())
+    return ref_updates, client_caps
 
-        status_lines.append(None)  # Flush
 
-        return pkt_line_stream(status_lines)
+async def _single_chunk(data: bytes) -> AsyncIterator[bytes]:
+    """Wrap bytes as a one-chunk async stream."""
+    yield data
 
 
 def parse_git_credentials(authorization: str | None) -> tuple[str | None, str | None]:
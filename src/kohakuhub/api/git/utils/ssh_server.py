@@ -0,0 +1,352 @@
+"""Git over SSH - embedded asyncssh server for clone, fetch and push.
+
+Clients connect as any user (e.g. git@hub:namespace/name.git) and are
+authenticated by the SSH keys registered in the settings UI (SSHKey rows,
+matched by SHA256 fingerprint). The SSHKey ID travels as an authorized_keys
+option of the matched key, so after authentication asyncssh reports the key
+that was actually verified (get_key_option). The git-upload-pack and
+git-receive-pack commands are served by the same handlers and permission
+checks as smart HTTP; only the framing differs:
+
+- refs are advertised without the smart HTTP "# service=" section
+- protocol v2 (GIT_PROTOCOL=version=2) sends one command request per flush
+- protocol v0 negotiates statefully: each round of haves is answered as it
+  arrives, replayed through the stateless HTTP handler
+- a push ends at EOF, the client closes its side after the pack
+
+asyncssh is an optional dependency (pip install kohakuhub[ssh]). The server
+is started with the app when cfg.app.git_ssh_enabled is set.
+"""
+
+import asyncio
+import io
+import os
+import shlex
+import tempfile
+from datetime import datetime, timezone
+from functools import partial
+
+from fastapi import HTTPException
+
+from kohakuhub.config import cfg
+from kohakuhub.db import Repository, SSHKey
+from kohakuhub.db_operations import get_ssh_key_by_fingerprint
+from kohakuhub.logger import get_logger
+from kohakuhub.auth.permissions import (
+    check_repo_read_permission,
+    check_repo_write_permission,
+)
+from kohakuhub.api.git.routers.http import is_protocol_v2
+from kohakuhub.api.git.routers.ssh_keys import compute_ssh_fingerprint
+from kohakuhub.api.git.utils.lakefs_bridge import GitLakeFSBridge
+from kohakuhub.api.git.utils.receive import apply_push
+from kohakuhub.api.git.utils.repo_cache import (
+    ResolvedRepository,
+    resolve_repository,
+)
+from kohakuhub.api.git.utils.server import (
+    ZERO_SHA1,
+    GitReceivePackHandler,
+    GitUploadPackHandler,
+    pkt_line,
+    read_receive_commands,
+)
+
+logger = get_logger("GIT_SSH")
+
+FLUSH_PKT = b"0000"
+DONE_PKT = pkt_line(b"done\n")
+SERVICES = ("git-upload-pack", "git-receive-pack")
+SPOOL_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+KEY_ID_OPTION = "kohakuhub-key-id"  # authorized_keys option holding SSHKey.id
+
+
+class SSHCommandError(Exception):
+    """Request refused; the message is reported to the client on stderr."""
+
+
+def parse_git_command(command: str | None) -> tuple[str, str, str]:
+    """Parse an SSH exec request like "git-upload-pack '/ns/name.git'".
+
+    Returns:
+        (service, namespace, name)
+
+    Raises:
+        SSHCommandError: If the command is not a git service on a repository
+    """
+    try:
+        args = shlex.split(command or "")
+    except ValueError:
+        args = []
+    if len(args) != 2 or args[0] not in SERVICES:
+        raise SSHCommandError("only git-upload-pack and git-receive-pack are served")
+
+    path = args[1].strip("/")
+    if path.endswith(".git"):
+        path = path[:-4]
+    namespace, _, name = path.partition("/")
+    if not namespace or not name or "/" in name:
+        raise SSHCommandError(f"invalid repository path: {args[1]}")
+    return args[0], namespace, name
+
+
+def public_key_fingerprint(key) -> str:
+    """SHA256 fingerprint of an asyncssh public key, as stored on SSHKey rows."""
+    key_type, key_data = key.export_public_key("openssh").decode().split()[:2]
+    return compute_ssh_fingerprint(key_type, key_data)
+
+
+async def read_pkt_block(stdin, stop_at_done: bool = False) -> bytes | None:
+    """Read raw pkt-lines up to and including the next flush packet.
+
+    Args:
+        stdin: Binary stream reader of the channel
+        stop_at_done: Also stop after a "done" line (v0 negotiation, which
+            is not followed by a flush)
+
+    Returns:
+        Raw packets, or None if the client closed the channel first
+    """
+    block = bytearray()
+    while True:
+        try:
+            header = await stdin.readexactly(4)
+            length = int(header, 16)
+            payload = await stdin.readexactly(length - 4) if length > 4 else b""
+        except (asyncio.IncompleteReadError, ValueError):
+            return None
+
+        block += header + payload
+        if header == FLUSH_PKT:
+            return bytes(block)
+        if stop_at_done and header + payload == DONE_PKT:
+            return bytes(block)
+
+
+def find_registered_key(key) -> SSHKey | None:
+    """SSHKey row of an asyncssh public key, if registered to an active user."""
+    ssh_key = get_ssh_key_by_fingerprint(public_key_fingerprint(key))
+    if not ssh_key or not ssh_key.user.is_active:
+        return None
+    return ssh_key
+
+
+class RegisteredKeys:
+    """authorized_keys lookups answered from the SSHKey table.
+
+    Mixed into asyncssh.SSHAuthorizedKeys by start_ssh_server; certificates
+    are not accepted.
+    """
+
+    def validate(
+        self, key, client_host, client_addr, cert_principals=None, ca=False
+    ) -> dict | None:
+        if ca:
+            return None
+        ssh_key = find_registered_key(key)
+        return {KEY_ID_OPTION: ssh_key.id} if ssh_key else None
+
+
+class GitSSHServer:
+    """asyncssh server callbacks of one connection (see start_ssh_server)."""
+
+    authorized_keys = None  # RegisteredKeys instance, set by start_ssh_server
+
+    def __init__(self):
+        self.conn = None
+
+    def connection_made(self, conn) -> None:
+        self.conn = conn
+
+    def begin_auth(self, username: str) -> bool:
+        # The SSH username is ignored (git@...), keys identify the user
+        self.conn.set_authorized_keys(self.authorized_keys)
+        return True
+
+    def password_auth_supported(self) -> bool:
+        return False
+
+    def public_key_auth_supported(self) -> bool:
+        return True
+
+    def auth_completed(self) -> None:
+        # Options of the key whose signature was verified
+        key_id = self.conn.get_key_option(KEY_ID_OPTION)
+        ssh_key = SSHKey.get_or_none(SSHKey.id == key_id) if key_id else None
+        self.conn.set_extra_info(kohakuhub_ssh_key=ssh_key)
+        if ssh_key is None:
+            return
+
+        SSHKey.update(last_used=datetime.now(timezone.utc)).where(
+            SSHKey.id == ssh_key.id
+        ).execute()
+        logger.info(
+            f"Authenticated {ssh_key.user.username} via SSH key {ssh_key.fingerprint}"
+        )
+
+
+async def handle_git_process(process) -> None:
+    """Serve one git command over an SSH channel."""
+    ssh_key = process.get_extra_info("kohakuhub_ssh_key")
+    user = ssh_key.user if ssh_key else None
+
+    try:
+        if user is None:
+            raise SSHCommandError("authentication required")
+        service, namespace, name = parse_git_command(process.command)
+        repo_id = f"{namespace}/{name}"
+        logger.info(f"Git SSH: {service} for {repo_id} by {user.username}")
+
+        repo = resolve_repository(namespace, name)
+        if not repo:
+            raise SSHCommandError(f"repository {repo_id} not found")
+
+        if service == "git-upload-pack":
+            check_repo_read_permission(repo, user)
+            await serve_upload_pack(process, repo, repo_id)
+        else:
+            check_repo_write_permission(repo, user)
+            # Pushes need the full row (quota and LFS settings), not the cached one
+            repo = repo.load()
+            if not repo:
+                raise SSHCommandError(f"repository {repo_id} not found")
+            await serve_receive_pack(process, repo, repo_id, user)
+
+        process.exit(0)
+    except SSHCommandError as e:
+        process.stderr.write(f"ERROR: {e}\n".encode())
+        process.exit(1)
+    except HTTPException as e:
+        # Raised by the shared permission checks
+        detail = e.detail
+        reason = detail.get("error") if isinstance(detail, dict) else detail
+        process.stderr.write(f"ERROR: {reason}\n".encode())
+        process.exit(1)
+    except Exception as e:
+        logger.exception(f"Git SSH command failed: {process.command}", e)
+        process.stderr.write(b"ERROR: internal server error\n")
+        process.exit(1)
+
+
+async def serve_upload_pack(process, repo: ResolvedRepository, repo_id: str) -> None:
+    """Serve git-upload-pack (clone/fetch) until the client is done."""
+    stdin, stdout = process.stdin, process.stdout
+    bridge = GitLakeFSBridge(repo.repo_type, repo.namespace, repo.name)
+    handler = GitUploadPackHandler(repo_id, bridge=bridge)
+
+    async def send(chunks) -> None:
+        async for chunk in chunks:
+            stdout.write(chunk)
+            await stdout.drain()
+
+    if is_protocol_v2(process.env.get("GIT_PROTOCOL")):
+        stdout.write(handler.get_v2_service_info())
+        await stdout.drain()
+        while request := await read_pkt_block(stdin):
+            if request == FLUSH_PKT:
+                continue
+            await send(handler.handle_v2_request(request))
+        return
+
+    refs = await bridge.get_refs(branch="main")
+    stdout.write(handler.get_service_info(refs, service_header=False))
+    await stdout.drain()
+
+    # Wants (with capabilities and filter), a bare flush if up to date
+    wants = await read_pkt_block(stdin)
+    if not wants or wants == FLUSH_PKT:
+        return
+
+    # Each round of haves is answered as it comes, "done" gets the pack;
+    # the stateless handler sees the wants and every have sent so far
+    haves = b""
+    while True:
+        block = await read_pkt_block(stdin, stop_at_done=True)
+        if block is None:
+            return
+        haves += block
+        done = block.endswith(DONE_PKT)
+        await send(handler.handle_upload_pack(wants + (haves if done else block)))
+        if done:
+            return
+
+
+async def serve_receive_pack(process, repo: Repository, repo_id: str, user) -> None:
+    """Serve git-receive-pack (push)."""
+    stdin, stdout = process.stdin, process.stdout
+    bridge = GitLakeFSBridge(repo.repo_type, repo.namespace, repo.name)
+    handler = GitReceivePackHandler(repo_id, ingest=partial(apply_push, repo, user))
+
+    refs = await bridge.get_refs(branch="main")
+    stdout.write(handler.get_service_info(refs, service_header=False))
+    await stdout.drain()
+
+    commands = await read_pkt_block(stdin)
+    if not commands or commands == FLUSH_PKT:
+        return  # Nothing to update
+
+    ref_updates, _ = read_receive_commands(io.BytesIO(commands))
+
+    # Spool commands and pack to disk, pushes can carry large pack files
+    with tempfile.TemporaryFile() as request_body:
+        request_body.write(commands)
+        if any(new_sha1 != ZERO_SHA1 for _, new_sha1, _ in ref_updates):
+            # The pack runs until the client closes its side
+            while chunk := await stdin.read(SPOOL_CHUNK_SIZE):
+                await asyncio.to_thread(request_body.write, chunk)
+        request_body.seek(0)
+
+        response_data = await handler.handle_receive_pack(request_body)
+
+    stdout.write(response_data)
+    await stdout.drain()
+
+
+def load_host_key(path: str):
+    """Load the SSH host key, generating an Ed25519 key on first start."""
+    import asyncssh
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        asyncssh.generate_private_key("ssh-ed25519").write_private_key(path)
+        os.chmod(path, 0o600)
+        logger.info(f"Generated SSH host key {path}")
+    return asyncssh.read_private_key(path)
+
+
+async def start_ssh_server():
+    """Start the git SSH server (cfg.app.git_ssh_*).
+
+    Returns:
+        asyncssh server (close() it on shutdown), or None if asyncssh is not
+        installed
+    """
+    try:
+        import asyncssh
+    except ImportError:
+        logger.warning(
+            "Git over SSH is enabled but asyncssh is not installed. "
+            "Install with: pip install asyncssh"
+        )
+        return None
+
+    class _RegisteredKeys(RegisteredKeys, asyncssh.SSHAuthorizedKeys):
+        pass
+
+    class _Server(GitSSHServer, asyncssh.SSHServer):
+        authorized_keys = _RegisteredKeys()
+
+    server = await asyncssh.create_server(
+        _Server,
+        cfg.app.git_ssh_host,
+        cfg.app.git_ssh_port,
+        server_host_keys=[load_host_key(cfg.app.git_ssh_host_key_path)],
+        process_factory=handle_git_process,
+        encoding=None,
+        # Every app worker listens on the same port
+        reuse_port=True,
+    )
+    logger.success(
+        f"Git SSH server listening on {cfg.app.git_ssh_host}:{cfg.app.git_ssh_port}"
+    )
+    return server
@@ -7,10 +7,10 @@ for users and organizations with separate tracking for private and public reposi
 import asyncio
 
 from kohakuhub.config import cfg
-from kohakuhub.db import File, LFSObjectHistory, Repository, User
-from kohakuhub.db_operations import get_organization
+from kohakuhub.db import LFSObjectHistory, Repository, User
+from kohakuhub.db_operations import get_files_by_paths, get_organization
 from kohakuhub.logger import get_logger
-from kohakuhub.utils.lakefs import get_lakefs_client, lakefs_repo_name
+from kohakuhub.utils.lakefs import iter_objects_sharded, lakefs_repo_name
 
 logger = get_logger("QUOTA")
 
@@ -38,47 +38,24 @@ async def calculate_repository_storage(repo: Repository) -> dict[str, int]:
         - lfs_unique_bytes: Unique LFS storage (deduplicated by SHA256)
     """
     lakefs_repo = lakefs_repo_name(repo.repo_type, repo.full_id)
-    client = get_lakefs_client()
 
     # Calculate current branch storage (all files)
     current_branch_bytes = 0
     current_branch_lfs_bytes = 0
 
     try:
-        # List all objects in main branch
-        after = ""
-        has_more = True
-
-        while has_more:
-            result = await client.list_objects(
-                repository=lakefs_repo,
-                ref="main",
-                delimiter="",  # Recursive
-                amount=1000,
-                after=after,
-            )
-
-            for obj in result["results"]:
-                if obj["path_type"] == "object":
-                    size = obj.get("size_bytes") or 0
-                    current_branch_bytes += size
-
-                    # Check if this file is LFS (stored in File table)
-                    path = obj.get("path")
-                    if path:
-                        file_record = File.get_or_none(
-                            (File.repository == repo)
-                            & (File.path_in_repo == path)
-                            & (File.is_deleted == False)
-                        )
-                        if file_record and file_record.lfs:
-                            current_branch_lfs_bytes += size
-
-            if result.get("pagination") and result["pagination"].get("has_more"):
-                after = result["pagination"]["next_offset"]
-                has_more = True
-            else:
-                has_more = False
+        # List all objects in main branch (shards listed in parallel)
+        async for objects in iter_objects_sharded(lakefs_repo, "main"):
+            # Check which files are LFS (stored in File table), one batch per shard
+            file_records = get_files_by_paths(repo, [obj["path"] for obj in objects])
+
+            for obj in objects:
+                size = obj.get("size_bytes") or 0
+                current_branch_bytes += size
+
+                file_record = file_records.get(obj["path"])
+                if file_record and file_record["lfs"]:
+                    current_branch_lfs_bytes += size
 
     except Exception as e:
         logger.warning(
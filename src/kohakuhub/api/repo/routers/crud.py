@@ -17,7 +17,9 @@ from kohakuhub.db import (
     init_db,
 )
 from kohakuhub.db_operations import (
-    get_file,
+    delete_commit_manifests,
+    delete_git_commit_mappings,
+    get_files_by_paths,
     get_organization,
     get_repository,
     should_use_lfs,
@@ -28,7 +30,11 @@ from kohakuhub.auth.permissions import (
     check_namespace_permission,
     check_repo_delete_permission,
 )
-from kohakuhub.utils.lakefs import get_lakefs_client, lakefs_repo_name
+from kohakuhub.utils.lakefs import (
+    get_lakefs_client,
+    lakefs_repo_name,
+    list_all_objects,
+)
 from kohakuhub.utils.s3 import copy_s3_folder, delete_objects_with_prefix
 from kohakuhub.lakefs_rest_client import StagingLocation, StagingMetadata
 from kohakuhub.api.repo.utils.hf import (
@@ -45,6 +51,8 @@ from kohakuhub.api.quota.util import (
     update_repository_storage,
 )
 from kohakuhub.api.repo.utils.gc import cleanup_repository_storage
+from kohakuhub.api.repo.utils.head import sync_repository_head
+from kohakuhub.api.git.utils.repo_cache import invalidate_repo_resolution
 from kohakuhub.api.validation import normalize_name
 
 logger = get_logger("REPO")
@@ -125,13 +133,15 @@ async def create_repo(
         return hf_server_error(f"LakeFS repository creation failed: {str(e)}")
 
     # Store in database for listing/metadata
-    Repository.get_or_create(
+    repo_row, _ = Repository.get_or_create(
         repo_type=payload.type,
         namespace=namespace,
         name=payload.name,
         full_id=full_id,
         defaults={"private": payload.private, "owner": user},
     )
+    invalidate_repo_resolution(namespace, payload.name)
+    await sync_repository_head(repo_row, lakefs_repo)
 
     return {
         "url": f"{cfg.app.base_url}/{payload.type}s/{full_id}",
@@ -231,6 +241,7 @@ async def delete_repo(
             # - All staging uploads (StagingUpload.repository)
             # - All LFS history (LFSObjectHistory.repository)
             repo_row.delete_instance()
+        invalidate_repo_resolution(namespace, payload.name)
         logger.success(f"Successfully deleted database records for: {full_id}")
     except Exception as e:
         logger.exception(f"Database deletion failed for {full_id}", e)
@@ -303,35 +314,15 @@ async def _migrate_lakefs_repository(repo_type: str, from_id: str, to_id: str) -
     try:
         # 1. Get list of all objects with metadata from old repo
         logger.info(f"Listing objects in {from_lakefs_repo}")
-        objects_to_migrate = []
-        after = ""
-        has_more = True
-
-        while has_more:
-            result = await client.list_objects(
-                repository=from_lakefs_repo,
-                ref="main",
-                delimiter="",
-                amount=1000,
-                after=after,
-            )
-
-            for obj in result["results"]:
-                if obj["path_type"] == "object":
-                    objects_to_migrate.append(
-                        {
-                            "path": obj["path"],
-                            "size_bytes": obj.get("size_bytes", 0),
-                            "checksum": obj.get("checksum", ""),
-                            "physical_address": obj.get("physical_address", ""),
-                        }
-                    )
-
-            if result.get("pagination") and result["pagination"].get("has_more"):
-                after = result["pagination"]["next_offset"]
-                has_more = True
-            else:
-                has_more = False
+        objects_to_migrate = [
+            {
+                "path": obj["path"],
+                "size_bytes": obj.get("size_bytes", 0),
+                "checksum": obj.get("checksum", ""),
+                "physical_address": obj.get("physical_address", ""),
+            }
+            for obj in await list_all_objects(from_lakefs_repo, "main")
+        ]
 
         logger.info(f"Found {len(objects_to_migrate)} object(s) to migrate")
 
@@ -348,22 +339,27 @@ async def _migrate_lakefs_repository(repo_type: str, from_id: str, to_id: str) -
         lfs_count = 0
         regular_count = 0
 
+        # Prefetch File rows in batches instead of one query per object
+        file_records = get_files_by_paths(
+            from_repo, [obj["path"] for obj in objects_to_migrate]
+        )
+
         for obj in objects_to_migrate:
             obj_path = obj["path"]
             size_bytes = obj["size_bytes"]
 
             # Query File table to get LFS status (source of truth)
             # This handles dynamic LFS rules and ensures consistency
-            file_record = get_file(from_repo, obj_path)
+            file_record = file_records.get(obj_path)
 
             # Determine if file is LFS:
             # - Primary: Use File table record if exists (handles dynamic rules)
             # - Fallback: Use repo-specific LFS rules (size + suffix)
             if file_record:
-                is_lfs = file_record.lfs
+                is_lfs = file_record["lfs"]
                 logger.debug(
                     f"File {obj_path}: LFS={is_lfs} from File table "
-                    f"(size={size_bytes}, db_lfs={file_record.lfs})"
+                    f"(size={size_bytes}, db_lfs={file_record['lfs']})"
                 )
             else:
                 # Fallback to repo-specific LFS rules if File record doesn't exist
@@ -517,12 +513,20 @@ def _update_repository_database_records(
         full_id=to_id,
         quota_bytes=current_quota_bytes,
         used_bytes=current_used_bytes,
+        head_commit_id=None,  # New LakeFS commit IDs, re-synced on next listing
     ).where(Repository.id == repo_row.id).execute()
+    invalidate_repo_resolution(repo_row.namespace, repo_row.name)
+    invalidate_repo_resolution(to_namespace, to_name)
 
     # NOTE: File and StagingUpload records don't need updating!
     # They use ForeignKey to Repository.id (which doesn't change on move).
     # Only Repository.namespace, Repository.name, Repository.full_id change.
 
+    # The LakeFS repository was recreated with new commit IDs, so manifests
+    # and git commit mappings of the old commits can never be hit again
+    delete_commit_manifests(repo_row)
+    delete_git_commit_mappings(repo_row)
+
     # Update storage quotas if namespace changed
     if moving_namespace and repo_size > 0:
         # Check if source namespace is an organization
@@ -1,15 +1,19 @@
 """Repository information and listing endpoints."""
 
+import base64
+import json
 from datetime import datetime
 from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, Query, Request
+from cachetools import LRUCache
+from fastapi import APIRouter, Depends, Query, Request, Response
+from peewee import Tuple
 
 from kohakuhub.config import cfg
 from kohakuhub.constants import DATETIME_FORMAT_ISO
 from kohakuhub.db import Repository, User, UserOrganization
 from kohakuhub.db_operations import (
-    get_file,
+    get_files_by_paths,
     get_organization,
     get_repository,
     get_user_by_username,
@@ -21,18 +25,25 @@ from kohakuhub.auth.permissions import (
     check_repo_read_permission,
     check_repo_write_permission,
 )
-from kohakuhub.utils.lakefs import get_lakefs_client, lakefs_repo_name
+from kohakuhub.utils.lakefs import (
+    get_lakefs_client,
+    lakefs_repo_name,
+    list_all_objects,
+)
 from kohakuhub.api.fallback import (
     with_list_aggregation,
     with_repo_fallback,
     with_user_fallback,
 )
 from kohakuhub.api.quota.util import get_repo_storage_info
-from kohakuhub.utils.datetime_utils import safe_strftime
+from kohakuhub.api.repo.utils.head import ensure_repository_heads
+from kohakuhub.api.repo.utils.manifest import FileManifest, get_manifest
+from kohakuhub.utils.datetime_utils import ensure_datetime, safe_strftime
 from kohakuhub.api.repo.utils.hf import (
     HFErrorCode,
     format_hf_datetime,
     hf_error_response,
+    hf_next_page_link,
     hf_repo_not_found,
 )
 
@@ -42,6 +53,155 @@ router = APIRouter()
 RepoType = Literal["model", "dataset", "space"]
 
 
+# Siblings and last-modified date per (repository id, commit id).
+# Commits are immutable, so entries never need invalidation; the cache is
+# bounded by the total number of siblings it holds.
+_siblings_cache = LRUCache(
+    maxsize=max(cfg.app.siblings_cache_size, 1),
+    getsizeof=lambda item: len(item[0]) + 1,
+)
+
+
+async def _list_siblings_from_lakefs(
+    repo_row: Repository, lakefs_repo: str, commit_id: str
+) -> list:
+    """Build siblings by listing a commit in LakeFS.
+
+    Only used when the commit is too large for a materialized manifest.
+
+    Args:
+        repo_row: Repository object (FK)
+        lakefs_repo: LakeFS repository name
+        commit_id: LakeFS commit ID
+
+    Returns:
+        List of sibling dicts
+    """
+    siblings = []
+
+    # Fetch all files recursively from root (sharded, in path order)
+    file_objects = await list_all_objects(lakefs_repo, commit_id)
+
+    # LFS files need their SHA256 from the File table (using repo-specific settings)
+    lfs_files = [
+        obj
+        for obj in file_objects
+        if should_use_lfs(repo_row, obj["path"], obj.get("size_bytes", 0))
+    ]
+
+    file_records = {}
+    if lfs_files:
+        # Fetch all file records in batched IN queries
+        try:
+            file_records = get_files_by_paths(
+                repo_row, [obj["path"] for obj in lfs_files]
+            )
+        except Exception:
+            # Fall back to LakeFS checksums
+            pass
+
+    # Convert to siblings format
+    for obj in file_objects:
+        sibling = {
+            "rfilename": obj["path"],
+            "size": obj.get("size_bytes", 0),
+        }
+
+        # Add LFS info if applicable (using repo-specific settings)
+        if should_use_lfs(repo_row, obj["path"], obj.get("size_bytes", 0)):
+            file_record = file_records.get(obj["path"])
+            checksum = (
+                file_record["sha256"]
+                if file_record and file_record["sha256"]
+                else obj.get("checksum", "")
+            )
+            sibling["lfs"] = {
+                "sha256": checksum,
+                "size": obj["size_bytes"],
+                "pointerSize": 134,
+            }
+
+        siblings.append(sibling)
+
+    return siblings
+
+
+def _siblings_from_manifest(manifest: FileManifest) -> list:
+    """Build siblings from a commit manifest (no LakeFS/DB round trips).
+
+    Args:
+        manifest: Commit manifest
+
+    Returns:
+        List of sibling dicts
+    """
+    siblings = []
+    for entry in manifest.iter_entries():
+        sibling = {
+            "rfilename": entry["path"],
+            "size": entry["size_bytes"],
+        }
+        if entry["lfs"]:
+            sibling["lfs"] = {
+                "sha256": entry["oid"],
+                "size": entry["size_bytes"],
+                "pointerSize": 134,
+            }
+        siblings.append(sibling)
+
+    return siblings
+
+
+async def _get_commit_siblings(
+    repo_row: Repository, lakefs_repo: str, commit_id: str
+) -> tuple[list, str | None]:
+    """Get siblings and last-modified date of a commit, computed once per commit.
+
+    Args:
+        repo_row: Repository object (FK)
+        lakefs_repo: LakeFS repository name
+        commit_id: LakeFS commit ID
+
+    Returns:
+        Tuple of (siblings, last_modified)
+
+    Raises:
+        Exception: If siblings can't be listed
+    """
+    key = (repo_row.id, commit_id)
+    cached = _siblings_cache.get(key)
+    if cached is not None:
+        return cached
+
+    client = get_lakefs_client()
+
+    last_modified = None
+    try:
+        commit_info = await client.get_commit(
+            repository=lakefs_repo, commit_id=commit_id
+        )
+        if commit_info and commit_info.get("creation_date"):
+            last_modified = datetime.fromtimestamp(
+                commit_info["creation_date"]
+            ).strftime(DATETIME_FORMAT_ISO)
+    except Exception as ex:
+        logger.debug(f"Could not get commit info: {str(ex)}")
+
+    # Get all files in the repository for siblings field
+    # This is needed for transformers/diffusers with trust_remote_code
+    manifest = await get_manifest(repo_row, lakefs_repo, commit_id)
+    if manifest is not None:
+        siblings = _siblings_from_manifest(manifest)
+    else:
+        siblings = await _list_siblings_from_lakefs(repo_row, lakefs_repo, commit_id)
+
+    # Only cache complete results, and skip commits larger than the whole cache
+    if last_modified is not None and len(siblings) < _siblings_cache.maxsize:
+        _siblings_cache[key] = (siblings, last_modified)
+
+    return siblings, last_modified
+
+
 @router.get("/models/{namespace}/{repo_name}")
 @router.get("/datasets/{namespace}/{repo_name}")
 @router.get("/spaces/{namespace}/{repo_name}")
@@ -113,97 +273,17 @@ async def get_repo_info(
         branch = await client.get_branch(repository=lakefs_repo, branch="main")
         commit_id = branch["commit_id"]
 
-        # Get commit details if available
+        # Siblings and commit date are cached per commit
         if commit_id:
             try:
-                commit_info = await client.get_commit(
-                    repository=lakefs_repo, commit_id=commit_id
+                siblings, last_modified = await _get_commit_siblings(
+                    repo_row, lakefs_repo, commit_id
                 )
-                if commit_info and commit_info.get("creation_date"):
-                    last_modified = datetime.fromtimestamp(
-                        commit_info["creation_date"]
-                    ).strftime(DATETIME_FORMAT_ISO)
             except Exception as ex:
-                logger.debug(f"Could not get commit info: {str(ex)}")
-
-        # Get all files in the repository for siblings field
-        # This is needed for transformers/diffusers with trust_remote_code
-        try:
-            all_results = []
-            after = ""
-            has_more = True
-
-            # Fetch all files recursively from root
-            while has_more:
-                result = await client.list_objects(
-                    repository=lakefs_repo,
-                    ref="main",
-                    prefix="",
-                    delimiter="",  # No delimiter = recursive
-                    amount=1000,
-                    after=after,
+                logger.exception(
+                    f"Could not fetch siblings for {lakefs_repo}: {str(ex)}", ex
                 )
-
-                all_results.extend(result["results"])
-
-                # Check pagination
-                if result.get("pagination") and result["pagination"].get("has_more"):
-                    after = result["pagination"]["next_offset"]
-                    has_more = True
-                else:
-                    has_more = False
-
-            # Filter only file objects
-            file_objects = [obj for obj in all_results if obj["path_type"] == "object"]
-
-            # Fetch all file records in parallel for LFS files (using repo-specific settings)
-            lfs_files = [
-                obj
-                for obj in file_objects
-                if should_use_lfs(repo_row, obj["path"], obj.get("size_bytes", 0))
-            ]
-
-            file_records = {}
-            if lfs_files:
-                # Fetch all file records sequentially (sync DB operations)
-                for obj in lfs_files:
-                    try:
-                        record = get_file(repo_row, obj["path"])
-                        if record:
-                            file_records[obj["path"]] = record
-                    except Exception:
-                        # Skip files that fail to fetch
-                        pass
-
-            # Convert to siblings format
-            for obj in file_objects:
-                sibling = {
-                    "rfilename": obj["path"],
-                    "size": obj.get("size_bytes", 0),
-                }
-
-                # Add LFS info if applicable (using repo-specific settings)
-                if should_use_lfs(repo_row, obj["path"], obj.get("size_bytes", 0)):
-                    file_record = file_records.get(obj["path"])
-                    checksum = (
-                        file_record.sha256
-                        if file_record and file_record.sha256
-                        else obj.get("checksum", "")
-                    )
-                    sibling["lfs"] = {
-                        "sha256": checksum,
-                        "size": obj["size_bytes"],
-                        "pointerSize": 134,
-                    }
-
-                siblings.append(sibling)
-
-        except Exception as ex:
-            logger.exception(
-                f"Could not fetch siblings for {lakefs_repo}: {str(ex)}", ex
-            )
-            logger.debug(f"Could not fetch siblings for {lakefs_repo}: {str(ex)}")
-            # Continue without siblings if fetch fails
+                # Continue without siblings if fetch fails
 
     except Exception as e:
         # Log warning but continue - repo exists even if LakeFS has issues
@@ -300,6 +380,76 @@ def _filter_repos_by_privacy(q, user: Optional[User], author: Optional[str] = No
     return q
 
 
+# Sorts served with keyset (cursor) pagination, ordered by (column, id) DESC
+_KEYSET_SORT_FIELDS = {
+    "recent": Repository.created_at,
+    "downloads": Repository.downloads,
+    "likes": Repository.likes_count,
+}
+
+
+def _apply_repo_sort(q, sort: str):
+    """Order a Repository query by the requested sort key.
+
+    Repository.id breaks ties so the order is stable across pages.
+    """
+    if sort == "likes":
+        return q.order_by(Repository.likes_count.desc(), Repository.id.desc())
+    elif sort == "downloads":
+        return q.order_by(Repository.downloads.desc(), Repository.id.desc())
+    elif sort == "lastModified":
+        return q.order_by(
+            Repository.last_modified.desc(nulls="LAST"), Repository.id.desc()
+        )
+    else:  # recent (default)
+        return q.order_by(Repository.created_at.desc(), Repository.id.desc())
+
+
+def _encode_repo_cursor(sort: str, row: Repository) -> str:
+    """Encode the keyset position after row as an opaque cursor."""
+    value = getattr(row, _KEYSET_SORT_FIELDS[sort].name)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort, value, row.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_repo_cursor(cursor: str, sort: str) -> tuple:
+    """Decode a list cursor into its (sort value, repository id) position.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, row_id = json.loads(
+            base64.b64decode(padded, altchars=b"-_", validate=True)
+        )
+        if cursor_sort != sort or sort not in _KEYSET_SORT_FIELDS:
+            raise ValueError(f"Cursor does not match sort={sort}")
+        if sort == "recent":
+            value = ensure_datetime(value)
+        return value, int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _format_repo_list_item(r: Repository) -> dict:
+    """Format a Repository row for list endpoints (no LakeFS round trips)."""
+    return {
+        "id": r.full_id,
+        "author": r.namespace,
+        "private": r.private,
+        "sha": r.head_commit_id,
+        "lastModified": safe_strftime(r.last_modified, DATETIME_FORMAT_ISO),
+        "createdAt": safe_strftime(r.created_at, DATETIME_FORMAT_ISO),
+        "downloads": r.downloads,
+        "likes": r.likes_count,
+        "gated": False,
+        "tags": [],
+    }
+
+
 async def _list_repos_internal(
     rt: str,
     author: Optional[str] = None,
@@ -307,9 +457,16 @@ async def _list_repos_internal(
     sort: str = "recent",
     user: User | None = None,
     fallback: bool = True,
+    cursor: Optional[str] = None,
+    request: Request | None = None,
+    response: Response | None = None,
 ) -> list[dict]:
     """Internal function to list repositories (called by decorated versions).
 
+    Sorts by recent/downloads/likes use keyset pagination: the page is read
+    straight off the (repo_type, column, id) index starting after `cursor`,
+    and a `Link: rel="next"` header is set on `response` when more rows exist.
+
     Args:
         rt: Repository type ("model", "dataset", or "space")
         author: Filter by author/namespace
@@ -317,6 +474,9 @@ async def _list_repos_internal(
         sort: Sort order
         user: Current authenticated user (optional)
         fallback: Enable fallback to external sources (default: True)
+        cursor: Keyset cursor from a previous page (already validated)
+        request: FastAPI request object (for the next page link)
+        response: FastAPI response object (for the next page link)
 
     Returns:
         List of repositories
@@ -339,54 +499,24 @@ async def _list_repos_internal(
         rows = get_trending_repositories(rt, limit=limit, days=7)
     else:
         # Standard sorting
-        if sort == "likes":
-            q = q.order_by(Repository.likes_count.desc())
-        elif sort == "downloads":
-            q = q.order_by(Repository.downloads.desc())
-        else:  # recent (default)
-            q = q.order_by(Repository.created_at.desc())
-
-        rows = list(q.limit(limit))
-
-    # Format response with lastModified from LakeFS
-    client = get_lakefs_client()
-    result = []
-
-    for r in rows:
-        last_modified = None
-        sha = None
-
-        # Try to get lastModified from LakeFS main branch
-        try:
-            lakefs_repo = lakefs_repo_name(rt, r.full_id)
-            branch = await client.get_branch(repository=lakefs_repo, branch="main")
-            sha = branch["commit_id"]
-
-            if sha:
-                commit_info = await client.get_commit(
-                    repository=lakefs_repo, commit_id=sha
+        q = _apply_repo_sort(q, sort)
+        if cursor:
+            value, row_id = _decode_repo_cursor(cursor, sort)
+            field = _KEYSET_SORT_FIELDS[sort]
+            q = q.where(Tuple(field, Repository.id) < Tuple(value, row_id))
+
+        # Fetch one extra row to know whether there is a next page
+        rows = list(q.limit(limit + 1))
+        if len(rows) > limit:
+            rows = rows[:limit]
+            if sort in _KEYSET_SORT_FIELDS and request and response:
+                response.headers["Link"] = hf_next_page_link(
+                    request, _encode_repo_cursor(sort, rows[-1])
                 )
-                if commit_info and commit_info.get("creation_date"):
-                    last_modified = datetime.fromtimestamp(
-                        commit_info["creation_date"]
-                    ).strftime(DATETIME_FORMAT_ISO)
-        except Exception as e:
-            logger.debug(f"Could not get lastModified for {r.full_id}: {str(e)}")
-
-        result.append(
-            {
-                "id": r.full_id,
-                "author": r.namespace,
-                "private": r.private,
-                "sha": sha,
-                "lastModified": last_modified,
-                "createdAt": safe_strftime(r.created_at, DATETIME_FORMAT_ISO),
-                "downloads": r.downloads,
-                "likes": r.likes_count,
-                "gated": False,
-                "tags": [],
-            }
-        )
+
+    # lastModified/sha are denormalized on Repository (synced on commit)
+    await ensure_repository_heads(rows)
+    result = [_format_repo_list_item(r) for r in rows]
 
     # Sorting already applied by database query
     return result
@@ -394,18 +524,30 @@ async def _list_repos_internal(
 
 # Create decorated versions for each repo type
 @with_list_aggregation("model")
-async def _list_models_with_aggregation(author, limit, sort, user, fallback=True):
-    return await _list_repos_internal("model", author, limit, sort, user, fallback)
+async def _list_models_with_aggregation(
+    author, limit, sort, user, fallback=True, **page_kwargs
+):
+    return await _list_repos_internal(
+        "model", author, limit, sort, user, fallback, **page_kwargs
+    )
 
 
 @with_list_aggregation("dataset")
-async def _list_datasets_with_aggregation(author, limit, sort, user, fallback=True):
-    return await _list_repos_internal("dataset", author, limit, sort, user, fallback)
+async def _list_datasets_with_aggregation(
+    author, limit, sort, user, fallback=True, **page_kwargs
+):
+    return await _list_repos_internal(
+        "dataset", author, limit, sort, user, fallback, **page_kwargs
+    )
 
 
 @with_list_aggregation("space")
-async def _list_spaces_with_aggregation(author, limit, sort, user, fallback=True):
-    return await _list_repos_internal("space", author, limit, sort, user, fallback)
+async def _list_spaces_with_aggregation(
+    author, limit, sort, user, fallback=True, **page_kwargs
+):
+    return await _list_repos_internal(
+        "space", author, limit, sort, user, fallback, **page_kwargs
+    )
 
 
 @router.get("/models")
@@ -416,19 +558,29 @@ async def list_repos(
     limit: int = Query(
         50, ge=1, le=100000
     ),  # Very high limit to support "get all repos"
-    sort: str = Query("recent", regex="^(recent|likes|downloads|trending)$"),
+    sort: str = Query(
+        "recent", regex="^(recent|likes|downloads|lastModified|trending)$"
+    ),
+    cursor: Optional[str] = None,
     fallback: bool = Query(True, description="Enable fallback to external sources"),
     request: Request = None,
+    response: Response = None,
     user: User | None = Depends(get_optional_user),
 ):
     """List repositories of a specific type.
 
+    Sorting by recent, likes or downloads is cursor-paginated like the HF Hub:
+    follow the `Link: <...>; rel="next"` header until it is absent. External
+    sources are only aggregated into the first page.
+
     Args:
         author: Filter by author/namespace
         limit: Maximum number of results
-        sort: Sort order (recent, likes, downloads, trending) - default: recent
+        sort: Sort order (recent, likes, downloads, lastModified, trending) - default: recent
+        cursor: Pagination cursor from a previous `Link` header
         fallback: Enable fallback to external sources (default: True)
         request: FastAPI request object
+        response: FastAPI response object
         user: Current authenticated user (optional)
 
     Returns:
@@ -436,18 +588,28 @@ async def list_repos(
     """
     path = request.url.path
 
+    if cursor:
+        try:
+            _decode_repo_cursor(cursor, sort)
+        except ValueError as e:
+            return hf_error_response(400, HFErrorCode.BAD_REQUEST, str(e))
+        # External lists can't be resumed from a local cursor
+        fallback = False
+
+    page_kwargs = {"cursor": cursor, "request": request, "response": response}
+
     match path:
         case _ if "models" in path:
             return await _list_models_with_aggregation(
-                author, limit, sort, user, fallback
+                author, limit, sort, user, fallback, **page_kwargs
             )
         case _ if "datasets" in path:
             return await _list_datasets_with_aggregation(
-                author, limit, sort, user, fallback
+                author, limit, sort, user, fallback, **page_kwargs
             )
         case _ if "spaces" in path:
             return await _list_spaces_with_aggregation(
-                author, limit, sort, user, fallback
+                author, limit, sort, user, fallback, **page_kwargs
             )
         case _:
             return hf_error_response(
@@ -465,7 +627,7 @@ async def list_user_repos(
     limit: int = Query(
         100, ge=1, le=100000
     ),  # Very high limit to support "get all repos"
-    sort: str = Query("recent", regex="^(recent|likes|downloads)$"),
+    sort: str = Query("recent", regex="^(recent|likes|downloads|lastModified)$"),
     fallback: bool = True,
     user: User | None = Depends(get_optional_user),
 ):
@@ -476,7 +638,7 @@ async def list_user_repos(
     Args:
         username: Username or organization name
         limit: Maximum number of results per type
-        sort: Sort order (recent, likes, downloads) - default: recent
+        sort: Sort order (recent, likes, downloads, lastModified) - default: recent
         user: Current authenticated user (optional)
 
     Returns:
@@ -509,54 +671,11 @@ async def list_user_repos(
         q = _filter_repos_by_privacy(q, user, username)
 
         # Apply sorting
-        if sort == "likes":
-            q = q.order_by(Repository.likes_count.desc())
-        elif sort == "downloads":
-            q = q.order_by(Repository.downloads.desc())
-        else:  # recent (default)
-            q = q.order_by(Repository.created_at.desc())
-
-        rows = list(q.limit(limit))
+        rows = list(_apply_repo_sort(q, sort).limit(limit))
 
         key = repo_type + "s"
-        repos_list = []
-        client = get_lakefs_client()
-
-        for r in rows:
-            last_modified = None
-            sha = None
-
-            # Try to get lastModified from LakeFS
-            try:
-                lakefs_repo = lakefs_repo_name(repo_type, r.full_id)
-                branch = await client.get_branch(repository=lakefs_repo, branch="main")
-                sha = branch["commit_id"]
-
-                if sha:
-                    commit_info = await client.get_commit(
-                        repository=lakefs_repo, commit_id=sha
-                    )
-                    if commit_info and commit_info.get("creation_date"):
-                        last_modified = datetime.fromtimestamp(
-                            commit_info["creation_date"]
-                        ).strftime(DATETIME_FORMAT_ISO)
-            except Exception as e:
-                logger.debug(f"Could not get lastModified for {r.full_id}: {str(e)}")
-
-            repos_list.append(
-                {
-                    "id": r.full_id,
-                    "author": r.namespace,
-                    "private": r.private,
-                    "sha": sha,
-                    "lastModified": last_modified,
-                    "createdAt": safe_strftime(r.created_at, DATETIME_FORMAT_ISO),
-                    "downloads": r.downloads,
-                    "likes": r.likes_count,
-                    "gated": False,
-                    "tags": [],
-                }
-            )
+        await ensure_repository_heads(rows)
+        repos_list = [_format_repo_list_item(r) for r in rows]
 
         # Sorting already applied by database query
         result[key] = repos_list
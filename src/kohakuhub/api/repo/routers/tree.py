@@ -1,21 +1,38 @@
 """Repository tree listing and path information endpoints - Refactored version."""
 
 import asyncio
+import base64
+import json
+import os
 from datetime import datetime
-from typing import Literal
+from itertools import islice
+from typing import AsyncIterator, Iterator, Literal, Optional
 
-from fastapi import APIRouter, Depends, Form, Request
+from fastapi import APIRouter, Depends, Form, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from kohakuhub.config import cfg
 from kohakuhub.constants import DATETIME_FORMAT_ISO
 from kohakuhub.db import File, Repository, User
-from kohakuhub.db_operations import get_file, get_repository, should_use_lfs
+from kohakuhub.db_operations import (
+    get_files_by_paths,
+    get_repository,
+    should_use_lfs,
+)
 from kohakuhub.logger import get_logger
 from kohakuhub.auth.dependencies import get_optional_user
 from kohakuhub.auth.permissions import check_repo_read_permission
-from kohakuhub.utils.lakefs import get_lakefs_client, lakefs_repo_name
+from kohakuhub.utils.lakefs import (
+    get_lakefs_client,
+    iter_objects_sharded,
+    lakefs_repo_name,
+)
 from kohakuhub.api.fallback import with_repo_fallback
+from kohakuhub.api.repo.utils.manifest import FileManifest, get_revision_manifest
 from kohakuhub.api.repo.utils.hf import (
+    HFErrorCode,
+    hf_error_response,
+    hf_next_page_link,
     hf_repo_not_found,
     hf_revision_not_found,
     hf_server_error,
@@ -28,50 +45,57 @@ router = APIRouter()
 
 RepoType = Literal["model", "dataset", "space"]
 
+# Entries per chunk when streaming unpaginated tree listings
+TREE_STREAM_CHUNK_SIZE = 1000
 
-async def fetch_lakefs_objects(
-    lakefs_repo: str, revision: str, prefix: str, recursive: bool
-) -> list:
-    """Fetch all objects from LakeFS with pagination.
+
+async def fetch_lakefs_page(
+    lakefs_repo: str,
+    revision: str,
+    prefix: str,
+    recursive: bool,
+    after: str = "",
+    amount: int = 1000,
+) -> tuple[list, str | None]:
+    """Fetch one page of objects from LakeFS.
 
     Args:
         lakefs_repo: LakeFS repository name
         revision: Branch or commit
         prefix: Path prefix
         recursive: Whether to list recursively
+        after: LakeFS pagination offset to start after
+        amount: Number of objects to fetch (may span several LakeFS requests)
 
     Returns:
-        List of all LakeFS objects
+        Tuple of (objects, next_after), next_after is None on the last page
 
     Raises:
         Exception: If listing fails
     """
     client = get_lakefs_client()
 
-    all_results = []
-    after = ""
-    has_more = True
-
-    while has_more:
+    results = []
+    while True:
         result = await client.list_objects(
             repository=lakefs_repo,
             ref=revision,
             prefix=prefix,
             delimiter="" if recursive else "/",
-            amount=1000,  # Max per request
+            amount=min(amount - len(results), 1000),  # Max per request
             after=after,
         )
 
-        all_results.extend(result["results"])
+        results.extend(result["results"])
 
         # Check pagination
-        if result.get("pagination") and result["pagination"].get("has_more"):
-            after = result["pagination"]["next_offset"]
-            has_more = True
-        else:
-            has_more = False
+        pagination = result.get("pagination") or {}
+        if not pagination.get("has_more"):
+            return results, None
 
-    return all_results
+        after = pagination["next_offset"]
+        if len(results) >= amount:
+            return results, after
 
 
 async def calculate_folder_stats(
@@ -130,54 +154,106 @@ async def calculate_folder_stats(
     return folder_size, folder_latest_mtime
 
 
-async def convert_file_object(obj, repository: Repository, prefix_len: int) -> dict:
-    """Convert LakeFS file object to HuggingFace format.
+def build_file_object(
+    relative_path: str, size: int, oid: str, mtime: float | None, is_lfs: bool
+) -> dict:
+    """Build HuggingFace formatted file object.
 
     Args:
-        obj: LakeFS object dict
-        repository: Repository object (FK)
-        prefix_len: Length of path prefix to remove
+        relative_path: Path relative to the listed prefix
+        size: File size in bytes
+        oid: Git blob SHA1 for non-LFS, SHA256 for LFS
+        mtime: Last modification time (unix seconds)
+        is_lfs: Whether file is stored in LFS
 
     Returns:
         HuggingFace formatted file object
     """
-    # Use repo-specific LFS settings
-    is_lfs = should_use_lfs(repository, obj["path"], obj["size_bytes"])
-
-    # Remove prefix from path to get relative path
-    relative_path = obj["path"][prefix_len:] if prefix_len else obj["path"]
-
-    # Get correct checksum from database using repository FK
-    file_record = get_file(repository, obj["path"])
-
-    checksum = (
-        file_record.sha256 if file_record and file_record.sha256 else obj["checksum"]
-    )
-
     file_obj = {
         "type": "file",
-        "oid": checksum,  # Git blob SHA1 for non-LFS, SHA256 for LFS
-        "size": obj["size_bytes"],
+        "oid": oid,
+        "size": size,
         "path": relative_path,
     }
 
     # Add last modified info if available
-    if obj.get("mtime"):
-        file_obj["lastModified"] = datetime.fromtimestamp(obj["mtime"]).strftime(
+    if mtime:
+        file_obj["lastModified"] = datetime.fromtimestamp(mtime).strftime(
             DATETIME_FORMAT_ISO
         )
 
     # Add LFS metadata if it's an LFS file
     if is_lfs:
         file_obj["lfs"] = {
-            "oid": checksum,  # SHA256 for LFS files
-            "size": obj["size_bytes"],
+            "oid": oid,  # SHA256 for LFS files
+            "size": size,
             "pointerSize": 134,  # Standard Git LFS pointer size
         }
 
     return file_obj
 
 
+def build_directory_object(
+    relative_path: str, oid: str, size: int, mtime: float | None
+) -> dict:
+    """Build HuggingFace formatted directory object.
+
+    Args:
+        relative_path: Path relative to the listed prefix (may end with "/")
+        oid: Directory oid
+        size: Total size of files under the directory
+        mtime: Latest modification time under the directory (unix seconds)
+
+    Returns:
+        HuggingFace formatted directory object
+    """
+    dir_obj = {
+        "type": "directory",
+        "oid": oid,
+        "size": size,
+        "path": relative_path.rstrip("/"),  # Remove trailing slash
+    }
+
+    if mtime:
+        dir_obj["lastModified"] = datetime.fromtimestamp(mtime).strftime(
+            DATETIME_FORMAT_ISO
+        )
+
+    return dir_obj
+
+
+async def convert_file_object(
+    obj, repository: Repository, prefix_len: int, file_record: dict | None
+) -> dict:
+    """Convert LakeFS file object to HuggingFace format.
+
+    Args:
+        obj: LakeFS object dict
+        repository: Repository object (FK)
+        prefix_len: Length of path prefix to remove
+        file_record: Prefetched File row (see get_files_by_paths), if any
+
+    Returns:
+        HuggingFace formatted file object
+    """
+    # Use repo-specific LFS settings
+    is_lfs = should_use_lfs(repository, obj["path"], obj["size_bytes"])
+
+    # Remove prefix from path to get relative path
+    relative_path = obj["path"][prefix_len:] if prefix_len else obj["path"]
+
+    # Correct checksum comes from the database (git blob SHA1 / LFS SHA256)
+    checksum = (
+        file_record["sha256"]
+        if file_record and file_record["sha256"]
+        else obj["checksum"]
+    )
+
+    return build_file_object(
+        relative_path, obj["size_bytes"], checksum, obj.get("mtime"), is_lfs
+    )
+
+
 async def convert_directory_object(
     obj, lakefs_repo: str, revision: str, prefix_len: int
 ) -> dict:
@@ -200,24 +276,307 @@ async def convert_directory_object(
         lakefs_repo, revision, obj["path"]
     )
 
-    dir_obj = {
+    return build_directory_object(
+        relative_path,
+        obj.get("checksum", ""),
+        folder_size,
+        folder_latest_mtime or obj.get("mtime"),
+    )
+
+
+def iter_manifest_tree(
+    manifest: FileManifest, prefix: str, recursive: bool, after: str = ""
+) -> Iterator[dict]:
+    """Iterate tree entries from a commit manifest (no LakeFS/DB round trips).
+
+    Args:
+        manifest: Commit manifest
+        prefix: Path prefix ("" or ending with "/")
+        recursive: List recursively
+        after: Only return entries sorting after this path (pagination)
+
+    Yields:
+        HuggingFace formatted file/folder objects in path order
+    """
+    prefix_len = len(prefix)
+    entries = (
+        manifest.iter_entries(prefix, after)
+        if recursive
+        else manifest.iter_directory(prefix, after)
+    )
+
+    for entry in entries:
+        relative_path = entry["path"][prefix_len:]
+        match entry["path_type"]:
+            case "object":
+                yield build_file_object(
+                    relative_path,
+                    entry["size_bytes"],
+                    entry["oid"],
+                    entry["mtime"],
+                    entry["lfs"],
+                )
+
+            case "common_prefix":
+                folder_size, folder_latest_mtime = manifest.directory_stats(
+                    entry["path"]
+                )
+                yield build_directory_object(
+                    relative_path, "", folder_size, folder_latest_mtime
+                )
+
+
+async def convert_lakefs_objects(
+    objects: list,
+    repository: Repository,
+    lakefs_repo: str,
+    revision: str,
+    prefix_len: int,
+) -> list[dict]:
+    """Convert a page of LakeFS objects to HuggingFace format.
+
+    Args:
+        objects: LakeFS objects (files and common prefixes)
+        repository: Repository object (FK)
+        lakefs_repo: LakeFS repository name
+        revision: Branch or commit
+        prefix_len: Length of path prefix to remove
+
+    Returns:
+        List of HuggingFace formatted file/folder objects
+    """
+    # Prefetch File rows for the whole page instead of one query per object
+    file_records = get_files_by_paths(
+        repository, [obj["path"] for obj in objects if obj["path_type"] == "object"]
+    )
+
+    result_list = []
+    for obj in objects:
+        match obj["path_type"]:
+            case "object":
+                # File object - pass Repository FK instead of repo_id
+                file_obj = await convert_file_object(
+                    obj, repository, prefix_len, file_records.get(obj["path"])
+                )
+                result_list.append(file_obj)
+
+            case "common_prefix":
+                # Directory object
+                dir_obj = await convert_directory_object(
+                    obj, lakefs_repo, revision, prefix_len
+                )
+                result_list.append(dir_obj)
+
+    return result_list
+
+
+def encode_tree_cursor(after: str) -> str:
+    """Encode a path offset as an opaque, URL-safe tree cursor."""
+    return base64.urlsafe_b64encode(after.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_tree_cursor(cursor: str) -> str:
+    """Decode a tree cursor back to its path offset.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.b64decode(padded, altchars=b"-_", validate=True).decode("utf-8")
+    except ValueError as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def tree_entry_offset(prefix: str, item: dict) -> str:
+    """Path offset (LakeFS `after`) that resumes listing right after item."""
+    if item["type"] == "directory":
+        return f"{prefix}{item['path']}/"
+    return f"{prefix}{item['path']}"
+
+
+async def stream_json_array(pages: AsyncIterator[list[dict]]) -> AsyncIterator[bytes]:
+    """Encode pages of objects as a single JSON array, one page at a time."""
+    separator = "["
+    async for page in pages:
+        if page:
+            yield (separator + ",".join(json.dumps(item) for item in page)).encode()
+            separator = ","
+    yield b"[]" if separator == "[" else b"]"
+
+
+async def manifest_tree_pages(entries: Iterator[dict]) -> AsyncIterator[list[dict]]:
+    """Chunk manifest tree entries into pages for streaming."""
+    while page := list(islice(entries, TREE_STREAM_CHUNK_SIZE)):
+        yield page
+
+
+async def iter_lakefs_tree_objects(
+    lakefs_repo: str, revision: str, prefix: str, recursive: bool
+) -> AsyncIterator[list]:
+    """Iterate a full LakeFS listing in pages, in path order.
+
+    Recursive listings are sharded by directory and listed in parallel
+    (see iter_objects_sharded), single-level listings follow LakeFS pages.
+    """
+    if recursive:
+        async for objects in iter_objects_sharded(lakefs_repo, revision, prefix):
+            for start in range(0, len(objects), TREE_STREAM_CHUNK_SIZE):
+                yield objects[start : start + TREE_STREAM_CHUNK_SIZE]
+        return
+
+    after = ""
+    while after is not None:
+        objects, after = await fetch_lakefs_page(
+            lakefs_repo,
+            revision,
+            prefix,
+            recursive,
+            after=after,
+            amount=TREE_STREAM_CHUNK_SIZE,
+        )
+        yield objects
+
+
+async def lakefs_tree_pages(
+    first_page: list,
+    pages: AsyncIterator[list],
+    repository: Repository,
+    lakefs_repo: str,
+    revision: str,
+    prefix_len: int,
+) -> AsyncIterator[list[dict]]:
+    """Convert the already fetched first LakeFS page, then the remaining pages."""
+    yield await convert_lakefs_objects(
+        first_page, repository, lakefs_repo, revision, prefix_len
+    )
+    async for objects in pages:
+        yield await convert_lakefs_objects(
+            objects, repository, lakefs_repo, revision, prefix_len
+        )
+
+
+def build_paths_info_file(path: str, size: int, oid: str, is_lfs: bool) -> dict:
+    """Build paths-info object for a file.
+
+    Args:
+        path: Path in repository
+        size: File size in bytes
+        oid: Git blob SHA1 for non-LFS, SHA256 for LFS
+        is_lfs: Whether file is stored in LFS
+
+    Returns:
+        HuggingFace formatted paths-info file object
+    """
+    file_info = {
+        "type": "file",
+        "path": path,
+        "size": size,
+        "oid": oid,
+        "lfs": None,
+        "last_commit": None,
+        "security": None,
+    }
+
+    # Add LFS metadata if applicable
+    if is_lfs:
+        file_info["lfs"] = {
+            "oid": oid,  # SHA256 for LFS files
+            "size": size,
+            "pointerSize": 134,
+        }
+
+    return file_info
+
+
+def build_paths_info_directory(path: str, oid: str) -> dict:
+    """Build paths-info object for a directory."""
+    return {
         "type": "directory",
-        "oid": obj.get("checksum", ""),
-        "size": folder_size,
-        "path": relative_path.rstrip("/"),  # Remove trailing slash
+        "path": path,
+        "oid": oid,
+        "tree_id": oid,
+        "last_commit": None,
     }
 
-    # Add last modified info
-    if folder_latest_mtime:
-        dir_obj["lastModified"] = datetime.fromtimestamp(folder_latest_mtime).strftime(
-            DATETIME_FORMAT_ISO
-        )
-    elif obj.get("mtime"):
-        dir_obj["lastModified"] = datetime.fromtimestamp(obj["mtime"]).strftime(
-            DATETIME_FORMAT_ISO
+
+def manifest_paths_info(manifest: FileManifest, paths: list[str]) -> list[dict]:
+    """Answer paths-info from a commit manifest.
+
+    Args:
+        manifest: Commit manifest
+        paths: Requested paths
+
+    Returns:
+        Path information objects for existing paths, in request order
+    """
+    results = []
+    for path in paths:
+        clean_path = path.lstrip("/")
+
+        entry = manifest.get(clean_path)
+        if entry:
+            results.append(
+                build_paths_info_file(
+                    clean_path, entry["size_bytes"], entry["oid"], entry["lfs"]
+                )
+            )
+            continue
+
+        # Not a file - check if it's a directory
+        prefix = clean_path if clean_path.endswith("/") else clean_path + "/"
+        first = next(manifest.iter_entries(prefix), None)
+        if first:
+            results.append(build_paths_info_directory(clean_path, first["checksum"]))
+        # Path doesn't exist, skip it (as per HF behavior)
+
+    return results
+
+
+async def find_directory_entries(
+    lakefs_repo: str, revision: str, wanted: set[str]
+) -> dict[str, dict]:
+    """Look up sibling paths of one directory with a single delimiter listing.
+
+    The listing is narrowed to the longest common prefix of the wanted paths
+    and stops as soon as it has passed the last of them.
+
+    Args:
+        lakefs_repo: LakeFS repository name
+        revision: Branch or commit
+        wanted: Paths (without trailing slash) sharing the same parent directory
+
+    Returns:
+        Mapping of found path to its LakeFS object or common_prefix entry
+    """
+    client = get_lakefs_client()
+
+    prefix = os.path.commonprefix(list(wanted))
+    # Directories are listed as "name/", so that is the largest key to reach
+    last_key = max(path + "/" for path in wanted)
+
+    found = {}
+    after = ""
+    while True:
+        result = await client.list_objects(
+            repository=lakefs_repo,
+            ref=revision,
+            prefix=prefix,
+            delimiter="/",
+            amount=1000,
+            after=after,
         )
 
-    return dir_obj
+        for obj in result["results"]:
+            path = obj["path"].removesuffix("/")
+            if path in wanted:
+                # A file wins over a directory of the same name
+                found.setdefault(path, obj)
+
+        pagination = result.get("pagination") or {}
+        if not pagination.get("has_more") or pagination["next_offset"] >= last_key:
+            return found
+        after = pagination["next_offset"]
 
 
 @router.get("/{repo_type}s/{namespace}/{repo_name}/tree/{revision}{path:path}")
@@ -231,6 +590,8 @@ async def list_repo_tree(
     path: str = "",
     recursive: bool = False,
     expand: bool = False,
+    limit: Optional[int] = Query(None, ge=1, le=10000),
+    cursor: Optional[str] = None,
     fallback: bool = True,
     user: User | None = Depends(get_optional_user),
 ):
@@ -238,6 +599,12 @@ async def list_repo_tree(
 
     Returns a flat list of files and folders in HuggingFace format.
 
+    Pagination follows huggingface_hub: when a page size is in effect
+    (`limit`, or `tree_page_size` in config) and more entries remain, the
+    response carries a `Link: <...>; rel="next"` header whose URL holds
+    an opaque `cursor`. Without a page size the whole listing is streamed
+    as a JSON array, one page at a time, so memory stays bounded.
+
     Args:
         repo_type: Type of repository
         namespace: Repository namespace
@@ -246,6 +613,8 @@ async def list_repo_tree(
         path: Path within repository (default: root)
         recursive: List recursively (default: False)
         expand: Include detailed metadata (default: False)
+        limit: Page size (default: tree_page_size, unpaginated if 0)
+        cursor: Pagination cursor from a previous `Link` header
         user: Current authenticated user (optional)
 
     Returns:
@@ -270,11 +639,65 @@ async def list_repo_tree(
     if prefix and not prefix.endswith("/"):
         prefix += "/"
 
-    # Fetch all objects from LakeFS
+    # Cursor maps onto the LakeFS `after` offset
+    after = ""
+    if cursor:
+        try:
+            after = decode_tree_cursor(cursor)
+        except ValueError as e:
+            return hf_error_response(400, HFErrorCode.BAD_REQUEST, str(e))
+
+    page_size = (
+        limit or cfg.app.tree_page_size or (TREE_STREAM_CHUNK_SIZE if cursor else 0)
+    )
+
+    # Serve from the commit manifest when it can be materialized
     try:
-        all_results = await fetch_lakefs_objects(
-            lakefs_repo, revision, prefix, recursive
+        manifest = await get_revision_manifest(repo_row, lakefs_repo, revision)
+    except Exception as e:
+        if is_lakefs_not_found_error(e):
+            return hf_revision_not_found(repo_id, revision)
+        logger.exception(f"Failed to load manifest for {repo_id}", e)
+        return hf_server_error(f"Failed to list objects: {str(e)}")
+
+    if manifest is not None:
+        entries = iter_manifest_tree(manifest, prefix, recursive, after)
+        if not page_size:
+            return StreamingResponse(
+                stream_json_array(manifest_tree_pages(entries)),
+                media_type="application/json",
+            )
+
+        result_list = list(islice(entries, page_size + 1))
+        if len(result_list) <= page_size:
+            return result_list
+
+        result_list = result_list[:page_size]
+        return JSONResponse(
+            content=result_list,
+            headers={
+                "Link": hf_next_page_link(
+                    request,
+                    encode_tree_cursor(tree_entry_offset(prefix, result_list[-1])),
+                )
+            },
         )
+
+    # Commit too large for a manifest - list from LakeFS page by page
+    try:
+        if page_size:
+            objects, next_after = await fetch_lakefs_page(
+                lakefs_repo,
+                revision,
+                prefix,
+                recursive,
+                after=after,
+                amount=page_size,
+            )
+        else:
+            # Fetch the first page eagerly so errors are reported before streaming
+            pages = iter_lakefs_tree_objects(lakefs_repo, revision, prefix, recursive)
+            objects = await anext(pages, [])
     except Exception as e:
         # Check for specific error types
         if is_lakefs_not_found_error(e):
@@ -288,25 +711,27 @@ async def list_repo_tree(
         logger.exception(f"Failed to list objects for {repo_id}", e)
         return hf_server_error(f"Failed to list objects: {str(e)}")
 
-    # Convert LakeFS objects to HuggingFace format
-    result_list = []
-    prefix_len = len(prefix)
-
-    for obj in all_results:
-        match obj["path_type"]:
-            case "object":
-                # File object - pass Repository FK instead of repo_id
-                file_obj = await convert_file_object(obj, repo_row, prefix_len)
-                result_list.append(file_obj)
-
-            case "common_prefix":
-                # Directory object
-                dir_obj = await convert_directory_object(
-                    obj, lakefs_repo, revision, prefix_len
+    if not page_size:
+        return StreamingResponse(
+            stream_json_array(
+                lakefs_tree_pages(
+                    objects, pages, repo_row, lakefs_repo, revision, len(prefix)
                 )
-                result_list.append(dir_obj)
+            ),
+            media_type="application/json",
+        )
 
-    return result_list
+    # Convert LakeFS objects to HuggingFace format
+    result_list = await convert_lakefs_objects(
+        objects, repo_row, lakefs_repo, revision, len(prefix)
+    )
+    if next_after is None:
+        return result_list
+
+    return JSONResponse(
+        content=result_list,
+        headers={"Link": hf_next_page_link(request, encode_tree_cursor(next_after))},
+    )
 
 
 @router.post("/{repo_type}s/{namespace}/{repo_name}/paths-info/{revision}")
@@ -352,93 +777,79 @@ async def get_paths_info(
 
     lakefs_repo = lakefs_repo_name(repo_type, repo_id)
 
-    # Helper function to process a single path
-    async def process_path(path: str) -> dict | None:
-        """Process single path and return its info, or None if path doesn't exist."""
-        clean_path = path.lstrip("/")
+    try:
+        manifest = await get_revision_manifest(repo_row, lakefs_repo, revision)
+    except Exception as e:
+        logger.debug(f"No manifest for {repo_id}@{revision}: {str(e)}")
+        manifest = None
+
+    if manifest is not None:
+        return manifest_paths_info(manifest, paths)
+
+    clean_paths = [path.lstrip("/") for path in paths]
+
+    # Group requested paths by parent directory
+    groups: dict[str, set[str]] = {}
+    for clean_path in clean_paths:
+        entry_path = clean_path.rstrip("/")
+        if entry_path:
+            parent = entry_path.rpartition("/")[0]
+            groups.setdefault(parent, set()).add(entry_path)
+
+    # One delimiter listing per directory, with bounded LakeFS concurrency
+    semaphore = asyncio.Semaphore(max(cfg.lakefs.list_concurrency, 1))
+
+    async def probe_directory(wanted: set[str]) -> dict[str, dict]:
+        async with semaphore:
+            try:
+                return await find_directory_entries(lakefs_repo, revision, wanted)
+            except Exception as e:
+                # Paths that can't be listed are skipped (as per HF behavior)
+                logger.debug(f"Failed to probe paths in {repo_id}: {str(e)}")
+                return {}
+
+    found = {}
+    for entries in await asyncio.gather(
+        *[probe_directory(wanted) for wanted in groups.values()]
+    ):
+        found.update(entries)
+
+    # Get correct checksums for all found files in one batch
+    file_records = get_files_by_paths(
+        repo_row,
+        [path for path, obj in found.items() if obj["path_type"] == "object"],
+    )
 
-        try:
-            # Try to get object stats
-            client = get_lakefs_client()
-            obj_stats = await client.stat_object(
-                repository=lakefs_repo,
-                ref=revision,
-                path=clean_path,
+    # Build results in request order
+    results = []
+    for clean_path in clean_paths:
+        obj = found.get(clean_path.rstrip("/"))
+        if obj is None:
+            # Path doesn't exist, skip it (as per HF behavior)
+            continue
+
+        if obj["path_type"] == "common_prefix":
+            results.append(
+                build_paths_info_directory(clean_path, obj.get("checksum") or "")
             )
+            continue
 
-            # It's a file - use repo-specific LFS settings
-            is_lfs = should_use_lfs(repo_row, clean_path, obj_stats["size_bytes"])
+        if clean_path.endswith("/"):
+            # A file was requested as a directory
+            continue
 
-            # Get correct checksum from database using repository FK
-            file_record = get_file(repo_row, clean_path)
+        # It's a file - use repo-specific LFS settings
+        is_lfs = should_use_lfs(repo_row, clean_path, obj["size_bytes"])
 
-            checksum = (
-                file_record.sha256
-                if file_record and file_record.sha256
-                else obj_stats["checksum"]
-            )
+        file_record = file_records.get(clean_path)
+        checksum = (
+            file_record["sha256"]
+            if file_record and file_record["sha256"]
+            else obj["checksum"]
+        )
+
+        results.append(
+            build_paths_info_file(clean_path, obj["size_bytes"], checksum, is_lfs)
+        )
 
-            file_info = {
-                "type": "file",
-                "path": clean_path,
-                "size": obj_stats["size_bytes"],
-                "oid": checksum,  # Git blob SHA1 for non-LFS, SHA256 for LFS
-                "lfs": None,
-                "last_commit": None,
-                "security": None,
-            }
-
-            # Add LFS metadata if applicable
-            if is_lfs:
-                file_info["lfs"] = {
-                    "oid": checksum,  # SHA256 for LFS files
-                    "size": obj_stats["size_bytes"],
-                    "pointerSize": 134,
-                }
-
-            return file_info
-
-        except Exception as e:
-            # Check if it might be a directory by trying to list with prefix
-            if is_lakefs_not_found_error(e):
-                try:
-                    # Try to list objects with this path as prefix
-                    client = get_lakefs_client()
-                    prefix = (
-                        clean_path if clean_path.endswith("/") else clean_path + "/"
-                    )
-                    list_result = await client.list_objects(
-                        repository=lakefs_repo,
-                        ref=revision,
-                        prefix=prefix,
-                        amount=1,  # Just check if any objects exist
-                    )
-
-                    # If we get results, it's a directory
-                    if list_result["results"]:
-                        # Try to get an oid from the first result if available
-                        oid = ""
-                        if list_result["results"]:
-                            oid = list_result["results"][0].get("checksum", "")
-
-                        return {
-                            "type": "directory",
-                            "path": clean_path,
-                            "oid": oid,
-                            "tree_id": oid,
-                            "last_commit": None,
-                        }
-                    # Path doesn't exist, return None
-                    return None
-                except Exception as ex:
-                    # Path doesn't exist, skip it (as per HF behavior)
-                    logger.debug(f"Path {clean_path} doesn't exist or is invalid")
-                    return None
-            # For other errors, also return None
-            return None
-
-    # Process all paths in parallel
-    results = await asyncio.gather(*[process_path(path) for path in paths])
-
-    # Filter out None values (paths that don't exist)
-    return [r for r in results if r is not None]
+    return results
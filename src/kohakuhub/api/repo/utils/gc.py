@@ -8,13 +8,16 @@ from kohakuhub.config import cfg
 from kohakuhub.db import File, LFSObjectHistory, Repository
 from kohakuhub.db_operations import (
     create_lfs_history,
+    delete_lfs_verification,
     get_effective_lfs_keep_versions,
     get_repository,
     should_use_lfs,
 )
 from kohakuhub.logger import get_logger
-from kohakuhub.utils.lakefs import get_lakefs_client
+from kohakuhub.utils.lakefs import get_lakefs_client, list_all_objects
 from kohakuhub.utils.s3 import delete_objects_with_prefix, get_s3_client, object_exists
+from kohakuhub.api.git.utils.lakefs_bridge import create_lfs_pointer_blob
+from kohakuhub.api.git.utils.object_store import delete_object_store
 
 logger = get_logger("GC")
 
@@ -182,6 +185,7 @@ def cleanup_lfs_object(sha256: str, repo: Optional[Repository] = None) -> bool:
         s3_client.delete_object(Bucket=cfg.s3.bucket, Key=lfs_key)
 
         logger.success(f"Deleted LFS object from S3: {lfs_key}")
+        delete_lfs_verification(sha256)
 
         # Remove from history table using repository FK
         if repo:
@@ -472,29 +476,10 @@ async def sync_file_table_with_commit(
         commit_id = branch_info["commit_id"]
 
         # Get ALL objects at the commit (use commit ID to avoid staging issues)
-        # LakeFS has max amount=1000, so we need to paginate
-        all_objects = []
-        after = ""
-        has_more = True
-
-        while has_more:
-            list_result = await client.list_objects(
-                repository=lakefs_repo,
-                ref=commit_id,  # Use commit ID, not branch name!
-                amount=1000,  # LakeFS maximum
-                after=after,
-            )
-
-            results = list_result.get("results", [])
-            all_objects.extend(results)
+        # Directory shards are listed in parallel and merged in path order
+        all_objects = await list_all_objects(lakefs_repo, commit_id)
 
-            # Check pagination
-            pagination = list_result.get("pagination", {})
-            has_more = pagination.get("has_more", False)
-            if has_more:
-                after = pagination.get("next_offset", "")
-
-        logger.info(f"Paginated through LakeFS, got {len(all_objects)} total objects")
+        logger.info(f"Listed LakeFS commit, got {len(all_objects)} total objects")
         logger.info(
             f"Syncing {len(all_objects)} file(s) from ref {ref} (commit {commit_id[:8]})"
         )
@@ -530,12 +515,17 @@ async def sync_file_table_with_commit(
             )
 
             # Update File table using repository FK
+            pointer_sha1, pointer = (
+                create_lfs_pointer_blob(sha256, size_bytes) if is_lfs else (None, None)
+            )
             File.insert(
                 repository=repo,
                 path_in_repo=path,
                 size=size_bytes,
                 sha256=sha256,
                 lfs=is_lfs,
+                lfs_pointer_sha1=pointer_sha1,
+                lfs_pointer=pointer,
                 is_deleted=False,
                 owner=repo.owner,  # Denormalized owner
             ).on_conflict(
@@ -544,6 +534,8 @@ async def sync_file_table_with_commit(
                     File.sha256: sha256,
                     File.size: size_bytes,
                     File.lfs: is_lfs,
+                    File.lfs_pointer_sha1: pointer_sha1,
+                    File.lfs_pointer: pointer,
                     File.is_deleted: False,  # File is active
                     File.updated_at: datetime.now(timezone.utc),
                 },
@@ -634,6 +626,11 @@ async def cleanup_repository_storage(
         f"Deleted {repo_objects_deleted} repository object(s) from S3 prefix: {repo_prefix}"
     )
 
+    # Git objects mirrored by the git bridge (index rows go with the repository)
+    git_objects_deleted = await delete_object_store(repo)
+    if git_objects_deleted:
+        logger.info(f"Deleted {git_objects_deleted} git object store file(s)")
+
     # 2. Clean up LFS objects that were only used by this repository
     # Get all LFS objects ever used by this repository using backref
     lfs_objects = list(repo.lfs_history.select(LFSObjectHistory.sha256).distinct())
@@ -779,12 +776,19 @@ async def track_commit_lfs_objects(
                     logger.debug(f"Tracked LFS object: {path} ({sha256[:8]})")
 
                 # Update File table for BOTH LFS and regular files using repository FK
+                pointer_sha1, pointer = (
+                    create_lfs_pointer_blob(sha256, size_bytes)
+                    if is_lfs
+                    else (None, None)
+                )
                 File.insert(
                     repository=repo,
                     path_in_repo=path,
                     size=size_bytes,
                     sha256=sha256,
                     lfs=is_lfs,
+                    lfs_pointer_sha1=pointer_sha1,
+                    lfs_pointer=pointer,
                     is_deleted=False,
                     owner=repo.owner,  # Denormalized owner
                 ).on_conflict(
@@ -793,6 +797,8 @@ async def track_commit_lfs_objects(
                         File.sha256: sha256,
                         File.size: size_bytes,
                         File.lfs: is_lfs,
+                        File.lfs_pointer_sha1: pointer_sha1,
+                        File.lfs_pointer: pointer,
                         File.is_deleted: False,  # File is active
                         File.updated_at: datetime.now(timezone.utc),
                     },
@@ -0,0 +1,76 @@
+"""Denormalized main branch head (commit ID and last modified) on Repository.
+
+List endpoints read Repository.head_commit_id / last_modified instead of
+asking LakeFS for every row. The columns are written by every path that
+moves main (commit, merge, revert, reset, repo creation) and filled lazily
+for rows that have never been synced.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+from kohakuhub.config import cfg
+from kohakuhub.db import Repository
+from kohakuhub.db_operations import update_repository_head
+from kohakuhub.logger import get_logger
+from kohakuhub.utils.lakefs import get_lakefs_client, lakefs_repo_name
+
+logger = get_logger("REPO")
+
+HEAD_BRANCH = "main"
+
+
+async def sync_repository_head(
+    repository: Repository,
+    lakefs_repo: str,
+    branch: str = HEAD_BRANCH,
+    commit: dict | None = None,
+) -> None:
+    """Store the main branch head on the Repository row after a write.
+
+    Never raises: a failed sync only leaves the columns stale.
+
+    Args:
+        repository: Repository object (FK)
+        lakefs_repo: LakeFS repository name
+        branch: Branch that was written to (no-op unless it is main)
+        commit: LakeFS commit dict if already at hand (saves two LakeFS calls)
+    """
+    if branch != HEAD_BRANCH:
+        return
+
+    try:
+        if commit is None:
+            client = get_lakefs_client()
+            branch_info = await client.get_branch(
+                repository=lakefs_repo, branch=HEAD_BRANCH
+            )
+            commit = await client.get_commit(
+                repository=lakefs_repo, commit_id=branch_info["commit_id"]
+            )
+
+        update_repository_head(
+            repository,
+            commit["id"],
+            datetime.fromtimestamp(commit["creation_date"], tz=timezone.utc),
+        )
+    except Exception as e:
+        logger.warning(f"Failed to update head of {repository.full_id}: {e}")
+
+
+async def ensure_repository_heads(repositories: list[Repository]) -> None:
+    """Fill head columns for rows that were never synced (bounded concurrency)."""
+    missing = [repo for repo in repositories if repo.head_commit_id is None]
+    if not missing:
+        return
+
+    semaphore = asyncio.Semaphore(max(cfg.lakefs.list_concurrency, 1))
+
+    async def sync(repository: Repository):
+        async with semaphore:
+            await sync_repository_head(
+                repository,
+                lakefs_repo_name(repository.repo_type, repository.full_id),
+            )
+
+    await asyncio.gather(*[sync(repo) for repo in missing])
@@ -5,6 +5,7 @@ This module provides utilities for making Kohaku Hub compatible with HuggingFace
 
 from typing import Optional
 
+from fastapi import Request
 from fastapi.responses import Response
 
 
@@ -249,6 +250,25 @@ def format_hf_datetime(dt) -> Optional[str]:
     return safe_strftime(dt, "%Y-%m-%dT%H:%M:%S.%fZ")
 
 
+def hf_next_page_link(request: Request, cursor: str) -> str:
+    """Build a `Link` header value pointing to the next page of a listing.
+
+    huggingface_hub follows `Link: <url>; rel="next"` until it is absent.
+
+    Args:
+        request: Current request (path and query params are preserved)
+        cursor: Opaque cursor for the next page
+
+    Returns:
+        Header value like '<https://hub/api/models?cursor=...>; rel="next"'
+    """
+    # Import here to avoid circular dependency
+    from kohakuhub.config import cfg
+
+    url = request.url.include_query_params(cursor=cursor)
+    return f'<{cfg.app.base_url}{url.path}?{url.query}>; rel="next"'
+
+
 def is_lakefs_not_found_error(error: Exception) -> bool:
     """Check if an exception is a LakeFS not found error.
 
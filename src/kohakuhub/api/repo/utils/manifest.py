@@ -0,0 +1,437 @@
+"""Materialized per-commit file manifests.
+
+A manifest is the full recursive listing of one LakeFS commit, joined once
+with the File table so every entry already carries its HuggingFace oid
+(git blob SHA1 for regular files, SHA256 for LFS files), LFS flag and, for
+LFS files, the SHA-1 of the git pointer blob.
+
+Manifests are stored in the CommitManifest table as zlib-compressed columnar
+JSON (one list per field, rows sorted by path):
+
+    {"version": 2, "path": [...], "size": [...], "oid": [...],
+     "checksum": [...], "lfs": [...], "mtime": [...], "address": [...],
+     "content_type": [...], "pointer": [...]}
+
+Version 1 manifests have no pointer column; it reads as all None.
+
+Commits are immutable, so a manifest never needs invalidation. They are
+materialized in the background right after a commit, and lazily (on first
+read) for commits made before manifests existed.
+
+File rows describe the branch head, so they are only joined in when the
+manifest of a fresh commit is built (schedule_manifest_build). Backfilled
+manifests of older commits take the oid of regular files from the git blob
+SHA-1 mapping (by physical address), falling back to the LakeFS checksum.
+Pointer SHA-1s are only taken from File rows whose content matches the
+entry; elsewhere they are None and the git bridge hashes the pointer.
+"""
+
+import asyncio
+import json
+import zlib
+from bisect import bisect_left, bisect_right
+from typing import Iterator
+
+from cachetools import LRUCache
+
+from kohakuhub.config import cfg
+from kohakuhub.db import Repository
+from kohakuhub.db_operations import (
+    get_commit_manifest,
+    get_files_by_paths,
+    get_git_blob_sha1s,
+    save_commit_manifest,
+    should_use_lfs,
+)
+from kohakuhub.logger import get_logger
+from kohakuhub.utils.lakefs import get_lakefs_client, iter_objects_sharded
+from kohakuhub.api.repo.utils.hf import is_lakefs_not_found_error
+
+logger = get_logger("MANIFEST")
+
+MANIFEST_VERSION = 2
+MANIFEST_COLUMNS = (
+    "path",
+    "size",
+    "oid",
+    "checksum",
+    "lfs",
+    "mtime",
+    "address",
+    "content_type",
+    "pointer",
+)
+# Columns added after version 1, None for every entry of older manifests
+OPTIONAL_COLUMNS = ("pointer",)
+
+# Marker for commits that exceed manifest_max_files (served from LakeFS)
+_TOO_LARGE = object()
+
+# Decoded manifests keyed by (repository id, commit id)
+_manifest_cache = LRUCache(maxsize=max(cfg.app.manifest_cache_size, 1))
+# In-flight loads keyed like the cache, awaited by every concurrent reader
+_loading: dict[tuple[int, str], asyncio.Task] = {}
+_background_builds: set[asyncio.Task] = set()
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string starting with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def lfs_oid_from_address(physical_address: str) -> str | None:
+    """Extract SHA256 from a global LFS physical address.
+
+    LFS objects are linked at s3://{bucket}/lfs/{sha[:2]}/{sha[2:4]}/{sha},
+    so the address itself identifies the content, even for old commits.
+    """
+    if not physical_address or not physical_address.startswith("s3://"):
+        return None
+
+    key = physical_address.split("/", 3)[-1]
+    parts = key.split("/")
+    if len(parts) == 4 and parts[0] == "lfs" and len(parts[3]) == 64:
+        return parts[3]
+    return None
+
+
+class FileManifest:
+    """Decoded manifest of a single commit with prefix queries over sorted paths."""
+
+    def __init__(self, commit_id: str, columns: dict[str, list]):
+        self.commit_id = commit_id
+        self.columns = columns
+        self.paths: list[str] = columns["path"]
+        self._index: dict[str, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    @property
+    def total_size(self) -> int:
+        return sum(self.columns["size"])
+
+    def entry(self, i: int) -> dict:
+        """Return row i in LakeFS ObjectStats shape (plus oid, lfs and pointer_sha1)."""
+        c = self.columns
+        return {
+            "path_type": "object",
+            "path": c["path"][i],
+            "size_bytes": c["size"][i],
+            "checksum": c["checksum"][i],
+            "mtime": c["mtime"][i],
+            "physical_address": c["address"][i],
+            "content_type": c["content_type"][i],
+            "oid": c["oid"][i],
+            "lfs": bool(c["lfs"][i]),
+            "pointer_sha1": c["pointer"][i],
+        }
+
+    def get(self, path: str) -> dict | None:
+        """Get file entry by exact path."""
+        if self._index is None:
+            self._index = {p: i for i, p in enumerate(self.paths)}
+        i = self._index.get(path)
+        return self.entry(i) if i is not None else None
+
+    def _range(self, prefix: str) -> tuple[int, int]:
+        if not prefix:
+            return 0, len(self.paths)
+        lo = bisect_left(self.paths, prefix)
+        hi = bisect_left(self.paths, _prefix_upper_bound(prefix), lo)
+        return lo, hi
+
+    def has_prefix(self, prefix: str) -> bool:
+        """Check whether any file lives under prefix."""
+        lo, hi = self._range(prefix)
+        return lo < hi
+
+    def _skip_after(self, lo: int, hi: int, after: str) -> int:
+        """First index in [lo, hi) that sorts after a pagination cursor.
+
+        A cursor ending with "/" is a directory entry, so everything under
+        it is skipped as well.
+        """
+        if not after:
+            return lo
+        if after.endswith("/"):
+            return max(lo, bisect_left(self.paths, _prefix_upper_bound(after), lo, hi))
+        return max(lo, bisect_right(self.paths, after, lo, hi))
+
+    def iter_entries(self, prefix: str = "", after: str = "") -> Iterator[dict]:
+        """Iterate file entries under prefix in path order.
+
+        Args:
+            prefix: Path prefix
+            after: Only return entries sorting after this path (pagination)
+        """
+        lo, hi = self._range(prefix)
+        for i in range(self._skip_after(lo, hi, after), hi):
+            yield self.entry(i)
+
+    def iter_directory(self, prefix: str, after: str = "") -> Iterator[dict]:
+        """Iterate one directory level, matching LakeFS delimiter="/" semantics.
+
+        Args:
+            prefix: Directory prefix ("" for root, otherwise ending with "/")
+            after: Only return entries sorting after this path (pagination)
+
+        Yields:
+            File entries and {"path_type": "common_prefix", "path": ...} dicts
+            in path order
+        """
+        lo, hi = self._range(prefix)
+        prefix_len = len(prefix)
+        i = self._skip_after(lo, hi, after)
+        while i < hi:
+            path = self.paths[i]
+            slash = path.find("/", prefix_len)
+            if slash == -1:
+                yield self.entry(i)
+                i += 1
+                continue
+
+            dir_path = path[: slash + 1]
+            yield {"path_type": "common_prefix", "path": dir_path}
+            # Skip everything under this directory
+            i = bisect_left(self.paths, _prefix_upper_bound(dir_path), i, hi)
+
+    def directory_stats(self, prefix: str) -> tuple[int, float | None]:
+        """Total size and latest mtime of all files under prefix."""
+        lo, hi = self._range(prefix)
+        sizes = self.columns["size"]
+        mtimes = self.columns["mtime"]
+        total_size = sum(sizes[lo:hi])
+        latest_mtime = max((m for m in mtimes[lo:hi] if m), default=None)
+        return total_size, latest_mtime
+
+    def to_bytes(self) -> bytes:
+        document = {"version": MANIFEST_VERSION, **self.columns}
+        return zlib.compress(
+            json.dumps(document, separators=(",", ":")).encode("utf-8")
+        )
+
+    @classmethod
+    def from_bytes(cls, commit_id: str, data: bytes) -> "FileManifest":
+        document = json.loads(zlib.decompress(data))
+        count = len(document["path"])
+        return cls(
+            commit_id,
+            {
+                name: (
+                    document[name]
+                    if name in document or name not in OPTIONAL_COLUMNS
+                    else [None] * count
+                )
+                for name in MANIFEST_COLUMNS
+            },
+        )
+
+
+async def build_commit_manifest(
+    repository: Repository,
+    lakefs_repo: str,
+    commit_id: str,
+    use_file_rows: bool = False,
+) -> FileManifest | None:
+    """List a commit from LakeFS and join it with the File table.
+
+    Args:
+        repository: Repository object (FK)
+        lakefs_repo: LakeFS repository name
+        commit_id: LakeFS commit ID
+        use_file_rows: Take oids and LFS flags from File rows; only valid for
+            the commit that just wrote them (File rows follow the branch head)
+
+    Returns:
+        FileManifest, or None if the commit has more than manifest_max_files files
+    """
+    objects = []
+    records = {}
+
+    # Shards arrive in path order, listed in parallel
+    async for batch in iter_objects_sharded(lakefs_repo, commit_id):
+        objects.extend(batch)
+        if use_file_rows:
+            # One batched File lookup per shard instead of one query per object
+            records.update(
+                get_files_by_paths(repository, [obj["path"] for obj in batch])
+            )
+
+        if len(objects) > cfg.app.manifest_max_files:
+            logger.info(
+                f"Commit {commit_id[:8]} of {lakefs_repo} has more than "
+                f"{cfg.app.manifest_max_files} files, not materializing manifest"
+            )
+            return None
+
+    # Git blob SHA-1s hashed from the content before, valid for any commit
+    blob_sha1s = (
+        {}
+        if use_file_rows
+        else get_git_blob_sha1s([obj.get("physical_address") for obj in objects])
+    )
+
+    columns = {name: [] for name in MANIFEST_COLUMNS}
+    for obj in objects:
+        path = obj["path"]
+        size = obj.get("size_bytes") or 0
+        address = obj.get("physical_address", "")
+        checksum = obj.get("checksum", "")
+
+        lfs_oid = lfs_oid_from_address(address)
+        record = records.get(path)
+        if lfs_oid:
+            oid, is_lfs = lfs_oid, True
+        elif record and record["sha256"] and record["size"] == size:
+            oid, is_lfs = record["sha256"], record["lfs"]
+        elif address in blob_sha1s:
+            oid, is_lfs = blob_sha1s[address], False
+        else:
+            oid, is_lfs = checksum, should_use_lfs(repository, path, size)
+
+        # Pointer stored with the File row, if the row has this very content
+        pointer = (
+            record["lfs_pointer_sha1"]
+            if is_lfs
+            and record
+            and record["lfs"]
+            and record["sha256"] == oid
+            and record["size"] == size
+            else None
+        )
+
+        columns["path"].append(path)
+        columns["size"].append(size)
+        columns["oid"].append(oid)
+        columns["checksum"].append(checksum)
+        columns["lfs"].append(1 if is_lfs else 0)
+        columns["mtime"].append(obj.get("mtime"))
+        columns["address"].append(address)
+        columns["content_type"].append(obj.get("content_type"))
+        columns["pointer"].append(pointer)
+
+    return FileManifest(commit_id, columns)
+
+
+async def _load_manifest(
+    repository: Repository, lakefs_repo: str, commit_id: str, use_file_rows: bool
+) -> FileManifest | None:
+    """Read a manifest from the DB, or build and store it."""
+    key = (repository.id, commit_id)
+    row = get_commit_manifest(repository, commit_id)
+    if row:
+        manifest = FileManifest.from_bytes(commit_id, bytes(row.entries))
+    else:
+        manifest = await build_commit_manifest(
+            repository, lakefs_repo, commit_id, use_file_rows=use_file_rows
+        )
+        if manifest is None:
+            _manifest_cache[key] = _TOO_LARGE
+            return None
+
+        save_commit_manifest(
+            repository=repository,
+            commit_id=commit_id,
+            file_count=len(manifest),
+            total_size=manifest.total_size,
+            entries=manifest.to_bytes(),
+        )
+        logger.debug(
+            f"Materialized manifest for {lakefs_repo}@{commit_id[:8]} "
+            f"({len(manifest)} files)"
+        )
+
+    _manifest_cache[key] = manifest
+    return manifest
+
+
+def _start_load(
+    repository: Repository,
+    lakefs_repo: str,
+    commit_id: str,
+    use_file_rows: bool = False,
+) -> asyncio.Task:
+    """Get the in-flight load of a manifest, starting one if there is none."""
+    key = (repository.id, commit_id)
+    task = _loading.get(key)
+    if task is None:
+        task = asyncio.create_task(
+            _load_manifest(repository, lakefs_repo, commit_id, use_file_rows)
+        )
+        _loading[key] = task
+        task.add_done_callback(lambda _: _loading.pop(key, None))
+    return task
+
+
+async def get_manifest(
+    repository: Repository, lakefs_repo: str, commit_id: str
+) -> FileManifest | None:
+    """Get manifest for a commit: memory cache, then DB, then build and store.
+
+    Concurrent requests for the same commit share one load.
+
+    Returns:
+        FileManifest, or None if the commit is too large to materialize
+    """
+    key = (repository.id, commit_id)
+    cached = _manifest_cache.get(key)
+    if cached is not None:
+        return None if cached is _TOO_LARGE else cached
+
+    # Shielded: a cancelled request doesn't cancel the load other requests wait for
+    return await asyncio.shield(_start_load(repository, lakefs_repo, commit_id))
+
+
+async def resolve_commit_id(lakefs_repo: str, revision: str) -> str:
+    """Resolve branch name, tag or commit ID to a LakeFS commit ID.
+
+    Raises:
+        Exception: LakeFS error if the revision does not exist
+    """
+    client = get_lakefs_client()
+    try:
+        branch = await client.get_branch(repository=lakefs_repo, branch=revision)
+        return branch["commit_id"]
+    except Exception as e:
+        if not is_lakefs_not_found_error(e):
+            raise
+
+    commit = await client.get_commit(repository=lakefs_repo, commit_id=revision)
+    return commit["id"]
+
+
+async def get_revision_manifest(
+    repository: Repository, lakefs_repo: str, revision: str
+) -> FileManifest | None:
+    """Resolve revision and get its manifest.
+
+    Raises:
+        Exception: LakeFS error if the revision does not exist
+    """
+    commit_id = await resolve_commit_id(lakefs_repo, revision)
+    return await get_manifest(repository, lakefs_repo, commit_id)
+
+
+def schedule_manifest_build(
+    repository: Repository, lakefs_repo: str, commit_id: str
+) -> None:
+    """Materialize a fresh commit's manifest in the background.
+
+    Must be called right after the commit, while the File rows still
+    describe it. The load is registered before returning, so readers of the
+    new commit wait for it instead of backfilling without File rows.
+    """
+    load = _start_load(repository, lakefs_repo, commit_id, use_file_rows=True)
+
+    async def _build():
+        try:
+            await load
+        except Exception as e:
+            logger.warning(
+                f"Failed to materialize manifest for {lakefs_repo}@{commit_id[:8]}: {e}"
+            )
+
+    task = asyncio.create_task(_build())
+    _background_builds.add(task)
+    task.add_done_callback(_background_builds.discard)
@@ -21,6 +21,7 @@ from kohakuhub.db_operations import (
 )
 from kohakuhub.logger import get_logger
 from kohakuhub.api.fallback import with_user_fallback
+from kohakuhub.api.git.utils.repo_cache import invalidate_repo_resolution
 from kohakuhub.api.quota.util import calculate_repository_storage, check_quota
 from kohakuhub.api.repo.utils.hf import hf_repo_not_found
 from kohakuhub.auth.dependencies import get_current_user
@@ -417,6 +418,7 @@ async def update_repo_settings(
     # Apply all updates if there are any
     if update_fields:
         update_repository(repo_row, **update_fields)
+        invalidate_repo_resolution(repo_row.namespace, repo_row.name)
 
     # Note: gated functionality not yet implemented in database schema
     # Would require adding a 'gated' field to Repository model
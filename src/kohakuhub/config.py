@@ -26,6 +26,8 @@ class LakeFSConfig(BaseModel):
     access_key: str = "test-access-key"
     secret_key: str = "test-secret-key"
     repo_namespace: str = "hf"
+    list_concurrency: int = 8  # Parallel shard listings for recursive listings
+    list_shard_depth: int = 1  # Directory levels used to shard recursive listings
 
 
 class SMTPConfig(BaseModel):
@@ -96,9 +98,49 @@ class AppConfig(BaseModel):
     lfs_multipart_chunk_size_bytes: int = (
         50 * 1000 * 1000
     )  # 50 MB - size of each part (S3 minimum is 5MB except last part)
+    lfs_multipart_session_ttl_seconds: int = (
+        7 * 86400
+    )  # Idle multipart uploads are resumable this long, then aborted
     # LFS Garbage Collection settings
     lfs_keep_versions: int = 5  # Keep last K versions of each file
     lfs_auto_gc: bool = False  # Auto-delete old LFS objects on commit
+    # LFS content verification (uploads are hashed before dedup trusts them)
+    lfs_verify_enabled: bool = True
+    lfs_verify_concurrency: int = 4  # Objects hashed at once per worker
+    # Commit manifest settings (materialized per-commit file listings)
+    manifest_max_files: int = (
+        500000  # Commits with more files are served from LakeFS listings directly
+    )
+    manifest_cache_size: int = 64  # Decoded manifests kept in memory per worker
+    siblings_cache_size: int = (
+        1000000  # Total repo info siblings cached in memory per worker
+    )
+    tree_page_size: int = 0  # Default tree page size (0 = stream full listing)
+    # Git pack cache (prebuilt full-clone packs per commit)
+    git_pack_cache_backend: str = "local"  # "local", "s3", or "" to disable
+    git_pack_cache_dir: str = "cache/git-packs/"  # Used by the "local" backend
+    git_pack_cache_max_bytes: int = 10 * 1000 * 1000 * 1000  # 10 GB
+    git_history_max_commits: int = 1000  # Older LakeFS history is cut off in git
+    # Unmapped commits a ref advertisement maps itself, more are mapped in the
+    # background while the newest mapped ancestor is advertised
+    git_history_inline_commits: int = 50
+    git_repo_cache_ttl_seconds: int = 30  # Git/LFS URL → repository cache (0 = off)
+    # Git object store (objects mirrored into S3, so clones skip LakeFS)
+    git_object_store_enabled: bool = True
+    git_object_store_pack_threshold: int = (
+        256  # Batches this large go straight to a pack
+    )
+    git_object_store_repack_threshold: int = 1000  # Loose objects that trigger a repack
+    # Git blob fetching (LakeFS/object store downloads of the git bridge)
+    git_fetch_concurrency: int = 16  # Concurrent downloads per worker
+    git_fetch_window: int = 64  # Blobs fetched ahead of a pack stream
+    git_fetch_buffer_bytes: int = 64 * 1024 * 1024  # Fetched bytes ahead of a stream
+    git_fetch_retries: int = 3  # Retries of a failed download
+    # Git over SSH (embedded asyncssh server, keys from the SSH key settings)
+    git_ssh_enabled: bool = False
+    git_ssh_host: str = "0.0.0.0"
+    git_ssh_port: int = 2222
+    git_ssh_host_key_path: str = "ssh/ssh_host_ed25519_key"  # Generated if missing
     # Download tracking settings
     download_time_bucket_seconds: int = 900  # 15 minutes - session deduplication window
     download_session_cleanup_threshold: int = (
@@ -291,6 +333,14 @@ def load_config(path: str = None) -> Config:
         lakefs_env["secret_key"] = os.environ["KOHAKU_HUB_LAKEFS_SECRET_KEY"]
     if "KOHAKU_HUB_LAKEFS_REPO_NAMESPACE" in os.environ:
         lakefs_env["repo_namespace"] = os.environ["KOHAKU_HUB_LAKEFS_REPO_NAMESPACE"]
+    if "KOHAKU_HUB_LAKEFS_LIST_CONCURRENCY" in os.environ:
+        lakefs_env["list_concurrency"] = int(
+            os.environ["KOHAKU_HUB_LAKEFS_LIST_CONCURRENCY"]
+        )
+    if "KOHAKU_HUB_LAKEFS_LIST_SHARD_DEPTH" in os.environ:
+        lakefs_env["list_shard_depth"] = int(
+            os.environ["KOHAKU_HUB_LAKEFS_LIST_SHARD_DEPTH"]
+        )
     if lakefs_env:
         config_from_env["lakefs"] = lakefs_env
 
@@ -419,10 +469,92 @@ def load_config(path: str = None) -> Config:
         app_env["lfs_multipart_chunk_size_bytes"] = int(
             os.environ["KOHAKU_HUB_LFS_MULTIPART_CHUNK_SIZE_BYTES"]
         )
+    if "KOHAKU_HUB_LFS_MULTIPART_SESSION_TTL_SECONDS" in os.environ:
+        app_env["lfs_multipart_session_ttl_seconds"] = int(
+            os.environ["KOHAKU_HUB_LFS_MULTIPART_SESSION_TTL_SECONDS"]
+        )
     if "KOHAKU_HUB_LFS_KEEP_VERSIONS" in os.environ:
         app_env["lfs_keep_versions"] = int(os.environ["KOHAKU_HUB_LFS_KEEP_VERSIONS"])
     if "KOHAKU_HUB_LFS_AUTO_GC" in os.environ:
         app_env["lfs_auto_gc"] = os.environ["KOHAKU_HUB_LFS_AUTO_GC"].lower() == "true"
+    if "KOHAKU_HUB_LFS_VERIFY_ENABLED" in os.environ:
+        app_env["lfs_verify_enabled"] = (
+            os.environ["KOHAKU_HUB_LFS_VERIFY_ENABLED"].lower() == "true"
+        )
+    if "KOHAKU_HUB_LFS_VERIFY_CONCURRENCY" in os.environ:
+        app_env["lfs_verify_concurrency"] = int(
+            os.environ["KOHAKU_HUB_LFS_VERIFY_CONCURRENCY"]
+        )
+    if "KOHAKU_HUB_MANIFEST_MAX_FILES" in os.environ:
+        app_env["manifest_max_files"] = int(os.environ["KOHAKU_HUB_MANIFEST_MAX_FILES"])
+    if "KOHAKU_HUB_MANIFEST_CACHE_SIZE" in os.environ:
+        app_env["manifest_cache_size"] = int(
+            os.environ["KOHAKU_HUB_MANIFEST_CACHE_SIZE"]
+        )
+    if "KOHAKU_HUB_SIBLINGS_CACHE_SIZE" in os.environ:
+        app_env["siblings_cache_size"] = int(
+            os.environ["KOHAKU_HUB_SIBLINGS_CACHE_SIZE"]
+        )
+    if "KOHAKU_HUB_TREE_PAGE_SIZE" in os.environ:
+        app_env["tree_page_size"] = int(os.environ["KOHAKU_HUB_TREE_PAGE_SIZE"])
+    if "KOHAKU_HUB_GIT_PACK_CACHE_BACKEND" in os.environ:
+        app_env["git_pack_cache_backend"] = os.environ[
+            "KOHAKU_HUB_GIT_PACK_CACHE_BACKEND"
+        ]
+    if "KOHAKU_HUB_GIT_PACK_CACHE_DIR" in os.environ:
+        app_env["git_pack_cache_dir"] = os.environ["KOHAKU_HUB_GIT_PACK_CACHE_DIR"]
+    if "KOHAKU_HUB_GIT_PACK_CACHE_MAX_BYTES" in os.environ:
+        app_env["git_pack_cache_max_bytes"] = int(
+            os.environ["KOHAKU_HUB_GIT_PACK_CACHE_MAX_BYTES"]
+        )
+    if "KOHAKU_HUB_GIT_HISTORY_MAX_COMMITS" in os.environ:
+        app_env["git_history_max_commits"] = int(
+            os.environ["KOHAKU_HUB_GIT_HISTORY_MAX_COMMITS"]
+        )
+    if "KOHAKU_HUB_GIT_HISTORY_INLINE_COMMITS" in os.environ:
+        app_env["git_history_inline_commits"] = int(
+            os.environ["KOHAKU_HUB_GIT_HISTORY_INLINE_COMMITS"]
+        )
+    if "KOHAKU_HUB_GIT_REPO_CACHE_TTL" in os.environ:
+        app_env["git_repo_cache_ttl_seconds"] = int(
+            os.environ["KOHAKU_HUB_GIT_REPO_CACHE_TTL"]
+        )
+    if "KOHAKU_HUB_GIT_OBJECT_STORE_ENABLED" in os.environ:
+        app_env["git_object_store_enabled"] = (
+            os.environ["KOHAKU_HUB_GIT_OBJECT_STORE_ENABLED"].lower() == "true"
+        )
+    if "KOHAKU_HUB_GIT_OBJECT_STORE_PACK_THRESHOLD" in os.environ:
+        app_env["git_object_store_pack_threshold"] = int(
+            os.environ["KOHAKU_HUB_GIT_OBJECT_STORE_PACK_THRESHOLD"]
+        )
+    if "KOHAKU_HUB_GIT_OBJECT_STORE_REPACK_THRESHOLD" in os.environ:
+        app_env["git_object_store_repack_threshold"] = int(
+            os.environ["KOHAKU_HUB_GIT_OBJECT_STORE_REPACK_THRESHOLD"]
+        )
+    if "KOHAKU_HUB_GIT_FETCH_CONCURRENCY" in os.environ:
+        app_env["git_fetch_concurrency"] = int(
+            os.environ["KOHAKU_HUB_GIT_FETCH_CONCURRENCY"]
+        )
+    if "KOHAKU_HUB_GIT_FETCH_WINDOW" in os.environ:
+        app_env["git_fetch_window"] = int(os.environ["KOHAKU_HUB_GIT_FETCH_WINDOW"])
+    if "KOHAKU_HUB_GIT_FETCH_BUFFER_BYTES" in os.environ:
+        app_env["git_fetch_buffer_bytes"] = int(
+            os.environ["KOHAKU_HUB_GIT_FETCH_BUFFER_BYTES"]
+        )
+    if "KOHAKU_HUB_GIT_FETCH_RETRIES" in os.environ:
+        app_env["git_fetch_retries"] = int(os.environ["KOHAKU_HUB_GIT_FETCH_RETRIES"])
+    if "KOHAKU_HUB_GIT_SSH_ENABLED" in os.environ:
+        app_env["git_ssh_enabled"] = (
+            os.environ["KOHAKU_HUB_GIT_SSH_ENABLED"].lower() == "true"
+        )
+    if "KOHAKU_HUB_GIT_SSH_HOST" in os.environ:
+        app_env["git_ssh_host"] = os.environ["KOHAKU_HUB_GIT_SSH_HOST"]
+    if "KOHAKU_HUB_GIT_SSH_PORT" in os.environ:
+        app_env["git_ssh_port"] = int(os.environ["KOHAKU_HUB_GIT_SSH_PORT"])
+    if "KOHAKU_HUB_GIT_SSH_HOST_KEY_PATH" in os.environ:
+        app_env["git_ssh_host_key_path"] = os.environ[
+            "KOHAKU_HUB_GIT_SSH_HOST_KEY_PATH"
+        ]
     if "KOHAKU_HUB_SITE_NAME" in os.environ:
         app_env["site_name"] = os.environ["KOHAKU_HUB_SITE_NAME"]
     if "KOHAKU_HUB_DEBUG_LOG_PAYLOADS" in os.environ:
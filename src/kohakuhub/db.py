@@ -182,11 +182,22 @@ class Repository(BaseModel):
     downloads = IntegerField(default=0)  # Total download sessions (not file count)
     likes_count = IntegerField(default=0)  # Total likes
 
+    # Main branch head (denormalized from LakeFS for fast list queries)
+    head_commit_id = CharField(null=True)  # NULL = not synced yet
+    last_modified = DateTimeField(null=True)  # Creation date of head commit
+
     created_at = DateTimeField(default=partial(datetime.now, tz=timezone.utc))
 
     class Meta:
-        # Unique constraint on (repo_type, namespace, name) allows same name across types
-        indexes = ((("repo_type", "namespace", "name"), True),)
+        indexes = (
+            # Unique constraint on (repo_type, namespace, name) allows same name across types
+            (("repo_type", "namespace", "name"), True),
+            (("repo_type", "last_modified"), False),  # Sort by last modified
+            # Keyset pagination of list endpoints, one index per sort order
+            (("repo_type", "created_at", "id"), False),
+            (("repo_type", "downloads", "id"), False),
+            (("repo_type", "likes_count", "id"), False),
+        )
 
 
 class File(BaseModel):
@@ -198,6 +209,9 @@ class File(BaseModel):
     size = BigIntegerField(default=0)  # Changed from IntegerField to support files >2GB
     sha256 = CharField(index=True)
     lfs = BooleanField(default=False)
+    # Git LFS pointer blob of LFS files (NULL = not an LFS file, or not stored yet)
+    lfs_pointer_sha1 = CharField(null=True, max_length=40)
+    lfs_pointer = BlobField(null=True)
     is_deleted = BooleanField(default=False, index=True)  # Soft delete flag
     owner = ForeignKeyField(
         User, backref="owned_files", on_delete="CASCADE", index=True
@@ -209,6 +223,97 @@ class File(BaseModel):
         indexes = ((("repository", "path_in_repo"), True),)
 
 
+class CommitManifest(BaseModel):
+    """Materialized file listing of a LakeFS commit.
+
+    Commits are immutable, so the listing (path, size, oid, lfs flag, mtime,
+    physical address) is computed once and reused by tree/paths-info/info/resolve
+    instead of relisting LakeFS and joining File row by row.
+
+    entries holds a zlib-compressed columnar JSON document, see
+    kohakuhub.api.repo.utils.manifest for the format.
+    """
+
+    id = AutoField()
+    repository = ForeignKeyField(
+        Repository, backref="manifests", on_delete="CASCADE", index=True
+    )
+    commit_id = CharField(index=True)  # LakeFS commit ID
+    file_count = IntegerField(default=0)
+    total_size = BigIntegerField(default=0)
+    entries = BlobField()
+    created_at = DateTimeField(default=partial(datetime.now, tz=timezone.utc))
+
+    class Meta:
+        indexes = ((("repository", "commit_id"), True),)  # One manifest per commit
+
+
+class GitBlobMapping(BaseModel):
+    """Git blob SHA-1 of a LakeFS object, keyed by physical address.
+
+    A physical address is never rewritten, so its git blob SHA-1 is computed
+    once (by downloading the content) and reused by every later commit and
+    repository that references the same object.
+    """
+
+    id = AutoField()
+    physical_address = CharField(unique=True, max_length=1024)
+    checksum = CharField(null=True)  # LakeFS checksum at hashing time
+    blob_sha1 = CharField(max_length=40)
+    created_at = DateTimeField(default=partial(datetime.now, tz=timezone.utc))
+
+
+class GitCommitMapping(BaseModel):
+    """Git commit/tree SHA-1 synthesized for a LakeFS commit.
+
+    Used by the git bridge to advertise refs without relisting and rehashing
+    the whole commit on every ls-remote/clone. Commits link to their mapped
+    LakeFS parents, and the raw commit object is kept so the SHA-1 never
+    changes once handed out.
+    """
+
+    id = AutoField()
+    repository = ForeignKeyField(
+        Repository, backref="git_commits", on_delete="CASCADE", index=True
+    )
+    commit_id = CharField(index=True)  # LakeFS commit ID
+    commit_sha1 = CharField(max_length=40, index=True)
+    tree_sha1 = CharField(max_length=40)
+    parent_commit_ids = TextField(default="[]")  # JSON list of LakeFS commit IDs
+    commit_object = BlobField(null=True)  # Git commit object (with header)
+    created_at = DateTimeField(default=partial(datetime.now, tz=timezone.utc))
+
+    class Meta:
+        indexes = ((("repository", "commit_id"), True),)  # One mapping per commit
+
+
+class GitObject(BaseModel):
+    """Git object mirrored into the S3 object store of a repository.
+
+    Objects are written as zlib-compressed loose objects (pack is NULL) and
+    later repacked; packed objects record where their entry sits in the pack
+    so they can be read with a ranged GET.
+    """
+
+    id = AutoField()
+    repository = ForeignKeyField(
+        Repository, backref="git_objects", on_delete="CASCADE", index=True
+    )
+    sha1 = CharField(max_length=40)
+    obj_type = IntegerField()  # 1=commit, 2=tree, 3=blob
+    size = BigIntegerField()  # Uncompressed content size (without header)
+    pack = CharField(null=True, max_length=40)  # Pack name, NULL while loose
+    offset = BigIntegerField(null=True)  # Entry offset in the pack
+    length = BigIntegerField(null=True)  # Entry length in the pack
+    created_at = DateTimeField(default=partial(datetime.now, tz=timezone.utc))
+
+    class Meta:
+        indexes = (
+            (("repository", "sha1"), True),  # One entry per object
+            (("repository", "pack"), False),  # For repacking loose objects
+        )
+
+
 class StagingUpload(BaseModel):
     id = AutoField()
     repository = ForeignKeyField(
@@ -315,6 +420,51 @@ class LFSObjectHistory(BaseModel):
         )
 
 
+class LFSObjectVerification(BaseModel):
+    """Server-side content verification of an uploaded LFS object.
+
+    LFS objects are stored once per SHA256 and shared by all repositories,
+    so an object is only trusted for deduplication once the server hashed
+    it. Uploads not matching their OID are moved to the quarantine prefix
+    and recorded as quarantined, unless the object was verified before.
+    """
+
+    id = AutoField()
+    sha256 = CharField(unique=True, max_length=64)  # Claimed OID
+    size = BigIntegerField()
+    status = CharField(default="pending", index=True)  # verified/quarantined
+    actual_sha256 = CharField(null=True, max_length=64)  # Hash of quarantined upload
+    checked_at = DateTimeField(null=True)
+    created_at = DateTimeField(default=partial(datetime.now, tz=timezone.utc))
+
+
+class LFSMultipartUpload(BaseModel):
+    """Open S3 multipart upload of an LFS object.
+
+    A retried batch request of the same user for the same object resumes
+    this upload instead of starting a new one, so parts already sent are
+    kept. Uploads are never shared between users. Uploads not completed
+    before expires_at are aborted by the sweeper.
+    """
+
+    id = AutoField()
+    sha256 = CharField(max_length=64)
+    size = BigIntegerField()
+    user = ForeignKeyField(
+        User, backref="lfs_multipart_uploads", on_delete="SET NULL", null=True
+    )  # Uploader (NULL once deleted: never resumed, aborted on expiry)
+    upload_id = CharField(unique=True, max_length=1024)  # S3 upload ID
+    s3_key = CharField(max_length=1024)  # Staging key the upload writes to
+    chunk_size = BigIntegerField()
+    part_count = IntegerField()
+    parts = TextField(default="[]")  # JSON [[part_number, etag], ...] last seen in S3
+    expires_at = DateTimeField(index=True)
+    created_at = DateTimeField(default=partial(datetime.now, tz=timezone.utc))
+
+    class Meta:
+        indexes = ((("sha256", "size", "user"), True),)  # One upload per object/user
+
+
 class SSHKey(BaseModel):
     """User SSH public keys for Git operations."""
 
@@ -528,10 +678,16 @@ def init_db():
             UserExternalToken,
             Repository,
             File,
+            CommitManifest,
+            GitBlobMapping,
+            GitCommitMapping,
+            GitObject,
             StagingUpload,
             UserOrganization,
             Commit,
             LFSObjectHistory,
+            LFSObjectVerification,
+            LFSMultipartUpload,
             SSHKey,
             Invitation,
             RepositoryLike,
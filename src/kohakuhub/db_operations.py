@@ -10,18 +10,27 @@ All operations now use proper ForeignKey relationships with backref for convenie
 import json
 import uuid
 from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+from peewee import Case
 
 from kohakuhub.config import cfg
 from kohakuhub.logger import get_logger
 from kohakuhub.db import (
     Commit,
+    CommitManifest,
     ConfirmationToken,
     DailyRepoStats,
     DownloadSession,
     EmailVerification,
     File,
+    GitBlobMapping,
+    GitObject,
+    GitCommitMapping,
     Invitation,
+    LFSMultipartUpload,
     LFSObjectHistory,
+    LFSObjectVerification,
     Repository,
     RepositoryLike,
     Session,
@@ -36,6 +45,17 @@ from kohakuhub.db import (
 from kohakuhub.utils.names import normalize_name
 
 
+def _chunked_in(query, field, values) -> Iterator:
+    """Run query once per chunk of values with field IN chunk, yielding its rows.
+
+    Values are deduplicated (falsy ones dropped), and chunks stay well below
+    SQLite's bound parameter limit.
+    """
+    unique_values = list(dict.fromkeys(v for v in values if v))
+    for i in range(0, len(unique_values), 500):
+        yield from query.where(field.in_(unique_values[i : i + 500]))
+
+
 # ===== User operations =====
 
 
@@ -229,6 +249,17 @@ def update_repository(repo: Repository, **fields) -> None:
     repo.save()
 
 
+def update_repository_head(
+    repo: Repository, head_commit_id: str | None, last_modified
+) -> None:
+    """Update denormalized main branch head without rewriting other columns."""
+    Repository.update(
+        head_commit_id=head_commit_id, last_modified=last_modified
+    ).where(Repository.id == repo.id).execute()
+    repo.head_commit_id = head_commit_id
+    repo.last_modified = last_modified
+
+
 def list_repositories(
     repo_type: str | None = None, namespace: str | None = None, limit: int | None = None
 ) -> list[Repository]:
@@ -449,6 +480,30 @@ def get_file(repo: Repository, path_in_repo: str) -> File | None:
     )
 
 
+def get_files_by_paths(repo: Repository, paths: list[str]) -> dict[str, dict]:
+    """Get active files for many paths at once (one IN query per chunk).
+
+    Returns plain dict rows (path_in_repo, sha256, size, lfs,
+    lfs_pointer_sha1) keyed by path instead of model instances, for hot
+    listing paths.
+    """
+    query = (
+        File.select(
+            File.path_in_repo,
+            File.sha256,
+            File.size,
+            File.lfs,
+            File.lfs_pointer_sha1,
+        )
+        .where((File.repository == repo) & (File.is_deleted == False))
+        .dicts()
+    )
+    return {
+        row["path_in_repo"]: row
+        for row in _chunked_in(query, File.path_in_repo, paths)
+    }
+
+
 def get_file_by_sha256(sha256: str) -> File | None:
     """Get file by SHA256 hash (only active files)."""
     return File.get_or_none((File.sha256 == sha256) & (File.is_deleted == False))
@@ -524,6 +579,21 @@ def get_commit(commit_id: str, repository: Repository) -> Commit | None:
     )
 
 
+def get_commits_by_ids(
+    repository: Repository, commit_ids: list[str]
+) -> dict[str, Commit]:
+    """Get commit records for many LakeFS commit IDs (one IN query per chunk).
+
+    Returns:
+        Dict of commit_id -> Commit (commits made outside the API are omitted)
+    """
+    query = Commit.select().where(Commit.repository == repository)
+    return {
+        commit.commit_id: commit
+        for commit in _chunked_in(query, Commit.commit_id, commit_ids)
+    }
+
+
 def list_commits_by_repo(
     repository: Repository, branch: str | None = None, limit: int | None = None
 ) -> list[Commit]:
@@ -537,6 +607,253 @@ def list_commits_by_repo(
     return list(query)
 
 
+# ===== Commit manifest operations =====
+
+
+def get_commit_manifest(
+    repository: Repository, commit_id: str
+) -> CommitManifest | None:
+    """Get materialized manifest for a commit."""
+    return CommitManifest.get_or_none(
+        (CommitManifest.repository == repository)
+        & (CommitManifest.commit_id == commit_id)
+    )
+
+
+def save_commit_manifest(
+    repository: Repository,
+    commit_id: str,
+    file_count: int,
+    total_size: int,
+    entries: bytes,
+) -> None:
+    """Store manifest for a commit.
+
+    Commits are immutable, so a concurrent writer that got there first
+    already stored the same content and the insert is simply ignored.
+    """
+    CommitManifest.insert(
+        repository=repository,
+        commit_id=commit_id,
+        file_count=file_count,
+        total_size=total_size,
+        entries=entries,
+    ).on_conflict_ignore().execute()
+
+
+def delete_commit_manifests(repository: Repository) -> int:
+    """Delete all manifests of a repository (e.g. after history rewrite)."""
+    return (
+        CommitManifest.delete().where(CommitManifest.repository == repository).execute()
+    )
+
+
+# ===== Git object mapping operations =====
+
+
+def get_git_blob_sha1s(physical_addresses: list[str]) -> dict[str, str]:
+    """Get known git blob SHA-1s for many LakeFS physical addresses.
+
+    Returns:
+        Dict of physical_address -> blob_sha1 (unknown addresses are omitted)
+    """
+    query = GitBlobMapping.select(
+        GitBlobMapping.physical_address, GitBlobMapping.blob_sha1
+    ).tuples()
+    return dict(
+        _chunked_in(query, GitBlobMapping.physical_address, physical_addresses)
+    )
+
+
+def save_git_blob_sha1s(rows: list[tuple[str, str | None, str]]) -> None:
+    """Store git blob SHA-1s of LakeFS objects.
+
+    Args:
+        rows: List of (physical_address, checksum, blob_sha1)
+    """
+    rows = [row for row in rows if row[0]]
+    with db.atomic():
+        for i in range(0, len(rows), 300):
+            GitBlobMapping.insert_many(
+                rows[i : i + 300],
+                fields=[
+                    GitBlobMapping.physical_address,
+                    GitBlobMapping.checksum,
+                    GitBlobMapping.blob_sha1,
+                ],
+            ).on_conflict_ignore().execute()
+
+
+def get_git_commit_mapping(
+    repository: Repository, commit_id: str
+) -> GitCommitMapping | None:
+    """Get synthesized git commit for a LakeFS commit."""
+    return GitCommitMapping.get_or_none(
+        (GitCommitMapping.repository == repository)
+        & (GitCommitMapping.commit_id == commit_id)
+    )
+
+
+def get_git_commit_mappings_by_sha1(
+    repository: Repository, commit_sha1s: list[str]
+) -> dict[str, GitCommitMapping]:
+    """Get synthesized git commits of a repository by git commit SHA-1.
+
+    Returns:
+        Dict of commit_sha1 -> GitCommitMapping (unknown SHA-1s are omitted)
+    """
+    query = GitCommitMapping.select().where(GitCommitMapping.repository == repository)
+    return {
+        mapping.commit_sha1: mapping
+        for mapping in _chunked_in(query, GitCommitMapping.commit_sha1, commit_sha1s)
+    }
+
+
+def get_git_commit_mappings(
+    repository: Repository, commit_ids: list[str]
+) -> dict[str, GitCommitMapping]:
+    """Get synthesized git commits for many LakeFS commits.
+
+    Returns:
+        Dict of LakeFS commit_id -> GitCommitMapping (unmapped IDs are omitted)
+    """
+    query = GitCommitMapping.select().where(GitCommitMapping.repository == repository)
+    return {
+        mapping.commit_id: mapping
+        for mapping in _chunked_in(query, GitCommitMapping.commit_id, commit_ids)
+    }
+
+
+def save_git_commit_mapping(
+    repository: Repository,
+    commit_id: str,
+    commit_sha1: str,
+    tree_sha1: str,
+    parent_commit_ids: list[str],
+    commit_object: bytes,
+) -> None:
+    """Store synthesized git commit for a LakeFS commit.
+
+    Args:
+        repository: Repository object (FK)
+        commit_id: LakeFS commit ID
+        commit_sha1: Git commit SHA-1
+        tree_sha1: Git root tree SHA-1
+        parent_commit_ids: LakeFS commit IDs of the mapped parents
+        commit_object: Git commit object (with header)
+
+    A concurrent writer that got there first already stored a mapping; the
+    insert is ignored so the first SHA-1 handed out stays valid.
+    """
+    GitCommitMapping.insert(
+        repository=repository,
+        commit_id=commit_id,
+        commit_sha1=commit_sha1,
+        tree_sha1=tree_sha1,
+        parent_commit_ids=json.dumps(parent_commit_ids),
+        commit_object=commit_object,
+    ).on_conflict_ignore().execute()
+
+
+def delete_git_commit_mappings(repository: Repository) -> int:
+    """Delete all git commit mappings of a repository (e.g. after history rewrite)."""
+    return (
+        GitCommitMapping.delete()
+        .where(GitCommitMapping.repository == repository)
+        .execute()
+    )
+
+
+def get_git_objects(
+    repository: Repository, sha1s: list[str]
+) -> dict[str, GitObject]:
+    """Get stored git objects of a repository by SHA-1.
+
+    Returns:
+        Dict of sha1 -> GitObject (objects not in the store are omitted)
+    """
+    query = GitObject.select().where(GitObject.repository == repository)
+    return {obj.sha1: obj for obj in _chunked_in(query, GitObject.sha1, sha1s)}
+
+
+def save_git_objects(
+    repository: Repository,
+    rows: list[tuple[str, int, int, str | None, int | None, int | None]],
+) -> None:
+    """Index git objects written to the object store of a repository.
+
+    Args:
+        rows: List of (sha1, obj_type, size, pack, offset, length); pack,
+            offset and length are None for loose objects
+
+    Objects are content-addressed, so one that is already indexed is left
+    as is.
+    """
+    with db.atomic():
+        for i in range(0, len(rows), 150):
+            GitObject.insert_many(
+                [(repository.id, *row) for row in rows[i : i + 150]],
+                fields=[
+                    GitObject.repository,
+                    GitObject.sha1,
+                    GitObject.obj_type,
+                    GitObject.size,
+                    GitObject.pack,
+                    GitObject.offset,
+                    GitObject.length,
+                ],
+            ).on_conflict_ignore().execute()
+
+
+def list_loose_git_objects(
+    repository: Repository, limit: int | None = None
+) -> list[GitObject]:
+    """List loose (not yet packed) git objects of a repository."""
+    query = (
+        GitObject.select()
+        .where((GitObject.repository == repository) & (GitObject.pack.is_null()))
+        .order_by(GitObject.id)
+    )
+    if limit:
+        query = query.limit(limit)
+    return list(query)
+
+
+def count_loose_git_objects(repository: Repository) -> int:
+    """Count loose (not yet packed) git objects of a repository."""
+    return (
+        GitObject.select()
+        .where((GitObject.repository == repository) & (GitObject.pack.is_null()))
+        .count()
+    )
+
+
+def mark_git_objects_packed(
+    repository: Repository, pack: str, entries: list[tuple[str, int, int]]
+) -> None:
+    """Point git objects at their entries in a new pack.
+
+    One UPDATE per chunk, offsets and lengths picked by SHA-1 with CASE.
+
+    Args:
+        pack: Pack name
+        entries: List of (sha1, offset, length)
+    """
+    with db.atomic():
+        for i in range(0, len(entries), 150):
+            chunk = entries[i : i + 150]
+            offsets = [(sha1, offset) for sha1, offset, _ in chunk]
+            lengths = [(sha1, length) for sha1, _, length in chunk]
+            GitObject.update(
+                pack=pack,
+                offset=Case(GitObject.sha1, offsets),
+                length=Case(GitObject.sha1, lengths),
+            ).where(
+                (GitObject.repository == repository)
+                & (GitObject.sha1.in_([sha1 for sha1, _, _ in chunk]))
+            ).execute()
+
+
 # ===== SSH Key operations =====
 
 
@@ -668,6 +985,127 @@ def refresh_lfs_history_timestamp(
     lfs_entry.save()
 
 
+def get_lfs_verification(sha256: str) -> LFSObjectVerification | None:
+    """Get the content verification state of an LFS object."""
+    return LFSObjectVerification.get_or_none(LFSObjectVerification.sha256 == sha256)
+
+
+def set_lfs_verification_result(
+    sha256: str, size: int, status: str, actual_sha256: str | None = None
+) -> None:
+    """Record the outcome of an LFS content verification.
+
+    A failed upload does not change the state of an object already verified.
+
+    Args:
+        sha256: Claimed OID
+        size: Claimed size
+        status: "verified" or "quarantined"
+        actual_sha256: Hash of the uploaded content if it didn't match
+    """
+    with db.atomic():
+        query = LFSObjectVerification.update(
+            size=size,
+            status=status,
+            actual_sha256=actual_sha256,
+            checked_at=datetime.now(timezone.utc),
+        ).where(LFSObjectVerification.sha256 == sha256)
+        if status != "verified":
+            query = query.where(LFSObjectVerification.status != "verified")
+        if not query.execute():
+            LFSObjectVerification.insert(
+                sha256=sha256,
+                size=size,
+                status=status,
+                actual_sha256=actual_sha256,
+                checked_at=datetime.now(timezone.utc),
+            ).on_conflict_ignore().execute()
+
+
+def delete_lfs_verification(sha256: str) -> None:
+    """Forget the verification state of an LFS object (e.g. it was deleted)."""
+    LFSObjectVerification.delete().where(
+        LFSObjectVerification.sha256 == sha256
+    ).execute()
+
+
+def get_lfs_multipart_upload(
+    sha256: str, size: int, user: User
+) -> LFSMultipartUpload | None:
+    """Get a user's open multipart upload of an LFS object."""
+    return LFSMultipartUpload.get_or_none(
+        (LFSMultipartUpload.sha256 == sha256)
+        & (LFSMultipartUpload.size == size)
+        & (LFSMultipartUpload.user == user)
+    )
+
+
+def get_lfs_multipart_upload_by_id(upload_id: str) -> LFSMultipartUpload | None:
+    """Get an open multipart upload by its S3 upload ID."""
+    return LFSMultipartUpload.get_or_none(LFSMultipartUpload.upload_id == upload_id)
+
+
+def create_lfs_multipart_upload(
+    sha256: str,
+    size: int,
+    user: User,
+    upload_id: str,
+    s3_key: str,
+    chunk_size: int,
+    part_count: int,
+    expires_at: datetime,
+) -> LFSMultipartUpload:
+    """Record a new multipart upload of an LFS object by a user.
+
+    Returns:
+        The user's open upload of the object; if another request recorded
+        one first, that upload (not upload_id) is returned
+    """
+    LFSMultipartUpload.insert(
+        sha256=sha256,
+        size=size,
+        user=user,
+        upload_id=upload_id,
+        s3_key=s3_key,
+        chunk_size=chunk_size,
+        part_count=part_count,
+        expires_at=expires_at,
+    ).on_conflict_ignore().execute()
+    return get_lfs_multipart_upload(sha256, size, user)
+
+
+def update_lfs_multipart_upload(
+    upload: LFSMultipartUpload, parts: list[list], expires_at: datetime
+) -> None:
+    """Record the parts seen in S3 and extend the expiry of an upload."""
+    LFSMultipartUpload.update(parts=json.dumps(parts), expires_at=expires_at).where(
+        LFSMultipartUpload.id == upload.id
+    ).execute()
+
+
+def delete_lfs_multipart_upload(upload: LFSMultipartUpload) -> bool:
+    """Delete an upload record.
+
+    Returns:
+        True if this call deleted it (so the caller owns aborting it)
+    """
+    return (
+        LFSMultipartUpload.delete()
+        .where(LFSMultipartUpload.id == upload.id)
+        .execute()
+        > 0
+    )
+
+
+def list_expired_lfs_multipart_uploads(now: datetime) -> list[LFSMultipartUpload]:
+    """List multipart uploads abandoned past their expiry."""
+    return list(
+        LFSMultipartUpload.select()
+        .where(LFSMultipartUpload.expires_at < now)
+        .order_by(LFSMultipartUpload.id)
+    )
+
+
 def get_effective_lfs_threshold(repo: Repository) -> int:
     """Get effective LFS threshold for a repository.
 
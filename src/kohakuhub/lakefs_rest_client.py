@@ -710,6 +710,24 @@ class LakeFSRestClient:
             )
             self._check_response(response)
 
+    async def reset_branch_changes(self, repository: str, branch: str) -> None:
+        """Discard all uncommitted changes of a branch.
+
+        Args:
+            repository: Repository name
+            branch: Branch name
+
+        Raises:
+            httpx.HTTPStatusError: If reset fails
+        """
+        url = f"{self.base_url}/repositories/{repository}/branches/{branch}"
+
+        async with httpx.AsyncClient() as client:
+            response = await client.put(
+                url, json={"type": "reset"}, auth=self.auth, timeout=None
+            )
+            self._check_response(response)
+
 
 def get_lakefs_rest_client() -> LakeFSRestClient:
     """Get LakeFS REST client instance.
@@ -33,6 +33,7 @@ from kohakuhub.auth.dependencies import get_optional_user
 from kohakuhub.utils.s3 import init_storage
 from kohakuhub.api.git.routers import http as git_http
 from kohakuhub.api.git.routers import lfs, ssh_keys
+from kohakuhub.api.git.utils.ssh_server import start_ssh_server
 from kohakuhub.api.repo.routers import crud as repo_crud
 from kohakuhub.api.repo.routers import info as repo_info
 from kohakuhub.api.repo.routers import tree as repo_tree
@@ -63,7 +64,12 @@ async def lifespan(app: FastAPI):
         logger.warning("=" * 80)
 
     init_storage()
+
+    ssh_server = await start_ssh_server() if cfg.app.git_ssh_enabled else None
     yield
+    if ssh_server is not None:
+        ssh_server.close()
+        await ssh_server.wait_closed()
 
 
 app = FastAPI(
@@ -1,10 +1,14 @@
 """LakeFS client utilities and helper functions."""
 
+import asyncio
 import hashlib
 import re
+from collections import deque
+from typing import AsyncIterator
 
 import numpy as np
 
+from kohakuhub.config import cfg
 from kohakuhub.lakefs_rest_client import LakeFSRestClient, get_lakefs_rest_client
 
 
@@ -17,6 +21,127 @@ def get_lakefs_client() -> LakeFSRestClient:
     return get_lakefs_rest_client()
 
 
+async def _list_prefix(
+    client: LakeFSRestClient, repository: str, ref: str, prefix: str, delimiter: str
+) -> list[dict]:
+    """List every entry under prefix, following LakeFS pagination sequentially."""
+    results = []
+    after = ""
+
+    while True:
+        result = await client.list_objects(
+            repository=repository,
+            ref=ref,
+            prefix=prefix,
+            delimiter=delimiter,
+            amount=1000,  # LakeFS maximum
+            after=after,
+        )
+        results.extend(result["results"])
+
+        pagination = result.get("pagination") or {}
+        if not pagination.get("has_more"):
+            return results
+        after = pagination["next_offset"]
+
+
+async def iter_objects_sharded(
+    repository: str, ref: str, prefix: str = ""
+) -> AsyncIterator[list[dict]]:
+    """Recursively list all objects under prefix, sharded by directory.
+
+    Directory prefixes are discovered with delimiter listings down to
+    cfg.lakefs.list_shard_depth levels. Each shard is then listed recursively,
+    with at most cfg.lakefs.list_concurrency LakeFS listings in flight, and
+    shards are yielded back in path order.
+
+    Args:
+        repository: LakeFS repository name
+        ref: Branch name or commit ID
+        prefix: Path prefix ("" or ending with "/")
+
+    Yields:
+        Batches of LakeFS ObjectStats (path_type "object"), in path order
+
+    Raises:
+        Exception: If a LakeFS listing fails
+    """
+    client = get_lakefs_client()
+    concurrency = max(cfg.lakefs.list_concurrency, 1)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def list_shard(shard_prefix: str, delimiter: str) -> list[dict]:
+        async with semaphore:
+            return await _list_prefix(client, repository, ref, shard_prefix, delimiter)
+
+    # Discover shards level by level; objects found on the way are kept as-is
+    plan: list[str | dict] = []
+    shards = [prefix]
+    for _ in range(cfg.lakefs.list_shard_depth):
+        listings = await asyncio.gather(*(list_shard(s, "/") for s in shards))
+        shards = []
+        for listing in listings:
+            for entry in listing:
+                if entry["path_type"] == "object":
+                    plan.append(entry)
+                else:
+                    shards.append(entry["path"])
+        if not shards:
+            break
+    plan.extend(shards)
+
+    # Shards are disjoint path ranges, so sorting by key restores path order
+    plan.sort(key=lambda item: item if isinstance(item, str) else item["path"])
+
+    segments: list[str | list[dict]] = []
+    for item in plan:
+        if isinstance(item, str):
+            segments.append(item)
+        elif segments and isinstance(segments[-1], list):
+            segments[-1].append(item)
+        else:
+            segments.append([item])
+
+    # List shards ahead of the consumer with a bounded window
+    pending = deque()
+    next_segment = 0
+    try:
+        while next_segment < len(segments) or pending:
+            while next_segment < len(segments) and len(pending) < concurrency:
+                segment = segments[next_segment]
+                next_segment += 1
+                if isinstance(segment, str):
+                    segment = asyncio.create_task(list_shard(segment, ""))
+                pending.append(segment)
+
+            head = pending.popleft()
+            yield head if isinstance(head, list) else await head
+    finally:
+        for task in pending:
+            if isinstance(task, asyncio.Task):
+                task.cancel()
+
+
+async def list_all_objects(repository: str, ref: str, prefix: str = "") -> list[dict]:
+    """Recursively list all objects under prefix (see iter_objects_sharded).
+
+    Args:
+        repository: LakeFS repository name
+        ref: Branch name or commit ID
+        prefix: Path prefix ("" or ending with "/")
+
+    Returns:
+        List of LakeFS ObjectStats (path_type "object"), sorted by path
+
+    Raises:
+        Exception: If a LakeFS listing fails
+    """
+    objects = []
+    async for batch in iter_objects_sharded(repository, ref, prefix):
+        objects.extend(batch)
+    return objects
+
+
 def _base36_encode(num: int) -> str:
     """Encode integer to base36 using numpy (C-optimized).
 
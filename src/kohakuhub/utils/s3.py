@@ -1,8 +1,10 @@
 """S3 client utilities and helper functions."""
 
-import atexit
-from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import hmac
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from urllib.parse import quote, urlsplit
 
 import boto3
 from botocore.config import Config as BotoConfig
@@ -13,66 +15,174 @@ from kohakuhub.logger import get_logger
 
 logger = get_logger("S3")
 
-# Global process pool for CPU-intensive presigned URL generation
-_presigned_url_process_pool = None
+# Upload part URLs are signed in-process: SigV4 presigning is a few HMACs
+# per URL once the daily signing key is derived, so no boto3 request
+# machinery (or process pool) is needed even for thousands of parts
+SIGV4_ALGORITHM = "AWS4-HMAC-SHA256"
+URI_SAFE_CHARS = "-_.~"
 
 
-def get_presigned_url_process_pool():
-    """Get or create global process pool for presigned URL generation."""
-    global _presigned_url_process_pool
-    if _presigned_url_process_pool is None:
-        # Use process pool for CPU-bound signature calculation
-        _presigned_url_process_pool = ProcessPoolExecutor(max_workers=8)
-        atexit.register(_presigned_url_process_pool.shutdown)
-    return _presigned_url_process_pool
+@lru_cache(maxsize=4)
+def _sigv4_signing_key(secret_key: str, datestamp: str, region: str) -> bytes:
+    """Derive the SigV4 signing key of a day (cached, valid for that date)."""
+    key = f"AWS4{secret_key}".encode()
+    for part in (datestamp, region, "s3", "aws4_request"):
+        key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+    return key
 
 
-def _generate_single_part_url(args: tuple) -> dict:
+def _can_presign_in_process() -> bool:
+    """Whether _presign_sigv4_url produces the URLs boto3 would.
+
+    Only SigV4 with path-style addressing on a plain endpoint is signed
+    in-process, other setups use boto3.
     """
-    Generate presigned URL for a single part (picklable for multiprocessing).
+    return (
+        cfg.s3.signature_version == "s3v4"
+        and cfg.s3.force_path_style
+        and urlsplit(cfg.s3.endpoint).path.strip("/") == ""
+    )
+
+
+def _presign_sigv4_url(
+    method: str,
+    bucket: str,
+    key: str,
+    params: dict[str, str],
+    expires_in: int,
+    now: datetime | None = None,
+) -> str:
+    """Presign a path-style S3 request with SigV4 query parameters.
 
     Args:
-        args: Tuple of (bucket, key, upload_id, part_number, expires_in, s3_config)
+        method: HTTP method
+        bucket: S3 bucket name
+        key: Object key in S3
+        params: Request query parameters (e.g. partNumber, uploadId)
+        expires_in: URL expiration time in seconds
+        now: Signing time (default: current time)
 
     Returns:
-        Dict with part_number and url
+        Presigned URL on the public endpoint
     """
-    bucket, key, upload_id, part_number, expires_in, s3_config = args
-
-    # Create S3 client (must be done in each process)
-    s3 = boto3.client(
-        "s3",
-        endpoint_url=s3_config["endpoint"],
-        aws_access_key_id=s3_config["access_key"],
-        aws_secret_access_key=s3_config["secret_key"],
-        region_name=s3_config.get("region", "us-east-1"),
-        config=BotoConfig(
-            signature_version=s3_config.get("signature_version") or "s3v4",
-            s3=(
-                {"addressing_style": "path"}
-                if s3_config.get("force_path_style")
-                else {}
-            ),
-        ),
+    now = now or datetime.now(timezone.utc)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    datestamp = now.strftime("%Y%m%d")
+    scope = f"{datestamp}/{cfg.s3.region}/s3/aws4_request"
+
+    endpoint = cfg.s3.endpoint.rstrip("/")
+    host = urlsplit(endpoint).netloc
+    path = "/" + quote(f"{bucket}/{key}", safe="/" + URI_SAFE_CHARS)
+
+    query = {
+        **params,
+        "X-Amz-Algorithm": SIGV4_ALGORITHM,
+        "X-Amz-Credential": f"{cfg.s3.access_key}/{scope}",
+        "X-Amz-Date": amz_date,
+        "X-Amz-Expires": str(expires_in),
+        "X-Amz-SignedHeaders": "host",
+    }
+    canonical_query = "&".join(
+        f"{quote(name, safe=URI_SAFE_CHARS)}={quote(str(value), safe=URI_SAFE_CHARS)}"
+        for name, value in sorted(query.items())
     )
-
-    # Generate presigned URL (local computation, no network call)
-    url = s3.generate_presigned_url(
-        "upload_part",
-        Params={
-            "Bucket": bucket,
-            "Key": key,
-            "UploadId": upload_id,
-            "PartNumber": part_number,
-        },
-        ExpiresIn=expires_in,
+    canonical_request = "\n".join(
+        [method, path, canonical_query, f"host:{host}\n", "host", "UNSIGNED-PAYLOAD"]
     )
+    string_to_sign = "\n".join(
+        [
+            SIGV4_ALGORITHM,
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ]
+    )
+    signing_key = _sigv4_signing_key(cfg.s3.secret_key, datestamp, cfg.s3.region)
+    signature = hmac.new(
+        signing_key, string_to_sign.encode(), hashlib.sha256
+    ).hexdigest()
+
+    url = f"{endpoint}{path}?{canonical_query}&X-Amz-Signature={signature}"
+    return url.replace(cfg.s3.endpoint, cfg.s3.public_endpoint)
+
 
-    # Replace endpoint if needed
-    if s3_config.get("public_endpoint") != s3_config.get("endpoint"):
-        url = url.replace(s3_config["endpoint"], s3_config["public_endpoint"])
+def _presign_upload_part_urls_sync(
+    bucket: str,
+    key: str,
+    upload_id: str,
+    part_numbers: list[int],
+    expires_in: int = 3600,
+) -> list[dict]:
+    """Synchronous implementation of presign_upload_part_urls."""
+    if _can_presign_in_process():
+        now = datetime.now(timezone.utc)
+        return [
+            {
+                "part_number": part_number,
+                "url": _presign_sigv4_url(
+                    "PUT",
+                    bucket,
+                    key,
+                    {"partNumber": str(part_number), "uploadId": upload_id},
+                    expires_in,
+                    now,
+                ),
+            }
+            for part_number in part_numbers
+        ]
 
-    return {"part_number": part_number, "url": url}
+    s3 = get_s3_client()
+    part_urls = []
+    for part_number in part_numbers:
+        url = s3.generate_presigned_url(
+            "upload_part",
+            Params={
+                "Bucket": bucket,
+                "Key": key,
+                "UploadId": upload_id,
+                "PartNumber": part_number,
+            },
+            ExpiresIn=expires_in,
+        )
+        part_urls.append(
+            {
+                "part_number": part_number,
+                "url": url.replace(cfg.s3.endpoint, cfg.s3.public_endpoint),
+            }
+        )
+    return part_urls
+
+
+async def presign_upload_part_urls(
+    bucket: str,
+    key: str,
+    upload_id: str,
+    part_numbers: list[int],
+    expires_in: int = 3600,
+) -> list[dict]:
+    """Presign upload_part URLs of a multipart upload.
+
+    Signed in-process with a cached SigV4 signing key when the S3 setup
+    allows it (see _can_presign_in_process), else with boto3.
+
+    Args:
+        bucket: S3 bucket name
+        key: Object key in S3
+        upload_id: Upload ID from create_multipart_upload
+        part_numbers: Parts to presign
+        expires_in: URL expiration time in seconds
+
+    Returns:
+        List of dicts with 'part_number' and 'url'
+    """
+    return await run_in_s3_executor(
+        _presign_upload_part_urls_sync,
+        bucket,
+        key,
+        upload_id,
+        part_numbers,
+        expires_in,
+    )
 
 
 def get_multipart_threshold() -> int:
@@ -297,72 +407,48 @@ async def generate_upload_presigned_url(
     )
 
 
+def _create_multipart_upload_sync(bucket: str, key: str) -> str:
+    """Synchronous implementation of create_multipart_upload."""
+    s3 = get_s3_client()
+    response = s3.create_multipart_upload(
+        Bucket=bucket,
+        Key=key,
+        ContentType="application/octet-stream",
+    )
+    return response["UploadId"]
+
+
+async def create_multipart_upload(bucket: str, key: str) -> str:
+    """Start a multipart upload.
+
+    Args:
+        bucket: S3 bucket name
+        key: Object key in S3
+
+    Returns:
+        Upload ID
+    """
+    return await run_in_s3_executor(_create_multipart_upload_sync, bucket, key)
+
+
 def _generate_multipart_upload_urls_sync(
     bucket: str,
     key: str,
     part_count: int,
     upload_id: str = None,
     expires_in: int = 3600,
+    part_numbers: list[int] | None = None,
 ) -> dict:
     """Synchronous implementation of generate_multipart_upload_urls."""
-    s3 = get_s3_client()
-
     if not upload_id:
-        response = s3.create_multipart_upload(
-            Bucket=bucket,
-            Key=key,
-            ContentType="application/octet-stream",
-        )
-        upload_id = response["UploadId"]
-
-    # Prepare S3 config for multiprocessing (must be picklable)
-    s3_config = {
-        "endpoint": cfg.s3.endpoint,
-        "public_endpoint": cfg.s3.public_endpoint,
-        "access_key": cfg.s3.access_key,
-        "secret_key": cfg.s3.secret_key,
-        "region": cfg.s3.region,
-        "signature_version": cfg.s3.signature_version,
-        "force_path_style": cfg.s3.force_path_style,
-    }
+        upload_id = _create_multipart_upload_sync(bucket, key)
 
-    # For large part counts (>10), use multiprocessing for parallel signature generation
-    if part_count > 10:
-        logger.info(
-            f"Generating {part_count} presigned URLs in parallel (multiprocessing)..."
-        )
-
-        # Prepare arguments for each part
-        args_list = [
-            (bucket, key, upload_id, part_number, expires_in, s3_config)
-            for part_number in range(1, part_count + 1)
-        ]
-
-        # Generate URLs in parallel using process pool
-        pool = get_presigned_url_process_pool()
-        part_urls = list(pool.map(_generate_single_part_url, args_list))
+    if part_numbers is None:
+        part_numbers = list(range(1, part_count + 1))
 
-        logger.success(f"Generated {part_count} presigned URLs in parallel")
-    else:
-        # For small part counts, use sequential generation (faster due to no overhead)
-        part_urls = []
-        for part_number in range(1, part_count + 1):
-            url = s3.generate_presigned_url(
-                "upload_part",
-                Params={
-                    "Bucket": bucket,
-                    "Key": key,
-                    "UploadId": upload_id,
-                    "PartNumber": part_number,
-                },
-                ExpiresIn=expires_in,
-            )
-            part_urls.append(
-                {
-                    "part_number": part_number,
-                    "url": url.replace(cfg.s3.endpoint, cfg.s3.public_endpoint),
-                }
-            )
+    part_urls = _presign_upload_part_urls_sync(
+        bucket, key, upload_id, part_numbers, expires_in
+    )
 
     expires_at = (datetime.now(timezone.utc) + timedelta(seconds=expires_in)).strftime(
         "%Y-%m-%dT%H:%M:%S.%fZ"
@@ -381,6 +467,7 @@ async def generate_multipart_upload_urls(
     part_count: int,
     upload_id: str = None,
     expires_in: int = 3600,
+    part_numbers: list[int] | None = None,
 ) -> dict:
     """Generate presigned URLs for multipart upload.
 
@@ -392,6 +479,7 @@ async def generate_multipart_upload_urls(
         part_count: Number of parts to upload
         upload_id: Existing upload ID (if resuming)
         expires_in: URL expiration time in seconds
+        part_numbers: Parts to presign (default: all of 1..part_count)
 
     Returns:
         Dict with 'upload_id', 'part_urls', and 'expires_at'
@@ -403,9 +491,45 @@ async def generate_multipart_upload_urls(
         part_count,
         upload_id,
         expires_in,
+        part_numbers,
     )
 
 
+def _list_multipart_parts_sync(bucket: str, key: str, upload_id: str) -> list[dict]:
+    """Synchronous implementation of list_multipart_parts."""
+    s3 = get_s3_client()
+    paginator = s3.get_paginator("list_parts")
+
+    parts = []
+    for page in paginator.paginate(Bucket=bucket, Key=key, UploadId=upload_id):
+        for part in page.get("Parts", []):
+            parts.append(
+                {
+                    "PartNumber": part["PartNumber"],
+                    "ETag": part["ETag"],
+                    "Size": part["Size"],
+                }
+            )
+    return parts
+
+
+async def list_multipart_parts(bucket: str, key: str, upload_id: str) -> list[dict]:
+    """List the parts already uploaded to a multipart upload.
+
+    Args:
+        bucket: S3 bucket name
+        key: Object key in S3
+        upload_id: Upload ID from create_multipart_upload
+
+    Returns:
+        List of dicts with 'PartNumber', 'ETag' and 'Size'
+
+    Raises:
+        ClientError: If the upload does not exist (NoSuchUpload)
+    """
+    return await run_in_s3_executor(_list_multipart_parts_sync, bucket, key, upload_id)
+
+
 def _complete_multipart_upload_sync(
     bucket: str, key: str, upload_id: str, parts: list
 ) -> dict:
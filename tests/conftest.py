@@ -0,0 +1,209 @@
+"""Shared fixtures for the KohakuHub test suite.
+
+The configuration is read when kohakuhub is first imported, so the
+environment is pointed at a throwaway SQLite database and log directory
+before any test module imports the package.
+"""
+
+import base64
+import hashlib
+import io
+import itertools
+import os
+import tempfile
+from datetime import datetime, timezone
+
+_TEST_DIR = tempfile.mkdtemp(prefix="kohakuhub-tests-")
+os.environ.setdefault(
+    "KOHAKU_HUB_DATABASE_URL", f"sqlite:///{os.path.join(_TEST_DIR, 'hub.db')}"
+)
+os.environ.setdefault("KOHAKU_HUB_LOG_DIR", os.path.join(_TEST_DIR, "logs"))
+
+import pytest
+from botocore.exceptions import ClientError
+
+from kohakuhub.db import BaseModel, File, Repository, User, db, init_db
+from kohakuhub.db_operations import create_repository, create_user
+
+
+@pytest.fixture
+def database():
+    """Fresh tables for every test."""
+    init_db()
+    yield db
+    db.drop_tables(BaseModel.__subclasses__())
+
+
+@pytest.fixture
+def user(database) -> User:
+    return create_user("tester", "tester@example.com", "x", email_verified=True)
+
+
+@pytest.fixture
+def repository(user) -> Repository:
+    return create_repository("model", "tester", "bench", "tester/bench", False, user)
+
+
+@pytest.fixture
+def insert_files(database):
+    """Bulk insert File rows of (path, size, sha256, lfs)."""
+
+    def insert(repository: Repository, rows: list[tuple[str, int, str, bool]]):
+        with db.atomic():
+            for i in range(0, len(rows), 300):
+                File.insert_many(
+                    [
+                        {
+                            "repository": repository,
+                            "path_in_repo": path,
+                            "size": size,
+                            "sha256": sha256,
+                            "lfs": lfs,
+                            "owner": repository.owner,
+                        }
+                        for path, size, sha256, lfs in rows[i : i + 300]
+                    ]
+                ).execute()
+
+    return insert
+
+
+class FakeS3:
+    """In-memory stand-in for the boto3 S3 client calls of the LFS and git code.
+
+    Objects are (content, sha256 checksum or None, last modified). Presigned
+    URLs are opaque strings naming the operation and key.
+    """
+
+    class exceptions:
+        class NoSuchKey(ClientError):
+            pass
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}  # upload ID -> (key, {part number: content})
+        self.reads = []  # Keys streamed by get_object
+        self._ids = itertools.count(1)
+
+    @staticmethod
+    def _error(code: str, operation: str) -> ClientError:
+        return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+    def put(self, key: str, content: bytes, checksum: bool = False) -> None:
+        """Store an object, with the SHA256 checksum S3 keeps if one was sent."""
+        digest = hashlib.sha256(content).digest()
+        self.objects[key] = (
+            content,
+            base64.b64encode(digest).decode() if checksum else None,
+            datetime.now(timezone.utc),
+        )
+
+    def upload_part(self, upload_id: str, number: int, content: bytes) -> str:
+        self.uploads[upload_id][1][number] = content
+        return f'"etag-{number}-{hashlib.md5(content).hexdigest()}"'
+
+    def head_object(self, Bucket, Key, **kwargs):
+        if Key not in self.objects:
+            raise self._error("404", "HeadObject")
+        content, checksum, modified = self.objects[Key]
+        response = {
+            "ContentLength": len(content),
+            "ETag": f'"{hashlib.md5(content).hexdigest()}"',
+            "LastModified": modified,
+            "ContentType": "application/octet-stream",
+        }
+        if checksum and kwargs.get("ChecksumMode") == "ENABLED":
+            response["ChecksumSHA256"] = checksum
+        return response
+
+    def get_object(self, Bucket, Key, Range=None):
+        if Key not in self.objects:
+            raise self.exceptions.NoSuchKey(
+                {"Error": {"Code": "NoSuchKey"}}, "GetObject"
+            )
+        self.reads.append(Key)
+        content = self.objects[Key][0]
+        if Range:
+            start, end = Range.removeprefix("bytes=").split("-")
+            content = content[int(start) : int(end) + 1]
+        return {"Body": io.BytesIO(content)}
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.put(Key, Body)
+
+    def upload_fileobj(self, Fileobj, Bucket, Key):
+        self.put(Key, Fileobj.read())
+
+    def copy(self, CopySource, Bucket, Key):
+        self.objects[Key] = self.objects[CopySource["Key"]]
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    def delete_objects(self, Bucket, Delete):
+        for obj in Delete["Objects"]:
+            self.objects.pop(obj["Key"], None)
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        upload_id = f"upload-{next(self._ids)}"
+        self.uploads[upload_id] = (Key, {})
+        return {"UploadId": upload_id}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        if UploadId not in self.uploads:
+            raise self._error("NoSuchUpload", "CompleteMultipartUpload")
+        key, parts = self.uploads.pop(UploadId)
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        self.put(key, b"".join(parts[number] for number in numbers))
+        return {"Key": key}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        if self.uploads.pop(UploadId, None) is None:
+            raise self._error("NoSuchUpload", "AbortMultipartUpload")
+
+    def generate_presigned_url(self, operation, Params, **kwargs):
+        return f"fake-s3://{operation}/{Params['Key']}"
+
+    def get_paginator(self, operation):
+        fake = self
+
+        class Paginator:
+            def paginate(self, Bucket, **kwargs):
+                if operation == "list_parts":
+                    if kwargs["UploadId"] not in fake.uploads:
+                        raise fake._error("NoSuchUpload", "ListParts")
+                    parts = fake.uploads[kwargs["UploadId"]][1]
+                    yield {
+                        "Parts": [
+                            {
+                                "PartNumber": number,
+                                "ETag": f'"etag-{number}-{hashlib.md5(content).hexdigest()}"',
+                                "Size": len(content),
+                            }
+                            for number, content in sorted(parts.items())
+                        ]
+                    }
+                else:
+                    yield {
+                        "Contents": [
+                            {"Key": key, "LastModified": modified}
+                            for key, (_, _, modified) in sorted(fake.objects.items())
+                            if key.startswith(kwargs.get("Prefix", ""))
+                        ]
+                    }
+
+        return Paginator()
+
+
+@pytest.fixture
+def s3(monkeypatch) -> FakeS3:
+    """Fake S3 behind every get_s3_client of the LFS and git object store code."""
+    from kohakuhub.utils import s3 as s3_utils
+    from kohakuhub.api.git.utils import lfs_verify, object_store
+
+    fake = FakeS3()
+    monkeypatch.setattr(s3_utils, "get_s3_client", lambda: fake)
+    monkeypatch.setattr(lfs_verify, "get_s3_client", lambda: fake)
+    monkeypatch.setattr(object_store, "get_s3_client", lambda: fake)
+    monkeypatch.setattr(s3_utils, "_can_presign_in_process", lambda: False)
+    return fake
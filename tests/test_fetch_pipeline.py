@@ -0,0 +1,76 @@
+"""Prioritized blob fetching (fetch_pipeline)."""
+
+import asyncio
+
+from kohakuhub.config import cfg
+from kohakuhub.api.git.utils import fetch_pipeline
+from kohakuhub.api.git.utils.fetch_pipeline import (
+    FetchPriority,
+    PrioritySemaphore,
+    iter_fetched,
+)
+
+
+def test_lowered_priority_is_served_first():
+    async def main():
+        semaphore = PrioritySemaphore(1)
+        await semaphore.acquire()
+        order = []
+
+        async def waiter(name, priority):
+            await semaphore.acquire(priority)
+            order.append(name)
+            semaphore.release()
+
+        late = FetchPriority(5)
+        tasks = [
+            asyncio.create_task(waiter("read-ahead", 1)),
+            asyncio.create_task(waiter("head", late)),
+        ]
+        await asyncio.sleep(0)
+        late.lower(0)
+        semaphore.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["head", "read-ahead"]
+        # Stale heap entries do not keep the semaphore from being free
+        await asyncio.wait_for(semaphore.acquire(), 1)
+
+    asyncio.run(main())
+
+
+def test_blocked_stream_goes_before_earlier_read_ahead(monkeypatch):
+    monkeypatch.setattr(cfg.app, "git_fetch_concurrency", 1)
+    monkeypatch.setattr(cfg.app, "git_fetch_window", 8)
+    monkeypatch.setattr(fetch_pipeline, "_limiter", None)
+
+    async def main():
+        started = []
+        gate = asyncio.Event()
+
+        async def fetch(name):
+            started.append(name)
+            await gate.wait()
+            return name.encode()
+
+        # Stream A queues its read-ahead first; its head blob holds the slot
+        stream_a = iter_fetched(["a0", "a1", "a2", "a3"], fetch)
+        first_a = asyncio.create_task(stream_a.__anext__())
+        await asyncio.sleep(0.01)
+
+        # Stream B then blocks on its first blob
+        stream_b = iter_fetched([b"inline", "b0", "b1"], fetch)
+        assert await stream_b.__anext__() == b"inline"
+        first_b = asyncio.create_task(stream_b.__anext__())
+        await asyncio.sleep(0.01)
+
+        gate.set()
+        assert await first_a == b"a0"
+        assert await first_b == b"b0"
+        # b0 waited for behind a1..a3 (queued first, priority 1..3)
+        assert started[:2] == ["a0", "b0"]
+
+        assert [data async for data in stream_a] == [b"a1", b"a2", b"a3"]
+        assert [data async for data in stream_b] == [b"b1"]
+
+    asyncio.run(main())
@@ -0,0 +1,267 @@
+"""Mapping of LakeFS history to git commits (GitLakeFSBridge)."""
+
+import asyncio
+import hashlib
+import io
+
+import pytest
+
+from kohakuhub.config import cfg
+from kohakuhub.db_operations import get_git_commit_mapping
+from kohakuhub.api.git.utils import lakefs_bridge
+from kohakuhub.api.git.utils.lakefs_bridge import GitLakeFSBridge
+from kohakuhub.api.git.utils.objects import build_nested_trees, create_blob_object
+from kohakuhub.api.git.utils.pack_reader import PackObjectStore, read_pack
+from kohakuhub.api.git.utils.repo_cache import get_repo_cache
+
+
+class FakeLakeFS:
+    """LakeFS client with a linear history c0 <- c1 <- ... on main."""
+
+    def __init__(self, length: int):
+        self.history = []
+        self.extend(length)
+
+    def extend(self, count: int) -> None:
+        for _ in range(count):
+            n = len(self.history)
+            self.history.append(
+                {
+                    "id": f"c{n}",
+                    "parents": [f"c{n - 1}"] if n else [],
+                    "message": f"Commit {n}",
+                    "committer": "tester",
+                    "creation_date": 1700000000 + n,
+                }
+            )
+
+    async def get_branch(self, repository: str, branch: str) -> dict:
+        return {"commit_id": self.history[-1]["id"]}
+
+    async def log_commits(self, repository, ref, after="", amount=1000) -> dict:
+        end = next(i for i, c in enumerate(self.history) if c["id"] == ref)
+        commits = self.history[end::-1]
+        start = int(after or 0)
+        page = commits[start : start + amount]
+        has_more = start + amount < len(commits)
+        return {
+            "results": page,
+            "pagination": {"has_more": has_more, "next_offset": str(start + amount)},
+        }
+
+
+@pytest.fixture
+def history(monkeypatch, repository):
+    """Bridge of the test repository over a fake LakeFS history.
+
+    Trees are not built: load_commit_tree returns a tree per commit and
+    records the commits it was called for; set "gate" to hold it.
+    """
+    get_repo_cache().clear()
+    lakefs = FakeLakeFS(3)
+    monkeypatch.setattr(lakefs_bridge, "get_lakefs_client", lambda: lakefs)
+    state = {"lakefs": lakefs, "built": [], "gate": None}
+
+    async def load_commit_tree(self, repo, commit_id, tree_sha1=None):
+        if state["gate"] is not None:
+            await state["gate"].wait()
+        state["built"].append(commit_id)
+        return {}, hashlib.sha1(commit_id.encode()).hexdigest(), []
+
+    monkeypatch.setattr(GitLakeFSBridge, "load_commit_tree", load_commit_tree)
+    state["bridge"] = GitLakeFSBridge("model", "tester", "bench")
+    return state
+
+
+def advertised(bridge: GitLakeFSBridge) -> str | None:
+    return asyncio.run(bridge.get_refs()).get("HEAD")
+
+
+def sha1_of(repository, commit_id: str) -> str:
+    return get_git_commit_mapping(repository, commit_id).commit_sha1
+
+
+def test_short_history_is_mapped_before_advertising(history, repository):
+    assert advertised(history["bridge"]) == sha1_of(repository, "c2")
+    assert history["built"] == ["c0", "c1", "c2"]
+
+    # Mapped once: later advertisements are lookups
+    assert advertised(history["bridge"]) == sha1_of(repository, "c2")
+    assert history["built"] == ["c0", "c1", "c2"]
+
+
+def test_long_history_is_mapped_in_the_background(history, repository, monkeypatch):
+    monkeypatch.setattr(cfg.app, "git_history_inline_commits", 2)
+    bridge = history["bridge"]
+    base = advertised(bridge)
+    history["lakefs"].extend(5)
+
+    async def main():
+        history["gate"] = asyncio.Event()
+
+        # The mapped ancestor is advertised while the new commits are mapped
+        refs = await asyncio.gather(bridge.get_refs(), bridge.get_refs())
+        assert [r["HEAD"] for r in refs] == [base, base]
+        assert len(lakefs_bridge._backfills) == 1
+
+        history["gate"].set()
+        task, _ = lakefs_bridge._backfills[(repository.id, "c7")]
+        await task
+        return (await bridge.get_refs())["HEAD"]
+
+    head = asyncio.run(main())
+    assert head == sha1_of(repository, "c7")
+    assert history["built"] == ["c0", "c1", "c2", "c3", "c4", "c5", "c6", "c7"]
+    # The new history continues the advertised one
+    c3 = get_git_commit_mapping(repository, "c3")
+    assert f"parent {base}".encode() in bytes(c3.commit_object)
+
+
+def test_unmapped_history_is_waited_for(history, repository, monkeypatch):
+    monkeypatch.setattr(cfg.app, "git_history_inline_commits", 1)
+    # Nothing mapped yet: no older commit could be advertised
+    assert advertised(history["bridge"]) == sha1_of(repository, "c2")
+    assert not lakefs_bridge._backfills
+
+
+def test_fetches_wait_for_the_mapping_in_flight(history, repository, monkeypatch):
+    monkeypatch.setattr(cfg.app, "git_history_inline_commits", 0)
+    bridge = history["bridge"]
+    advertised(bridge)
+    history["lakefs"].extend(2)
+
+    async def main():
+        history["gate"] = asyncio.Event()
+        await bridge.get_refs()
+        fetch = asyncio.ensure_future(bridge.get_commit_mapping("c4"))
+        await asyncio.sleep(0.01)
+        assert not fetch.done()
+        history["gate"].set()
+        return await fetch
+
+    assert asyncio.run(main()).commit_sha1 == sha1_of(repository, "c4")
+    # One run mapped the new commits for both
+    assert history["built"] == ["c0", "c1", "c2", "c3", "c4"]
+
+
+def commit_files(n: int) -> dict[str, bytes]:
+    """Files of commit n: one changes every commit, one every other commit."""
+    return {
+        "README.md": b"readme\n",
+        "data/a.txt": f"a{n}\n".encode(),
+        "data/static/b.txt": b"static\n",
+        "c.txt": f"c{n // 2}\n".encode(),
+    }
+
+
+def commit_tree(n: int) -> tuple[dict, str, list]:
+    """(blob_data, root tree SHA-1, tree objects) of commit n."""
+    blob_data = {
+        path: (create_blob_object(content)[0], None, "100644")
+        for path, content in commit_files(n).items()
+    }
+    root, trees = build_nested_trees(
+        [(mode, path, sha1) for path, (sha1, _, mode) in blob_data.items()]
+    )
+    return blob_data, root, trees
+
+
+@pytest.fixture
+def tree_history(history, s3, monkeypatch):
+    """History whose commits have real trees, mirrored into the object store."""
+    lakefs = history["lakefs"]
+    monkeypatch.setattr(cfg.app, "git_object_store_repack_threshold", 10**6)
+
+    async def get_object(repository, ref, path):
+        return commit_files(int(ref[1:]))[path]
+
+    async def load_commit_tree(self, repo, commit_id, tree_sha1=None):
+        history["built"].append(commit_id)
+        blob_data, root, trees = commit_tree(int(commit_id[1:]))
+        await self.mirror_objects(repo, trees)
+        return blob_data, root, trees
+
+    async def list_commit_objects(self, commit_id):
+        return [
+            {"path": path, "size_bytes": len(content)}
+            for path, content in commit_files(int(commit_id[1:])).items()
+        ]
+
+    lakefs.get_object = get_object
+    monkeypatch.setattr(GitLakeFSBridge, "load_commit_tree", load_commit_tree)
+    monkeypatch.setattr(GitLakeFSBridge, "_list_commit_objects", list_commit_objects)
+    lakefs.extend(1)  # c0..c3
+    return history
+
+
+def assert_pack(bridge: GitLakeFSBridge, commit_id: str, expected: set, **kwargs):
+    """Check the pack of a fetch holds exactly the expected objects, once each."""
+
+    async def collect():
+        return b"".join(
+            [chunk async for chunk in bridge._stream_commit_pack(commit_id, **kwargs)]
+        )
+
+    with PackObjectStore() as pack:
+        count = read_pack(io.BytesIO(asyncio.run(collect())), pack)
+        assert count == len(pack) == len(expected)
+        assert all(sha1 in pack for sha1 in expected)
+
+
+def expected_objects(repository, commits: range) -> set[str]:
+    objects = set()
+    for n in commits:
+        blob_data, _, trees = commit_tree(n)
+        objects.add(sha1_of(repository, f"c{n}"))
+        objects.update(sha1 for sha1, _, _ in blob_data.values())
+        objects.update(hashlib.sha1(data).hexdigest() for _, data in trees)
+    return objects
+
+
+def test_history_pack_walks_stored_trees(tree_history, repository):
+    bridge = tree_history["bridge"]
+    asyncio.run(bridge.get_commit_mapping("c3"))
+    built = list(tree_history["built"])
+
+    assert_pack(bridge, "c3", expected_objects(repository, range(4)))
+    # Trees came from the object store, nothing was rebuilt from LakeFS
+    assert tree_history["built"] == built
+
+
+def test_history_pack_without_object_store(tree_history, repository, monkeypatch):
+    bridge = tree_history["bridge"]
+    asyncio.run(bridge.get_commit_mapping("c3"))
+    monkeypatch.setattr(cfg.app, "git_object_store_enabled", False)
+
+    assert_pack(bridge, "c3", expected_objects(repository, range(4)))
+
+
+def test_history_pack_leaves_out_objects_the_client_has(tree_history, repository):
+    bridge = tree_history["bridge"]
+    asyncio.run(bridge.get_commit_mapping("c3"))
+
+    new = expected_objects(repository, range(2, 4))
+    assert_pack(
+        bridge,
+        "c3",
+        new - expected_objects(repository, range(2)),
+        have_commit_ids=["c1"],
+    )
+
+
+def test_filtered_history_packs(tree_history, repository):
+    bridge = tree_history["bridge"]
+    asyncio.run(bridge.get_commit_mapping("c3"))
+    commits = {sha1_of(repository, f"c{n}") for n in range(4)}
+    trees = {
+        hashlib.sha1(data).hexdigest()
+        for n in range(4)
+        for _, data in commit_tree(n)[2]
+    }
+
+    assert_pack(bridge, "c3", commits, send_trees=False)
+    assert_pack(bridge, "c3", commits | trees, blob_limit=0)
+    # blob:limit=4 keeps the 3-byte files only
+    small = {create_blob_object(f"a{n}\n".encode())[0] for n in range(4)}
+    small |= {create_blob_object(f"c{n}\n".encode())[0] for n in range(2)}
+    assert_pack(bridge, "c3", commits | trees | small, blob_limit=4)
@@ -0,0 +1,160 @@
+"""LFS pointer blobs in the git trees of current and older commits."""
+
+import asyncio
+import hashlib
+import json
+import zlib
+
+import pytest
+
+from kohakuhub.config import cfg
+from kohakuhub.db import File
+from kohakuhub.api.git.utils import lakefs_bridge
+from kohakuhub.api.git.utils.lakefs_bridge import (
+    GitLakeFSBridge,
+    create_lfs_pointer_blob,
+)
+from kohakuhub.api.git.utils.objects import create_blob_object
+from kohakuhub.api.git.utils.repo_cache import get_repo_cache
+from kohakuhub.api.repo.utils import manifest
+from kohakuhub.api.repo.utils.manifest import FileManifest, build_commit_manifest
+
+OLD_WEIGHTS = hashlib.sha256(b"old weights").hexdigest()
+NEW_WEIGHTS = hashlib.sha256(b"new weights").hexdigest()
+
+
+def lfs_address(oid: str) -> str:
+    return f"s3://{cfg.s3.bucket}/lfs/{oid[:2]}/{oid[2:4]}/{oid}"
+
+
+class FakeLakeFS:
+    """LakeFS client whose main branch is at "head", with files of "old"."""
+
+    files = {"notes.txt": b"small notes\n"}
+
+    async def get_branch(self, repository: str, branch: str) -> dict:
+        return {"commit_id": "head"}
+
+    async def get_object(self, repository: str, ref: str, path: str) -> bytes:
+        assert ref == "old"
+        return self.files[path]
+
+
+@pytest.fixture
+def bridge(repository, monkeypatch) -> GitLakeFSBridge:
+    """Bridge of the test repository; File rows describe the head commit."""
+    get_repo_cache().clear()
+    monkeypatch.setattr(lakefs_bridge, "get_lakefs_client", FakeLakeFS)
+
+    for path, oid, size in (
+        ("model.bin", NEW_WEIGHTS, 100),
+        ("notes.txt", hashlib.sha256(b"x" * 2000).hexdigest(), 2000),
+    ):
+        pointer_sha1, pointer = create_lfs_pointer_blob(oid, size)
+        File.create(
+            repository=repository,
+            path_in_repo=path,
+            size=size,
+            sha256=oid,
+            lfs=True,
+            lfs_pointer_sha1=pointer_sha1,
+            lfs_pointer=pointer,
+            owner=repository.owner,
+        )
+    return GitLakeFSBridge("model", "tester", "bench")
+
+
+def test_older_commit_ignores_head_file_rows(bridge):
+    # Listed from LakeFS (no manifest): no LFS flags or oids
+    objects = [
+        {
+            "path": "model.bin",
+            "size_bytes": 90,
+            "physical_address": lfs_address(OLD_WEIGHTS),
+        },
+        {
+            "path": "notes.txt",
+            "size_bytes": 12,
+            "physical_address": "s3://bucket/data/notes",
+        },
+    ]
+    blobs = asyncio.run(bridge._build_blob_sha1s(objects, "old"))
+
+    # The pointer of the old content, not of the head's File row
+    assert blobs["model.bin"][0] == create_lfs_pointer_blob(OLD_WEIGHTS, 90)[0]
+    # Regular in this commit, though LFS in the head
+    assert blobs["notes.txt"][0] == create_blob_object(b"small notes\n")[0]
+    assert b"notes.txt" not in blobs[".gitattributes"][1]
+
+
+def test_head_commit_uses_file_rows(bridge):
+    objects = [{"path": "model.bin", "size_bytes": 100, "physical_address": ""}]
+    blobs = asyncio.run(bridge._build_blob_sha1s(objects, "head"))
+    assert blobs["model.bin"][0] == create_lfs_pointer_blob(NEW_WEIGHTS, 100)[0]
+
+
+def test_manifest_pointer_is_used(bridge):
+    entry = {
+        "path": "model.bin",
+        "size_bytes": 90,
+        "physical_address": lfs_address(OLD_WEIGHTS),
+        "oid": OLD_WEIGHTS,
+        "lfs": True,
+    }
+    pointer_sha1, pointer = create_lfs_pointer_blob(OLD_WEIGHTS, 90)
+
+    blobs = asyncio.run(
+        bridge._build_blob_sha1s([dict(entry, pointer_sha1=None)], "old")
+    )
+    assert blobs["model.bin"][0] == pointer_sha1
+
+    # Stored SHA-1s are taken as they are
+    blobs = asyncio.run(
+        bridge._build_blob_sha1s([dict(entry, pointer_sha1="f" * 40)], "old")
+    )
+    sha1, data, _ = blobs["model.bin"]
+    assert sha1 == "f" * 40
+    assert data == f"blob {len(pointer)}\0".encode() + pointer
+
+
+def test_manifest_stores_pointers_of_matching_file_rows(
+    bridge, repository, monkeypatch
+):
+    async def iter_objects_sharded(lakefs_repo, commit_id):
+        yield [
+            {"path": "model.bin", "size_bytes": 100, "physical_address": ""},
+            {"path": "notes.txt", "size_bytes": 12, "physical_address": ""},
+        ]
+
+    monkeypatch.setattr(manifest, "iter_objects_sharded", iter_objects_sharded)
+    built = asyncio.run(
+        build_commit_manifest(repository, "lakefs-repo", "head", use_file_rows=True)
+    )
+
+    assert built.get("model.bin")["pointer_sha1"] == (
+        create_lfs_pointer_blob(NEW_WEIGHTS, 100)[0]
+    )
+    # The File row has other content (size) than the commit
+    assert built.get("notes.txt")["pointer_sha1"] is None
+
+    decoded = FileManifest.from_bytes("head", built.to_bytes())
+    assert decoded.columns == built.columns
+
+
+def test_version_1_manifest_has_no_pointers():
+    document = {
+        "version": 1,
+        "path": ["model.bin"],
+        "size": [90],
+        "oid": [OLD_WEIGHTS],
+        "checksum": [""],
+        "lfs": [1],
+        "mtime": [None],
+        "address": [lfs_address(OLD_WEIGHTS)],
+        "content_type": [None],
+    }
+    decoded = FileManifest.from_bytes(
+        "old", zlib.compress(json.dumps(document).encode())
+    )
+    assert decoded.get("model.bin")["pointer_sha1"] is None
+    assert decoded.get("model.bin")["oid"] == OLD_WEIGHTS
@@ -0,0 +1,42 @@
+"""Git object index of the object store (GitObject rows)."""
+
+import hashlib
+
+from kohakuhub.db_operations import (
+    count_loose_git_objects,
+    get_git_objects,
+    mark_git_objects_packed,
+    save_git_objects,
+)
+
+
+def sha1(n: int) -> str:
+    return hashlib.sha1(str(n).encode()).hexdigest()
+
+
+def test_lookups_span_several_chunks(repository):
+    save_git_objects(
+        repository, [(sha1(n), 3, n, None, None, None) for n in range(1200)]
+    )
+
+    wanted = [sha1(n) for n in range(1300)] + [sha1(0), ""]
+    objects = get_git_objects(repository, wanted)
+    assert len(objects) == 1200
+    assert objects[sha1(700)].size == 700
+
+
+def test_objects_are_marked_packed_in_bulk(repository):
+    save_git_objects(
+        repository, [(sha1(n), 3, n, None, None, None) for n in range(400)]
+    )
+
+    entries = [(sha1(n), 12 + n * 10, n + 5) for n in range(0, 400, 2)]
+    mark_git_objects_packed(repository, "pack-1", entries)
+
+    assert count_loose_git_objects(repository) == 200
+    objects = get_git_objects(repository, [sha1(n) for n in range(400)])
+    for n in (0, 2, 398):
+        obj = objects[sha1(n)]
+        assert (obj.pack, obj.offset, obj.length) == ("pack-1", 12 + n * 10, n + 5)
+    assert objects[sha1(1)].pack is None
+    assert objects[sha1(1)].offset is None
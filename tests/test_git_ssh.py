@@ -0,0 +1,302 @@
+"""Git over SSH against a local server.
+
+start_ssh_server runs on localhost with a generated host key; the real git
+and OpenSSH clients clone and push with generated user keys registered as
+SSHKey rows. LakeFS is replaced by a bridge serving a local git repository
+and pushes are recorded instead of replayed, so no network service is
+needed.
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+
+import pytest
+
+asyncssh = pytest.importorskip("asyncssh")
+
+from kohakuhub.config import cfg
+from kohakuhub.db import SSHKey
+from kohakuhub.db_operations import create_repository, create_user
+from kohakuhub.api.git.routers.ssh_keys import compute_ssh_fingerprint
+from kohakuhub.api.git.utils import ssh_server
+from kohakuhub.api.git.utils.repo_cache import get_repo_cache
+
+pytestmark = pytest.mark.skipif(
+    shutil.which("git") is None or shutil.which("ssh") is None,
+    reason="needs the git and ssh clients",
+)
+
+
+def git(*args: str, cwd=None, env=None) -> str:
+    result = subprocess.run(
+        ["git", *args], cwd=cwd, env=env, capture_output=True, check=True
+    )
+    return result.stdout.decode().strip()
+
+
+class LocalBridge:
+    """GitLakeFSBridge stand-in serving the refs and objects of a local repository."""
+
+    source = None  # Path of the served repository, set by the fixture
+
+    def __init__(self, repo_type: str, namespace: str, name: str):
+        self.repo_id = f"{namespace}/{name}"
+
+    async def get_refs(self, branch: str = "main") -> dict[str, str]:
+        head = git("rev-parse", branch, cwd=self.source)
+        return {f"refs/heads/{branch}": head, "HEAD": head}
+
+    async def find_common_commits(self, haves: list[str]) -> list[str]:
+        known = []
+        for sha in haves:
+            result = subprocess.run(
+                ["git", "cat-file", "-e", f"{sha}^{{commit}}"],
+                cwd=self.source,
+                capture_output=True,
+            )
+            if result.returncode == 0:
+                known.append(sha)
+        return known
+
+    async def stream_pack_file(self, wants, haves, branch="main", **kwargs):
+        revs = "".join(f"{sha}\n" for sha in wants)
+        revs += "".join(f"^{sha}\n" for sha in haves)
+        result = subprocess.run(
+            ["git", "pack-objects", "--stdout", "--revs"],
+            cwd=self.source,
+            input=revs.encode(),
+            capture_output=True,
+            check=True,
+        )
+        yield result.stdout
+
+
+@pytest.fixture
+def ssh_env(tmp_path, database, monkeypatch):
+    """Users, repositories, keys and a client environment for the SSH server."""
+    get_repo_cache().clear()
+
+    alice = create_user("alice", "alice@example.com", "x", email_verified=True)
+    bob = create_user("bob", "bob@example.com", "x", email_verified=True)
+    create_repository("model", "alice", "demo", "alice/demo", False, alice)
+    create_repository("model", "alice", "secret", "alice/secret", True, alice)
+
+    keys = {}
+    for name, user in (("alice", alice), ("bob", bob), ("stranger", None)):
+        key = asyncssh.generate_private_key("ssh-ed25519")
+        path = tmp_path / f"id_{name}"
+        key.write_private_key(str(path))
+        os.chmod(path, 0o600)
+        keys[name] = path
+        if user is not None:
+            key_type, key_data = key.export_public_key("openssh").decode().split()[:2]
+            SSHKey.create(
+                user=user,
+                key_type=key_type,
+                public_key=f"{key_type} {key_data}",
+                fingerprint=compute_ssh_fingerprint(key_type, key_data),
+                title=f"{name} test key",
+            )
+
+    # Repository served by the bridge, one commit on main
+    source = tmp_path / "source"
+    git("init", "-q", "-b", "main", str(source))
+    (source / "README.md").write_text("# demo\n")
+    env = dict(
+        os.environ,
+        HOME=str(tmp_path),
+        GIT_AUTHOR_NAME="Alice",
+        GIT_AUTHOR_EMAIL="alice@example.com",
+        GIT_COMMITTER_NAME="Alice",
+        GIT_COMMITTER_EMAIL="alice@example.com",
+        GIT_CONFIG_NOSYSTEM="1",
+    )
+    git("add", "README.md", cwd=source, env=env)
+    git("commit", "-q", "-m", "Initial commit", cwd=source, env=env)
+    monkeypatch.setattr(LocalBridge, "source", source)
+    monkeypatch.setattr(ssh_server, "GitLakeFSBridge", LocalBridge)
+
+    pushes = []
+
+    async def record_push(repository, user, ref_updates, objects):
+        pushes.append(
+            (
+                repository.full_id,
+                user.username,
+                ref_updates,
+                {new: objects.type_of(new) for _, new, _ in ref_updates},
+            )
+        )
+        return {ref_name: None for _, _, ref_name in ref_updates}
+
+    monkeypatch.setattr(ssh_server, "apply_push", record_push)
+    monkeypatch.setattr(cfg.app, "git_ssh_host", "127.0.0.1")
+    monkeypatch.setattr(cfg.app, "git_ssh_port", 0)
+    monkeypatch.setattr(cfg.app, "git_ssh_host_key_path", str(tmp_path / "host_key"))
+
+    return {"tmp": tmp_path, "keys": keys, "env": env, "pushes": pushes}
+
+
+async def run_git(ssh_env, port: int, key: str, *args: str, cwd=None):
+    """Run a git command using the given user's key; returns (code, stderr)."""
+    env = dict(
+        ssh_env["env"],
+        GIT_SSH_COMMAND=(
+            f"ssh -p {port} -i {ssh_env['keys'][key]} -o IdentitiesOnly=yes "
+            "-o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null "
+            "-o BatchMode=yes -o LogLevel=ERROR"
+        ),
+    )
+    process = await asyncio.create_subprocess_exec(
+        "git",
+        *args,
+        cwd=cwd,
+        env=env,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    _, stderr = await asyncio.wait_for(process.communicate(), timeout=60)
+    return process.returncode, stderr.decode()
+
+
+def run_with_server(scenario):
+    async def main():
+        server = await ssh_server.start_ssh_server()
+        port = server.sockets[0].getsockname()[1]
+        try:
+            await scenario(port)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(main())
+
+
+def test_host_key_is_generated_once(ssh_env):
+    path = ssh_env["tmp"] / "host_key"
+    first = ssh_server.load_host_key(str(path))
+    second = ssh_server.load_host_key(str(path))
+    assert first.export_public_key() == second.export_public_key()
+    assert os.stat(path).st_mode & 0o777 == 0o600
+
+
+def test_clone_and_push(ssh_env):
+    tmp = ssh_env["tmp"]
+    clone = tmp / "clone"
+
+    async def scenario(port):
+        url = f"ssh://git@127.0.0.1:{port}/alice/demo.git"
+        code, stderr = await run_git(ssh_env, port, "alice", "clone", url, str(clone))
+        assert code == 0, stderr
+        assert (clone / "README.md").read_text() == "# demo\n"
+
+        (clone / "model.txt").write_text("weights\n")
+        git("add", "model.txt", cwd=clone, env=ssh_env["env"])
+        git("commit", "-q", "-m", "Add model", cwd=clone, env=ssh_env["env"])
+        new_sha = git("rev-parse", "HEAD", cwd=clone)
+        old_sha = git("rev-parse", "HEAD~1", cwd=clone)
+
+        code, stderr = await run_git(
+            ssh_env, port, "alice", "push", "origin", "main", cwd=clone
+        )
+        assert code == 0, stderr
+        assert ssh_env["pushes"] == [
+            (
+                "alice/demo",
+                "alice",
+                [(old_sha, new_sha, "refs/heads/main")],
+                {new_sha: 1},  # The pushed commit arrived in the pack
+            )
+        ]
+
+    run_with_server(scenario)
+
+    key = SSHKey.get(SSHKey.title == "alice test key")
+    assert key.last_used is not None
+
+
+def test_clone_with_protocol_v0(ssh_env):
+    clone = ssh_env["tmp"] / "clone-v0"
+
+    async def scenario(port):
+        url = f"ssh://git@127.0.0.1:{port}/alice/demo.git"
+        code, stderr = await run_git(
+            ssh_env, port, "bob", "-c", "protocol.version=0", "clone", url, str(clone)
+        )
+        assert code == 0, stderr
+        assert (clone / "README.md").exists()
+
+    run_with_server(scenario)
+
+
+def test_push_denied_without_write_permission(ssh_env):
+    clone = ssh_env["tmp"] / "clone-bob"
+
+    async def scenario(port):
+        url = f"ssh://git@127.0.0.1:{port}/alice/demo.git"
+        # Public repository: bob can read it ...
+        code, stderr = await run_git(ssh_env, port, "bob", "clone", url, str(clone))
+        assert code == 0, stderr
+
+        (clone / "evil.txt").write_text("nope\n")
+        git("add", "evil.txt", cwd=clone, env=ssh_env["env"])
+        git("commit", "-q", "-m", "Sneaky", cwd=clone, env=ssh_env["env"])
+
+        # ... but not push to it
+        code, stderr = await run_git(
+            ssh_env, port, "bob", "push", "origin", "main", cwd=clone
+        )
+        assert code != 0
+        assert "ERROR" in stderr
+        assert ssh_env["pushes"] == []
+
+    run_with_server(scenario)
+
+
+def test_clone_denied_without_read_permission(ssh_env):
+    clone = ssh_env["tmp"] / "clone-secret"
+
+    async def scenario(port):
+        url = f"ssh://git@127.0.0.1:{port}/alice/secret.git"
+        code, stderr = await run_git(ssh_env, port, "bob", "clone", url, str(clone))
+        assert code != 0
+        assert "ERROR" in stderr
+
+        code, stderr = await run_git(ssh_env, port, "alice", "clone", url, str(clone))
+        assert code == 0, stderr
+
+    run_with_server(scenario)
+
+
+def test_unregistered_key_is_rejected(ssh_env):
+    async def scenario(port):
+        url = f"ssh://git@127.0.0.1:{port}/alice/demo.git"
+        code, stderr = await run_git(
+            ssh_env, port, "stranger", "clone", url, str(ssh_env["tmp"] / "x")
+        )
+        assert code != 0
+        assert "Permission denied" in stderr
+
+    run_with_server(scenario)
+
+
+def test_unknown_repository_and_command(ssh_env):
+    async def scenario(port):
+        url = f"ssh://git@127.0.0.1:{port}/alice/missing.git"
+        code, stderr = await run_git(
+            ssh_env, port, "alice", "clone", url, str(ssh_env["tmp"] / "y")
+        )
+        assert code != 0
+        assert "repository alice/missing not found" in stderr
+
+    run_with_server(scenario)
+
+    with pytest.raises(ssh_server.SSHCommandError):
+        ssh_server.parse_git_command("rm -rf /")
+    assert ssh_server.parse_git_command("git-upload-pack '/alice/demo.git'") == (
+        "git-upload-pack",
+        "alice",
+        "demo",
+    )
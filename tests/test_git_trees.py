@@ -0,0 +1,141 @@
+"""Nested git tree building (build_nested_trees).
+
+Trees are checked against what git itself writes for the same index
+(``git update-index --index-info`` + ``git write-tree``), and timed over
+synthetic 100k-path layouts. Run the benchmark with
+``pytest -m slow -s tests/test_git_trees.py`` to see the timings.
+"""
+
+import hashlib
+import os
+import random
+import shutil
+import subprocess
+import time
+
+import pytest
+
+from kohakuhub.api.git.utils.objects import build_nested_trees
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+
+# Names whose git order differs from plain string order of the paths
+NAMES = ["a", "a-b", "a.b", "a0", "a_b", "ab", "B", "z", "é", "a b"]
+
+
+def blob_entry(path: str, mode: str = "100644") -> tuple[str, str, str]:
+    return mode, path, hashlib.sha1(path.encode()).hexdigest()
+
+
+def git_write_tree(tmp_path, entries: list[tuple[str, str, str]]) -> str:
+    """Root tree SHA-1 git writes for an index of (mode, path, blob_sha1)."""
+    repo = tmp_path / "repo"
+    if not repo.exists():
+        subprocess.run(["git", "init", "-q", str(repo)], check=True)
+    env = dict(os.environ, GIT_INDEX_FILE=str(tmp_path / "index"))
+    if os.path.exists(env["GIT_INDEX_FILE"]):
+        os.remove(env["GIT_INDEX_FILE"])
+
+    index_info = "".join(f"{mode} {sha1}\t{path}\n" for mode, path, sha1 in entries)
+    subprocess.run(
+        ["git", "-C", str(repo), "update-index", "--add", "--index-info"],
+        input=index_info.encode(),
+        env=env,
+        check=True,
+    )
+    result = subprocess.run(
+        ["git", "-C", str(repo), "write-tree", "--missing-ok"],
+        env=env,
+        capture_output=True,
+        check=True,
+    )
+    return result.stdout.decode().strip()
+
+
+def random_layout(rng: random.Random, count: int, max_depth: int) -> list[str]:
+    """Random nested paths, without a file where another path has a directory."""
+    paths = {
+        "/".join(rng.choice(NAMES) for _ in range(rng.randint(1, max_depth)))
+        for _ in range(count)
+    }
+    dirs = {path.rsplit("/", 1)[0] for path in paths if "/" in path}
+    dirs |= {d.rsplit("/", i)[0] for d in dirs for i in range(d.count("/") + 1)}
+    return sorted(path for path in paths if path not in dirs)
+
+
+def synthetic_layout(count: int, fanout: int, depth: int) -> list[str]:
+    """count files spread over a directory tree of the given fanout and depth."""
+    paths = []
+    for i in range(count):
+        dirs, n = [], i
+        for _ in range(depth):
+            n, digit = divmod(n, fanout)
+            dirs.append(f"d{digit}")
+        paths.append("/".join(dirs + [f"file-{i}.txt"]))
+    return paths
+
+
+def test_empty():
+    assert build_nested_trees([]) == (None, [])
+
+
+def test_single_file(tmp_path):
+    entries = [blob_entry("README.md")]
+    root, trees = build_nested_trees(entries)
+    assert root == git_write_tree(tmp_path, entries)
+    assert len(trees) == 1
+
+
+def test_nested_layout(tmp_path):
+    entries = [
+        blob_entry(".gitattributes"),
+        blob_entry("README.md"),
+        blob_entry("models/config.json"),
+        blob_entry("models/v1/model.safetensors"),
+        blob_entry("models/v1.0/model.safetensors"),
+        blob_entry("models-old/weights.bin"),
+        blob_entry("scripts/run.sh", mode="100755"),
+    ]
+    root, trees = build_nested_trees(entries)
+    assert root == git_write_tree(tmp_path, entries)
+
+    # One tree per directory, each object hashes to its own SHA-1
+    assert len(trees) == 6
+    shas = {hashlib.sha1(data).hexdigest() for _, data in trees}
+    assert root in shas
+
+
+def test_random_layouts_match_git(tmp_path):
+    rng = random.Random(44)
+    for _ in range(100):
+        paths = random_layout(rng, rng.randint(1, 40), 4)
+        entries = [blob_entry(path) for path in paths]
+        assert build_nested_trees(entries)[0] == git_write_tree(tmp_path, entries)
+
+
+def test_entry_order_does_not_matter():
+    entries = [blob_entry(path) for path in synthetic_layout(500, 7, 3)]
+    shuffled = entries[:]
+    random.Random(0).shuffle(shuffled)
+    assert build_nested_trees(shuffled)[0] == build_nested_trees(entries)[0]
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize(
+    "fanout, depth",
+    [(100_000, 0), (10, 4), (4, 8), (100, 2)],
+    ids=["flat", "deep-10", "deep-4", "wide-100"],
+)
+def test_build_nested_trees_benchmark(tmp_path, fanout, depth):
+    paths = synthetic_layout(100_000, fanout, depth)
+    entries = [blob_entry(path) for path in paths]
+
+    start = time.perf_counter()
+    root, trees = build_nested_trees(entries)
+    seconds = time.perf_counter() - start
+
+    assert root == git_write_tree(tmp_path, entries)
+    print(
+        f"\n100,000 paths, fanout {fanout}, depth {depth}: "
+        f"{len(trees):,} trees in {seconds * 1000:.1f} ms"
+    )
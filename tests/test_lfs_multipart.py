@@ -0,0 +1,230 @@
+"""Multipart LFS uploads: staging, completion and concurrent clients."""
+
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from kohakuhub.db_operations import (
+    create_lfs_multipart_upload,
+    create_organization,
+    create_repository,
+    create_user,
+    create_user_organization,
+    get_lfs_multipart_upload_by_id,
+)
+from kohakuhub.api.git.routers import lfs
+from kohakuhub.api.git.utils import lfs_multipart
+from kohakuhub.api.git.utils.lfs_verify import (
+    STAGING_PREFIX,
+    lfs_object_key,
+    verify_staged_upload,
+)
+from kohakuhub.api.git.utils.repo_cache import get_repo_cache
+
+CHUNK_SIZE = 4
+CONTENT = b"0123456789"  # Three parts of CHUNK_SIZE bytes
+OID = hashlib.sha256(CONTENT).hexdigest()
+SIZE = len(CONTENT)
+EXPIRES_AT = datetime.now(timezone.utc) + timedelta(hours=1)
+
+
+class JSONRequest:
+    def __init__(self, body: dict):
+        self.body = body
+
+    async def json(self) -> dict:
+        return self.body
+
+
+def open_session(user):
+    return asyncio.run(lfs_multipart.open_upload_session(OID, SIZE, user))
+
+
+@pytest.fixture
+def upload(s3, user, monkeypatch):
+    """Open a session and upload its parts; returns (session, parts)."""
+    monkeypatch.setattr(lfs_multipart, "get_multipart_chunk_size", lambda: CHUNK_SIZE)
+
+    def start(content: bytes = CONTENT, as_user=user):
+        session, _ = open_session(as_user)
+        parts = [
+            {
+                "partNumber": number,
+                "etag": s3.upload_part(
+                    session.upload_id,
+                    number,
+                    content[(number - 1) * CHUNK_SIZE : number * CHUNK_SIZE],
+                ),
+            }
+            for number in range(1, session.part_count + 1)
+            if (number - 1) * CHUNK_SIZE < len(content)  # Parts sent so far
+        ]
+        return session, parts
+
+    return start
+
+
+def complete(upload_id: str, parts: list[dict], **body) -> dict:
+    request = JSONRequest({"oid": OID, "parts": parts, **body})
+    return asyncio.run(lfs.lfs_complete_multipart("ns", "repo", request, upload_id))
+
+
+def test_upload_is_staged_and_published_on_completion(s3, upload):
+    session, parts = upload()
+    assert session.s3_key.startswith(f"{STAGING_PREFIX}{OID}/")
+    assert session.part_count == 3
+
+    assert complete(session.upload_id, parts)["size"] == SIZE
+    assert s3.objects[lfs_object_key(OID)][0] == CONTENT
+    assert session.s3_key not in s3.objects
+    assert get_lfs_multipart_upload_by_id(session.upload_id) is None
+
+
+def test_retried_batch_resumes_the_upload(s3, upload, user):
+    session, parts = upload(CONTENT[:CHUNK_SIZE])  # Crashed after one part
+
+    resumed, uploaded = open_session(user)
+    assert resumed.upload_id == session.upload_id
+    assert uploaded == {1: parts[0]["etag"]}
+    assert len(s3.uploads) == 1
+
+
+def test_sessions_are_not_shared_between_users(s3, upload, user):
+    session, _ = upload()
+    other = create_user("other", "other@example.com", "x", email_verified=True)
+
+    other_session, uploaded = open_session(other)
+    assert other_session.upload_id != session.upload_id
+    assert other_session.s3_key != session.s3_key
+    assert uploaded == {}
+    assert open_session(user)[0].upload_id == session.upload_id
+
+
+def test_concurrent_session_creation_keeps_one_upload(s3, upload, user, monkeypatch):
+    create_multipart_upload = lfs_multipart.create_multipart_upload
+    created = []
+
+    async def racing_create(bucket, key):
+        # Another request records its session while this one creates its upload
+        if not created:
+            first = await create_multipart_upload(bucket, key + "-first")
+            created.append(first)
+            create_lfs_multipart_upload(
+                OID, SIZE, user, first, key + "-first", CHUNK_SIZE, 3, EXPIRES_AT
+            )
+        upload_id = await create_multipart_upload(bucket, key)
+        created.append(upload_id)
+        return upload_id
+
+    monkeypatch.setattr(lfs_multipart, "create_multipart_upload", racing_create)
+
+    session, uploaded = open_session(user)
+    assert session.upload_id == created[0]
+    assert uploaded == {}
+    # The duplicate upload is aborted, not leaked
+    assert list(s3.uploads) == [created[0]]
+
+
+def test_concurrent_completion_is_answered_from_the_staged_object(s3, upload):
+    session, parts = upload()
+    # Another client completed the S3 upload; its verification is still due
+    s3.complete_multipart_upload(
+        None,
+        session.s3_key,
+        session.upload_id,
+        {"Parts": [{"PartNumber": p["partNumber"]} for p in parts]},
+    )
+
+    assert complete(session.upload_id, parts)["size"] == SIZE
+    assert s3.objects[lfs_object_key(OID)][0] == CONTENT
+
+
+def test_concurrent_completion_after_verification(s3, upload):
+    session, parts = upload()
+    s3.complete_multipart_upload(
+        None,
+        session.s3_key,
+        session.upload_id,
+        {"Parts": [{"PartNumber": p["partNumber"]} for p in parts]},
+    )
+    asyncio.run(verify_staged_upload(OID, SIZE, session.s3_key))
+    assert session.s3_key not in s3.objects
+
+    assert complete(session.upload_id, parts)["size"] == SIZE
+
+
+def test_missing_upload_without_object_fails(s3, upload):
+    session, parts = upload()
+    s3.abort_multipart_upload(None, session.s3_key, session.upload_id)
+
+    with pytest.raises(HTTPException) as exc:
+        complete(session.upload_id, parts)
+    assert exc.value.status_code == 500
+    assert lfs_object_key(OID) not in s3.objects
+
+
+def test_mismatching_upload_is_rejected(s3, upload):
+    session, parts = upload(b"9876543210")
+
+    with pytest.raises(HTTPException) as exc:
+        complete(session.upload_id, parts)
+    assert exc.value.status_code == 422
+    assert lfs_object_key(OID) not in s3.objects
+
+
+def test_second_completion_succeeds(s3, upload):
+    session, parts = upload()
+    complete(session.upload_id, parts)
+
+    # HuggingFace clients do not send the size
+    assert complete(session.upload_id, parts)["size"] == SIZE
+    assert complete(session.upload_id, parts, size=SIZE)["size"] == SIZE
+
+
+def test_second_completion_with_other_size_fails(s3, upload):
+    session, parts = upload()
+    complete(session.upload_id, parts)
+
+    with pytest.raises(HTTPException) as exc:
+        complete(session.upload_id, parts, size=SIZE + 1)
+    assert exc.value.status_code == 404
+
+
+def test_unknown_upload_fails(s3, upload):
+    with pytest.raises(HTTPException) as exc:
+        complete("upload-unknown", [])
+    assert exc.value.status_code == 404
+
+
+def test_part_urls_require_the_upload_oid_and_owner(s3, upload, user):
+    get_repo_cache().clear()
+    org = create_organization("lab")
+    other = create_user("other", "other@example.com", "x", email_verified=True)
+    for member in (user, other):
+        create_user_organization(member, org, "member")
+    create_repository("model", "lab", "bench", "lab/bench", False, org)
+    session, _ = upload()
+
+    def part_urls(oid, as_user=user):
+        return asyncio.run(
+            lfs.lfs_part_urls("lab", "bench", session.upload_id, oid, 2, 10, as_user)
+        )
+
+    result = part_urls(OID)
+    assert result["parts"] == {
+        "2": f"fake-s3://upload_part/{session.s3_key}",
+        "3": f"fake-s3://upload_part/{session.s3_key}",
+    }
+    assert result["next"] is None
+
+    with pytest.raises(HTTPException) as exc:
+        part_urls("cd" * 32)
+    assert exc.value.status_code == 404
+
+    # Another member can write to the repository, but not to this upload
+    with pytest.raises(HTTPException) as exc:
+        part_urls(OID, other)
+    assert exc.value.status_code == 404
@@ -0,0 +1,188 @@
+"""LFS upload verification: staged uploads, quarantine and deduplication."""
+
+import asyncio
+import hashlib
+
+import pytest
+from fastapi import HTTPException
+
+from kohakuhub.db_operations import create_user, get_lfs_verification
+from kohakuhub.api.git.routers import lfs
+from kohakuhub.api.git.utils.lfs_verify import (
+    QUARANTINE_PREFIX,
+    lfs_object_key,
+    new_staging_token,
+    staging_key,
+    verify_staged_upload,
+)
+from kohakuhub.api.git.utils.repo_cache import get_repo_cache
+
+CONTENT = b"model weights\n" * 1000
+OID = hashlib.sha256(CONTENT).hexdigest()
+SIZE = len(CONTENT)
+
+
+class JSONRequest:
+    def __init__(self, body: dict):
+        self.body = body
+
+    async def json(self) -> dict:
+        return self.body
+
+
+def stage(s3, content: bytes, checksum: bool = False) -> tuple[str, str]:
+    """Upload content as a client would; returns (token, staging key)."""
+    token = new_staging_token()
+    key = staging_key(OID, token)
+    s3.put(key, content, checksum=checksum)
+    return token, key
+
+
+def verify(key: str, size: int = SIZE) -> str | None:
+    return asyncio.run(verify_staged_upload(OID, size, key))
+
+
+def test_matching_upload_is_published(s3, database):
+    _, key = stage(s3, CONTENT)
+
+    assert verify(key) == "verified"
+    assert s3.objects[lfs_object_key(OID)][0] == CONTENT
+    assert key not in s3.objects
+    assert s3.reads == [key]
+    assert get_lfs_verification(OID).status == "verified"
+
+
+def test_stored_checksum_is_trusted_without_reading(s3, database):
+    _, key = stage(s3, CONTENT, checksum=True)
+
+    assert verify(key) == "verified"
+    assert s3.reads == []
+    assert s3.objects[lfs_object_key(OID)][0] == CONTENT
+
+
+def test_mismatch_is_quarantined_without_touching_the_object(s3, database):
+    _, key = stage(s3, CONTENT)
+    assert verify(key) == "verified"
+
+    # A later upload claiming the same OID with other content
+    token, bad_key = stage(s3, b"not the weights" * 100)
+    assert verify(bad_key, SIZE) == "quarantined"
+
+    assert s3.objects[lfs_object_key(OID)][0] == CONTENT
+    assert s3.objects[f"{QUARANTINE_PREFIX}{OID}/{token}"][0].startswith(b"not")
+    assert bad_key not in s3.objects
+    assert get_lfs_verification(OID).status == "verified"
+
+
+def test_mismatch_keeps_an_unverified_object_in_place(s3, database):
+    # Stored before verification existed, still linked by repositories
+    s3.put(lfs_object_key(OID), b"legacy content")
+
+    _, bad_key = stage(s3, b"garbage")
+    assert verify(bad_key, 7) == "quarantined"
+
+    assert s3.objects[lfs_object_key(OID)][0] == b"legacy content"
+    verification = get_lfs_verification(OID)
+    assert verification.status == "quarantined"
+    assert verification.actual_sha256 == hashlib.sha256(b"garbage").hexdigest()
+
+
+def test_size_mismatch_is_quarantined(s3, database):
+    _, key = stage(s3, CONTENT)
+    assert verify(key, SIZE + 1) == "quarantined"
+    assert lfs_object_key(OID) not in s3.objects
+
+
+def test_missing_staged_object(s3, database):
+    assert verify(staging_key(OID, new_staging_token())) is None
+
+
+def test_batch_skips_verified_objects_only(s3, user):
+    def upload_action(size=SIZE):
+        response = asyncio.run(
+            lfs.process_upload_object(OID, size, "tester/bench", user)
+        )
+        return response.actions and response.actions["upload"]
+
+    # Unverified object in lfs/: uploaded again, to a staging key
+    s3.put(lfs_object_key(OID), CONTENT)
+    action = upload_action()
+    assert "/lfs-staging/" in action["href"]
+    assert "/lfs/" not in action["href"]
+
+    _, key = stage(s3, CONTENT)
+    verify(key)
+    assert upload_action() is None
+
+    # Claiming another size never gets a write to the verified object
+    action = upload_action(SIZE + 1)
+    assert "/lfs-staging/" in action["href"]
+
+
+def test_batch_rejects_invalid_oids(s3, user):
+    response = asyncio.run(lfs.process_upload_object("../x", 1, "tester/bench", user))
+    assert response.error.code == 422
+    assert response.actions is None
+
+
+@pytest.fixture
+def call_verify(s3, user, repository):
+    get_repo_cache().clear()
+
+    def call(body: dict, upload: str | None = None, as_user=user) -> dict:
+        return asyncio.run(
+            lfs.lfs_verify("tester", "bench", JSONRequest(body), upload, as_user)
+        )
+
+    return call
+
+
+def test_verify_endpoint_publishes_and_does_not_hash_again(s3, call_verify):
+    token, key = stage(s3, CONTENT)
+    body = {"oid": OID, "size": SIZE}
+
+    assert call_verify(body, token)["message"] == "Object verified successfully"
+    assert s3.reads == [key]
+
+    # Repeated confirmations of a verified object don't read it again
+    call_verify(body, token)
+    call_verify(body)
+    assert s3.reads == [key]
+
+    # An upload made anyway is discarded instead of hashed
+    token, key = stage(s3, CONTENT)
+    call_verify(body, token)
+    assert key not in s3.objects
+    assert s3.reads == [s3.reads[0]]
+
+
+def test_verify_endpoint_reports_mismatches(s3, call_verify):
+    token, _ = stage(s3, b"something else")
+    with pytest.raises(HTTPException) as exc:
+        call_verify({"oid": OID, "size": SIZE}, token)
+    assert exc.value.status_code == 422
+
+    with pytest.raises(HTTPException) as exc:
+        call_verify({"oid": OID, "size": SIZE}, new_staging_token())
+    assert exc.value.status_code == 404
+
+
+def test_verify_endpoint_requires_write_permission(s3, call_verify):
+    token, key = stage(s3, CONTENT)
+    body = {"oid": OID, "size": SIZE}
+
+    with pytest.raises(HTTPException) as exc:
+        call_verify(body, token, as_user=None)
+    assert exc.value.status_code == 401
+
+    other = create_user("other", "other@example.com", "x", email_verified=True)
+    with pytest.raises(HTTPException) as exc:
+        call_verify(body, token, as_user=other)
+    assert exc.value.status_code == 403
+
+    with pytest.raises(HTTPException) as exc:
+        call_verify(body, "../../lfs")
+    assert exc.value.status_code == 400
+
+    assert s3.reads == []
+    assert key in s3.objects
@@ -0,0 +1,59 @@
+"""Git/LFS URL → repository resolution (repo_cache)."""
+
+import dataclasses
+
+import pytest
+
+from kohakuhub.db import Repository
+from kohakuhub.db_operations import create_repository
+from kohakuhub.api.git.utils.repo_cache import (
+    ResolvedRepository,
+    get_repo_cache,
+    invalidate_repo_resolution,
+    resolve_repository,
+)
+
+
+@pytest.fixture
+def cache(database):
+    get_repo_cache().clear()
+    yield get_repo_cache()
+    get_repo_cache().clear()
+
+
+def test_resolution_is_cached(cache, repository, user):
+    resolved = resolve_repository("tester", "bench")
+    assert resolved == ResolvedRepository(
+        id=repository.id,
+        repo_type="model",
+        namespace="tester",
+        name="bench",
+        private=False,
+        owner_id=user.id,
+    )
+    assert resolved.full_id == "tester/bench"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        resolved.private = True
+
+    # Served from the cache until invalidated
+    Repository.update(private=True).where(Repository.id == repository.id).execute()
+    assert resolve_repository("tester", "bench") is resolved
+    invalidate_repo_resolution("tester", "bench")
+    assert resolve_repository("tester", "bench").private
+
+
+def test_repository_types_are_tried_in_order(cache, user):
+    dataset = create_repository("dataset", "tester", "data", "tester/data", False, user)
+    assert resolve_repository("tester", "data").id == dataset.id
+    assert resolve_repository("tester", "data", "model") is None
+    assert resolve_repository("tester", "missing") is None
+
+
+def test_load_fetches_the_row(cache, repository):
+    resolved = resolve_repository("tester", "bench")
+    row = resolved.load()
+    assert isinstance(row, Repository)
+    assert row.quota_bytes == repository.quota_bytes
+
+    repository.delete_instance()
+    assert resolved.load() is None
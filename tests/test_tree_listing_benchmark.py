@@ -0,0 +1,128 @@
+"""Recursive tree listing latency vs file count.
+
+Benchmarks the conversion of a recursive LakeFS listing into HuggingFace
+tree entries, which joins every listed object with its File row. The
+batched join (one IN query per 500 paths) is compared with the former one
+query per object. LakeFS itself is not involved: listings are synthesized
+in the shape list_objects returns, one 1000-object page at a time.
+
+Run with ``pytest -m slow -s tests/test_tree_listing_benchmark.py`` to see
+the timing table.
+"""
+
+import asyncio
+import hashlib
+import time
+
+import pytest
+
+from kohakuhub.db import db
+from kohakuhub.db_operations import get_file
+from kohakuhub.api.repo.routers.tree import build_file_object, convert_lakefs_objects
+
+PAGE_SIZE = 1000
+FILE_COUNTS = (1_000, 10_000, 50_000)
+PER_ROW_MAX_FILES = 10_000  # The per-row baseline gets too slow beyond this
+
+
+def synthetic_listing(count: int) -> list[dict]:
+    """LakeFS ObjectStats of a nested layout, in path order."""
+    objects = [
+        {
+            "path_type": "object",
+            "path": f"shard-{i // 1000:03d}/dir-{i // 100 % 10}/file-{i:06d}.txt",
+            "size_bytes": 1024 + i,
+            "checksum": f"etag-{i}",
+            "mtime": 1_700_000_000 + i,
+        }
+        for i in range(count)
+    ]
+    return sorted(objects, key=lambda obj: obj["path"])
+
+
+def file_rows(objects: list[dict]) -> list[tuple[str, int, str, bool]]:
+    return [
+        (
+            obj["path"],
+            obj["size_bytes"],
+            hashlib.sha1(obj["path"].encode()).hexdigest(),
+            False,
+        )
+        for obj in objects
+    ]
+
+
+def pages(objects: list[dict]) -> list[list[dict]]:
+    return [objects[i : i + PAGE_SIZE] for i in range(0, len(objects), PAGE_SIZE)]
+
+
+async def list_batched(repository, objects: list[dict]) -> list[dict]:
+    entries = []
+    for page in pages(objects):
+        entries.extend(
+            await convert_lakefs_objects(page, repository, "lakefs-repo", "main", 0)
+        )
+    return entries
+
+
+async def list_per_row(repository, objects: list[dict]) -> list[dict]:
+    """The former conversion: one File query per listed object."""
+    entries = []
+    for obj in objects:
+        record = get_file(repository, obj["path"])
+        entries.append(
+            build_file_object(
+                obj["path"],
+                obj["size_bytes"],
+                record.sha256 if record else obj["checksum"],
+                obj["mtime"],
+                False,
+            )
+        )
+    return entries
+
+
+class QueryCounter:
+    def __init__(self, monkeypatch):
+        self.count = 0
+        execute_sql = db.execute_sql
+
+        def counted(*args, **kwargs):
+            self.count += 1
+            return execute_sql(*args, **kwargs)
+
+        monkeypatch.setattr(db, "execute_sql", counted)
+
+
+def timed(coro) -> tuple[list[dict], float]:
+    start = time.perf_counter()
+    result = asyncio.run(coro)
+    return result, time.perf_counter() - start
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("count", FILE_COUNTS)
+def test_recursive_tree_latency(count, repository, insert_files, monkeypatch):
+    objects = synthetic_listing(count)
+    insert_files(repository, file_rows(objects))
+    counter = QueryCounter(monkeypatch)
+
+    entries, batched_seconds = timed(list_batched(repository, objects))
+    batched_queries = counter.count
+
+    # Every entry is joined with its File row (git blob SHA-1, not the etag)
+    assert len(entries) == count
+    assert all(not entry["oid"].startswith("etag-") for entry in entries)
+    # One IN query per 500 paths, independent of per-object lookups
+    assert batched_queries <= 2 * len(pages(objects))
+
+    line = (
+        f"\n{count:>7,} files: batched {batched_seconds * 1000:9.1f} ms "
+        f"({batched_queries} queries)"
+    )
+    if count <= PER_ROW_MAX_FILES:
+        counter.count = 0
+        per_row_entries, per_row_seconds = timed(list_per_row(repository, objects))
+        assert per_row_entries == entries
+        line += f", per-row {per_row_seconds * 1000:9.1f} ms ({counter.count} queries)"
+    print(line)